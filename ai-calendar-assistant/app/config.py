@@ -42,6 +42,8 @@ class Settings(BaseSettings):
     radicale_admin_password: str = ""
     radicale_bot_user: str = "calendar_bot"
     radicale_bot_password: Optional[str] = None  # Required for production, optional for dev
+    radicale_incremental_sync: bool = True  # RFC 6578 sync-collection mirror instead of date_search per read
+    radicale_async_client: bool = True  # httpx-based asyncio CalDAV transport instead of caldav.DAVClient in threads
 
     # OpenAI (for Whisper - optional, can use Yandex STT)
     openai_api_key: Optional[str] = None
@@ -49,6 +51,9 @@ class Settings(BaseSettings):
     # Yandex GPT (for regions where Claude/OpenAI are blocked)
     yandex_gpt_api_key: Optional[str] = None
     yandex_gpt_folder_id: Optional[str] = None
+    yandex_gpt_streaming: bool = True  # Stream completions: early stop when the JSON closes, live clarify text
+    yandex_gpt_intent_cache: bool = True  # Reuse answers to repeated context-free requests (re-anchored to today)
+    yandex_gpt_prompt_token_budget: int = 2000  # Estimated prompt tokens; events/history trimmed by relevance to fit
 
     # Database
     database_url: str = "sqlite:///./calendar_assistant.db"
@@ -104,8 +104,8 @@ async def startup_event():
 
     # Initialize Redis rate limiter
     try:
-        from app.services.rate_limiter_redis import init_redis_rate_limiter
-        init_redis_rate_limiter()
+        from app.services.rate_limiter_redis import init_async_redis_rate_limiter
+        await init_async_redis_rate_limiter()
         logger.info("redis_rate_limiter_enabled")
     except Exception as e:
         logger.warning("redis_rate_limiter_failed_using_memory", error=str(e))
@@ -134,6 +134,14 @@ async def shutdown_event():
     except Exception as e:
         logger.error("preferences_flush_error", error=str(e))
 
+    # Close Redis rate limiter connections
+    try:
+        from app.services import rate_limiter_redis
+        if rate_limiter_redis.rate_limiter_redis_async:
+            await rate_limiter_redis.rate_limiter_redis_async.close()
+    except Exception as e:
+        logger.error("redis_rate_limiter_close_error", error=str(e))
+
     # Close LLM agent HTTP client
     try:
         from app.services.llm_agent_yandex import llm_agent_yandex
@@ -143,6 +151,14 @@ async def shutdown_event():
     except Exception as e:
         logger.error("llm_agent_close_error", error=str(e))
 
+    # Close CalDAV async client connection pool
+    try:
+        from app.services.calendar_radicale import calendar_service
+        await calendar_service.close()
+        logger.info("caldav_client_closed_on_shutdown")
+    except Exception as e:
+        logger.error("caldav_client_close_error", error=str(e))
+
     logger.info("application_shutdown_complete")
 
 
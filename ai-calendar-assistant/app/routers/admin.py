@@ -296,7 +296,12 @@ async def get_admin_stats(
 
 
 @router.get("/users", response_model=List[UserDetail])
-async def get_all_users(request: Request, authorization: Optional[str] = Header(None, alias="Authorization")):
+async def get_all_users(
+    request: Request, authorization: Optional[str] = Header(None, alias="Authorization"),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    sort: str = Query("activity")
+):
     """
     Get detailed information for all users.
 
@@ -314,7 +319,9 @@ async def get_all_users(request: Request, authorization: Optional[str] = Header(
             return []
 
         # Return real user details
-        users = analytics_service.get_all_users_details()
+        if sort not in analytics_service.USER_DETAILS_SORTS:
+            raise HTTPException(status_code=400, detail=f"Unknown sort: {sort}")
+        users = analytics_service.get_all_users_details(limit=limit, offset=offset, sort_by=sort)
         logger.info("admin_users_accessed", count=len(users))
         return users
 
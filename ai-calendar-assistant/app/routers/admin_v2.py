@@ -13,6 +13,7 @@ from slowapi.util import get_remote_address
 
 from app.services.admin_auth_service import get_admin_auth, init_admin_auth_service
 from app.services.analytics_service import analytics_service
+from app.services.admin_query_cache import admin_query_cache
 from app.services.calendar_radicale import calendar_service
 from app.services.todos_service import todos_service
 from app.models.analytics import (
@@ -309,7 +310,7 @@ async def get_admin_stats(request: Request):
             )
         
         # Return real stats
-        stats = analytics_service.get_admin_stats()
+        stats = await admin_query_cache.run(analytics_service.get_admin_stats)
         logger.info("admin_stats_accessed", user_id=payload["user_id"], username=payload["username"])
         return stats
     
@@ -321,7 +322,12 @@ async def get_admin_stats(request: Request):
 
 
 @router.get("/users", response_model=List[UserDetail])
-async def get_all_users(request: Request):
+async def get_all_users(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    sort: str = Query("activity")
+):
     """
     Get detailed information for all users.
     
@@ -336,7 +342,11 @@ async def get_all_users(request: Request):
             return []
         
         # Return real user details
-        users = analytics_service.get_all_users_details()
+        if sort not in analytics_service.USER_DETAILS_SORTS:
+            raise HTTPException(status_code=400, detail=f"Unknown sort: {sort}")
+        users = await admin_query_cache.run(
+            analytics_service.get_all_users_details, limit=limit, offset=offset, sort_by=sort
+        )
         logger.info("admin_users_accessed", user_id=payload["user_id"], count=len(users))
         return users
     
@@ -480,6 +490,8 @@ async def toggle_user_hidden(request: Request, user_id: str):
         
         # Toggle hidden status
         new_hidden = analytics_service.toggle_user_hidden(user_id)
+        # Cached /users responses carry is_hidden_in_admin
+        admin_query_cache.clear()
         
         # Log audit
         auth_service = get_admin_auth()
@@ -521,7 +533,7 @@ async def get_activity_timeline(
             return []
         
         # Return real timeline
-        timeline = analytics_service.get_activity_timeline(hours)
+        timeline = await admin_query_cache.run(analytics_service.get_activity_timeline, hours)
         logger.info("admin_timeline_accessed", 
                    admin_id=payload["user_id"],
                    hours=hours, 
@@ -648,7 +660,7 @@ async def get_daily_timeline(
         if payload.get("mode") == "fake":
             return {"data": [], "period_days": days}
 
-        data = analytics_service.get_daily_timeline(days)
+        data = await admin_query_cache.run(analytics_service.get_daily_timeline, days)
 
         logger.info("admin_daily_timeline_accessed",
                    admin_id=payload["user_id"],
@@ -687,7 +699,7 @@ async def get_llm_costs(
                 "period_days": days
             }
 
-        data = analytics_service.get_llm_cost_breakdown(days)
+        data = await admin_query_cache.run(analytics_service.get_llm_cost_breakdown, days)
 
         logger.info("admin_llm_costs_accessed",
                    admin_id=payload["user_id"],
@@ -728,7 +740,7 @@ async def get_user_metrics(
                 "period_days": days
             }
 
-        data = analytics_service.get_user_engagement_metrics(days)
+        data = await admin_query_cache.run(analytics_service.get_user_engagement_metrics, days)
 
         logger.info("admin_user_metrics_accessed",
                    admin_id=payload["user_id"],
@@ -762,7 +774,7 @@ async def get_top_users(
         if payload.get("mode") == "fake":
             return {"users": [], "limit": limit, "period_days": days}
 
-        users = analytics_service.get_top_users(limit, days)
+        users = await admin_query_cache.run(analytics_service.get_top_users, limit, days)
 
         logger.info("admin_top_users_accessed",
                    admin_id=payload["user_id"],
@@ -39,8 +39,8 @@ async def health_check():
 
     # 2. Check Redis
     try:
-        from app.services.rate_limiter_redis import is_redis_available
-        if is_redis_available():
+        from app.services.rate_limiter_redis import is_redis_available_async
+        if await is_redis_available_async():
             checks["redis"] = {"status": "healthy", "detail": "Redis connected"}
         else:
             checks["redis"] = {"status": "degraded", "detail": "Redis unavailable, using in-memory fallback"}
@@ -102,6 +102,7 @@ class CalendarEvent(BaseModel):
     attendees: List[str] = Field(default_factory=list)
     html_link: str = Field(..., description="Link to event in Google Calendar")
     event_type: str = Field(default="generic", description="Domain event type")
+    recurring: bool = Field(default=False, description="Occurrence of a recurring series (id is the occurrence id: series UID and RECURRENCE-ID)")
 
     class Config:
         """Pydantic config."""
@@ -0,0 +1,104 @@
+"""Shared registry of users who receive reminders (user_id -> chat_id)."""
+
+import threading
+from typing import Callable, Dict, List, Optional
+import structlog
+
+from app.services.analytics_service import analytics_service
+
+logger = structlog.get_logger()
+
+
+class ActiveUsersRegistry:
+    """
+    Active reminder recipients for all schedulers.
+
+    Backed by the analytics users table (is_active, chat_id; partial index
+    on active users) with an in-memory mirror, so lookups and repeated
+    registrations never touch the database. register()/unregister() write
+    one row and notify listeners with (user_id, chat_id), chat_id None
+    meaning the user was removed. reload() picks up changes written by
+    other processes and notifies only the differences.
+
+    Thread-safe.
+    """
+
+    def __init__(self):
+        self._users: Optional[Dict[str, int]] = None  # Loaded on first use
+        self._listeners: List[Callable[[str, Optional[int]], None]] = []
+        self._lock = threading.RLock()
+
+    def _mirror(self) -> Dict[str, int]:
+        """In-memory mirror, loaded from the users table once (caller holds the lock)."""
+        if self._users is None:
+            self._users = {str(user_id): int(chat_id) for user_id, chat_id in analytics_service.get_active_users().items()}
+            logger.info("active_users_loaded", count=len(self._users))
+        return self._users
+
+    def add_listener(self, listener: Callable[[str, Optional[int]], None]):
+        """Subscribe to registrations (user_id, chat_id) and removals (user_id, None)."""
+        self._listeners.append(listener)
+
+    def _notify(self, user_id: str, chat_id: Optional[int]):
+        for listener in list(self._listeners):
+            try:
+                listener(user_id, chat_id)
+            except Exception as e:
+                logger.error("active_users_listener_error", user_id=user_id, error=str(e))
+
+    def register(self, user_id: str, chat_id: int) -> bool:
+        """Add or update user. Returns False (no write) if already registered with this chat."""
+        user_id, chat_id = str(user_id), int(chat_id)
+        with self._lock:
+            users = self._mirror()
+            if users.get(user_id) == chat_id:
+                return False
+            analytics_service.ensure_user(user_id, chat_id)
+            users[user_id] = chat_id
+        self._notify(user_id, chat_id)
+        logger.info("active_user_registered", user_id=user_id)
+        return True
+
+    def unregister(self, user_id: str) -> bool:
+        """Deactivate user (e.g. bot blocked). Returns False if not registered."""
+        user_id = str(user_id)
+        with self._lock:
+            if self._mirror().pop(user_id, None) is None:
+                return False
+            analytics_service.deactivate_user(user_id)
+        self._notify(user_id, None)
+        logger.info("active_user_unregistered", user_id=user_id)
+        return True
+
+    def reload(self):
+        """Re-read active users from the table and notify about changes."""
+        fresh = {str(user_id): int(chat_id) for user_id, chat_id in analytics_service.get_active_users().items()}
+        with self._lock:
+            old = self._users if self._users is not None else {}
+            self._users = fresh
+        changes = [(user_id, None) for user_id in old if user_id not in fresh]
+        changes += [(user_id, chat_id) for user_id, chat_id in fresh.items() if old.get(user_id) != chat_id]
+        for user_id, chat_id in changes:
+            self._notify(user_id, chat_id)
+        if changes:
+            logger.info("active_users_reloaded", count=len(fresh), changed=len(changes))
+
+    def get(self, user_id: str) -> Optional[int]:
+        """Chat ID of active user, or None."""
+        with self._lock:
+            return self._mirror().get(str(user_id))
+
+    def __contains__(self, user_id: str) -> bool:
+        return self.get(user_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._mirror())
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copy of {user_id: chat_id} for iteration."""
+        with self._lock:
+            return dict(self._mirror())
+
+
+active_users_registry = ActiveUsersRegistry()
@@ -0,0 +1,87 @@
+"""Off-event-loop execution and short-TTL caching of admin analytics queries."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Tuple
+import structlog
+
+from app.utils.lru_dict import LRUDict
+
+logger = structlog.get_logger()
+
+
+class AdminQueryCache:
+    """
+    Runs synchronous analytics queries for admin endpoints.
+
+    Queries execute on a small dedicated thread pool, so SQLite work never
+    blocks the event loop and at most max_workers dashboard queries run at
+    once. Results are cached per (query, arguments) for ttl_seconds.
+    Concurrent requests for the same key share one in-flight computation.
+
+    Cached results are shared between requests and must not be mutated.
+    Not thread-safe: call run() from the event loop only.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_workers: int = 2, max_entries: int = 256):
+        """
+        Initialize query cache.
+
+        Args:
+            ttl_seconds: Result lifetime
+            max_workers: Threads available for admin queries
+            max_entries: Cached results kept (least recently used evicted)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="admin-query")
+        self._results: LRUDict = LRUDict(max_size=max_entries)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0  # Bumped by clear(); older in-flight results are not cached
+
+    @staticmethod
+    def _key(func: Callable, args: Tuple, kwargs: Dict) -> Hashable:
+        return (getattr(func, "__qualname__", repr(func)), args, tuple(sorted(kwargs.items())))
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Return func(*args, **kwargs), from cache when fresh."""
+        key = self._key(func, args, kwargs)
+
+        cached = self._results.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(partial(self._on_done, key, self._generation))
+        else:
+            logger.debug("admin_query_coalesced", query=key[0])
+
+        # shield: a cancelled request must not cancel the shared computation
+        return await asyncio.shield(future)
+
+    def _on_done(self, key: Hashable, generation: int, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if generation != self._generation:
+            return  # Started before clear(): may predate the write
+        if not future.cancelled() and future.exception() is None:
+            self._results[key] = (time.monotonic(), future.result())
+
+    def clear(self):
+        """
+        Drop cached results after a write.
+
+        In-flight queries still complete for their callers, but their
+        results are not cached and later requests start a fresh query.
+        """
+        self._generation += 1
+        self._results.clear()
+        self._inflight.clear()
+
+
+admin_query_cache = AdminQueryCache()
@@ -2,6 +2,8 @@
 
 import sqlite3
 import os
+import queue
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
@@ -69,12 +71,34 @@ class AnalyticsService:
     Benefits over JSON storage:
     - Atomic writes - no data loss on crash
     - Multi-process safe - both uvicorn and polling bot can write
-    - No flush needed - writes are immediate
     - Efficient queries - SQL instead of list iteration
+
+    log_action is write-behind: actions are queued and a single writer thread
+    stores them in batches (one transaction each). flush() waits for the queue.
+    Reads do not see queued actions: a query right after log_action in the
+    same request (e.g. get_user_action_count) may miss the new row unless
+    flush() is called first.
+
+    Dashboard queries read per-day/per-hour rollup tables and the
+    user_first_seen cohort table, updated in the same transaction as each
+    batch. rebuild_rollups() recomputes them from actions.
     """
 
-    def __init__(self, db_path: Optional[str] = None):
-        """Initialize analytics service with SQLite database."""
+    WRITE_QUEUE_MAX = 10000  # Pending actions before log_action falls back to inline writes
+    WRITE_BATCH_SIZE = 500  # Max actions per transaction
+    ROLLUP_VERSION = 1  # PRAGMA user_version once rollup tables are backfilled
+
+    EVENT_ACTION_TYPES = ('event_create', 'event_update', 'event_delete')
+    MESSAGE_ACTION_TYPES = ('text_message', 'voice_message')
+
+    def __init__(self, db_path: Optional[str] = None, buffered: bool = True):
+        """
+        Initialize analytics service with SQLite database.
+
+        Args:
+            db_path: SQLite file (default: ANALYTICS_DB_PATH or /var/lib/calendar-bot/analytics.db)
+            buffered: Queue log_action writes for the background writer (False = write inline)
+        """
         if db_path is None:
             db_path = os.getenv("ANALYTICS_DB_PATH", "/var/lib/calendar-bot/analytics.db")
             
@@ -92,6 +116,11 @@ class AnalyticsService:
         self._init_database()
         self._migrate_encrypted_actions()
 
+        self._buffered = buffered
+        self._write_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=self.WRITE_QUEUE_MAX)
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
     def _get_connection(self) -> sqlite3.Connection:
         """Get database connection with WAL mode for better concurrency."""
         conn = sqlite3.connect(str(self.db_path), timeout=30.0)
@@ -100,6 +129,21 @@ class AnalyticsService:
         conn.execute("PRAGMA busy_timeout=30000")
         return conn
 
+    def _get_read_connection(self) -> sqlite3.Connection:
+        """
+        Get read-only connection for dashboard queries.
+
+        Opened with mode=ro so it can never take the write lock; in WAL mode
+        readers do not block the analytics writer. Usable from executor threads.
+        """
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro",
+            uri=True, timeout=30.0, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
     def _init_database(self):
         """Initialize SQLite database schema."""
         conn = self._get_connection()
@@ -135,6 +179,9 @@ class AnalyticsService:
                 conn.execute('CREATE INDEX IF NOT EXISTS idx_users_referral_code ON users(referral_code)')
                 logger.info("migration_added_referral_code_column")
 
+            # Active reminder recipients (ActiveUsersRegistry / get_active_users)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_users_active ON users(user_id, chat_id) WHERE is_active = 1')
+
             # Referrals table for detailed tracking
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS referrals (
@@ -174,7 +221,57 @@ class AnalyticsService:
             conn.execute('CREATE INDEX IF NOT EXISTS idx_actions_type ON actions(action_type)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_actions_success ON actions(success)')
 
+            # Rollups for admin dashboards (non-test actions only).
+            # Maintained by _write_batch, rebuilt from actions by rebuild_rollups().
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rollup_daily_user (
+                    day TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    actions INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    llm_requests INTEGER NOT NULL DEFAULT 0,
+                    llm_tokens INTEGER NOT NULL DEFAULT 0,
+                    llm_cost_rub REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, user_id)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_rollup_daily_user_user ON rollup_daily_user(user_id, day)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rollup_daily_type (
+                    day TEXT NOT NULL,
+                    action_type TEXT NOT NULL,
+                    llm_model TEXT NOT NULL DEFAULT '',
+                    actions INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    tokens INTEGER NOT NULL DEFAULT 0,
+                    cost_rub REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, action_type, llm_model)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rollup_hourly (
+                    hour TEXT NOT NULL,
+                    action_type TEXT NOT NULL,
+                    actions INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (hour, action_type)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS user_first_seen (
+                    user_id TEXT PRIMARY KEY,
+                    first_day TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_user_first_seen_day ON user_first_seen(first_day)')
+
             conn.commit()
+
+            # Backfill rollups once for databases created before they existed
+            if conn.execute('PRAGMA user_version').fetchone()[0] < self.ROLLUP_VERSION:
+                self._rebuild_rollups(conn)
+                conn.execute(f'PRAGMA user_version = {self.ROLLUP_VERSION}')
+                logger.info("analytics_rollups_backfilled", version=self.ROLLUP_VERSION)
             logger.info("analytics_database_initialized", db_path=str(self.db_path))
         except Exception as e:
             logger.error("analytics_database_init_error", error=str(e), exc_info=True)
@@ -271,6 +368,7 @@ class AnalyticsService:
                                   error=str(e))
 
             conn.commit()
+            self._rebuild_rollups(conn)
             conn.close()
 
             # Rename encrypted file to .migrated
@@ -332,7 +430,11 @@ class AnalyticsService:
             conn.close()
 
     def get_active_users(self) -> Dict[str, int]:
-        """Get active users for reminders. Returns {user_id: chat_id}."""
+        """
+        Get active users for reminders. Returns {user_id: chat_id}.
+
+        Schedulers should use ActiveUsersRegistry, which mirrors this in memory.
+        """
         conn = self._get_connection()
         try:
             cursor = conn.execute('SELECT user_id, chat_id FROM users WHERE is_active = 1')
@@ -377,7 +479,6 @@ class AnalyticsService:
         finally:
             conn.close()
 
-    @retry_on_locked()
     def log_action(
         self,
         user_id: str,
@@ -397,7 +498,7 @@ class AnalyticsService:
         is_test: Optional[bool] = None
     ):
         """
-        Log a user action. Writes directly to SQLite (atomic).
+        Log a user action. Queued for the background writer (see flush()).
         
         Args:
             user_id: User ID
@@ -416,7 +517,6 @@ class AnalyticsService:
             llm_model: LLM model used
             is_test: Whether this is test data. If None, auto-detected via is_test_user()
         """
-        conn = self._get_connection()
         try:
             now = datetime.now().isoformat()
 
@@ -427,30 +527,18 @@ class AnalyticsService:
             if is_test is None:
                 is_test = is_test_user(user_id, username)
 
-            conn.execute('''
-                INSERT INTO actions
-                (user_id, action_type, timestamp, details, event_id, success,
-                 error_message, is_test, input_tokens, output_tokens, total_tokens, cost_rub, llm_model)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (user_id, action_type_str, now, details, event_id,
-                  1 if success else 0, error_message,
-                  1 if is_test else 0,
-                  input_tokens, output_tokens, total_tokens, cost_rub, llm_model))
-
-            # Update user info if provided
-            if username or first_name or last_name:
-                conn.execute('''
-                    UPDATE users SET
-                        username = COALESCE(?, username),
-                        first_name = COALESCE(?, first_name),
-                        last_name = COALESCE(?, last_name),
-                        last_seen = ?
-                    WHERE user_id = ?
-                ''', (username, first_name, last_name, now, user_id))
-            else:
-                conn.execute('UPDATE users SET last_seen = ? WHERE user_id = ?', (now, user_id))
+            action_row = (user_id, action_type_str, now, details, event_id,
+                          1 if success else 0, error_message,
+                          1 if is_test else 0,
+                          input_tokens, output_tokens, total_tokens, cost_rub, llm_model)
+            user_update = (user_id, username, first_name, last_name, now)
 
-            conn.commit()
+            if not self._enqueue_write((action_row, user_update)):
+                conn = self._get_connection()
+                try:
+                    self._write_batch(conn, [(action_row, user_update)])
+                finally:
+                    conn.close()
 
             logger.info(
                 "action_logged",
@@ -460,72 +548,245 @@ class AnalyticsService:
             )
         except Exception as e:
             logger.error("log_action_error", user_id=user_id, error=str(e))
+
+    def _enqueue_write(self, item: tuple) -> bool:
+        """Queue action for the writer thread. False if unbuffered or queue is full."""
+        if not self._buffered:
+            return False
+        with self._writer_lock:
+            if self._writer_thread is None or not self._writer_thread.is_alive():
+                self._writer_thread = threading.Thread(
+                    target=self._writer_loop, name="analytics-writer", daemon=True
+                )
+                self._writer_thread.start()
+        try:
+            self._write_queue.put_nowait(item)
+            return True
+        except queue.Full:
+            logger.warning("analytics_write_queue_full", size=self.WRITE_QUEUE_MAX)
+            return False
+
+    @retry_on_locked()
+    def _write_batch(self, conn: sqlite3.Connection, items: List[tuple]):
+        """
+        Store queued actions in one transaction.
+
+        last_seen/name updates are coalesced to one UPDATE per user
+        (latest timestamp, latest non-empty name fields).
+        """
+        users: Dict[str, list] = {}
+        for _, (user_id, username, first_name, last_name, seen_at) in items:
+            current = users.setdefault(user_id, [None, None, None, seen_at])
+            for i, value in enumerate((username, first_name, last_name)):
+                if value:
+                    current[i] = value
+            current[3] = max(current[3], seen_at)
+
+        with conn:
+            conn.executemany('''
+                INSERT INTO actions
+                (user_id, action_type, timestamp, details, event_id, success,
+                 error_message, is_test, input_tokens, output_tokens, total_tokens, cost_rub, llm_model)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [action_row for action_row, _ in items])
+            conn.executemany('''
+                UPDATE users SET
+                    username = COALESCE(?, username),
+                    first_name = COALESCE(?, first_name),
+                    last_name = COALESCE(?, last_name),
+                    last_seen = ?
+                WHERE user_id = ?
+            ''', [(*fields, user_id) for user_id, fields in users.items()])
+            self._update_rollups(conn, [action_row for action_row, _ in items])
+
+    def _update_rollups(self, conn: sqlite3.Connection, action_rows: List[tuple]):
+        """Add a batch of action rows to the rollup tables (caller commits)."""
+        daily_user: Dict[tuple, list] = defaultdict(lambda: [0, 0, 0, 0, 0.0])
+        daily_type: Dict[tuple, list] = defaultdict(lambda: [0, 0, 0, 0.0])
+        hourly: Dict[tuple, list] = defaultdict(lambda: [0, 0])
+        first_seen: Dict[str, str] = {}
+
+        for (user_id, action_type, timestamp, _details, _event_id, success, _error,
+             is_test, _in_tokens, _out_tokens, total_tokens, cost_rub, llm_model) in action_rows:
+            if is_test:
+                continue
+            day = timestamp[:10]
+            hour = f"{day} {timestamp[11:13]}:00:00"
+            error = 0 if success else 1
+            tokens = total_tokens or 0
+            cost = cost_rub or 0.0
+
+            user_row = daily_user[(day, user_id)]
+            user_row[0] += 1
+            user_row[1] += error
+            if action_type == 'llm_request':
+                user_row[2] += 1
+                user_row[3] += tokens
+                user_row[4] += cost
+
+            type_row = daily_type[(day, action_type, llm_model or '')]
+            type_row[0] += 1
+            type_row[1] += error
+            type_row[2] += tokens
+            type_row[3] += cost
+
+            hour_row = hourly[(hour, action_type)]
+            hour_row[0] += 1
+            hour_row[1] += error
+
+            first_seen[user_id] = min(first_seen.get(user_id, day), day)
+
+        conn.executemany('''
+            INSERT INTO rollup_daily_user (day, user_id, actions, errors, llm_requests, llm_tokens, llm_cost_rub)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day, user_id) DO UPDATE SET
+                actions = actions + excluded.actions,
+                errors = errors + excluded.errors,
+                llm_requests = llm_requests + excluded.llm_requests,
+                llm_tokens = llm_tokens + excluded.llm_tokens,
+                llm_cost_rub = llm_cost_rub + excluded.llm_cost_rub
+        ''', [(*key, *values) for key, values in daily_user.items()])
+        conn.executemany('''
+            INSERT INTO rollup_daily_type (day, action_type, llm_model, actions, errors, tokens, cost_rub)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(day, action_type, llm_model) DO UPDATE SET
+                actions = actions + excluded.actions,
+                errors = errors + excluded.errors,
+                tokens = tokens + excluded.tokens,
+                cost_rub = cost_rub + excluded.cost_rub
+        ''', [(*key, *values) for key, values in daily_type.items()])
+        conn.executemany('''
+            INSERT INTO rollup_hourly (hour, action_type, actions, errors)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(hour, action_type) DO UPDATE SET
+                actions = actions + excluded.actions,
+                errors = errors + excluded.errors
+        ''', [(*key, *values) for key, values in hourly.items()])
+        conn.executemany('''
+            INSERT INTO user_first_seen (user_id, first_day) VALUES (?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET first_day = MIN(first_day, excluded.first_day)
+        ''', list(first_seen.items()))
+
+    @staticmethod
+    def _rebuild_rollups(conn: sqlite3.Connection):
+        """Recompute all rollup tables from the actions table in one transaction."""
+        with conn:
+            for table in ('rollup_daily_user', 'rollup_daily_type', 'rollup_hourly', 'user_first_seen'):
+                conn.execute(f'DELETE FROM {table}')
+            conn.execute('''
+                INSERT INTO rollup_daily_user (day, user_id, actions, errors, llm_requests, llm_tokens, llm_cost_rub)
+                SELECT date(timestamp), user_id, COUNT(*),
+                    SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN action_type = 'llm_request' THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN action_type = 'llm_request' THEN COALESCE(total_tokens, 0) ELSE 0 END),
+                    SUM(CASE WHEN action_type = 'llm_request' THEN COALESCE(cost_rub, 0) ELSE 0 END)
+                FROM actions
+                WHERE is_test = 0 AND date(timestamp) IS NOT NULL
+                GROUP BY date(timestamp), user_id
+            ''')
+            conn.execute('''
+                INSERT INTO rollup_daily_type (day, action_type, llm_model, actions, errors, tokens, cost_rub)
+                SELECT date(timestamp), action_type, COALESCE(llm_model, ''), COUNT(*),
+                    SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END),
+                    COALESCE(SUM(total_tokens), 0),
+                    COALESCE(SUM(cost_rub), 0)
+                FROM actions
+                WHERE is_test = 0 AND date(timestamp) IS NOT NULL
+                GROUP BY date(timestamp), action_type, COALESCE(llm_model, '')
+            ''')
+            conn.execute('''
+                INSERT INTO rollup_hourly (hour, action_type, actions, errors)
+                SELECT strftime('%Y-%m-%d %H:00:00', timestamp), action_type, COUNT(*),
+                    SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END)
+                FROM actions
+                WHERE is_test = 0 AND date(timestamp) IS NOT NULL
+                GROUP BY strftime('%Y-%m-%d %H:00:00', timestamp), action_type
+            ''')
+            conn.execute('''
+                INSERT INTO user_first_seen (user_id, first_day)
+                SELECT user_id, MIN(day) FROM rollup_daily_user GROUP BY user_id
+            ''')
+
+    @retry_on_locked()
+    def rebuild_rollups(self):
+        """
+        Recompute dashboard rollups from the actions table.
+
+        Needed after actions are inserted or re-flagged outside log_action
+        (migrations, mark_test_data_in_db). See scripts/backfill_analytics_rollups.py.
+        """
+        self.flush()
+        conn = self._get_connection()
+        try:
+            self._rebuild_rollups(conn)
+            logger.info("analytics_rollups_rebuilt")
         finally:
             conn.close()
 
+    def _writer_loop(self):
+        """Drain the write queue in batches over one persistent connection."""
+        conn = self._get_connection()
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(conn, batch)
+            except Exception as e:
+                logger.error("analytics_batch_write_error", count=len(batch), error=str(e))
+                conn.close()
+                conn = self._get_connection()
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
     def flush(self):
-        """No-op for SQLite (writes are immediate). Kept for API compatibility."""
-        pass
+        """Wait until all queued actions are written. Call on shutdown."""
+        if self._writer_thread is not None and self._writer_thread.is_alive():
+            self._write_queue.join()
 
     def get_dashboard_stats(self) -> DashboardStats:
-        """Get overall dashboard statistics (excluding test data)."""
-        conn = self._get_connection()
+        """Get overall dashboard statistics (excluding test data), from rollups."""
+        conn = self._get_read_connection()
         try:
-            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-            week_start = (datetime.now() - timedelta(days=7)).isoformat()
-
-            # Total users (from users table - single source of truth, excluding test users)
-            # We count distinct user_ids from actions that are not test data
-            total_users = conn.execute(
-                'SELECT COUNT(DISTINCT user_id) FROM actions WHERE is_test = 0'
-            ).fetchone()[0]
+            today = datetime.now().strftime('%Y-%m-%d')
+            week_start = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
 
-            # Active users today
+            total_users = conn.execute('SELECT COUNT(*) FROM user_first_seen').fetchone()[0]
             active_today = conn.execute(
-                'SELECT COUNT(DISTINCT user_id) FROM actions WHERE timestamp >= ? AND is_test = 0',
-                (today_start,)
+                'SELECT COUNT(*) FROM rollup_daily_user WHERE day = ?', (today,)
             ).fetchone()[0]
-
-            # Active users this week
             active_week = conn.execute(
-                'SELECT COUNT(DISTINCT user_id) FROM actions WHERE timestamp >= ? AND is_test = 0',
-                (week_start,)
-            ).fetchone()[0]
-
-            # Events (SEC-002: parameterized queries to prevent SQL injection)
-            event_types = ['event_create', 'event_update', 'event_delete']
-            event_placeholders = ','.join('?' * len(event_types))
-            total_events = conn.execute(
-                f'SELECT COUNT(*) FROM actions WHERE action_type IN ({event_placeholders}) AND is_test = 0',
-                event_types
-            ).fetchone()[0]
-            events_today = conn.execute(
-                f'SELECT COUNT(*) FROM actions WHERE action_type IN ({event_placeholders}) AND timestamp >= ? AND is_test = 0',
-                (*event_types, today_start)
-            ).fetchone()[0]
-            events_week = conn.execute(
-                f'SELECT COUNT(*) FROM actions WHERE action_type IN ({event_placeholders}) AND timestamp >= ? AND is_test = 0',
-                (*event_types, week_start)
-            ).fetchone()[0]
-
-            # Messages (SEC-002: parameterized queries to prevent SQL injection)
-            msg_types = ['text_message', 'voice_message']
-            msg_placeholders = ','.join('?' * len(msg_types))
-            total_messages = conn.execute(
-                f'SELECT COUNT(*) FROM actions WHERE action_type IN ({msg_placeholders}) AND is_test = 0',
-                msg_types
-            ).fetchone()[0]
-            messages_today = conn.execute(
-                f'SELECT COUNT(*) FROM actions WHERE action_type IN ({msg_placeholders}) AND timestamp >= ? AND is_test = 0',
-                (*msg_types, today_start)
+                'SELECT COUNT(DISTINCT user_id) FROM rollup_daily_user WHERE day >= ?', (week_start,)
             ).fetchone()[0]
 
-            # Errors
-            total_errors = conn.execute('SELECT COUNT(*) FROM actions WHERE success = 0 AND is_test = 0').fetchone()[0]
-            errors_today = conn.execute(
-                'SELECT COUNT(*) FROM actions WHERE success = 0 AND timestamp >= ? AND is_test = 0',
-                (today_start,)
-            ).fetchone()[0]
+            # One pass over the per-day type rollup (SEC-002: parameterized)
+            event_placeholders = ','.join('?' * len(self.EVENT_ACTION_TYPES))
+            msg_placeholders = ','.join('?' * len(self.MESSAGE_ACTION_TYPES))
+            row = conn.execute(f'''
+                SELECT
+                    COALESCE(SUM(CASE WHEN action_type IN ({event_placeholders}) THEN actions END), 0) as total_events,
+                    COALESCE(SUM(CASE WHEN action_type IN ({event_placeholders}) AND day = ? THEN actions END), 0) as events_today,
+                    COALESCE(SUM(CASE WHEN action_type IN ({event_placeholders}) AND day >= ? THEN actions END), 0) as events_week,
+                    COALESCE(SUM(CASE WHEN action_type IN ({msg_placeholders}) THEN actions END), 0) as total_messages,
+                    COALESCE(SUM(CASE WHEN action_type IN ({msg_placeholders}) AND day = ? THEN actions END), 0) as messages_today,
+                    COALESCE(SUM(errors), 0) as total_errors,
+                    COALESCE(SUM(CASE WHEN day = ? THEN errors END), 0) as errors_today
+                FROM rollup_daily_type
+            ''', (
+                *self.EVENT_ACTION_TYPES,
+                *self.EVENT_ACTION_TYPES, today,
+                *self.EVENT_ACTION_TYPES, week_start,
+                *self.MESSAGE_ACTION_TYPES,
+                *self.MESSAGE_ACTION_TYPES, today,
+                today
+            )).fetchone()
+            total_events, events_today, events_week = row['total_events'], row['events_today'], row['events_week']
+            total_messages, messages_today = row['total_messages'], row['messages_today']
+            total_errors, errors_today = row['total_errors'], row['errors_today']
 
             return DashboardStats(
                 total_users=total_users,
@@ -551,50 +812,41 @@ class AnalyticsService:
             conn.close()
 
     def get_admin_stats(self) -> AdminDashboardStats:
-        """Get extended statistics for admin dashboard (excluding test data)."""
-        conn = self._get_connection()
+        """Get extended statistics for admin dashboard (excluding test data), from rollups."""
+        conn = self._get_read_connection()
         try:
             now = datetime.now()
-            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-            week_start = (now - timedelta(days=7)).isoformat()
-            month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
-
-            # Total logins
-            total_logins = conn.execute(
-                "SELECT COUNT(*) FROM actions WHERE action_type = 'user_login' AND is_test = 0"
-            ).fetchone()[0]
+            today = now.strftime('%Y-%m-%d')
+            week_start = (now - timedelta(days=7)).strftime('%Y-%m-%d')
+            month_start = now.replace(day=1).strftime('%Y-%m-%d')
 
             # Active users today
             active_today = conn.execute(
-                'SELECT COUNT(DISTINCT user_id) FROM actions WHERE timestamp >= ? AND is_test = 0',
-                (today_start,)
+                'SELECT COUNT(*) FROM rollup_daily_user WHERE day = ?', (today,)
             ).fetchone()[0]
 
-            # Active users week (3+ days)
-            cursor = conn.execute('''
-                SELECT user_id, COUNT(DISTINCT date(timestamp)) as active_days
-                FROM actions WHERE timestamp >= ? AND is_test = 0
-                GROUP BY user_id HAVING active_days >= 3
-            ''', (week_start,))
-            active_week = len(cursor.fetchall())
-
-            # Active users month (simplified: 3+ days)
-            cursor = conn.execute('''
-                SELECT user_id, COUNT(DISTINCT date(timestamp)) as active_days
-                FROM actions WHERE timestamp >= ? AND is_test = 0
-                GROUP BY user_id HAVING active_days >= 3
-            ''', (month_start,))
-            active_month = len(cursor.fetchall())
+            # Active users week / month (3+ active days)
+            active_days_query = '''
+                SELECT COUNT(*) FROM (
+                    SELECT user_id FROM rollup_daily_user WHERE day >= ?
+                    GROUP BY user_id HAVING COUNT(*) >= 3
+                )
+            '''
+            active_week = conn.execute(active_days_query, (week_start,)).fetchone()[0]
+            active_month = conn.execute(active_days_query, (month_start,)).fetchone()[0]
 
             # Totals
-            total_users = conn.execute('SELECT COUNT(DISTINCT user_id) FROM actions WHERE is_test = 0').fetchone()[0]
-            total_actions = conn.execute('SELECT COUNT(*) FROM actions WHERE is_test = 0').fetchone()[0]
-            total_events = conn.execute(
-                "SELECT COUNT(*) FROM actions WHERE action_type = 'event_create' AND is_test = 0"
-            ).fetchone()[0]
-            total_messages = conn.execute(
-                "SELECT COUNT(*) FROM actions WHERE action_type IN ('text_message', 'voice_message') AND is_test = 0"
-            ).fetchone()[0]
+            total_users = conn.execute('SELECT COUNT(*) FROM user_first_seen').fetchone()[0]
+            row = conn.execute('''
+                SELECT
+                    COALESCE(SUM(actions), 0) as total_actions,
+                    COALESCE(SUM(CASE WHEN action_type = 'user_login' THEN actions END), 0) as total_logins,
+                    COALESCE(SUM(CASE WHEN action_type = 'event_create' THEN actions END), 0) as total_events,
+                    COALESCE(SUM(CASE WHEN action_type IN ('text_message', 'voice_message') THEN actions END), 0) as total_messages
+                FROM rollup_daily_type
+            ''').fetchone()
+            total_logins, total_actions = row['total_logins'], row['total_actions']
+            total_events, total_messages = row['total_events'], row['total_messages']
 
             return AdminDashboardStats(
                 total_logins=total_logins,
@@ -616,107 +868,118 @@ class AnalyticsService:
         finally:
             conn.close()
 
-    def get_all_users_details(self) -> List[UserDetail]:
-        """Get detailed information for all users (excluding test data)."""
-        conn = self._get_connection()
+    # ORDER BY clauses accepted by get_all_users_details (sort_by -> SQL)
+    USER_DETAILS_SORTS = {
+        "activity": "total_actions DESC, actions_week DESC, last_seen DESC",
+        "last_seen": "last_seen DESC",
+        "first_seen": "first_seen DESC",
+        "actions_today": "actions_today DESC, last_seen DESC",
+    }
+
+    def get_all_users_details(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        sort_by: str = "activity"
+    ) -> List[UserDetail]:
+        """
+        Get detailed information for all users (excluding test data).
+
+        Everything is aggregated in a single grouped query over actions, so the
+        read transaction is held for one statement instead of ~4 per user.
+
+        Args:
+            limit: Page size (None = all users)
+            offset: Number of users to skip
+            sort_by: Key of USER_DETAILS_SORTS (default: most active first)
+        """
+        order_by = self.USER_DETAILS_SORTS.get(sort_by)
+        if order_by is None:
+            raise ValueError(f"Unknown sort: {sort_by}")
+
+        conn = self._get_read_connection()
         try:
             now = datetime.now()
             today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
             week_start = (now - timedelta(days=7)).isoformat()
             month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
 
-            # Get all unique users from actions (excluding test users)
-            cursor = conn.execute('''
-                SELECT
-                    user_id,
-                    MAX(CASE WHEN username IS NOT NULL THEN username END) as username,
-                    MAX(CASE WHEN first_name IS NOT NULL THEN first_name END) as first_name,
-                    MAX(CASE WHEN last_name IS NOT NULL THEN last_name END) as last_name
-                FROM (
-                    SELECT user_id, NULL as username, NULL as first_name, NULL as last_name 
-                    FROM actions WHERE is_test = 0
-                    UNION ALL
-                    SELECT user_id, username, first_name, last_name FROM users
-                )
-                GROUP BY user_id
-            ''')
-
-            users_basic = cursor.fetchall()
-            result = []
-
-            for user_row in users_basic:
-                user_id = user_row['user_id']
-
-                # Get user info from users table if available
-                user_info = conn.execute(
-                    'SELECT username, first_name, last_name, is_hidden_in_admin FROM users WHERE user_id = ?',
-                    (user_id,)
-                ).fetchone()
-
-                username = user_info['username'] if user_info else user_row['username']
-                first_name = user_info['first_name'] if user_info else user_row['first_name']
-                last_name = user_info['last_name'] if user_info else user_row['last_name']
-                is_hidden_in_admin = bool(user_info['is_hidden_in_admin']) if user_info else False
-
-                # Activity metrics (excluding test data)
-                metrics = conn.execute('''
+            # Users from actions (excluding test data) and from users table; users
+            # without actions sort as last seen now, like the per-user fallback below
+            cursor = conn.execute(f'''
+                WITH activity AS (
                     SELECT
+                        user_id,
                         MIN(timestamp) as first_seen,
                         MAX(timestamp) as last_seen,
                         COUNT(*) as total_actions,
                         SUM(CASE WHEN action_type = 'user_login' THEN 1 ELSE 0 END) as total_logins,
-                        SUM(CASE WHEN timestamp >= ? THEN 1 ELSE 0 END) as actions_today,
-                        SUM(CASE WHEN timestamp >= ? THEN 1 ELSE 0 END) as actions_week,
-                        SUM(CASE WHEN timestamp >= ? THEN 1 ELSE 0 END) as actions_month
-                    FROM actions WHERE user_id = ? AND is_test = 0
-                ''', (today_start, week_start, month_start, user_id)).fetchone()
-
-                # Active days (excluding test data)
-                active_days_week = conn.execute('''
-                    SELECT COUNT(DISTINCT date(timestamp)) FROM actions
-                    WHERE user_id = ? AND timestamp >= ? AND is_test = 0
-                ''', (user_id, week_start)).fetchone()[0]
-
-                active_days_month = conn.execute('''
-                    SELECT COUNT(DISTINCT date(timestamp)) FROM actions
-                    WHERE user_id = ? AND timestamp >= ? AND is_test = 0
-                ''', (user_id, month_start)).fetchone()[0]
-
-                first_seen = datetime.fromisoformat(metrics['first_seen']) if metrics['first_seen'] else now
-                last_seen = datetime.fromisoformat(metrics['last_seen']) if metrics['last_seen'] else now
-
-                # Handle None values from SQL aggregates
-                actions_today = metrics['actions_today'] or 0
-                actions_week = metrics['actions_week'] or 0
-                actions_month = metrics['actions_month'] or 0
-                total_logins = metrics['total_logins'] or 0
-                total_actions = metrics['total_actions'] or 0
-                active_days_week = active_days_week or 0
-                active_days_month = active_days_month or 0
+                        SUM(CASE WHEN timestamp >= :today THEN 1 ELSE 0 END) as actions_today,
+                        SUM(CASE WHEN timestamp >= :week THEN 1 ELSE 0 END) as actions_week,
+                        SUM(CASE WHEN timestamp >= :month THEN 1 ELSE 0 END) as actions_month,
+                        COUNT(DISTINCT CASE WHEN timestamp >= :week THEN date(timestamp) END) as active_days_week,
+                        COUNT(DISTINCT CASE WHEN timestamp >= :month THEN date(timestamp) END) as active_days_month
+                    FROM actions
+                    WHERE is_test = 0
+                    GROUP BY user_id
+                ),
+                all_users AS (
+                    SELECT user_id FROM activity
+                    UNION
+                    SELECT user_id FROM users
+                )
+                SELECT
+                    all_users.user_id,
+                    u.username,
+                    u.first_name,
+                    u.last_name,
+                    COALESCE(u.is_hidden_in_admin, 0) as is_hidden_in_admin,
+                    COALESCE(a.first_seen, :now) as first_seen,
+                    COALESCE(a.last_seen, :now) as last_seen,
+                    COALESCE(a.total_actions, 0) as total_actions,
+                    COALESCE(a.total_logins, 0) as total_logins,
+                    COALESCE(a.actions_today, 0) as actions_today,
+                    COALESCE(a.actions_week, 0) as actions_week,
+                    COALESCE(a.actions_month, 0) as actions_month,
+                    COALESCE(a.active_days_week, 0) as active_days_week,
+                    COALESCE(a.active_days_month, 0) as active_days_month
+                FROM all_users
+                LEFT JOIN users u ON u.user_id = all_users.user_id
+                LEFT JOIN activity a ON a.user_id = all_users.user_id
+                ORDER BY {order_by}, all_users.user_id
+                LIMIT :limit OFFSET :offset
+            ''', {
+                "today": today_start,
+                "week": week_start,
+                "month": month_start,
+                "now": now.isoformat(),
+                "limit": -1 if limit is None else limit,
+                "offset": offset,
+            })
 
+            result = []
+            for row in cursor.fetchall():
+                username = row['username']
                 result.append(UserDetail(
-                    user_id=user_id,
+                    user_id=row['user_id'],
                     username=username,
-                    first_name=first_name,
-                    last_name=last_name,
+                    first_name=row['first_name'],
+                    last_name=row['last_name'],
                     telegram_link=f"https://t.me/{username}" if username else None,
-                    first_seen=first_seen,
-                    last_seen=last_seen,
-                    total_logins=total_logins,
-                    total_actions=total_actions,
-                    actions_today=actions_today,
-                    actions_week=actions_week,
-                    actions_month=actions_month,
-                    active_days_week=active_days_week,
-                    active_days_month=active_days_month,
-                    is_active_today=actions_today > 0,
-                    is_active_week=active_days_week >= 3,
-                    is_active_month=active_days_month >= 3,
-                    is_hidden_in_admin=is_hidden_in_admin
+                    first_seen=datetime.fromisoformat(row['first_seen']),
+                    last_seen=datetime.fromisoformat(row['last_seen']),
+                    total_logins=row['total_logins'],
+                    total_actions=row['total_actions'],
+                    actions_today=row['actions_today'],
+                    actions_week=row['actions_week'],
+                    actions_month=row['actions_month'],
+                    active_days_week=row['active_days_week'],
+                    active_days_month=row['active_days_month'],
+                    is_active_today=row['actions_today'] > 0,
+                    is_active_week=row['active_days_week'] >= 3,
+                    is_active_month=row['active_days_month'] >= 3,
+                    is_hidden_in_admin=bool(row['is_hidden_in_admin'])
                 ))
-
-            # Sort by activity: total_actions DESC, actions_week DESC, last_seen DESC
-            result.sort(key=lambda x: (x.total_actions, x.actions_week, x.last_seen), reverse=True)
             return result
         except Exception as e:
             logger.error("get_all_users_details_error", error=str(e), exc_info=True)
@@ -753,15 +1016,15 @@ class AnalyticsService:
 
     def get_activity_timeline(self, hours: int = 24) -> List[TimeSeriesPoint]:
         """Get activity timeline for the last N hours (excluding test data)."""
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
-            start_time = (datetime.now() - timedelta(hours=hours)).isoformat()
+            start_hour = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:00:00')
 
             cursor = conn.execute('''
-                SELECT strftime('%Y-%m-%d %H:00:00', timestamp) as hour, COUNT(*) as count
-                FROM actions WHERE timestamp >= ? AND is_test = 0
+                SELECT hour, SUM(actions) as count
+                FROM rollup_hourly WHERE hour >= ?
                 GROUP BY hour ORDER BY hour
-            ''', (start_time,))
+            ''', (start_hour,))
 
             hourly_data = {row['hour']: row['count'] for row in cursor.fetchall()}
 
@@ -1056,23 +1319,34 @@ class AnalyticsService:
 
         Returns list of dicts with: date, actions, users, events, messages, errors
         """
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
             start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
 
             cursor = conn.execute('''
-                SELECT
-                    date(timestamp) as date,
-                    COUNT(*) as actions,
-                    COUNT(DISTINCT user_id) as users,
-                    SUM(CASE WHEN action_type IN ('event_create', 'event_update', 'event_delete') THEN 1 ELSE 0 END) as events,
-                    SUM(CASE WHEN action_type IN ('text_message', 'voice_message') THEN 1 ELSE 0 END) as messages,
-                    SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END) as errors
-                FROM actions
-                WHERE date(timestamp) >= ? AND is_test = 0
-                GROUP BY date(timestamp)
-                ORDER BY date(timestamp)
-            ''', (start_date,))
+                WITH by_type AS (
+                    SELECT
+                        day,
+                        SUM(actions) as actions,
+                        SUM(CASE WHEN action_type IN ('event_create', 'event_update', 'event_delete') THEN actions ELSE 0 END) as events,
+                        SUM(CASE WHEN action_type IN ('text_message', 'voice_message') THEN actions ELSE 0 END) as messages,
+                        SUM(errors) as errors
+                    FROM rollup_daily_type
+                    WHERE day >= ?
+                    GROUP BY day
+                ),
+                by_user AS (
+                    SELECT day, COUNT(*) as users
+                    FROM rollup_daily_user
+                    WHERE day >= ?
+                    GROUP BY day
+                )
+                SELECT t.day as date, t.actions, COALESCE(u.users, 0) as users,
+                       t.events, t.messages, t.errors
+                FROM by_type t
+                LEFT JOIN by_user u ON u.day = t.day
+                ORDER BY t.day
+            ''', (start_date, start_date))
 
             data = {row['date']: dict(row) for row in cursor.fetchall()}
 
@@ -1107,37 +1381,33 @@ class AnalyticsService:
 
         Returns dict with: daily_costs, by_model, by_user, totals
         """
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
             start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
 
             # Daily costs
             daily_cursor = conn.execute('''
                 SELECT
-                    date(timestamp) as date,
-                    COALESCE(SUM(cost_rub), 0) as cost_rub,
-                    COALESCE(SUM(total_tokens), 0) as tokens,
-                    COUNT(*) as requests
-                FROM actions
-                WHERE action_type = 'llm_request'
-                  AND date(timestamp) >= ?
-                  AND is_test = 0
-                GROUP BY date(timestamp)
-                ORDER BY date(timestamp)
+                    day as date,
+                    SUM(cost_rub) as cost_rub,
+                    SUM(tokens) as tokens,
+                    SUM(actions) as requests
+                FROM rollup_daily_type
+                WHERE action_type = 'llm_request' AND day >= ?
+                GROUP BY day
+                ORDER BY day
             ''', (start_date,))
             daily_costs = [dict(row) for row in daily_cursor.fetchall()]
 
             # By model
             model_cursor = conn.execute('''
                 SELECT
-                    COALESCE(llm_model, 'unknown') as model,
-                    COALESCE(SUM(cost_rub), 0) as cost_rub,
-                    COALESCE(SUM(total_tokens), 0) as tokens,
-                    COUNT(*) as requests
-                FROM actions
-                WHERE action_type = 'llm_request'
-                  AND date(timestamp) >= ?
-                  AND is_test = 0
+                    CASE WHEN llm_model = '' THEN 'unknown' ELSE llm_model END as model,
+                    SUM(cost_rub) as cost_rub,
+                    SUM(tokens) as tokens,
+                    SUM(actions) as requests
+                FROM rollup_daily_type
+                WHERE action_type = 'llm_request' AND day >= ?
                 GROUP BY llm_model
             ''', (start_date,))
             by_model = {row['model']: dict(row) for row in model_cursor.fetchall()}
@@ -1145,18 +1415,16 @@ class AnalyticsService:
             # By user (top 20)
             user_cursor = conn.execute('''
                 SELECT
-                    a.user_id,
+                    r.user_id,
                     u.username,
                     u.first_name,
-                    COALESCE(SUM(a.cost_rub), 0) as cost_rub,
-                    COALESCE(SUM(a.total_tokens), 0) as tokens,
-                    COUNT(*) as requests
-                FROM actions a
-                LEFT JOIN users u ON a.user_id = u.user_id
-                WHERE a.action_type = 'llm_request'
-                  AND date(a.timestamp) >= ?
-                  AND a.is_test = 0
-                GROUP BY a.user_id
+                    SUM(r.llm_cost_rub) as cost_rub,
+                    SUM(r.llm_tokens) as tokens,
+                    SUM(r.llm_requests) as requests
+                FROM rollup_daily_user r
+                LEFT JOIN users u ON r.user_id = u.user_id
+                WHERE r.llm_requests > 0 AND r.day >= ?
+                GROUP BY r.user_id
                 ORDER BY cost_rub DESC
                 LIMIT 20
             ''', (start_date,))
@@ -1199,7 +1467,7 @@ class AnalyticsService:
 
         Returns dict with: dau, wau, mau, dau_mau_ratio, dau_wau_ratio, segments, retention, new_users
         """
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
             start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
             today = datetime.now().strftime('%Y-%m-%d')
@@ -1207,26 +1475,26 @@ class AnalyticsService:
 
             # DAU by day
             dau_cursor = conn.execute('''
-                SELECT date(timestamp) as date, COUNT(DISTINCT user_id) as count
-                FROM actions
-                WHERE date(timestamp) >= ? AND is_test = 0
-                GROUP BY date(timestamp)
-                ORDER BY date(timestamp)
+                SELECT day as date, COUNT(*) as count
+                FROM rollup_daily_user
+                WHERE day >= ?
+                GROUP BY day
+                ORDER BY day
             ''', (start_date,))
             dau = [dict(row) for row in dau_cursor.fetchall()]
 
             # WAU (unique users in last 7 days)
             wau = conn.execute('''
                 SELECT COUNT(DISTINCT user_id) as count
-                FROM actions
-                WHERE date(timestamp) >= ? AND is_test = 0
+                FROM rollup_daily_user
+                WHERE day >= ?
             ''', (week_start,)).fetchone()['count']
 
             # MAU (unique users in period)
             mau = conn.execute('''
                 SELECT COUNT(DISTINCT user_id) as count
-                FROM actions
-                WHERE date(timestamp) >= ? AND is_test = 0
+                FROM rollup_daily_user
+                WHERE day >= ?
             ''', (start_date,)).fetchone()['count']
 
             # Average DAU (last 7 days)
@@ -1236,9 +1504,9 @@ class AnalyticsService:
             # User segments (based on last 7 days activity)
             segments_cursor = conn.execute('''
                 WITH user_activity AS (
-                    SELECT user_id, COUNT(*) as actions
-                    FROM actions
-                    WHERE date(timestamp) >= ? AND is_test = 0
+                    SELECT user_id, SUM(actions) as actions
+                    FROM rollup_daily_user
+                    WHERE day >= ?
                     GROUP BY user_id
                 )
                 SELECT
@@ -1251,41 +1519,18 @@ class AnalyticsService:
 
             # Dormant users (active before but not in last 7 days)
             dormant = conn.execute('''
-                SELECT COUNT(DISTINCT user_id) as count
-                FROM actions
+                SELECT COUNT(*) as count
+                FROM user_first_seen
                 WHERE user_id NOT IN (
-                    SELECT DISTINCT user_id FROM actions
-                    WHERE date(timestamp) >= ? AND is_test = 0
-                ) AND is_test = 0
-            ''', (week_start,)).fetchone()['count']
-
-            # New users (first action in period)
-            new_today = conn.execute('''
-                SELECT COUNT(*) as count FROM (
-                    SELECT user_id, MIN(date(timestamp)) as first_day
-                    FROM actions WHERE is_test = 0
-                    GROUP BY user_id
-                    HAVING first_day = ?
-                )
-            ''', (today,)).fetchone()['count']
-
-            new_week = conn.execute('''
-                SELECT COUNT(*) as count FROM (
-                    SELECT user_id, MIN(date(timestamp)) as first_day
-                    FROM actions WHERE is_test = 0
-                    GROUP BY user_id
-                    HAVING first_day >= ?
+                    SELECT user_id FROM rollup_daily_user WHERE day >= ?
                 )
             ''', (week_start,)).fetchone()['count']
 
-            new_month = conn.execute('''
-                SELECT COUNT(*) as count FROM (
-                    SELECT user_id, MIN(date(timestamp)) as first_day
-                    FROM actions WHERE is_test = 0
-                    GROUP BY user_id
-                    HAVING first_day >= ?
-                )
-            ''', (start_date,)).fetchone()['count']
+            # New users (first action in period)
+            new_users_query = 'SELECT COUNT(*) as count FROM user_first_seen WHERE first_day >= ?'
+            new_today = conn.execute(new_users_query, (today,)).fetchone()['count']
+            new_week = conn.execute(new_users_query, (week_start,)).fetchone()['count']
+            new_month = conn.execute(new_users_query, (start_date,)).fetchone()['count']
 
             # Simple retention calculation (day 1 and day 7)
             retention_d1 = self._calculate_retention(conn, 1)
@@ -1332,28 +1577,14 @@ class AnalyticsService:
         """Calculate retention rate for users N days after first visit."""
         try:
             result = conn.execute('''
-                WITH first_visit AS (
-                    SELECT user_id, MIN(date(timestamp)) as first_day
-                    FROM actions WHERE is_test = 0
-                    GROUP BY user_id
-                ),
-                eligible AS (
-                    SELECT user_id, first_day
-                    FROM first_visit
-                    WHERE date(first_day, '+' || ? || ' days') <= date('now')
-                ),
-                returned AS (
-                    SELECT DISTINCT e.user_id
-                    FROM eligible e
-                    INNER JOIN actions a ON e.user_id = a.user_id
-                    WHERE date(a.timestamp) = date(e.first_day, '+' || ? || ' days')
-                      AND a.is_test = 0
-                )
                 SELECT
-                    CAST(COUNT(DISTINCT r.user_id) AS FLOAT) /
-                    NULLIF(COUNT(DISTINCT e.user_id), 0) as retention
-                FROM eligible e
-                LEFT JOIN returned r ON e.user_id = r.user_id
+                    CAST(SUM(EXISTS (
+                        SELECT 1 FROM rollup_daily_user r
+                        WHERE r.day = date(f.first_day, '+' || ? || ' days')
+                          AND r.user_id = f.user_id
+                    )) AS FLOAT) / NULLIF(COUNT(*), 0) as retention
+                FROM user_first_seen f
+                WHERE date(f.first_day, '+' || ? || ' days') <= date('now')
             ''', (days_after, days_after)).fetchone()
 
             return round(result['retention'] or 0, 2)
@@ -1368,7 +1599,7 @@ class AnalyticsService:
         Returns list of dicts with: user_id, username, first_name, total_actions,
         events, messages, llm_cost, last_seen
         """
-        conn = self._get_connection()
+        conn = self._get_read_connection()
         try:
             start_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
 
@@ -1558,6 +1789,7 @@ class AnalyticsService:
                     ))
 
             conn.commit()
+            self._rebuild_rollups(conn)
             logger.info("migration_completed",
                        users=len(daily_reminder_users),
                        actions=len(actions))
@@ -1652,6 +1884,9 @@ class AnalyticsService:
     def get_user_action_count(self, user_id: str) -> int:
         """Get total action count for a user (for quick-hint visibility).
 
+        Counts stored actions only: a message logged moments ago may still be
+        queued for the writer thread (call flush() first to include it).
+
         Args:
             user_id: User ID
 
@@ -0,0 +1,130 @@
+"""Asyncio CalDAV transport for Radicale on top of httpx."""
+
+import asyncio
+from typing import Mapping, Optional
+import httpx
+import structlog
+
+logger = structlog.get_logger()
+
+
+class CalDAVUnavailableError(Exception):
+    """Radicale did not answer after all retries (network error, timeout or 5xx)."""
+    pass
+
+
+class AsyncCalDAVClient:
+    """
+    Minimal async CalDAV client: raw WebDAV/CalDAV requests over a shared
+    httpx connection pool.
+
+    - Bounded keep-alive pool instead of one shared synchronous session
+    - Per-request connect/read timeouts
+    - Retries with backoff on transport errors and 502/503/504 for
+      idempotent methods; failures never touch any calendar/event caches
+
+    Usage:
+        client = AsyncCalDAVClient("http://radicale:5232", "bot", "secret")
+        response = await client.request("PROPFIND", url, body, depth="0")
+        await client.close()
+    """
+
+    MAX_CONNECTIONS = 50
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    KEEPALIVE_EXPIRY_SECONDS = 30.0
+    CONNECT_TIMEOUT_SECONDS = 3.0
+    REQUEST_TIMEOUT_SECONDS = 10.0
+    MAX_RETRIES = 2
+    RETRY_DELAY_SECONDS = 0.3
+    RETRY_STATUSES = {502, 503, 504}
+    IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE", "PROPFIND", "REPORT"}
+
+    def __init__(self, base_url: str, username: Optional[str] = None, password: Optional[str] = None):
+        """
+        Initialize async CalDAV client.
+
+        Args:
+            base_url: Radicale base URL
+            username: Basic auth user (None for unauthenticated dev setups)
+            password: Basic auth password
+        """
+        self.base_url = base_url
+        self._auth = httpx.BasicAuth(username, password) if username and password else None
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    async def _get_http_client(self) -> httpx.AsyncClient:
+        """Get or create HTTP client with connection pooling."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=self._auth,
+                timeout=httpx.Timeout(self.REQUEST_TIMEOUT_SECONDS, connect=self.CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=self.KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+        return self._http_client
+
+    async def close(self):
+        """Close HTTP client and its connection pool."""
+        if self._http_client and not self._http_client.is_closed:
+            await self._http_client.aclose()
+            self._http_client = None
+            logger.info("caldav_async_client_closed")
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        depth: Optional[str] = None,
+    ) -> httpx.Response:
+        """
+        Send a CalDAV request with retries.
+
+        Args:
+            method: HTTP/WebDAV method (PROPFIND, REPORT, GET, PUT, DELETE, MKCALENDAR)
+            url: Absolute URL or path relative to base_url
+            body: Request body (XML or iCalendar)
+            headers: Extra headers
+            depth: WebDAV Depth header
+
+        Returns:
+            httpx.Response (any status - callers interpret 404/412 etc.)
+
+        Raises:
+            CalDAVUnavailableError: network error, timeout or 5xx after retries
+        """
+        request_headers = dict(headers or {})
+        if body is not None and "Content-Type" not in request_headers:
+            request_headers["Content-Type"] = 'application/xml; charset="utf-8"'
+        if depth is not None:
+            request_headers["Depth"] = depth
+
+        retries = self.MAX_RETRIES if method in self.IDEMPOTENT_METHODS else 0
+        client = await self._get_http_client()
+        last_error: Optional[str] = None
+        for attempt in range(retries + 1):
+            try:
+                response = await client.request(
+                    method, url,
+                    content=body.encode("utf-8") if body is not None else None,
+                    headers=request_headers,
+                )
+                if response.status_code not in self.RETRY_STATUSES:
+                    return response
+                last_error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                last_error = f"{type(e).__name__}: {e}"
+
+            logger.warning("caldav_async_request_retry",
+                           method=method,
+                           attempt=attempt,
+                           error=last_error[:200])
+            if attempt < retries:
+                await asyncio.sleep(self.RETRY_DELAY_SECONDS * (attempt + 1))
+
+        raise CalDAVUnavailableError(f"{method} failed after {retries + 1} attempts: {last_error}")
@@ -0,0 +1,111 @@
+"""Persisted user_id -> CalDAV calendar URL index for RadicaleService."""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+
+class CalendarIndex:
+    """
+    Maps Telegram user IDs to their Radicale calendar URLs.
+
+    Lets RadicaleService address a user's calendar directly instead of
+    listing every calendar under the bot principal and comparing display
+    names. The index survives restarts, so cold lookups cost zero requests.
+
+    File format:
+        {"version": 1, "migrated": true, "calendars": {"<user_id>": "<url>"}}
+
+    `migrated` is set once legacy calendars (found by display name only)
+    have been imported into the index.
+    """
+
+    VERSION = 1
+
+    def __init__(self, index_file: str = "/var/lib/calendar-bot/calendar_index.json"):
+        """
+        Initialize calendar index.
+
+        Args:
+            index_file: Path to JSON file for storing the index
+        """
+        self.index_file = Path(index_file)
+        self._urls: Dict[str, str] = {}
+        self.migrated = False
+        self._lock = threading.Lock()  # Accessed from asyncio.to_thread workers
+        self._load()
+
+    def _load(self):
+        """Load index from file."""
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._urls = {str(k): str(v) for k, v in data.get("calendars", {}).items()}
+                self.migrated = bool(data.get("migrated", False))
+                logger.info("calendar_index_loaded", count=len(self._urls), migrated=self.migrated)
+            else:
+                logger.info("calendar_index_file_not_found", creating_new=True)
+        except Exception as e:
+            logger.error("calendar_index_load_error", error=str(e))
+            self._urls = {}
+            self.migrated = False
+
+    def _save(self):
+        """Write index atomically (temp file + rename). Caller holds the lock."""
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.index_file.with_suffix(self.index_file.suffix + ".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {"version": self.VERSION, "migrated": self.migrated, "calendars": self._urls},
+                    f, ensure_ascii=False, separators=(',', ':')
+                )
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            logger.error("calendar_index_save_error", error=str(e))
+
+    def get(self, user_id: str) -> Optional[str]:
+        """Return calendar URL for user or None if not indexed."""
+        with self._lock:
+            return self._urls.get(user_id)
+
+    def set(self, user_id: str, url: str):
+        """Store calendar URL for user (persisted immediately, no-op if unchanged)."""
+        with self._lock:
+            if self._urls.get(user_id) == url:
+                return
+            self._urls[user_id] = url
+            self._save()
+        logger.debug("calendar_index_set", user_id=user_id)
+
+    def remove(self, user_id: str):
+        """Forget calendar URL for user (e.g. calendar was deleted on the server)."""
+        with self._lock:
+            if self._urls.pop(user_id, None) is not None:
+                self._save()
+        logger.debug("calendar_index_removed", user_id=user_id)
+
+    def import_legacy(self, urls: Dict[str, str]):
+        """
+        Import calendars discovered by display name and mark index as migrated.
+
+        Existing entries are kept - they were resolved more recently.
+        """
+        with self._lock:
+            added = 0
+            for user_id, url in urls.items():
+                if user_id not in self._urls:
+                    self._urls[user_id] = url
+                    added += 1
+            self.migrated = True
+            self._save()
+        logger.info("calendar_index_migrated", discovered=len(urls), added=added)
+
+    def __len__(self) -> int:
+        return len(self._urls)
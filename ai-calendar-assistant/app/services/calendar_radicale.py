@@ -1,21 +1,44 @@
 """Radicale CalDAV integration service (local calendar server)."""
 
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 from datetime import datetime, timedelta
 import asyncio
 import threading
 import time
 import caldav
 from caldav.elements import dav
+from caldav.lib.error import NotFoundError
 from icalendar import Calendar, Event as ICalEvent
 import structlog
 import hashlib
+import re
 import uuid
+from urllib.parse import urljoin
 from urllib3.exceptions import NameResolutionError, NewConnectionError
 
 from app.config import settings
 from app.schemas.events import EventDTO, CalendarEvent, FreeSlot
+from app.services.caldav_async import AsyncCalDAVClient, CalDAVUnavailableError
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_sync import (
+    CalendarSyncEngine,
+    CalendarSyncError,
+    CalendarUnavailableError,
+    calendar_query_by_uid_body,
+    parse_calendar_objects,
+)
+from app.services.event_cache import EventWindowCache
+from app.utils.lru_dict import LRUDict
 from app.utils.pii_masking import safe_log_params
+from app.utils.recurrence import (
+    build_rrule,
+    is_recurring,
+    occurrence_id,
+    occurrence_starts,
+    series_timezone,
+    split_occurrence_id,
+    to_utc,
+)
 
 logger = structlog.get_logger()
 
@@ -81,8 +104,12 @@ class RadicaleService:
     MAX_CLIENT_AGE_SECONDS = 300  # Recycle connection every 5 minutes
     MAX_RETRIES = 2  # Retry CalDAV operations up to 2 times
     RETRY_DELAY_SECONDS = 0.5  # Delay between retries
+    CALENDAR_NAME_PREFIX = "telegram_"
+    MAX_EVENT_HREFS = 20000  # (user_id, uid) -> object href entries kept in memory
+    BULK_CREATE_CONCURRENCY = 8  # Parallel writes per create_events_bulk call
+    CHANGE_NOTIFY_HORIZON_HOURS = 24  # Series occurrences passed to event listeners
 
-    def __init__(self):
+    def __init__(self, calendar_index: Optional[CalendarIndex] = None):
         """Initialize Radicale service."""
         self.url = settings.radicale_url
 
@@ -95,9 +122,35 @@ class RadicaleService:
         self._calendar_cache: dict = {}
         self._cache_lock = threading.Lock()  # For thread-safe cache access (used in asyncio.to_thread)
 
+        # Persisted user_id -> calendar URL index (survives cache TTL and restarts)
+        self._calendar_index = calendar_index if calendar_index is not None else CalendarIndex()
+        self._calendar_home_url: Optional[str] = None  # Principal's calendar home, resolved once
+        self._index_migration_lock = threading.Lock()
+
+        # (user_id, event uid) -> CalDAV object href, filled on create/list.
+        # Lets update/delete address a single object instead of downloading the calendar.
+        self._event_hrefs: LRUDict = LRUDict(max_size=self.MAX_EVENT_HREFS)
+
+        # Per-user event windows for list_events, kept current by create/update/delete
+        self._event_cache = EventWindowCache()
+
+        # Callbacks notified on create/update/delete (e.g. reminder scheduler)
+        self._event_listeners: List[Callable[[str, str, List[CalendarEvent]], None]] = []
+
+        # Incremental sync-collection mirror of user calendars (replaces date_search on reads)
+        self._sync_engine: Optional[CalendarSyncEngine] = (
+            CalendarSyncEngine(self) if settings.radicale_incremental_sync else None
+        )
+
+        # Asyncio CalDAV transport with its own keep-alive pool; None = thread pool + caldav.DAVClient
+        self._async_client: Optional[AsyncCalDAVClient] = (
+            AsyncCalDAVClient(self.url, settings.radicale_bot_user, settings.radicale_bot_password)
+            if settings.radicale_async_client else None
+        )
+
     def _get_user_calendar_name(self, user_id: str) -> str:
         """Generate calendar name for user based on Telegram ID."""
-        return f"telegram_{user_id}"
+        return f"{self.CALENDAR_NAME_PREFIX}{user_id}"
 
     def _reset_connection(self, reason: str = "manual"):
         """Reset CalDAV client and principal, forcing reconnection on next use."""
@@ -157,6 +210,12 @@ class RadicaleService:
         """
         Get or create calendar for user with caching.
 
+        Lookup order:
+        1. In-memory cache (TTL) - no requests
+        2. Persisted calendar index - no requests, calendar addressed by URL
+        3. Deterministic URL <calendar-home>/telegram_<id>/ - one PROPFIND,
+           MKCALENDAR if it does not exist yet
+
         Args:
             user_id: Telegram user ID
 
@@ -177,44 +236,18 @@ class RadicaleService:
         try:
             client = self._get_shared_client()
 
-            # Reuse principal if available
-            if self._principal is None:
-                self._principal = client.principal()
-
-            calendar_name = self._get_user_calendar_name(user_id)
-
-            # Try to find existing calendar by name
-            calendars = self._principal.calendars()
-            for cal in calendars:
-                try:
-                    # Check display name property
-                    cal_props = cal.get_properties([dav.DisplayName()])
-                    display_name = cal_props.get('{DAV:}displayname', '')
-
-                    if display_name == calendar_name:
-                        _cal_duration_ms = (time.perf_counter() - _cal_start) * 1000
-                        logger.info("calendar_found", user_id=user_id, calendar=calendar_name, url=str(cal.url), duration_ms=round(_cal_duration_ms, 1))
-
-                        # Cache the result
-                        self._cache_calendar(user_id, cal)
-                        return cal
-                except Exception as e:
-                    # If can't get properties, skip this calendar
-                    logger.debug("calendar_props_error", calendar=str(cal.url), error=str(e))
-                    continue
-
-            # Create new calendar if doesn't exist
-            new_calendar = self._principal.make_calendar(
-                name=calendar_name,
-                supported_calendar_component_set=['VEVENT']
-            )
-
-            _cal_duration_ms = (time.perf_counter() - _cal_start) * 1000
-            logger.info("calendar_created", user_id=user_id, calendar=calendar_name, duration_ms=round(_cal_duration_ms, 1))
+            calendar_url = self._calendar_index.get(user_id)
+            if calendar_url:
+                calendar = client.calendar(url=calendar_url)
+                logger.debug("calendar_index_hit", user_id=user_id)
+            else:
+                calendar = self._resolve_user_calendar(user_id)
+                _cal_duration_ms = (time.perf_counter() - _cal_start) * 1000
+                logger.info("calendar_resolved", user_id=user_id, url=str(calendar.url), duration_ms=round(_cal_duration_ms, 1))
 
             # Cache the result
-            self._cache_calendar(user_id, new_calendar)
-            return new_calendar
+            self._cache_calendar(user_id, calendar)
+            return calendar
 
         except Exception as e:
             _cal_duration_ms = (time.perf_counter() - _cal_start) * 1000
@@ -225,6 +258,143 @@ class RadicaleService:
             self._principal = None
             return None
 
+    def _get_principal(self) -> caldav.Principal:
+        """Get (cached) principal of the bot user."""
+        if self._principal is None:
+            self._principal = self._get_shared_client().principal()
+        return self._principal
+
+    def _get_calendar_home_url(self) -> str:
+        """Get principal's calendar home URL (resolved once per process)."""
+        if self._calendar_home_url is None:
+            home_url = str(self._get_principal().url)
+            self._calendar_home_url = home_url if home_url.endswith("/") else home_url + "/"
+        return self._calendar_home_url
+
+    def _resolve_user_calendar(self, user_id: str):
+        """
+        Resolve calendar for user not present in the index and store its URL.
+
+        Runs the one-time legacy migration first, then addresses the calendar
+        at its deterministic URL, creating it if missing.
+        """
+        if not self._calendar_index.migrated:
+            self._migrate_calendar_index()
+            calendar_url = self._calendar_index.get(user_id)
+            if calendar_url:
+                return self._get_shared_client().calendar(url=calendar_url)
+
+        calendar_name = self._get_user_calendar_name(user_id)
+        calendar = self._get_shared_client().calendar(url=f"{self._get_calendar_home_url()}{calendar_name}/")
+        try:
+            calendar.get_properties([dav.DisplayName()])
+            logger.info("calendar_found", user_id=user_id, calendar=calendar_name, url=str(calendar.url))
+        except NotFoundError:
+            try:
+                calendar = self._get_principal().make_calendar(
+                    name=calendar_name,
+                    cal_id=calendar_name,
+                    supported_calendar_component_set=['VEVENT']
+                )
+            except Exception:
+                # Concurrent request may have created it in the meantime
+                calendar.get_properties([dav.DisplayName()])
+            logger.info("calendar_created", user_id=user_id, calendar=calendar_name, url=str(calendar.url))
+
+        self._calendar_index.set(user_id, str(calendar.url))
+        return calendar
+
+    def _migrate_calendar_index(self):
+        """
+        One-time import of existing calendars into the index.
+
+        Calendars created before the index existed have server-generated URLs
+        and can only be found by display name. A single depth-1 PROPFIND on
+        the calendar home returns display names for all of them.
+        """
+        with self._index_migration_lock:
+            if self._calendar_index.migrated:
+                return
+
+            _start = time.perf_counter()
+            discovered: Dict[str, str] = {}
+            for cal in self._get_principal().calendars():
+                display_name = cal.name
+                if display_name is None:
+                    try:
+                        cal_props = cal.get_properties([dav.DisplayName()])
+                        display_name = cal_props.get('{DAV:}displayname', '')
+                    except Exception as e:
+                        logger.debug("calendar_props_error", calendar=str(cal.url), error=str(e))
+                        continue
+                if display_name and display_name.startswith(self.CALENDAR_NAME_PREFIX):
+                    discovered[display_name[len(self.CALENDAR_NAME_PREFIX):]] = str(cal.url)
+
+            self._calendar_index.import_legacy(discovered)
+            logger.info("calendar_index_migration_done",
+                       calendars=len(discovered),
+                       duration_ms=round((time.perf_counter() - _start) * 1000, 1))
+
+    def _forget_user_calendar(self, user_id: str):
+        """Drop cached and indexed calendar for user (calendar gone on server)."""
+        self.invalidate_cache(user_id)
+        self._calendar_index.remove(user_id)
+        logger.warning("calendar_index_stale_entry_removed", user_id=user_id)
+
+    def _is_calendar_gone(self, user_id: str, error: NotFoundError) -> bool:
+        """Check whether a 404 is for the user's calendar collection, not a single event."""
+        if not error.url:
+            return True
+        calendar_url = self._calendar_index.get(user_id)
+        if not calendar_url:
+            return True
+        return str(error.url).rstrip("/") == str(calendar_url).rstrip("/")
+
+    def _remember_event_href(self, user_id: str, event_uid: str, href) -> None:
+        """Remember object href for event UID (thread-safe)."""
+        if not href:
+            return
+        with self._cache_lock:
+            self._event_hrefs[(user_id, event_uid)] = str(href)
+
+    def _forget_event_href(self, user_id: str, event_uid: str) -> None:
+        """Drop remembered object href for event UID (thread-safe)."""
+        with self._cache_lock:
+            self._event_hrefs.pop((user_id, event_uid), None)
+
+    def _get_event_href(self, user_id: str, event_uid: str) -> Optional[str]:
+        """Get remembered object href for event UID (thread-safe)."""
+        with self._cache_lock:
+            return self._event_hrefs.get((user_id, event_uid))
+
+    def _get_event_by_uid(self, calendar, user_id: str, event_uid: str):
+        """
+        Fetch a single event object by UID.
+
+        Uses the remembered href (one GET) when available, otherwise a
+        CalDAV calendar-query REPORT with a UID text-match. Never lists
+        the whole calendar.
+
+        Returns:
+            caldav.Event with loaded data, or None if not found
+        """
+        href = self._get_event_href(user_id, event_uid)
+        if href:
+            try:
+                event = calendar.event_by_url(href)
+                event.load()
+                return event
+            except NotFoundError:
+                self._forget_event_href(user_id, event_uid)
+                logger.debug("event_href_stale", user_id=user_id, uid=event_uid)
+
+        try:
+            event = calendar.event_by_uid(event_uid)
+        except NotFoundError:
+            return None
+        self._remember_event_href(user_id, event_uid, event.url)
+        return event
+
     def _cache_calendar(self, user_id: str, calendar):
         """Cache calendar for user with LRU-like eviction (thread-safe)."""
         with self._cache_lock:
@@ -283,6 +453,8 @@ class RadicaleService:
                              attempt=attempt,
                              error_type=error_type,
                              error=str(e)[:200])
+                if isinstance(e, NotFoundError) and self._is_calendar_gone(user_id, e):
+                    self._forget_user_calendar(user_id)
                 self._reset_connection(reason=f"{operation_name}_{error_type}")
                 if attempt < self.MAX_RETRIES:
                     time.sleep(self.RETRY_DELAY_SECONDS * (attempt + 1))
@@ -317,12 +489,19 @@ class RadicaleService:
             user_id: Telegram user ID
             start: Start time of the new/updated event
             end: End time of the new/updated event
-            exclude_uid: Event UID to exclude (for updates)
+            exclude_uid: Event id to exclude (for updates; a series UID excludes all its occurrences)
 
         Returns:
             List of conflicting events as dicts with uid, summary, start, end
         """
-        import pytz
+        # Served from the event cache when a cached window covers the range
+        cached = self._event_cache.get(user_id, start, end)
+        if cached is not None:
+            return [
+                {'uid': e.id, 'summary': e.summary, 'start': e.start, 'end': e.end}
+                for e in cached
+                if not self._is_excluded(e.id, exclude_uid)
+            ]
 
         calendar = self._get_user_calendar(user_id)
         if not calendar:
@@ -335,43 +514,25 @@ class RadicaleService:
             logger.error("conflict_search_error", user_id=user_id, error=str(e))
             return []
 
+        # Normalize times for comparison
+        check_start, check_end = to_utc(start), to_utc(end)
+
         conflicts = []
         for event in events:
             try:
                 ical = Calendar.from_ical(event.data)
-                for component in ical.walk('VEVENT'):
-                    uid = str(component.get('uid'))
-
+                for existing in self._expand_vevents(user_id, list(ical.walk('VEVENT')), check_start, check_end):
                     # Skip excluded event (for updates)
-                    if exclude_uid and uid == exclude_uid:
+                    if self._is_excluded(existing.id, exclude_uid):
                         continue
 
-                    event_start = component.get('dtstart').dt
-                    event_end = component.get('dtend').dt
-
-                    # Convert date to datetime if needed
-                    if not isinstance(event_start, datetime):
-                        event_start = datetime.combine(event_start, datetime.min.time())
-                    if not isinstance(event_end, datetime):
-                        event_end = datetime.combine(event_end, datetime.min.time())
-
-                    # Ensure timezone awareness
-                    if event_start.tzinfo is None:
-                        event_start = pytz.UTC.localize(event_start)
-                    if event_end.tzinfo is None:
-                        event_end = pytz.UTC.localize(event_end)
-
-                    # Normalize times for comparison
-                    check_start = start if start.tzinfo else pytz.UTC.localize(start)
-                    check_end = end if end.tzinfo else pytz.UTC.localize(end)
-
                     # Check overlap: start1 < end2 AND start2 < end1
-                    if event_start < check_end and check_start < event_end:
+                    if existing.start < check_end and check_start < existing.end:
                         conflicts.append({
-                            'uid': uid,
-                            'summary': str(component.get('summary', 'Событие')),
-                            'start': event_start,
-                            'end': event_end
+                            'uid': existing.id,
+                            'summary': existing.summary,
+                            'start': existing.start,
+                            'end': existing.end
                         })
             except Exception as e:
                 logger.debug("conflict_parse_error", error=str(e))
@@ -387,63 +548,199 @@ class RadicaleService:
 
         return conflicts
 
-    def _create_event_sync(self, user_id: str, event: EventDTO) -> Optional[str]:
+    @staticmethod
+    def _is_excluded(event_id: str, exclude_uid: Optional[str]) -> bool:
+        """True if event_id is exclude_uid or an occurrence of the series exclude_uid."""
+        return exclude_uid is not None and exclude_uid in (event_id, split_occurrence_id(event_id)[0])
+
+    def _component_to_calendar_event(self, user_id: str, component) -> CalendarEvent:
+        """Convert VEVENT component to CalendarEvent in the default timezone."""
+        import pytz  # Import here for thread safety
+
+        start = component.get('dtstart').dt
+        end = component.get('dtend').dt
+
+        # Convert to datetime if date object
+        if not isinstance(start, datetime):
+            start = datetime.combine(start, datetime.min.time())
+        if not isinstance(end, datetime):
+            end = datetime.combine(end, datetime.min.time())
+
+        # Ensure timezone awareness
+        # Events in Radicale are stored in UTC, so if no timezone assume UTC
+        if start.tzinfo is None:
+            start = pytz.UTC.localize(start)
+        if end.tzinfo is None:
+            end = pytz.UTC.localize(end)
+
+        # Convert UTC to user's timezone (Moscow by default)
+        # This ensures all times are in the same timezone for comparison
+        user_tz = pytz.timezone(settings.default_timezone)
+        start_local = start.astimezone(user_tz)
+        end_local = end.astimezone(user_tz)
+
+        # Decode event_type from description prefix
+        raw_desc = str(component.get('description', ''))
+        event_type = "generic"
+        clean_desc = raw_desc
+        if raw_desc.startswith("[TYPE:"):
+            _type_match = re.match(r'\[TYPE:(\w+)\]\s*(.*)', raw_desc, re.DOTALL)
+            if _type_match:
+                event_type = _type_match.group(1)
+                clean_desc = _type_match.group(2)
+
+        return CalendarEvent(
+            id=str(component.get('uid')),
+            summary=str(component.get('summary', 'Событие')),
+            description=clean_desc,
+            start=start_local,
+            end=end_local,
+            location=str(component.get('location', '')),
+            attendees=[
+                str(att).replace('mailto:', '')
+                for att in component.get('attendee', [])
+            ],
+            html_link=f"{self.url}/{self._get_user_calendar_name(user_id)}/{component.get('uid')}.ics",
+            event_type=event_type,
+        )
+
+    def _expand_vevents(
+        self,
+        user_id: str,
+        components: list,
+        time_min: datetime,
+        time_max: datetime
+    ) -> List[CalendarEvent]:
         """
-        Synchronous implementation of create_event with retry logic.
-        Called via asyncio.to_thread to avoid blocking event loop.
+        Convert VEVENTs of one calendar object to CalendarEvents.
+
+        A recurring master (RRULE/RDATE) is expanded into its occurrences
+        overlapping [time_min, time_max); EXDATEs and instances overridden
+        by RECURRENCE-ID components are skipped. Each occurrence gets its
+        own id (series UID + RECURRENCE-ID, see occurrence_id), so update and
+        delete act on that occurrence; the plain UID addresses the series.
         """
         import pytz  # Import here for thread safety
 
-        # Safety check: start_time must exist to prevent NoneType + timedelta crash
-        if not event.start_time:
-            logger.error("create_event_missing_start_time",
-                        user_id=user_id,
-                        title=event.title)
-            return None
+        window_start, window_end = self._to_utc(time_min), self._to_utc(time_max)
+        overridden = [component.decoded('recurrence-id') for component in components if 'recurrence-id' in component]
+        user_tz = pytz.timezone(settings.default_timezone)
+        events = []
+        for component in components:
+            event = self._component_to_calendar_event(user_id, component)
+            if 'recurrence-id' in component:
+                if event.start < window_end and event.end > window_start:
+                    events.append(event.model_copy(update={
+                        'id': occurrence_id(event.id, component.decoded('recurrence-id')), 'recurring': True
+                    }))
+            elif not is_recurring(component):
+                events.append(event)
+            else:
+                duration = event.end - event.start
+                for start in occurrence_starts(component, window_start, window_end, exclude=overridden):
+                    local_start = start.astimezone(user_tz)
+                    events.append(event.model_copy(update={
+                        'id': occurrence_id(event.id, start),
+                        'start': local_start,
+                        'end': local_start + duration,
+                        'recurring': True,
+                    }))
+        return events
+
+    def _cache_write_through(self, user_id: str, components: list) -> None:
+        """
+        Put created/updated VEVENTs of one UID (a series: master and overrides) into
+        the event cache and notify listeners; drop user's window if conversion fails.
+        """
+        import pytz  # Import here for thread safety
 
-        calendar = self._get_user_calendar_with_retry(user_id)
-        if not calendar:
-            return None
+        event_uid = str(components[0].get('uid'))
+        try:
+            if any(is_recurring(component) or 'recurrence-id' in component for component in components):
+                # Occurrences of a series are expanded per window - reload on next read
+                self._event_cache.invalidate(user_id)
+                now = datetime.now(pytz.UTC)
+                events = self._expand_vevents(
+                    user_id, components, now, now + timedelta(hours=self.CHANGE_NOTIFY_HORIZON_HOURS)
+                )
+            else:
+                events = [self._component_to_calendar_event(user_id, components[0])]
+                self._event_cache.upsert(user_id, events[0])
+        except Exception as e:
+            logger.debug("event_cache_write_through_failed", user_id=user_id, error=str(e))
+            self._event_cache.invalidate(user_id)
+            return
+        self._notify_event_changed(user_id, event_uid, events)
+
+    def _cache_remove(self, user_id: str, event_uid: str) -> None:
+        """Write-through for deleted event (a series UID drops all its occurrences)."""
+        self._event_cache.remove(user_id, event_uid)
+        self._notify_event_changed(user_id, event_uid, [])
+
+    def add_event_listener(self, listener: Callable[[str, str, List[CalendarEvent]], None]) -> None:
+        """
+        Subscribe to event writes made through this service.
+
+        listener(user_id, event_uid, events) is called after create/update
+        with the event (or the series occurrences in the next
+        CHANGE_NOTIFY_HORIZON_HOURS) and after delete with an empty list.
+        It may be called from a worker thread.
+        """
+        self._event_listeners.append(listener)
+
+    def remove_event_listener(self, listener: Callable[[str, str, List[CalendarEvent]], None]) -> None:
+        """Unsubscribe listener added with add_event_listener()."""
+        if listener in self._event_listeners:
+            self._event_listeners.remove(listener)
+
+    def _notify_event_changed(self, user_id: str, event_uid: str, events: List[CalendarEvent]) -> None:
+        for listener in list(self._event_listeners):
+            try:
+                listener(user_id, event_uid, events)
+            except Exception as e:
+                logger.warning("event_listener_error", user_id=user_id, uid=event_uid, error=str(e))
+
+    @staticmethod
+    def _to_utc(value: datetime):
+        """Naive datetimes are in the default timezone; CalDAV stores UTC."""
+        import pytz  # Import here for thread safety
 
-        # Calculate end time
+        if value.tzinfo is None:
+            value = pytz.timezone(settings.default_timezone).localize(value)
+        return value.astimezone(pytz.UTC)
+
+    def _event_times_utc(self, event: EventDTO):
+        """Start and end of a new/updated event in UTC (end defaults to start + duration or 1 hour)."""
         end_time = event.end_time or (
             event.start_time + timedelta(minutes=event.duration_minutes or 60)
         )
-
-        # Ensure times are timezone-aware (convert to UTC for CalDAV)
-        start_time_utc = event.start_time
         logger.info("create_event_start_time_input",
-                   start_time=event.start_time.isoformat() if event.start_time else None,
-                   has_tzinfo=event.start_time.tzinfo is not None if event.start_time else None,
-                   tzinfo_str=str(event.start_time.tzinfo) if event.start_time and event.start_time.tzinfo else None)
-
-        if start_time_utc.tzinfo is None:
-            # If naive, assume it's in user's timezone (Moscow by default)
-            moscow_tz = pytz.timezone(settings.default_timezone)
-            start_time_utc = moscow_tz.localize(start_time_utc)
-        # Convert to UTC for CalDAV storage
-        start_time_utc = start_time_utc.astimezone(pytz.UTC)
+                   start_time=event.start_time.isoformat(),
+                   has_tzinfo=event.start_time.tzinfo is not None,
+                   tzinfo_str=str(event.start_time.tzinfo) if event.start_time.tzinfo else None)
 
+        start_time_utc = self._to_utc(event.start_time)
         logger.info("create_event_start_time_utc",
                    start_time_utc=start_time_utc.isoformat())
+        return start_time_utc, self._to_utc(end_time)
 
-        end_time_utc = end_time
-        if end_time_utc.tzinfo is None:
-            moscow_tz = pytz.timezone(settings.default_timezone)
-            end_time_utc = moscow_tz.localize(end_time_utc)
-        end_time_utc = end_time_utc.astimezone(pytz.UTC)
+    @staticmethod
+    def _log_conflicts(user_id: str, title: Optional[str], conflicts: List[Dict], event_uid: Optional[str] = None):
+        """BIZ-004: conflicts are reported as a warning only."""
+        if not conflicts:
+            return
+        logger.warning(
+            "event_conflict_detected",
+            user_id=user_id,
+            updated_event_uid=event_uid,
+            new_event_title=title,
+            conflicts_count=len(conflicts),
+            conflict_summaries=[c['summary'] for c in conflicts[:3]]  # First 3
+        )
 
-        # BIZ-004: Check for conflicts (warning only, does not block)
-        conflicts = self._find_conflicts(user_id, start_time_utc, end_time_utc)
-        if conflicts:
-            conflict_summaries = [c['summary'] for c in conflicts[:3]]  # First 3
-            logger.warning(
-                "event_conflict_detected",
-                user_id=user_id,
-                new_event_title=event.title,
-                conflicts_count=len(conflicts),
-                conflict_summaries=conflict_summaries
-            )
+    def _build_ical_event(self, event: EventDTO, start_time_utc: datetime, end_time_utc: datetime):
+        """Build VCALENDAR with a single VEVENT. Returns (uid, calendar, vevent)."""
+        import pytz  # Import here for thread safety
 
         # Create iCalendar event
         cal = Calendar()
@@ -457,8 +754,17 @@ class RadicaleService:
 
         ical_event.add('uid', uid)
         ical_event.add('summary', event.title or "Событие")
-        ical_event.add('dtstart', start_time_utc)
-        ical_event.add('dtend', end_time_utc)
+        if event.recurrence_type:
+            # Series keep local wall time: DTSTART/DTEND with TZID, so BYDAY
+            # and DST changes are resolved in the event (or user) timezone
+            tz = series_timezone(event.start_time) if getattr(event.start_time, 'tzinfo', None) else None
+            if tz is None or tz == pytz.UTC or not getattr(tz, 'zone', None):
+                tz = pytz.timezone(settings.default_timezone)
+            ical_event.add('dtstart', start_time_utc.astimezone(tz))
+            ical_event.add('dtend', end_time_utc.astimezone(tz))
+        else:
+            ical_event.add('dtstart', start_time_utc)
+            ical_event.add('dtend', end_time_utc)
         ical_event.add('dtstamp', datetime.now(pytz.UTC))
 
         # Encode event_type as prefix in description
@@ -472,19 +778,435 @@ class RadicaleService:
         if event.location:
             ical_event.add('location', event.location)
 
+        # Recurring event: one master VEVENT with RRULE, expanded on read
+        if event.recurrence_type:
+            until = self._to_utc(event.recurrence_end_date) if event.recurrence_end_date else None
+            rrule = build_rrule(event.recurrence_type, until, event.recurrence_days)
+            if rrule:
+                ical_event.add('rrule', rrule)
+
         # Add attendees if any
         if event.attendees:
             for attendee in event.attendees:
                 ical_event.add('attendee', f'mailto:{attendee}')
 
         cal.add_component(ical_event)
+        if event.recurrence_type and hasattr(cal, 'add_missing_timezones'):
+            cal.add_missing_timezones()  # VTIMEZONE for the TZID (icalendar >= 6)
+        return uid, cal, ical_event
+
+    @staticmethod
+    def _apply_event_update(component, updated_event: EventDTO) -> None:
+        """Copy provided fields of updated_event into VEVENT component."""
+        if updated_event.title:
+            component['summary'] = updated_event.title
+        # Keep the zone of a series stored with TZID (TZID parameter stays)
+        old_start = component['dtstart'].dt
+        zoned = getattr(old_start, 'tzinfo', None) is not None and str(old_start.tzinfo) != 'UTC'
+
+        def in_zone(value: datetime) -> datetime:
+            if zoned and value.tzinfo is not None:
+                return value.astimezone(series_timezone(old_start))
+            return value
+
+        if updated_event.start_time:
+            component['dtstart'].dt = in_zone(updated_event.start_time)
+        if updated_event.end_time:
+            component['dtend'].dt = in_zone(updated_event.end_time)
+        elif updated_event.start_time and updated_event.duration_minutes:
+            component['dtend'].dt = in_zone(updated_event.start_time + timedelta(minutes=updated_event.duration_minutes))
+        if updated_event.location:
+            component['location'] = updated_event.location
+        if updated_event.description:
+            component['description'] = updated_event.description
+
+    @staticmethod
+    def _series_components(ical, uid: str) -> list:
+        """VEVENTs of one UID: the event, or a series master with its overrides."""
+        return [component for component in ical.walk('VEVENT') if str(component.get('uid')) == uid]
+
+    @staticmethod
+    def _series_master(ical, uid: str):
+        """VEVENT of uid without RECURRENCE-ID (the event itself or the series master), or None."""
+        for component in ical.walk('VEVENT'):
+            if str(component.get('uid')) == uid and 'recurrence-id' not in component:
+                return component
+        return None
+
+    @staticmethod
+    def _find_override(ical, uid: str, recurrence_id: datetime):
+        """RECURRENCE-ID component of the occurrence, or None."""
+        for component in ical.walk('VEVENT'):
+            if (str(component.get('uid')) == uid and 'recurrence-id' in component
+                    and to_utc(component.decoded('recurrence-id')) == recurrence_id):
+                return component
+        return None
+
+    @staticmethod
+    def _is_occurrence(master, recurrence_id: datetime) -> bool:
+        """True if the series master (still) generates an occurrence starting at recurrence_id."""
+        if master is None or not is_recurring(master):
+            return False
+        return recurrence_id in occurrence_starts(master, recurrence_id, recurrence_id + timedelta(seconds=1))
+
+    def _exclude_occurrence(self, ical, uid: str, recurrence_id: datetime) -> bool:
+        """
+        Delete one occurrence: EXDATE on the master, override (if any) removed.
+
+        Returns:
+            False if the series has no such occurrence
+        """
+        master = self._series_master(ical, uid)
+        override = self._find_override(ical, uid, recurrence_id)
+        if master is None or (override is None and not self._is_occurrence(master, recurrence_id)):
+            return False
+        if override is not None:
+            ical.subcomponents.remove(override)
+        raw_start = master.decoded('dtstart')
+        exdate = recurrence_id.astimezone(series_timezone(raw_start))
+        master.add('exdate', exdate if isinstance(raw_start, datetime) else exdate.date())
+        return True
+
+    def _override_occurrence(self, ical, uid: str, recurrence_id: datetime):
+        """
+        RECURRENCE-ID component for one occurrence, created from the master if needed.
 
+        Returns:
+            The override VEVENT (already part of ical), or None if the series
+            has no such occurrence
+        """
+        import pytz  # Import here for thread safety
+
+        override = self._find_override(ical, uid, recurrence_id)
+        if override is not None:
+            return override
+        master = self._series_master(ical, uid)
+        if not self._is_occurrence(master, recurrence_id):
+            return None
+
+        raw_start = master.decoded('dtstart')
+        start = recurrence_id.astimezone(series_timezone(raw_start))
+        duration = (to_utc(master.decoded('dtend')) - to_utc(raw_start)) if 'dtend' in master else timedelta(hours=1)
+        if not isinstance(raw_start, datetime):
+            start = start.date()  # all-day series: keep VALUE=DATE
+        override = ICalEvent()
+        override.add('uid', uid)
+        override.add('recurrence-id', start)
+        override.add('dtstart', start)
+        override.add('dtend', start + duration)
+        override.add('dtstamp', datetime.now(pytz.UTC))
+        for name in ('summary', 'description', 'location', 'attendee'):
+            if name in master:
+                override[name] = master[name]
+        ical.add_component(override)
+        return override
+
+    def _target_component(self, ical, event_id: str):
+        """VEVENT an update of event_id applies to: the event/series master, or the occurrence's override."""
+        uid, recurrence_id = split_occurrence_id(event_id)
+        if recurrence_id is None:
+            return self._series_master(ical, uid)
+        return self._override_occurrence(ical, uid, recurrence_id)
+
+    # ------------------------------------------------------------------
+    # Async CalDAV path (AsyncCalDAVClient, no thread pool)
+    # ------------------------------------------------------------------
+
+    async def _caldav_request(self, method: str, url: str, body: Optional[str] = None,
+                              headers: Optional[Dict[str, str]] = None, depth: Optional[str] = None):
+        """Send request over the async client; transport failures become CalendarServiceError."""
+        try:
+            return await self._async_client.request(method, url, body, headers=headers, depth=depth)
+        except CalDAVUnavailableError as e:
+            raise CalendarServiceError(str(e)[:200])
+
+    async def _get_calendar_url_async(self, user_id: str) -> Optional[str]:
+        """
+        User calendar URL for the async path (None if it cannot be resolved).
+
+        Index hit costs no requests; a miss resolves (and creates) the
+        calendar once through the caldav library in a worker thread.
+        """
+        calendar_url = self._calendar_index.get(user_id)
+        if not calendar_url:
+            calendar = await asyncio.to_thread(self._get_user_calendar_with_retry, user_id)
+            if calendar is None:
+                return None
+            calendar_url = str(calendar.url)
+        return calendar_url if calendar_url.endswith("/") else calendar_url + "/"
+
+    async def _get_object_by_uid_async(self, user_id: str, calendar_url: str, event_uid: str):
+        """
+        Fetch a single calendar object by UID.
+
+        Returns:
+            (href, etag, ical data) or None if the event does not exist
+        """
+        href = self._get_event_href(user_id, event_uid)
+        if href:
+            response = await self._caldav_request("GET", href)
+            if response.status_code == 200:
+                return href, response.headers.get("ETag", ""), response.text
+            self._forget_event_href(user_id, event_uid)
+            logger.debug("event_href_stale", user_id=user_id, uid=event_uid, status=response.status_code)
+
+        response = await self._caldav_request(
+            "REPORT", calendar_url, calendar_query_by_uid_body(event_uid), depth="1"
+        )
+        if response.status_code == 404:
+            self._forget_user_calendar(user_id)
+            return None
+        try:
+            objects = parse_calendar_objects(response.status_code, response.content)
+        except CalendarSyncError as e:
+            raise CalendarServiceError(f"UID query failed: {e}")
+        for object_href, (etag, data) in objects.items():
+            href = urljoin(calendar_url, object_href)
+            self._remember_event_href(user_id, event_uid, href)
+            return href, etag, data
+        return None
+
+    async def _find_conflicts_async(
+        self,
+        user_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_uid: Optional[str] = None
+    ) -> List[Dict]:
+        """Async variant of _find_conflicts() served by list_events (event cache / sync mirror)."""
+        try:
+            events = await self.list_events(user_id, start_time, end_time)
+        except Exception as e:
+            logger.error("conflict_search_error", user_id=user_id, error=str(e))
+            return []
+        return [
+            {'uid': event.id, 'summary': event.summary, 'start': event.start, 'end': event.end}
+            for event in events
+            if not self._is_excluded(event.id, exclude_uid) and event.start < end_time and event.end > start_time
+        ]
+
+    async def _list_events_async(
+        self,
+        user_id: str,
+        time_min: datetime,
+        time_max: datetime
+    ) -> Optional[List[CalendarEvent]]:
+        """
+        list_events over the async client and the sync mirror.
+
+        Returns:
+            Events, or None when the server answered unexpectedly and the
+            thread pool path (date_search) should be used instead
+        """
+        calendar_url = await self._get_calendar_url_async(user_id)
+        if not calendar_url:
+            raise CalendarServiceError("Calendar service unavailable")
+        try:
+            events = await self._sync_engine.list_events_async(
+                user_id, calendar_url, self._async_client, time_min, time_max
+            )
+        except CalDAVUnavailableError as e:
+            raise CalendarServiceError(str(e)[:200])
+        except Exception as e:
+            logger.warning("calendar_sync_failed_fallback", user_id=user_id, error=str(e)[:200])
+            self._sync_engine.forget(user_id)
+            if isinstance(e, CalendarSyncError) and e.status == 404:
+                # Indexed calendar no longer exists - re-resolve in the fallback
+                self._forget_user_calendar(user_id)
+            return None
+        logger.info("events_listed", user_id=user_id, count=len(events), source="sync_async")
+        return events
+
+    async def _create_event_async(self, user_id: str, event: EventDTO) -> Optional[str]:
+        """Async implementation of create_event: one PUT of a new object."""
+        if not event.start_time:
+            logger.error("create_event_missing_start_time",
+                        user_id=user_id,
+                        title=event.title)
+            return None
+
+        start_time_utc, end_time_utc = self._event_times_utc(event)
+
+        # BIZ-004: Check for conflicts (warning only, does not block)
+        conflicts = await self._find_conflicts_async(user_id, start_time_utc, end_time_utc)
+        self._log_conflicts(user_id, event.title, conflicts)
+
+        uid, cal, ical_event = self._build_ical_event(event, start_time_utc, end_time_utc)
+        return await self._save_new_event_async(user_id, event, uid, cal, ical_event)
+
+    async def _save_new_event_async(self, user_id: str, event: EventDTO, uid: str, cal, ical_event) -> Optional[str]:
+        """PUT a new calendar object and update href map / event cache."""
+        ical_data = cal.to_ical().decode('utf-8')
+
+        for attempt in range(2):
+            calendar_url = await self._get_calendar_url_async(user_id)
+            if not calendar_url:
+                return None
+            href = f"{calendar_url}{uid}.ics"
+            response = await self._caldav_request(
+                "PUT", href, ical_data,
+                headers={"Content-Type": "text/calendar; charset=utf-8", "If-None-Match": "*"}
+            )
+            # 412: object already stored by an earlier attempt of a retried PUT
+            if response.status_code in (200, 201, 204, 412):
+                break
+            if response.status_code in (404, 409) and attempt == 0:
+                # Indexed calendar was removed on the server - resolve/create it again
+                self._forget_user_calendar(user_id)
+                continue
+            raise CalendarServiceError(f"save_event failed: HTTP {response.status_code}")
+
+        self._remember_event_href(user_id, uid, href)
+        self._cache_write_through(user_id, [ical_event])
+
+        logger.info(
+            "event_created",
+            **safe_log_params(user_id=user_id, title=event.title),
+            uid=uid
+        )
+
+        return uid
+
+    async def _update_event_async(self, user_id: str, event_uid: str, updated_event: EventDTO) -> bool:
+        """Async implementation of update_event: GET one object, PUT it back with If-Match."""
+        calendar_url = await self._get_calendar_url_async(user_id)
+        if not calendar_url:
+            return False
+        uid, _ = split_occurrence_id(event_uid)
+        found = await self._get_object_by_uid_async(user_id, calendar_url, uid)
+        if found is not None:
+            href, etag, data = found
+            ical = Calendar.from_ical(data)
+            component = self._target_component(ical, event_uid)
+            if component is not None:
+                self._apply_event_update(component, updated_event)
+
+                # BIZ-004: Check for conflicts when time is updated
+                if updated_event.start_time:
+                    new_start_utc, new_end_utc = self._event_times_utc(updated_event)
+                    conflicts = await self._find_conflicts_async(
+                        user_id, new_start_utc, new_end_utc, exclude_uid=event_uid
+                    )
+                    self._log_conflicts(user_id, updated_event.title, conflicts, event_uid=event_uid)
+
+                headers = {"Content-Type": "text/calendar; charset=utf-8"}
+                if etag:
+                    headers["If-Match"] = etag
+                response = await self._caldav_request("PUT", href, ical.to_ical().decode('utf-8'), headers=headers)
+                if response.status_code == 412:
+                    # Changed by another client since GET - do not overwrite
+                    logger.warning("event_update_conflict", user_id=user_id, uid=event_uid)
+                    return False
+                if response.status_code not in (200, 201, 204):
+                    raise CalendarServiceError(f"update_event failed: HTTP {response.status_code}")
+                self._cache_write_through(user_id, self._series_components(ical, uid))
+
+                logger.info("event_updated", user_id=user_id, uid=event_uid, title=updated_event.title)
+                return True
+
+        logger.warning("event_not_found_for_update", user_id=user_id, uid=event_uid)
+        return False
+
+    async def _delete_occurrence_async(self, user_id: str, uid: str, recurrence_id: datetime) -> bool:
+        """Delete one occurrence of a series: add EXDATE to the master, PUT it back with If-Match."""
+        calendar_url = await self._get_calendar_url_async(user_id)
+        if not calendar_url:
+            return False
+        found = await self._get_object_by_uid_async(user_id, calendar_url, uid)
+        if found is None:
+            logger.warning("event_not_found", user_id=user_id, uid=uid)
+            return False
+        href, etag, data = found
+        ical = Calendar.from_ical(data)
+        if not self._exclude_occurrence(ical, uid, recurrence_id):
+            logger.warning("event_occurrence_not_found", user_id=user_id, uid=uid, recurrence_id=recurrence_id.isoformat())
+            return False
+
+        headers = {"Content-Type": "text/calendar; charset=utf-8"}
+        if etag:
+            headers["If-Match"] = etag
+        response = await self._caldav_request("PUT", href, ical.to_ical().decode('utf-8'), headers=headers)
+        if response.status_code == 412:
+            # Changed by another client since GET - do not overwrite
+            logger.warning("event_delete_conflict", user_id=user_id, uid=uid)
+            return False
+        if response.status_code not in (200, 201, 204):
+            raise CalendarServiceError(f"delete_event failed: HTTP {response.status_code}")
+        self._cache_write_through(user_id, self._series_components(ical, uid))
+        logger.info("event_occurrence_deleted", user_id=user_id, uid=uid, recurrence_id=recurrence_id.isoformat())
+        return True
+
+    async def _delete_event_async(self, user_id: str, event_uid: str) -> bool:
+        """Async implementation of delete_event: DELETE known href, UID query otherwise."""
+        uid, recurrence_id = split_occurrence_id(event_uid)
+        if recurrence_id is not None:
+            return await self._delete_occurrence_async(user_id, uid, recurrence_id)
+
+        href = self._get_event_href(user_id, event_uid)
+        if href is None:
+            calendar_url = await self._get_calendar_url_async(user_id)
+            if not calendar_url:
+                return False
+            found = await self._get_object_by_uid_async(user_id, calendar_url, event_uid)
+            if found is None:
+                logger.warning("event_not_found", user_id=user_id, uid=event_uid)
+                return False
+            href = found[0]
+
+        response = await self._caldav_request("DELETE", href)
+        if response.status_code == 404:
+            # Stale href (or already deleted by a retried DELETE) - look it up by UID once
+            self._forget_event_href(user_id, event_uid)
+            calendar_url = await self._get_calendar_url_async(user_id)
+            found = calendar_url and await self._get_object_by_uid_async(user_id, calendar_url, event_uid)
+            if not found:
+                self._cache_remove(user_id, event_uid)
+                logger.warning("event_not_found", user_id=user_id, uid=event_uid)
+                return False
+            response = await self._caldav_request("DELETE", found[0])
+        if response.status_code not in (200, 204, 404):
+            raise CalendarServiceError(f"delete_event failed: HTTP {response.status_code}")
+
+        self._forget_event_href(user_id, event_uid)
+        self._cache_remove(user_id, event_uid)
+        logger.info("event_deleted", user_id=user_id, uid=event_uid)
+        return True
+
+    def _create_event_sync(self, user_id: str, event: EventDTO) -> Optional[str]:
+        """
+        Synchronous implementation of create_event with retry logic.
+        Called via asyncio.to_thread to avoid blocking event loop.
+        """
+        # Safety check: start_time must exist to prevent NoneType + timedelta crash
+        if not event.start_time:
+            logger.error("create_event_missing_start_time",
+                        user_id=user_id,
+                        title=event.title)
+            return None
+
+        calendar = self._get_user_calendar_with_retry(user_id)
+        if not calendar:
+            return None
+
+        start_time_utc, end_time_utc = self._event_times_utc(event)
+
+        # BIZ-004: Check for conflicts (warning only, does not block)
+        conflicts = self._find_conflicts(user_id, start_time_utc, end_time_utc)
+        self._log_conflicts(user_id, event.title, conflicts)
+
+        uid, cal, ical_event = self._build_ical_event(event, start_time_utc, end_time_utc)
+        return self._save_new_event_sync(user_id, calendar, event, uid, cal, ical_event)
+
+    def _save_new_event_sync(self, user_id: str, calendar, event: EventDTO, uid: str, cal, ical_event) -> str:
+        """Save a new calendar object with retry and update href map / event cache."""
         # Save to Radicale with retry
         ical_data = cal.to_ical().decode('utf-8')
-        self._retry_caldav_operation(
+        saved_event = self._retry_caldav_operation(
             "save_event", user_id,
             lambda: calendar.save_event(ical_data)
         )
+        self._remember_event_href(user_id, uid, getattr(saved_event, 'url', None))
+        self._cache_write_through(user_id, [ical_event])
 
         logger.info(
             "event_created",
@@ -497,7 +1219,8 @@ class RadicaleService:
     async def create_event(self, user_id: str, event: EventDTO) -> Optional[str]:
         """
         Create calendar event in user's personal calendar.
-        Runs blocking CalDAV operations in thread pool.
+        Uses the async CalDAV client when enabled, otherwise runs blocking
+        CalDAV operations in thread pool.
 
         Args:
             user_id: Telegram user ID
@@ -507,15 +1230,16 @@ class RadicaleService:
             Event UID or None if failed
         """
         try:
-            # Run blocking CalDAV operations in thread pool
-            result = await asyncio.to_thread(
-                self._create_event_sync,
-                user_id,
-                event
-            )
-            # Invalidate cache after successful create (BIZ-003)
-            if result:
-                self.invalidate_cache(user_id)
+            if self._async_client is not None:
+                result = await self._create_event_async(user_id, event)
+            else:
+                # Run blocking CalDAV operations in thread pool
+                result = await asyncio.to_thread(
+                    self._create_event_sync,
+                    user_id,
+                    event
+                )
+            # Event cache already updated write-through in the sync path (BIZ-003)
             return result
         except CalendarServiceError:
             logger.error("event_create_service_error", user_id=user_id)
@@ -542,6 +1266,79 @@ class RadicaleService:
                 )
             return None
 
+    async def create_events_bulk(self, user_id: str, events: List[EventDTO]) -> List[Optional[str]]:
+        """
+        Create many events in user's calendar (batch, schedule, recurring intents).
+
+        One conflict scan over the union time window, then objects are
+        written concurrently (at most BULK_CREATE_CONCURRENCY at a time).
+
+        Args:
+            user_id: Telegram user ID
+            events: Events to create
+
+        Returns:
+            Event UID or None for each input event, in the same order
+        """
+        results: List[Optional[str]] = [None] * len(events)
+        prepared = []  # (index, event, start_utc, end_utc)
+        for index, event in enumerate(events):
+            if not event.start_time:
+                logger.error("create_event_missing_start_time", user_id=user_id, title=event.title)
+                continue
+            start_time_utc, end_time_utc = self._event_times_utc(event)
+            prepared.append((index, event, start_time_utc, end_time_utc))
+        if not prepared:
+            return results
+
+        # BIZ-004: one conflict scan for the whole batch (warning only, does not block)
+        existing = await self._find_conflicts_async(
+            user_id,
+            min(item[2] for item in prepared),
+            max(item[3] for item in prepared)
+        )
+        for _, event, start_time_utc, end_time_utc in prepared:
+            self._log_conflicts(user_id, event.title, [
+                c for c in existing if c['start'] < end_time_utc and c['end'] > start_time_utc
+            ])
+
+        calendar = None
+        if self._async_client is None:
+            calendar = await asyncio.to_thread(self._get_user_calendar_with_retry, user_id)
+            if calendar is None:
+                logger.error("events_bulk_create_no_calendar", user_id=user_id, count=len(events))
+                return results
+
+        semaphore = asyncio.Semaphore(self.BULK_CREATE_CONCURRENCY)
+
+        async def create_one(index: int, event: EventDTO, start_time_utc: datetime, end_time_utc: datetime):
+            uid, cal, ical_event = self._build_ical_event(event, start_time_utc, end_time_utc)
+            async with semaphore:
+                try:
+                    if self._async_client is not None:
+                        results[index] = await self._save_new_event_async(user_id, event, uid, cal, ical_event)
+                    else:
+                        results[index] = await asyncio.to_thread(
+                            self._save_new_event_sync, user_id, calendar, event, uid, cal, ical_event
+                        )
+                except Exception as e:
+                    error_type = CalendarErrorType.classify(e)
+                    logger.error("event_bulk_item_error", user_id=user_id, error=str(e)[:200], error_type=error_type)
+
+        await asyncio.gather(*(create_one(*item) for item in prepared))
+
+        created = sum(1 for uid in results if uid)
+        logger.info("events_bulk_created", user_id=user_id, requested=len(events), created=created)
+        if created < len(events) and ANALYTICS_ENABLED and analytics_service:
+            analytics_service.log_action(
+                user_id=user_id,
+                action_type=ActionType.CALENDAR_ERROR,
+                details=f"Bulk create: {len(events) - created} of {len(events)} events failed",
+                success=False,
+                error_message="create_events_bulk partial failure"
+            )
+        return results
+
     def _list_events_sync(
         self,
         user_id: str,
@@ -552,10 +1349,24 @@ class RadicaleService:
         Synchronous implementation of list_events with retry logic.
         Called via asyncio.to_thread to avoid blocking event loop.
 
+        Reads from the incremental sync mirror when enabled (only changed
+        objects are fetched), falling back to a full date_search.
         Retries on connection errors (DNS, timeout, reset) with connection refresh.
         """
         import pytz  # Import here to avoid issues with thread safety
 
+        if self._sync_engine is not None:
+            try:
+                calendar_events = self._sync_engine.list_events(user_id, time_min, time_max)
+                logger.info("events_listed", user_id=user_id, count=len(calendar_events), source="sync")
+                return calendar_events
+            except CalendarUnavailableError:
+                raise CalendarServiceError("Calendar service unavailable")
+            except Exception as e:
+                # Server without sync-collection support or unexpected response - use date_search
+                logger.warning("calendar_sync_failed_fallback", user_id=user_id, error=str(e)[:200])
+                self._sync_engine.forget(user_id)
+
         last_error = None
         for attempt in range(self.MAX_RETRIES + 1):
             calendar = self._get_user_calendar(user_id)
@@ -588,6 +1399,10 @@ class RadicaleService:
                              error_type=error_type,
                              error=str(e)[:200])
 
+                if isinstance(e, NotFoundError) and self._is_calendar_gone(user_id, e):
+                    # Indexed calendar no longer exists - re-resolve on next attempt
+                    self._forget_user_calendar(user_id)
+
                 # Reset connection for next attempt
                 self._reset_connection(reason=f"date_search_error_{error_type}")
 
@@ -601,62 +1416,18 @@ class RadicaleService:
         calendar_events = []
         for event in events:
             ical = Calendar.from_ical(event.data)
+            components = list(ical.walk('VEVENT'))
+            for component in components:
+                self._remember_event_href(user_id, str(component.get('uid')), event.url)
 
-            for component in ical.walk('VEVENT'):
-                start = component.get('dtstart').dt
-                end = component.get('dtend').dt
-
-                # Convert to datetime if date object
-                if not isinstance(start, datetime):
-                    start = datetime.combine(start, datetime.min.time())
-                if not isinstance(end, datetime):
-                    end = datetime.combine(end, datetime.min.time())
-
-                # Ensure timezone awareness
-                # Events in Radicale are stored in UTC, so if no timezone assume UTC
-                if start.tzinfo is None:
-                    start = pytz.UTC.localize(start)
-                if end.tzinfo is None:
-                    end = pytz.UTC.localize(end)
-
-                # Convert UTC to user's timezone (Moscow by default)
-                # This ensures all times are in the same timezone for comparison
-                user_tz = pytz.timezone(settings.default_timezone)
-                start_local = start.astimezone(user_tz)
-                end_local = end.astimezone(user_tz)
-
+            # Recurring series are expanded only inside the requested window
+            for calendar_event in self._expand_vevents(user_id, components, time_min, time_max):
                 logger.info("list_events_retrieved_event",
-                           summary=str(component.get('summary', 'Событие')),
-                           start_utc=start.isoformat(),
-                           start_local=start_local.isoformat(),
-                           has_tzinfo=start.tzinfo is not None,
-                           tzinfo_str=str(start.tzinfo))
-
-                # Decode event_type from description prefix
-                raw_desc = str(component.get('description', ''))
-                event_type = "generic"
-                clean_desc = raw_desc
-                if raw_desc.startswith("[TYPE:"):
-                    import re as _re
-                    _type_match = _re.match(r'\[TYPE:(\w+)\]\s*(.*)', raw_desc, _re.DOTALL)
-                    if _type_match:
-                        event_type = _type_match.group(1)
-                        clean_desc = _type_match.group(2)
-
-                calendar_events.append(CalendarEvent(
-                    id=str(component.get('uid')),
-                    summary=str(component.get('summary', 'Событие')),
-                    description=clean_desc,
-                    start=start_local,
-                    end=end_local,
-                    location=str(component.get('location', '')),
-                    attendees=[
-                        str(att).replace('mailto:', '')
-                        for att in component.get('attendee', [])
-                    ],
-                    html_link=f"{self.url}/{self._get_user_calendar_name(user_id)}/{component.get('uid')}.ics",
-                    event_type=event_type,
-                ))
+                           summary=calendar_event.summary,
+                           start_utc=calendar_event.start.astimezone(pytz.UTC).isoformat(),
+                           start_local=calendar_event.start.isoformat())
+
+                calendar_events.append(calendar_event)
 
         logger.info("events_listed", user_id=user_id, count=len(calendar_events))
         return calendar_events
@@ -669,7 +1440,9 @@ class RadicaleService:
     ) -> List[CalendarEvent]:
         """
         List events from user's calendar in time range.
-        Runs blocking CalDAV operations in thread pool.
+        Served from the per-user event cache when a cached window covers the range,
+        otherwise synced over the async CalDAV client (when enabled) or by
+        blocking CalDAV operations in thread pool.
 
         Args:
             user_id: Telegram user ID
@@ -679,14 +1452,28 @@ class RadicaleService:
         Returns:
             List of calendar events
         """
+        cached = self._event_cache.get(user_id, time_min, time_max)
+        if cached is not None:
+            logger.debug("event_cache_hit", user_id=user_id, count=len(cached))
+            return cached
+
+        # Captured before fetching: a write-through that lands while we fetch
+        # makes this snapshot stale, and put() discards it
+        generation = self._event_cache.generation(user_id)
         try:
-            # Run blocking CalDAV operations in thread pool
-            return await asyncio.to_thread(
-                self._list_events_sync,
-                user_id,
-                time_min,
-                time_max
-            )
+            events = None
+            if self._async_client is not None and self._sync_engine is not None:
+                events = await self._list_events_async(user_id, time_min, time_max)
+            if events is None:
+                # Run blocking CalDAV operations in thread pool
+                events = await asyncio.to_thread(
+                    self._list_events_sync,
+                    user_id,
+                    time_min,
+                    time_max
+                )
+            self._event_cache.put(user_id, time_min, time_max, events, generation=generation)
+            return events
         except CalendarServiceError:
             # Re-raise CalendarServiceError so telegram_handler can show user-friendly message
             logger.error("events_list_service_error", user_id=user_id)
@@ -826,68 +1613,35 @@ class RadicaleService:
         Synchronous implementation of update_event with retry.
         Called via asyncio.to_thread to avoid blocking event loop.
         """
-        import pytz  # Import here for thread safety
-
         calendar = self._get_user_calendar_with_retry(user_id)
         if not calendar:
             return False
 
-        # Find event to update
-        events = calendar.events()
-        for event in events:
+        # Fetch only the event being updated (by href or UID query)
+        uid, _ = split_occurrence_id(event_uid)
+        event = self._get_event_by_uid(calendar, user_id, uid)
+        if event is not None:
             ical = Calendar.from_ical(event.data)
-            for component in ical.walk('VEVENT'):
-                if str(component.get('uid')) == event_uid:
-                    # Update fields if provided
-                    if updated_event.title:
-                        component['summary'] = updated_event.title
-                    if updated_event.start_time:
-                        component['dtstart'].dt = updated_event.start_time
-                    if updated_event.end_time:
-                        component['dtend'].dt = updated_event.end_time
-                    elif updated_event.start_time and updated_event.duration_minutes:
-                        component['dtend'].dt = updated_event.start_time + timedelta(minutes=updated_event.duration_minutes)
-                    if updated_event.location:
-                        component['location'] = updated_event.location
-                    if updated_event.description:
-                        component['description'] = updated_event.description
-
-                    # BIZ-004: Check for conflicts when time is updated
-                    if updated_event.start_time:
-                        new_start = updated_event.start_time
-                        new_end = updated_event.end_time or (
-                            updated_event.start_time + timedelta(minutes=updated_event.duration_minutes or 60)
-                        )
-                        # Ensure timezone awareness
-                        if new_start.tzinfo is None:
-                            moscow_tz = pytz.timezone(settings.default_timezone)
-                            new_start = moscow_tz.localize(new_start)
-                        if new_end.tzinfo is None:
-                            moscow_tz = pytz.timezone(settings.default_timezone)
-                            new_end = moscow_tz.localize(new_end)
-                        new_start_utc = new_start.astimezone(pytz.UTC)
-                        new_end_utc = new_end.astimezone(pytz.UTC)
-
-                        conflicts = self._find_conflicts(
-                            user_id, new_start_utc, new_end_utc, exclude_uid=event_uid
-                        )
-                        if conflicts:
-                            conflict_summaries = [c['summary'] for c in conflicts[:3]]
-                            logger.warning(
-                                "event_conflict_detected",
-                                user_id=user_id,
-                                updated_event_uid=event_uid,
-                                new_event_title=updated_event.title,
-                                conflicts_count=len(conflicts),
-                                conflict_summaries=conflict_summaries
-                            )
-
-                    # Save updated event
-                    event.data = ical.to_ical()
-                    event.save()
-
-                    logger.info("event_updated", user_id=user_id, uid=event_uid, title=updated_event.title)
-                    return True
+            component = self._target_component(ical, event_uid)
+            if component is not None:
+                self._apply_event_update(component, updated_event)
+
+                # BIZ-004: Check for conflicts when time is updated
+                if updated_event.start_time:
+                    new_start_utc, new_end_utc = self._event_times_utc(updated_event)
+                    conflicts = self._find_conflicts(
+                        user_id, new_start_utc, new_end_utc, exclude_uid=event_uid
+                    )
+                    self._log_conflicts(user_id, updated_event.title, conflicts, event_uid=event_uid)
+
+                # Save updated event
+                event.data = ical.to_ical()
+                event.save()
+                self._remember_event_href(user_id, uid, event.url)
+                self._cache_write_through(user_id, self._series_components(ical, uid))
+
+                logger.info("event_updated", user_id=user_id, uid=event_uid, title=updated_event.title)
+                return True
 
         logger.warning("event_not_found_for_update", user_id=user_id, uid=event_uid)
         return False
@@ -895,27 +1649,32 @@ class RadicaleService:
     async def update_event(self, user_id: str, event_uid: str, updated_event: EventDTO) -> bool:
         """
         Update existing event in user's calendar.
-        Runs blocking CalDAV operations in thread pool.
+        Uses the async CalDAV client when enabled, otherwise runs blocking
+        CalDAV operations in thread pool.
+
+        An occurrence id (see occurrence_id) changes only that occurrence
+        (RECURRENCE-ID override); a series UID changes the whole series.
 
         Args:
             user_id: Telegram user ID
-            event_uid: Event UID to update
+            event_uid: Event UID or occurrence id to update
             updated_event: New event details
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Run blocking CalDAV operations in thread pool
-            result = await asyncio.to_thread(
-                self._update_event_sync,
-                user_id,
-                event_uid,
-                updated_event
-            )
-            # Invalidate cache after successful update (BIZ-003)
-            if result:
-                self.invalidate_cache(user_id)
+            if self._async_client is not None:
+                result = await self._update_event_async(user_id, event_uid, updated_event)
+            else:
+                # Run blocking CalDAV operations in thread pool
+                result = await asyncio.to_thread(
+                    self._update_event_sync,
+                    user_id,
+                    event_uid,
+                    updated_event
+                )
+            # Event cache already updated write-through in the sync path (BIZ-003)
             return result
         except CalendarServiceError:
             logger.error("event_update_service_error", user_id=user_id, uid=event_uid)
@@ -952,41 +1711,80 @@ class RadicaleService:
         if not calendar:
             return False
 
-        # Find and delete event
-        events = calendar.events()
-        for event in events:
-            ical = Calendar.from_ical(event.data)
-            for component in ical.walk('VEVENT'):
-                if str(component.get('uid')) == event_uid:
-                    event.delete()
-                    logger.info("event_deleted", user_id=user_id, uid=event_uid)
-                    return True
+        uid, recurrence_id = split_occurrence_id(event_uid)
+        if recurrence_id is not None:
+            return self._delete_occurrence_sync(user_id, calendar, uid, recurrence_id)
 
-        logger.warning("event_not_found", user_id=user_id, uid=event_uid)
-        return False
+        # Known href: a single DELETE, no download
+        href = self._get_event_href(user_id, event_uid)
+        if href:
+            try:
+                calendar.event_by_url(href).delete()
+                self._forget_event_href(user_id, event_uid)
+                self._cache_remove(user_id, event_uid)
+                logger.info("event_deleted", user_id=user_id, uid=event_uid)
+                return True
+            except NotFoundError:
+                self._forget_event_href(user_id, event_uid)
+                logger.debug("event_href_stale", user_id=user_id, uid=event_uid)
+
+        # Unknown href: locate object with a UID calendar-query
+        event = self._get_event_by_uid(calendar, user_id, event_uid)
+        if event is None:
+            logger.warning("event_not_found", user_id=user_id, uid=event_uid)
+            return False
+
+        event.delete()
+        self._forget_event_href(user_id, event_uid)
+        self._cache_remove(user_id, event_uid)
+        logger.info("event_deleted", user_id=user_id, uid=event_uid)
+        return True
+
+    def _delete_occurrence_sync(self, user_id: str, calendar, uid: str, recurrence_id: datetime) -> bool:
+        """Delete one occurrence of a series: add EXDATE to the master and save it."""
+        event = self._get_event_by_uid(calendar, user_id, uid)
+        if event is None:
+            logger.warning("event_not_found", user_id=user_id, uid=uid)
+            return False
+        ical = Calendar.from_ical(event.data)
+        if not self._exclude_occurrence(ical, uid, recurrence_id):
+            logger.warning("event_occurrence_not_found", user_id=user_id, uid=uid, recurrence_id=recurrence_id.isoformat())
+            return False
+
+        event.data = ical.to_ical()
+        event.save()
+        self._remember_event_href(user_id, uid, event.url)
+        self._cache_write_through(user_id, self._series_components(ical, uid))
+        logger.info("event_occurrence_deleted", user_id=user_id, uid=uid, recurrence_id=recurrence_id.isoformat())
+        return True
 
     async def delete_event(self, user_id: str, event_uid: str) -> bool:
         """
         Delete event from user's calendar.
-        Runs blocking CalDAV operations in thread pool.
+        Uses the async CalDAV client when enabled, otherwise runs blocking
+        CalDAV operations in thread pool.
+
+        An occurrence id (see occurrence_id) deletes only that occurrence
+        (EXDATE); a series UID deletes the whole series.
 
         Args:
             user_id: Telegram user ID
-            event_uid: Event UID
+            event_uid: Event UID or occurrence id
 
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Run blocking CalDAV operations in thread pool
-            result = await asyncio.to_thread(
-                self._delete_event_sync,
-                user_id,
-                event_uid
-            )
-            # Invalidate cache after successful delete (BIZ-003)
-            if result:
-                self.invalidate_cache(user_id)
+            if self._async_client is not None:
+                result = await self._delete_event_async(user_id, event_uid)
+            else:
+                # Run blocking CalDAV operations in thread pool
+                result = await asyncio.to_thread(
+                    self._delete_event_sync,
+                    user_id,
+                    event_uid
+                )
+            # Event cache already updated write-through in the sync path (BIZ-003)
             return result
         except CalendarServiceError:
             logger.error("event_delete_service_error", user_id=user_id, uid=event_uid)
@@ -1036,10 +1834,20 @@ class RadicaleService:
     async def is_connected_async(self) -> bool:
         """Check if Radicale server is accessible (async, non-blocking)."""
         try:
+            if self._async_client is not None:
+                # Depth:0 PROPFIND on the root - no calendar listing
+                response = await self._async_client.request("PROPFIND", self.url, depth="0")
+                return response.status_code < 500 and response.status_code not in (401, 403)
             return await asyncio.to_thread(self._is_connected_sync)
-        except Exception:
+        except Exception as e:
+            logger.debug("radicale_connection_check_failed", error=str(e))
             return False
 
+    async def close(self):
+        """Close async CalDAV client connection pool."""
+        if self._async_client is not None:
+            await self._async_client.close()
+
 
 # Global instance
 calendar_service = RadicaleService()
@@ -0,0 +1,408 @@
+"""Incremental CalDAV sync (RFC 6578 sync-collection) for Radicale calendars."""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Generator, List, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlparse
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+import pytz
+import structlog
+from caldav.lib.error import AuthorizationError
+from icalendar import Calendar
+
+from app.config import settings
+from app.schemas.events import CalendarEvent
+from app.utils.lru_dict import LRUDict
+from app.utils.recurrence import is_recurring
+
+if TYPE_CHECKING:
+    from app.services.caldav_async import AsyncCalDAVClient
+    from app.services.calendar_radicale import RadicaleService
+
+logger = structlog.get_logger()
+
+DAV_NS = "DAV:"
+CALDAV_NS = "urn:ietf:params:xml:ns:caldav"
+
+XML_HEADERS = {"Content-Type": 'application/xml; charset="utf-8"'}
+
+# (method, body, depth) sent by the sync steps; (status, raw body) sent back by the driver
+SyncRequest = Tuple[str, str, str]
+SyncResponse = Tuple[int, bytes]
+
+
+class CalendarUnavailableError(Exception):
+    """User calendar could not be resolved (server down after retries)."""
+    pass
+
+
+class CalendarSyncError(Exception):
+    """Unexpected response status to a sync request."""
+
+    def __init__(self, status: int):
+        super().__init__(f"unexpected status {status}")
+        self.status = status
+
+
+def calendar_query_by_uid_body(uid: str) -> str:
+    """CalDAV calendar-query REPORT body matching a single VEVENT by UID."""
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        f'<C:calendar-query xmlns:D="{DAV_NS}" xmlns:C="{CALDAV_NS}">'
+        '<D:prop><D:getetag/><C:calendar-data/></D:prop>'
+        '<C:filter><C:comp-filter name="VCALENDAR"><C:comp-filter name="VEVENT">'
+        f'<C:prop-filter name="UID"><C:text-match collation="i;octet">{escape(uid)}</C:text-match></C:prop-filter>'
+        '</C:comp-filter></C:comp-filter></C:filter>'
+        '</C:calendar-query>'
+    )
+
+
+def parse_calendar_objects(status: int, raw: bytes) -> Dict[str, Tuple[str, str]]:
+    """Parse multistatus with calendar-data (multiget / calendar-query). Returns {href: (etag, ical data)}."""
+    if status not in (200, 207):
+        raise CalendarSyncError(status)
+    tree = ElementTree.fromstring(raw)
+    result: Dict[str, Tuple[str, str]] = {}
+    for item in tree.findall(f"{{{DAV_NS}}}response"):
+        href = item.findtext(f"{{{DAV_NS}}}href")
+        data = item.findtext(f".//{{{CALDAV_NS}}}calendar-data")
+        if href and data:
+            result[href] = (item.findtext(f".//{{{DAV_NS}}}getetag") or "", data)
+    return result
+
+
+@dataclass
+class SyncResult:
+    """Outcome of one sync() call."""
+    changed: int = 0
+    deleted: int = 0
+    full: bool = False
+    unchanged: bool = False
+
+
+@dataclass
+class CalendarSyncState:
+    """Local mirror of one user's calendar."""
+    sync_token: Optional[str] = None
+    etags: Dict[str, str] = field(default_factory=dict)  # href -> ETag
+    events: Dict[str, List[CalendarEvent]] = field(default_factory=dict)  # href -> parsed VEVENTs
+    series: Dict[str, list] = field(default_factory=dict)  # href -> VEVENT components of recurring objects
+    synced_at: float = 0.0
+
+
+class CalendarSyncEngine:
+    """
+    Keeps a warm local copy of each user's calendar using CalDAV sync.
+
+    - sync(): sync-collection REPORT with the stored token returns only
+      changed/deleted hrefs with their ETags; objects whose ETag differs
+      are fetched with a single calendar-multiget. An unchanged calendar
+      costs that one REPORT, so no separate getctag check is needed
+    - list_events(): syncs, then filters the local store by time range
+
+    The sync algorithm is written once as a generator of requests
+    (_sync_steps) and driven either by the synchronous caldav client
+    (thread pool path) or by AsyncCalDAVClient (*_async methods).
+
+    An unknown or expired token falls back to a full initial sync.
+    State is kept for at most max_users users (LRU).
+    """
+
+    MULTIGET_BATCH_SIZE = 100
+    LOCK_STRIPES = 64
+
+    def __init__(self, service: "RadicaleService", max_users: int = 500):
+        """
+        Initialize sync engine.
+
+        Args:
+            service: RadicaleService used for calendar lookup and VEVENT parsing
+            max_users: Maximum number of users with a local calendar mirror
+        """
+        self.service = service
+        self._states: LRUDict = LRUDict(max_size=max_users)
+        self._states_lock = threading.Lock()
+        # Lock striping: serialize syncs per user without a lock per user
+        self._user_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._user_async_locks = [asyncio.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def _stripe(self, user_id: str) -> int:
+        return hash(user_id) % self.LOCK_STRIPES
+
+    def _get_state(self, user_id: str) -> Optional[CalendarSyncState]:
+        with self._states_lock:
+            return self._states.get(user_id)
+
+    def _set_state(self, user_id: str, state: CalendarSyncState):
+        with self._states_lock:
+            self._states[user_id] = state
+
+    def forget(self, user_id: Optional[str] = None):
+        """Drop local mirror for user or all users."""
+        with self._states_lock:
+            if user_id:
+                self._states.pop(user_id, None)
+            else:
+                self._states.clear()
+
+    # ------------------------------------------------------------------
+    # Request bodies and response parsing (transport independent)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _sync_collection_body(sync_token: Optional[str]) -> str:
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            f'<D:sync-collection xmlns:D="{DAV_NS}">'
+            f'<D:sync-token>{escape(sync_token or "")}</D:sync-token>'
+            '<D:sync-level>1</D:sync-level>'
+            '<D:prop><D:getetag/></D:prop>'
+            '</D:sync-collection>'
+        )
+
+    @staticmethod
+    def _multiget_body(hrefs: List[str]) -> str:
+        return (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            f'<C:calendar-multiget xmlns:D="{DAV_NS}" xmlns:C="{CALDAV_NS}">'
+            '<D:prop><D:getetag/><C:calendar-data/></D:prop>'
+            + "".join(f"<D:href>{escape(href)}</D:href>" for href in hrefs)
+            + '</C:calendar-multiget>'
+        )
+
+    @staticmethod
+    def _parse_multistatus(status: int, raw: bytes) -> ElementTree.Element:
+        if status not in (200, 207):
+            raise CalendarSyncError(status)
+        return ElementTree.fromstring(raw)
+
+    def _parse_sync_collection(
+        self, status: int, raw: bytes, calendar_url: str
+    ) -> Tuple[Dict[str, str], List[str], Optional[str]]:
+        """Returns (changed {href: etag}, deleted [href], new sync token)."""
+        tree = self._parse_multistatus(status, raw)
+        calendar_path = unquote(urlparse(calendar_url).path).rstrip("/")
+        changed: Dict[str, str] = {}
+        deleted: List[str] = []
+        for item in tree.findall(f"{{{DAV_NS}}}response"):
+            href = item.findtext(f"{{{DAV_NS}}}href")
+            if not href or unquote(href).rstrip("/") == calendar_path:
+                continue
+            item_status = item.findtext(f"{{{DAV_NS}}}status") or ""
+            if " 404 " in item_status:
+                deleted.append(href)
+                continue
+            changed[href] = item.findtext(f".//{{{DAV_NS}}}getetag") or ""
+        return changed, deleted, tree.findtext(f"{{{DAV_NS}}}sync-token")
+
+    def _parse_multiget(self, status: int, raw: bytes) -> Dict[str, Tuple[str, str]]:
+        """Returns {href: (etag, ical data)}."""
+        return parse_calendar_objects(status, raw)
+
+    # ------------------------------------------------------------------
+    # Sync algorithm
+    # ------------------------------------------------------------------
+
+    def _sync_steps(self, user_id: str, calendar_url: str) -> Generator[SyncRequest, SyncResponse, SyncResult]:
+        """Incremental sync as a sequence of requests; yields requests, receives (status, body)."""
+        _start = time.perf_counter()
+        state = self._get_state(user_id)
+        result = SyncResult()
+        changed: Optional[Dict[str, str]] = None
+        deleted: List[str] = []
+        new_token: Optional[str] = None
+
+        if state is not None and state.sync_token:
+            status, raw = yield ("REPORT", self._sync_collection_body(state.sync_token), "1")
+            if status in (403, 409):
+                # RFC 6578: DAV:valid-sync-token precondition failed
+                logger.info("calendar_sync_token_invalid", user_id=user_id)
+            else:
+                changed, deleted, new_token = self._parse_sync_collection(status, raw, calendar_url)
+
+        if changed is None:
+            status, raw = yield ("REPORT", self._sync_collection_body(None), "1")
+            changed, _, new_token = self._parse_sync_collection(status, raw, calendar_url)
+            previous = state
+            state = CalendarSyncState()
+            if previous is not None:
+                # Reuse already parsed objects whose ETag is unchanged
+                for href, etag in changed.items():
+                    if etag and previous.etags.get(href) == etag and href in previous.events:
+                        state.etags[href] = etag
+                        state.events[href] = previous.events[href]
+                        if href in previous.series:
+                            state.series[href] = previous.series[href]
+            deleted = []
+            result.full = True
+
+        to_fetch = [href for href, etag in changed.items() if not etag or state.etags.get(href) != etag]
+        for i in range(0, len(to_fetch), self.MULTIGET_BATCH_SIZE):
+            batch = to_fetch[i:i + self.MULTIGET_BATCH_SIZE]
+            status, raw = yield ("REPORT", self._multiget_body(batch), "1")
+            for href, (etag, data) in self._parse_multiget(status, raw).items():
+                state.etags[href] = etag or changed.get(href, "")
+                state.events[href], series = self._parse_object(user_id, calendar_url, href, data)
+                if series:
+                    state.series[href] = series
+                else:
+                    state.series.pop(href, None)
+
+        for href in deleted:
+            state.etags.pop(href, None)
+            state.events.pop(href, None)
+            state.series.pop(href, None)
+
+        state.sync_token = new_token
+        state.synced_at = time.time()
+        self._set_state(user_id, state)
+
+        result.changed = len(to_fetch)
+        result.deleted = len(deleted)
+        result.unchanged = not (result.full or to_fetch or deleted)
+        logger.info("calendar_synced",
+                   user_id=user_id,
+                   full=result.full,
+                   changed=result.changed,
+                   deleted=result.deleted,
+                   objects=len(state.etags),
+                   duration_ms=round((time.perf_counter() - _start) * 1000, 1))
+        return result
+
+    @staticmethod
+    def _drive(steps: Generator, send: Callable[[SyncRequest], SyncResponse]):
+        """Run request generator with a blocking transport."""
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(send(request))
+        except StopIteration as stop:
+            return stop.value
+
+    @staticmethod
+    async def _drive_async(steps: Generator, send):
+        """Run request generator with an async transport."""
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(await send(request))
+        except StopIteration as stop:
+            return stop.value
+
+    # ------------------------------------------------------------------
+    # Transports
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _blocking_sender(calendar) -> Callable[[SyncRequest], SyncResponse]:
+        """Send requests through the synchronous caldav client of a calendar."""
+        def send(request: SyncRequest) -> SyncResponse:
+            method, body, depth = request
+            try:
+                response = calendar.client.request(str(calendar.url), method, body, {**XML_HEADERS, "Depth": depth})
+            except AuthorizationError:
+                # caldav raises on 403, which is also how RFC 6578 rejects a stale token
+                return 403, b""
+            raw = response.raw
+            return response.status, raw.encode("utf-8") if isinstance(raw, str) else raw
+        return send
+
+    @staticmethod
+    def _async_sender(client: "AsyncCalDAVClient", calendar_url: str):
+        """Send requests through AsyncCalDAVClient."""
+        async def send(request: SyncRequest) -> SyncResponse:
+            method, body, depth = request
+            response = await client.request(method, calendar_url, body, depth=depth)
+            return response.status_code, response.content
+        return send
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def sync(self, user_id: str) -> SyncResult:
+        """Bring local mirror up to date, fetching only changed objects."""
+        with self._user_locks[self._stripe(user_id)]:
+            calendar = self.service._get_user_calendar_with_retry(user_id)
+            if calendar is None:
+                raise CalendarUnavailableError(user_id)
+            return self._drive(self._sync_steps(user_id, str(calendar.url)), self._blocking_sender(calendar))
+
+    async def sync_async(self, user_id: str, calendar_url: str, client: "AsyncCalDAVClient") -> SyncResult:
+        """Async variant of sync() over AsyncCalDAVClient."""
+        async with self._user_async_locks[self._stripe(user_id)]:
+            return await self._drive_async(
+                self._sync_steps(user_id, calendar_url), self._async_sender(client, calendar_url)
+            )
+
+    def list_events(self, user_id: str, time_min: datetime, time_max: datetime) -> List[CalendarEvent]:
+        """Sync and return events overlapping [time_min, time_max) from the local mirror."""
+        self.sync(user_id)
+        return self.get_events(user_id, time_min, time_max)
+
+    async def list_events_async(
+        self, user_id: str, calendar_url: str, client: "AsyncCalDAVClient", time_min: datetime, time_max: datetime
+    ) -> List[CalendarEvent]:
+        """Async variant of list_events()."""
+        await self.sync_async(user_id, calendar_url, client)
+        return self.get_events(user_id, time_min, time_max)
+
+    def get_events(self, user_id: str, time_min: datetime, time_max: datetime) -> List[CalendarEvent]:
+        """Events overlapping [time_min, time_max) from the local mirror (no requests)."""
+        state = self._get_state(user_id)
+        if state is None:
+            return []
+
+        tz = pytz.timezone(settings.default_timezone)
+        if time_min.tzinfo is None:
+            time_min = tz.localize(time_min)
+        if time_max.tzinfo is None:
+            time_max = tz.localize(time_max)
+
+        events = [
+            event
+            for href_events in list(state.events.values())
+            for event in href_events
+            if event.start < time_max and event.end > time_min
+        ]
+        # Recurring series are expanded only inside the requested window
+        for components in list(state.series.values()):
+            events.extend(self.service._expand_vevents(user_id, components, time_min, time_max))
+        events.sort(key=lambda e: e.start)
+        return events
+
+    def _parse_object(
+        self, user_id: str, calendar_url: str, href: str, data: str
+    ) -> Tuple[List[CalendarEvent], Optional[list]]:
+        """
+        Parse one calendar object and remember its href by UID.
+
+        Returns:
+            (CalendarEvents, None) for plain objects or ([], VEVENT components)
+            for recurring ones, which are expanded per query in get_events()
+        """
+        events = []
+        try:
+            ical = Calendar.from_ical(data)
+        except Exception as e:
+            logger.warning("calendar_sync_parse_error", user_id=user_id, href=href, error=str(e))
+            return events, None
+        object_url = urljoin(calendar_url, href)
+        components = list(ical.walk('VEVENT'))
+        if any(is_recurring(component) for component in components):
+            for component in components:
+                self.service._remember_event_href(user_id, str(component.get('uid')), object_url)
+            return events, components
+        for component in components:
+            try:
+                event = self.service._component_to_calendar_event(user_id, component)
+            except Exception as e:
+                logger.warning("calendar_sync_parse_error", user_id=user_id, href=href, error=str(e))
+                continue
+            self.service._remember_event_href(user_id, event.id, object_url)
+            events.append(event)
+        return events, None
@@ -2,20 +2,22 @@
 
 import asyncio
 import sqlite3
+import threading
+from dataclasses import dataclass
 from datetime import datetime, time, timedelta
-from typing import Dict
+from typing import Dict, List, Optional, Set, Tuple
 import json
 from pathlib import Path
 import structlog
 import pytz
 from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.error import TelegramError
+from telegram.error import RetryAfter, TelegramError
 
 from app.services.calendar_radicale import calendar_service
 from app.services.user_preferences import user_preferences
 from app.services.translations import get_translation
 from app.utils.datetime_parser import format_datetime_human
-from app.services.analytics_service import analytics_service
+from app.services.active_users import active_users_registry
 from app.services.todos_service import todos_service
 
 logger = structlog.get_logger()
@@ -51,9 +53,149 @@ def is_in_quiet_hours(current_time: time, start: time, end: time) -> bool:
         return current_time >= start or current_time < end
 
 
+def _parse_hhmm(value: str) -> time:
+    """Parse "HH:MM" preference value."""
+    hour, minute = map(int, value.split(':'))
+    return time(hour, minute)
+
+
+@dataclass(frozen=True)
+class DigestSlot:
+    """One scheduled daily message of a user."""
+    user_id: str
+    reminder_type: str  # 'morning', 'motivation', 'evening', 'weekly_digest'
+    weekday: Optional[int] = None  # Only on this local weekday (Monday=0)
+
+
+class DigestScheduleIndex:
+    """
+    Daily message slots bucketed by timezone and local "HH:MM".
+
+    A tick converts the current UTC minute once per distinct timezone and
+    reads the matching bucket, so only users who are due are touched.
+    Slots are computed from user_preferences when a user is (re)indexed:
+    disabled messages and times inside quiet hours are simply not indexed.
+    Local-time buckets stay correct across DST changes.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, Dict[str, Set[DigestSlot]]] = {}  # timezone -> "HH:MM" -> slots
+        self._user_slots: Dict[str, List[Tuple[str, str, DigestSlot]]] = {}  # user_id -> (tz, "HH:MM", slot)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _compute_slots(user_id: str) -> Tuple[str, List[Tuple[str, DigestSlot]]]:
+        """Timezone and ("HH:MM", slot) list for user from preferences."""
+        tz_name = user_preferences.get_timezone(user_id)
+        try:
+            pytz.timezone(tz_name)
+        except pytz.UnknownTimeZoneError:
+            tz_name = "UTC"
+
+        morning_enabled = user_preferences.get_morning_summary_enabled(user_id)
+        evening_enabled = user_preferences.get_evening_digest_enabled(user_id)
+        quiet_start_str, quiet_end_str = user_preferences.get_quiet_hours(user_id)
+        quiet_start, quiet_end = _parse_hhmm(quiet_start_str), _parse_hhmm(quiet_end_str)
+
+        if TEST_MODE and user_id in TEST_USER_IDS:
+            # TEST SCHEDULE for test users only
+            wanted = [
+                ("12:37", "morning", morning_enabled, None),
+                ("12:39", "motivation", True, None),
+                ("21:00", "evening", evening_enabled, None),
+            ]
+        else:
+            # PRODUCTION SCHEDULE - uses user's configured times
+            wanted = [
+                (user_preferences.get_morning_summary_time(user_id), "morning", morning_enabled, None),
+                # Morning motivation at 10:00 (only if morning reminders enabled)
+                ("10:00", "motivation", morning_enabled, None),
+                (user_preferences.get_evening_digest_time(user_id), "evening", evening_enabled, None),
+                # Weekly digest on Sunday at 18:00
+                ("18:00", "weekly_digest", True, 6),
+            ]
+
+        slots = []
+        for time_str, reminder_type, enabled, weekday in wanted:
+            if not enabled:
+                continue
+            try:
+                slot_time = _parse_hhmm(time_str)
+            except (ValueError, AttributeError):
+                logger.warning("invalid_reminder_time", user_id=user_id, reminder_type=reminder_type, value=time_str)
+                continue
+            if is_in_quiet_hours(slot_time, quiet_start, quiet_end):
+                continue
+            slots.append((slot_time.strftime('%H:%M'), DigestSlot(user_id, reminder_type, weekday)))
+        return tz_name, slots
+
+    def _remove_locked(self, user_id: str):
+        for tz_name, time_str, slot in self._user_slots.pop(user_id, []):
+            bucket = self._slots.get(tz_name, {}).get(time_str)
+            if bucket is not None:
+                bucket.discard(slot)
+                if not bucket:
+                    del self._slots[tz_name][time_str]
+                    if not self._slots[tz_name]:
+                        del self._slots[tz_name]
+
+    def update_user(self, user_id: str):
+        """(Re)index user's slots from current preferences."""
+        try:
+            tz_name, slots = self._compute_slots(user_id)
+        except Exception as e:
+            logger.error("digest_schedule_update_error", user_id=user_id, error=str(e))
+            return
+        with self._lock:
+            self._remove_locked(user_id)
+            for time_str, slot in slots:
+                self._slots.setdefault(tz_name, {}).setdefault(time_str, set()).add(slot)
+            self._user_slots[user_id] = [(tz_name, time_str, slot) for time_str, slot in slots]
+
+    def remove_user(self, user_id: str):
+        """Drop all slots of user."""
+        with self._lock:
+            self._remove_locked(user_id)
+
+    def rebuild(self, user_ids):
+        """Reindex exactly the given users."""
+        user_ids = set(user_ids)
+        with self._lock:
+            stale = [user_id for user_id in self._user_slots if user_id not in user_ids]
+        for user_id in stale:
+            self.remove_user(user_id)
+        for user_id in user_ids:
+            self.update_user(user_id)
+
+    def due(self, utc_now: datetime) -> List[Tuple[DigestSlot, str]]:
+        """Slots due at utc_now's minute with the user's local date (YYYY-MM-DD)."""
+        with self._lock:
+            buckets = {tz_name: dict(by_time) for tz_name, by_time in self._slots.items()}
+        due = []
+        for tz_name, by_time in buckets.items():
+            local_now = utc_now.astimezone(pytz.timezone(tz_name))
+            slots = by_time.get(local_now.strftime('%H:%M'))
+            if not slots:
+                continue
+            date_str = local_now.strftime('%Y-%m-%d')
+            for slot in list(slots):
+                if slot.weekday is None or slot.weekday == local_now.weekday():
+                    due.append((slot, date_str))
+        return due
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._user_slots)
+
+
 class DailyRemindersService:
     """Service for sending daily reminders to users."""
 
+    SEND_WORKERS = 8  # Concurrent digest senders
+    SENDS_PER_SECOND = 25  # Below Telegram's ~30 msg/s bot limit
+    SCHEDULE_REFRESH_SECONDS = 600  # Reindex active users (covers changes made outside setters)
+    MAX_CATCHUP_MINUTES = 5  # Minutes replayed when a tick is late
+
     def __init__(self, bot: Bot, users_file: str = "/var/lib/calendar-bot/daily_reminder_users.json",
                  db_path: str = "/var/lib/calendar-bot/reminders.db"):
         """Initialize reminders service."""
@@ -71,15 +213,23 @@ class DailyRemindersService:
         # Initialize SQLite for idempotency (sent_daily_reminders table)
         self._init_database()
 
+        # Schedule index and send pipeline
+        self._schedule = DigestScheduleIndex()
+        self._chat_ids: Dict[str, int] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._pace_lock = asyncio.Lock()
+        self._next_send_at = 0.0
+        user_preferences.add_schedule_listener(self._schedule.update_user)
+        active_users_registry.add_listener(self._on_active_user_changed)
+
     @property
     def active_users(self) -> Dict[str, int]:
-        """Get active users from analytics service (live query)."""
-        return analytics_service.get_active_users()
+        """Snapshot of active users from the shared registry."""
+        return active_users_registry.snapshot()
 
     def _load_users(self):
         """Load active users from analytics SQLite."""
-        users = analytics_service.get_active_users()
-        logger.info("daily_reminder_users_loaded", count=len(users), source="analytics_sqlite")
+        logger.info("daily_reminder_users_loaded", count=len(active_users_registry), source="analytics_sqlite")
 
     def _migrate_json_users(self):
         """One-time migration from JSON to SQLite."""
@@ -94,15 +244,14 @@ class DailyRemindersService:
                 return
 
             # Check if migration needed (SQLite has fewer users)
-            sqlite_users = analytics_service.get_active_users()
-            if len(sqlite_users) >= len(json_users):
+            if len(active_users_registry) >= len(json_users):
                 logger.info("migration_skipped", reason="sqlite_has_users")
                 return
 
             # Migrate each user
             migrated = 0
             for user_id, chat_id in json_users.items():
-                analytics_service.ensure_user(str(user_id), int(chat_id))
+                active_users_registry.register(str(user_id), int(chat_id))
                 migrated += 1
 
             logger.info("json_users_migrated_to_sqlite", count=migrated)
@@ -214,14 +363,47 @@ class DailyRemindersService:
             logger.error("cleanup_daily_reminders_error", error=str(e))
 
     def register_user(self, user_id: str, chat_id: int):
-        """Register user for daily reminders (writes to analytics SQLite)."""
-        analytics_service.ensure_user(str(user_id), int(chat_id))
-        logger.info("user_registered_for_reminders", user_id=user_id)
+        """Register user for reminders (shared registry; no write if already registered)."""
+        active_users_registry.register(str(user_id), int(chat_id))
 
     def unregister_user(self, user_id: str):
-        """Unregister user from daily reminders (e.g., when chat is not found)."""
-        analytics_service.deactivate_user(str(user_id))
-        logger.info("user_unregistered_from_reminders", user_id=user_id)
+        """Unregister user from reminders (e.g., when chat is not found)."""
+        active_users_registry.unregister(str(user_id))
+
+    def _on_active_user_changed(self, user_id: str, chat_id: Optional[int]):
+        """Registry listener: keep chat IDs and the digest index in sync."""
+        if chat_id is None:
+            self._chat_ids.pop(user_id, None)
+            self._schedule.remove_user(user_id)
+        else:
+            self._chat_ids[user_id] = chat_id
+            self._schedule.update_user(user_id)
+
+    def refresh_schedule(self):
+        """Reload active users and reindex their digest slots."""
+        active_users_registry.reload()
+        self._chat_ids = active_users_registry.snapshot()
+        self._schedule.rebuild(self._chat_ids.keys())
+        logger.info("daily_schedule_refreshed", active_users=len(self._chat_ids))
+
+    async def _send_message(self, **kwargs):
+        """bot.send_message paced to SENDS_PER_SECOND; waits once on Telegram flood control."""
+        async with self._pace_lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_send_at - now
+            self._next_send_at = max(now, self._next_send_at) + 1.0 / self.SENDS_PER_SECOND
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            return await self.bot.send_message(**kwargs)
+        except RetryAfter as e:
+            retry_after = e.retry_after.total_seconds() if isinstance(e.retry_after, timedelta) else e.retry_after
+            logger.warning("telegram_flood_control", retry_after=retry_after)
+            async with self._pace_lock:
+                # Hold back all workers, not only this one
+                self._next_send_at = max(self._next_send_at, asyncio.get_running_loop().time() + retry_after)
+            await asyncio.sleep(retry_after)
+            return await self.bot.send_message(**kwargs)
 
     async def _get_user_todos(self, user_id: str) -> tuple:
         """
@@ -376,7 +558,7 @@ class DailyRemindersService:
                 parts.append(get_translation("morning_good_deals", lang))
 
             message = "\n".join(parts)
-            await self.bot.send_message(chat_id=chat_id, text=message)
+            await self._send_message(chat_id=chat_id, text=message)
             logger.info("morning_reminder_sent", user_id=user_id,
                        events_count=events_count, tasks_count=tasks_count)
             return message
@@ -414,7 +596,7 @@ class DailyRemindersService:
                 [InlineKeyboardButton(button_text, callback_data=f"motivation_action:{user_id}")]
             ])
 
-            await self.bot.send_message(
+            await self._send_message(
                 chat_id=chat_id,
                 text=message,
                 reply_markup=keyboard
@@ -512,7 +694,7 @@ class DailyRemindersService:
                 parts.append(f"\n📋 Незакрытых задач: {len(incomplete_todos)}")
 
             message = "\n".join(parts)
-            await self.bot.send_message(chat_id=chat_id, text=message)
+            await self._send_message(chat_id=chat_id, text=message)
             logger.info("weekly_digest_sent", user_id=user_id,
                        past_events=len(past_events), next_events=len(next_events))
             return message
@@ -606,7 +788,7 @@ class DailyRemindersService:
 
             message = "\n".join(parts)
 
-            await self.bot.send_message(chat_id=chat_id, text=message, parse_mode="Markdown")
+            await self._send_message(chat_id=chat_id, text=message, parse_mode="Markdown")
             logger.info("evening_reminder_sent", user_id=user_id,
                        events_count=events_count, tasks_incomplete=incomplete_count,
                        tasks_completed=completed_count)
@@ -624,138 +806,97 @@ class DailyRemindersService:
             logger.error("evening_reminder_error", user_id=user_id, error=str(e), exc_info=True)
             return None
 
+    async def _dispatch(self, slot: DigestSlot, date_str: str):
+        """Send one due message unless already sent today."""
+        chat_id = self._chat_ids.get(slot.user_id)
+        if chat_id is None:
+            return
+        if self._is_daily_reminder_sent(slot.user_id, date_str, slot.reminder_type):
+            return
+        senders = {
+            'morning': self.send_morning_reminder,
+            'motivation': self.send_morning_motivation,
+            'evening': self.send_evening_reminder,
+            'weekly_digest': self.send_weekly_digest,
+        }
+        msg = await senders[slot.reminder_type](slot.user_id, chat_id)
+        self._record_daily_reminder(slot.user_id, date_str, slot.reminder_type, msg)
+
+    async def _send_worker(self):
+        """Take due slots from the queue and send them."""
+        while True:
+            slot, date_str = await self._queue.get()
+            try:
+                await self._dispatch(slot, date_str)
+            except Exception as e:
+                logger.error("user_schedule_check_error", user_id=slot.user_id, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def enqueue_due(self, utc_now: datetime) -> int:
+        """Queue all slots due at utc_now's minute. Returns number of queued messages."""
+        due = self._schedule.due(utc_now)
+        for item in due:
+            self._queue.put_nowait(item)
+        return len(due)
+
     async def run_daily_schedule(self):
         """Run daily reminder schedule."""
         self.running = True
+        self._queue = asyncio.Queue()
+        workers = [asyncio.create_task(self._send_worker()) for _ in range(self.SEND_WORKERS)]
+        self.refresh_schedule()
         logger.info("daily_reminders_started",
                    test_mode=TEST_MODE,
-                   active_users_count=len(self.active_users))
+                   active_users_count=len(self._chat_ids))
 
         # Log check counter (every 10 minutes)
         check_counter = 0
+        last_refresh = asyncio.get_running_loop().time()
+        last_minute = datetime.now(pytz.UTC).replace(second=0, microsecond=0) - timedelta(minutes=1)
 
-        while self.running:
-            try:
-                utc_now = datetime.now(pytz.UTC)
-                check_counter += 1
-
-                # Log status every 10 minutes (10 checks)
-                if check_counter % 10 == 0:
-                    logger.info("daily_reminders_check",
-                               utc_time=utc_now.strftime('%H:%M'),
-                               active_users=len(self.active_users),
-                               checks_done=check_counter)
-
-                # Cleanup old reminder records at 3:00 UTC
-                if utc_now.hour == 3 and utc_now.minute == 0:
-                    self.cleanup_old_daily_reminders(days=7)
-
-                # Check each user's local time
-                for user_id, chat_id in list(self.active_users.items()):
-                    try:
-                        # Get user's timezone and preferences
-                        user_tz_str = user_preferences.get_timezone(user_id)
-                        user_tz = pytz.timezone(user_tz_str)
-                        user_local_time = utc_now.astimezone(user_tz)
-                        user_time = user_local_time.time()
-
-                        # Get user's reminder settings
-                        morning_enabled = user_preferences.get_morning_summary_enabled(user_id)
-                        morning_time_str = user_preferences.get_morning_summary_time(user_id)
-                        evening_enabled = user_preferences.get_evening_digest_enabled(user_id)
-                        evening_time_str = user_preferences.get_evening_digest_time(user_id)
-                        quiet_start_str, quiet_end_str = user_preferences.get_quiet_hours(user_id)
-
-                        # Parse time strings to time objects
-                        morning_hour, morning_min = map(int, morning_time_str.split(':'))
-                        morning_time = time(morning_hour, morning_min)
-                        evening_hour, evening_min = map(int, evening_time_str.split(':'))
-                        evening_time = time(evening_hour, evening_min)
-                        quiet_start_hour, quiet_start_min = map(int, quiet_start_str.split(':'))
-                        quiet_start = time(quiet_start_hour, quiet_start_min)
-                        quiet_end_hour, quiet_end_min = map(int, quiet_end_str.split(':'))
-                        quiet_end = time(quiet_end_hour, quiet_end_min)
-
-                        # Check if current time is in quiet hours (using module-level function)
-                        in_quiet_hours = is_in_quiet_hours(user_time, quiet_start, quiet_end)
-
-                        # Get date string for idempotency check
-                        user_date_str = user_local_time.strftime('%Y-%m-%d')
-
-                        # Determine if this is a test user
-                        is_test_user = user_id in TEST_USER_IDS
-
-                        # Use different schedules for test and production users
-                        if TEST_MODE and is_test_user:
-                            # TEST SCHEDULE for test users only
-                            # Morning reminder at 12:37 (normally user's configured time)
-                            if time(12, 37) <= user_time < time(12, 38):
-                                if morning_enabled and not in_quiet_hours:
-                                    if not self._is_daily_reminder_sent(user_id, user_date_str, 'morning'):
-                                        msg = await self.send_morning_reminder(user_id, chat_id)
-                                        self._record_daily_reminder(user_id, user_date_str, 'morning', msg)
-                                        await asyncio.sleep(1)  # Rate limiting
-
-                            # Morning motivation at 12:39 (normally 10:00)
-                            elif time(12, 39) <= user_time < time(12, 40):
-                                if not in_quiet_hours:
-                                    if not self._is_daily_reminder_sent(user_id, user_date_str, 'motivation'):
-                                        msg = await self.send_morning_motivation(user_id, chat_id)
-                                        self._record_daily_reminder(user_id, user_date_str, 'motivation', msg)
-                                        await asyncio.sleep(1)  # Rate limiting
-
-                            # Evening reminder at 21:00 (normally user's configured time)
-                            elif time(21, 0) <= user_time < time(21, 1):
-                                if evening_enabled and not in_quiet_hours:
-                                    if not self._is_daily_reminder_sent(user_id, user_date_str, 'evening'):
-                                        msg = await self.send_evening_reminder(user_id, chat_id)
-                                        self._record_daily_reminder(user_id, user_date_str, 'evening', msg)
-                                        await asyncio.sleep(1)  # Rate limiting
-
-                        else:
-                            # PRODUCTION SCHEDULE - uses user's configured times
-                            current_minute_time = time(user_time.hour, user_time.minute)
-
-                            # Morning reminder at user's configured time
-                            if morning_enabled and not in_quiet_hours:
-                                if is_time_match(current_minute_time, morning_time):
-                                    if not self._is_daily_reminder_sent(user_id, user_date_str, 'morning'):
-                                        msg = await self.send_morning_reminder(user_id, chat_id)
-                                        self._record_daily_reminder(user_id, user_date_str, 'morning', msg)
-                                        await asyncio.sleep(1)  # Rate limiting
-
-                            # Morning motivation at 10:00 (only if morning reminders enabled)
-                            if morning_enabled and not in_quiet_hours and is_time_match(current_minute_time, time(10, 0)):
-                                if not self._is_daily_reminder_sent(user_id, user_date_str, 'motivation'):
-                                    msg = await self.send_morning_motivation(user_id, chat_id)
-                                    self._record_daily_reminder(user_id, user_date_str, 'motivation', msg)
-                                    await asyncio.sleep(1)  # Rate limiting
-
-                            # Evening reminder at user's configured time
-                            if evening_enabled and not in_quiet_hours:
-                                if is_time_match(current_minute_time, evening_time):
-                                    if not self._is_daily_reminder_sent(user_id, user_date_str, 'evening'):
-                                        msg = await self.send_evening_reminder(user_id, chat_id)
-                                        self._record_daily_reminder(user_id, user_date_str, 'evening', msg)
-                                        await asyncio.sleep(1)  # Rate limiting
-
-                            # Weekly digest on Sunday at 18:00
-                            if user_local_time.weekday() == 6 and is_time_match(current_minute_time, time(18, 0)):
-                                if not in_quiet_hours:
-                                    if not self._is_daily_reminder_sent(user_id, user_date_str, 'weekly_digest'):
-                                        msg = await self.send_weekly_digest(user_id, chat_id)
-                                        self._record_daily_reminder(user_id, user_date_str, 'weekly_digest', msg)
-                                        await asyncio.sleep(1)
-
-                    except Exception as e:
-                        logger.error("user_schedule_check_error", user_id=user_id, error=str(e))
-
-                # Check every minute
-                await asyncio.sleep(60)
-
-            except Exception as e:
-                logger.error("daily_schedule_error", error=str(e))
-                await asyncio.sleep(60)
+        try:
+            while self.running:
+                try:
+                    utc_now = datetime.now(pytz.UTC)
+                    current_minute = utc_now.replace(second=0, microsecond=0)
+                    check_counter += 1
+
+                    if asyncio.get_running_loop().time() - last_refresh >= self.SCHEDULE_REFRESH_SECONDS:
+                        self.refresh_schedule()
+                        last_refresh = asyncio.get_running_loop().time()
+
+                    # Cleanup old reminder records at 3:00 UTC
+                    if current_minute > last_minute and current_minute.hour == 3 and current_minute.minute == 0:
+                        self.cleanup_old_daily_reminders(days=7)
+
+                    # Queue every minute since the last tick (normally one); sends run in workers
+                    minute = max(last_minute + timedelta(minutes=1),
+                                 current_minute - timedelta(minutes=self.MAX_CATCHUP_MINUTES - 1))
+                    queued = 0
+                    while minute <= current_minute:
+                        queued += self.enqueue_due(minute)
+                        minute += timedelta(minutes=1)
+                    last_minute = max(last_minute, current_minute)
+
+                    # Log status every 10 minutes (10 checks)
+                    if check_counter % 10 == 0 or queued:
+                        logger.info("daily_reminders_check",
+                                   utc_time=utc_now.strftime('%H:%M'),
+                                   active_users=len(self._chat_ids),
+                                   queued=queued,
+                                   backlog=self._queue.qsize(),
+                                   checks_done=check_counter)
+
+                    # Sleep until the start of the next minute
+                    await asyncio.sleep(60 - datetime.now(pytz.UTC).second + 0.5)
+
+                except Exception as e:
+                    logger.error("daily_schedule_error", error=str(e))
+                    await asyncio.sleep(60)
+        finally:
+            for worker in workers:
+                worker.cancel()
 
     def stop(self):
         """Stop daily reminders."""
@@ -3,14 +3,24 @@
 import os
 import json
 import base64
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
-from cryptography.fernet import Fernet
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 import structlog
 
 logger = structlog.get_logger()
 
 
+def _utc_now_iso() -> str:
+    """Naive UTC timestamp for updated_at (same format as existing rows)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
+
 class EncryptedStorage:
     """
     Service for storing and retrieving encrypted JSON data.
@@ -22,8 +32,15 @@ class EncryptedStorage:
     1. ENCRYPTION_KEY environment variable (base64-encoded)
     2. Key file at ENCRYPTION_KEY_FILE path
     3. Auto-generated key (development only)
+
+    A source may hold several keys (comma-separated in ENCRYPTION_KEY, one
+    per line in the key file): the first encrypts, all decrypt. This keeps
+    data readable while rotate_key re-encrypts it in the background.
     """
 
+    ROTATION_CHECKPOINT = ".key_rotation.json"
+    LOCK_STRIPES = 64  # Per-file write locks (by filename hash)
+
     def __init__(
         self,
         data_dir: Optional[str] = None,
@@ -48,6 +65,9 @@ class EncryptedStorage:
         self.key_file = Path(key_file or settings.encryption_key_file)
         self.key_from_env = key_from_env or settings.encryption_key
 
+        self._keys: List[bytes] = []  # Primary first
+        self._key_file_stamp: Optional[Tuple[int, int]] = None  # (mtime_ns, size) of loaded key file
+        self._file_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
         self.cipher = self._init_cipher()
 
         logger.info(
@@ -65,7 +85,7 @@ class EncryptedStorage:
         else:
             return "auto-generated"
 
-    def _init_cipher(self) -> Fernet:
+    def _init_cipher(self) -> MultiFernet:
         """
         Initialize encryption cipher from environment, file, or generate new one.
 
@@ -79,12 +99,12 @@ class EncryptedStorage:
         # 1. Try environment variable first (most secure for production)
         if self.key_from_env:
             try:
-                # Key should be base64-encoded Fernet key
-                key = self.key_from_env.encode('utf-8')
-                # Validate it's a valid Fernet key
-                Fernet(key)
-                logger.info("encryption_key_loaded_from_env")
-                return Fernet(key)
+                # Base64-encoded Fernet keys, primary first
+                keys = [key.strip().encode('utf-8') for key in self.key_from_env.split(',') if key.strip()]
+                cipher = MultiFernet([Fernet(key) for key in keys])
+                self._keys = keys
+                logger.info("encryption_key_loaded_from_env", keys=len(keys))
+                return cipher
             except Exception as e:
                 logger.error("invalid_encryption_key_in_env", error=str(e))
                 raise ValueError(
@@ -94,10 +114,9 @@ class EncryptedStorage:
 
         # 2. Try key file (should be in separate directory from data)
         if self.key_file.exists():
-            with open(self.key_file, 'rb') as f:
-                key = f.read().strip()
-            logger.info("encryption_key_loaded_from_file", key_file=str(self.key_file))
-            return Fernet(key)
+            self._keys = self._read_key_file()
+            logger.info("encryption_key_loaded_from_file", key_file=str(self.key_file), keys=len(self._keys))
+            return MultiFernet([Fernet(key) for key in self._keys])
 
         # 3. Auto-generate (development only)
         if settings.app_env == "production":
@@ -116,19 +135,82 @@ class EncryptedStorage:
         )
 
         key = Fernet.generate_key()
+        self._write_key_file([key])
+        self._keys = [key]
 
-        # Ensure key directory exists
+        logger.info("encryption_key_generated", key_file=str(self.key_file))
+        return MultiFernet([Fernet(key)])
+
+    def _read_key_file(self) -> List[bytes]:
+        """Keys from key file, primary first (remembers file stamp for refresh)."""
+        stat = self.key_file.stat()
+        with open(self.key_file, 'rb') as f:
+            keys = f.read().split()
+        self._key_file_stamp = (stat.st_mtime_ns, stat.st_size)
+        return keys
+
+    def _write_key_file(self, keys: List[bytes]):
+        """Atomically replace key file (owner read/write only)."""
         self.key_file.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(self.key_file, b'\n'.join(keys) + b'\n', mode=0o600)
+        stat = self.key_file.stat()
+        self._key_file_stamp = (stat.st_mtime_ns, stat.st_size)
 
-        # Save key with restricted permissions
-        with open(self.key_file, 'wb') as f:
-            f.write(key)
-        os.chmod(self.key_file, 0o600)  # Read/write for owner only
+    def _refresh_cipher(self) -> bool:
+        """
+        Reload keys if the key file changed (rotation by another process).
 
-        logger.info("encryption_key_generated", key_file=str(self.key_file))
-        return Fernet(key)
+        Returns:
+            True if keys were reloaded
+        """
+        if self.key_from_env:
+            return False
+        try:
+            stat = self.key_file.stat()
+        except FileNotFoundError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == self._key_file_stamp:
+            return False
+        self._keys = self._read_key_file()
+        self.cipher = MultiFernet([Fernet(key) for key in self._keys])
+        logger.info("encryption_keys_reloaded", key_file=str(self.key_file))
+        return True
+
+    def _decrypt(self, token: bytes) -> bytes:
+        """Decrypt with current keys, reloading them once if rotated meanwhile."""
+        try:
+            return self.cipher.decrypt(token)
+        except InvalidToken:
+            if self._refresh_cipher():
+                return self.cipher.decrypt(token)
+            raise
+
+    def _file_lock(self, name: str) -> threading.Lock:
+        return self._file_locks[hash(name) % self.LOCK_STRIPES]
+
+    @staticmethod
+    def _write_atomic(path: Path, payload: bytes, mode: Optional[int] = None) -> os.stat_result:
+        """Write via temp file + rename so readers never see a partial file. Returns its stat."""
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+                stat = os.fstat(f.fileno())
+            if mode is not None:
+                os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+            return stat
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
-    def save(self, data: Dict[str, Any], filename: str, encrypt: bool = True):
+    @staticmethod
+    def _stat_version(stat: os.stat_result) -> Tuple[int, int, int]:
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def save(self, data: Dict[str, Any], filename: str, encrypt: bool = True) -> Tuple[int, int, int]:
         """
         Save data to file (optionally encrypted).
 
@@ -136,21 +218,28 @@ class EncryptedStorage:
             data: Data to save (must be JSON-serializable)
             filename: Name of file to save to
             encrypt: Whether to encrypt the data (default: True)
+
+        Returns:
+            version() of the written file
         """
         file_path = self.data_dir / filename
 
         try:
-            # Convert to JSON
-            json_data = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+            # Convert to JSON (compact when encrypted - nobody reads the layout)
+            if encrypt:
+                json_data = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            else:
+                json_data = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
 
             if encrypt:
-                # Encrypt data
+                # Encrypt data (with the newest primary key if rotation started elsewhere)
+                self._refresh_cipher()
                 encrypted_data = self.cipher.encrypt(json_data)
 
                 # Save encrypted data with .enc extension
                 encrypted_path = file_path.with_suffix(file_path.suffix + '.enc')
-                with open(encrypted_path, 'wb') as f:
-                    f.write(encrypted_data)
+                with self._file_lock(encrypted_path.name):
+                    stat = self._write_atomic(encrypted_path, encrypted_data)
 
                 # Remove unencrypted version if exists
                 if file_path.exists():
@@ -161,12 +250,12 @@ class EncryptedStorage:
                            size_bytes=len(encrypted_data))
             else:
                 # Save unencrypted (backward compatibility)
-                with open(file_path, 'wb') as f:
-                    f.write(json_data)
+                stat = self._write_atomic(file_path, json_data)
 
                 logger.info("data_saved_unencrypted",
                            filename=filename,
                            size_bytes=len(json_data))
+            return self._stat_version(stat)
 
         except Exception as e:
             logger.error("save_failed",
@@ -196,7 +285,7 @@ class EncryptedStorage:
                     encrypted_data = f.read()
 
                 # Decrypt data
-                decrypted_data = self.cipher.decrypt(encrypted_data)
+                decrypted_data = self._decrypt(encrypted_data)
                 data = json.loads(decrypted_data.decode('utf-8'))
 
                 logger.info("data_loaded_encrypted",
@@ -252,6 +341,22 @@ class EncryptedStorage:
 
         return encrypted_path.exists() or file_path.exists()
 
+    def version(self, filename: str) -> Optional[Tuple[int, int, int]]:
+        """
+        Cheap change marker of a saved file (no read or decrypt).
+
+        Returns:
+            (inode, mtime_ns, size) of the file load() would read, or None
+            if nothing is saved. Any save, also from another process, changes it.
+        """
+        file_path = self.data_dir / filename
+        for path in (file_path.with_suffix(file_path.suffix + '.enc'), file_path):
+            try:
+                return self._stat_version(path.stat())
+            except FileNotFoundError:
+                continue
+        return None
+
     def delete(self, filename: str):
         """
         Delete file (both encrypted and unencrypted versions).
@@ -277,47 +382,507 @@ class EncryptedStorage:
         else:
             logger.warning("data_delete_not_found", filename=filename)
 
-    def rotate_key(self, new_data_dir: str = None):
+    def _install_new_key(self) -> Path:
         """
-        Rotate encryption key and re-encrypt all data.
+        Generate a new primary key, keeping current keys for decryption.
 
-        WARNING: This is a destructive operation. Backup before running!
+        The previous key file is kept as .key.backup.
 
-        Args:
-            new_data_dir: New directory to move data to (optional)
+        Returns:
+            Path of the backup key file
         """
-        logger.warning("key_rotation_started")
-
-        # Load all data with old key
-        all_data = {}
-        for file_path in self.data_dir.glob("*.enc"):
-            filename = file_path.stem  # Remove .enc extension
-            all_data[filename] = self.load(filename)
-
-        # Generate new key
-        new_key = Fernet.generate_key()
-        new_cipher = Fernet(new_key)
+        old_keys = self._read_key_file() if self.key_file.exists() else []
 
         # Save old key as backup
         backup_key_file = self.key_file.with_suffix('.key.backup')
         if self.key_file.exists():
-            self.key_file.rename(backup_key_file)
+            self._write_atomic(backup_key_file, self.key_file.read_bytes(), mode=0o600)
 
-        # Write new key
-        with open(self.key_file, 'wb') as f:
-            f.write(new_key)
-        os.chmod(self.key_file, 0o600)
+        # New key first: encrypts from now on, old keys still decrypt
+        keys = [Fernet.generate_key()] + old_keys
+        self._write_key_file(keys)
 
         # Update cipher
-        self.cipher = new_cipher
+        self._keys = keys
+        self.cipher = MultiFernet([Fernet(key) for key in keys])
+        return backup_key_file
+
+    def _rotation_items(self, modified_since: Optional[float] = None) -> List[Any]:
+        """Sorted names of encrypted files (optionally only modified since a timestamp)."""
+        paths = self.data_dir.glob("*.enc")
+        if modified_since is not None:
+            paths = (path for path in paths if path.stat().st_mtime >= modified_since)
+        return sorted(path.name for path in paths)
+
+    def _rotate_token(self, token: bytes) -> Optional[bytes]:
+        """Token re-encrypted with the primary key, or None if it already is."""
+        try:
+            Fernet(self._keys[0]).decrypt(token)
+            return None
+        except InvalidToken:
+            return self.cipher.rotate(token)
+
+    def _rotate_file(self, name: str) -> bool:
+        """Re-encrypt one file with the primary key. False if skipped."""
+        path = self.data_dir / name
+        try:
+            stamp = path.stat().st_mtime_ns
+            rotated = self._rotate_token(path.read_bytes())
+            if rotated is None:
+                return False
+        except FileNotFoundError:
+            return False
+        except InvalidToken:
+            logger.error("key_rotation_item_failed", item=name, error="invalid token")
+            return False
+
+        with self._file_lock(name):
+            try:
+                if path.stat().st_mtime_ns != stamp:
+                    return False  # Rewritten meanwhile, already with the primary key
+            except FileNotFoundError:
+                return False
+            self._write_atomic(path, rotated)
+        return True
+
+    def _rotate_batch(self, batch: List[Any], pool: ThreadPoolExecutor) -> int:
+        """Re-encrypt a batch of items. Returns number re-encrypted."""
+        return sum(pool.map(self._rotate_file, batch))
+
+    def rotate_key(
+        self,
+        workers: int = 4,
+        batch_size: int = 200,
+        progress: Optional[Callable[[int, int], None]] = None,
+        keep_old_keys: bool = False
+    ) -> int:
+        """
+        Rotate encryption key and re-encrypt all data, streaming.
+
+        A new primary key is added to the key file first, so the service
+        keeps reading and writing during rotation (other processes pick the
+        new key file up on their next save or undecryptable load). Data is
+        then re-encrypted in batches on a worker pool with a checkpoint
+        after each batch: after a crash, calling rotate_key again resumes
+        where it stopped. Finally the old keys are removed from the key
+        file (kept in .key.backup).
 
-        # Re-encrypt all data with new key
-        for filename, data in all_data.items():
-            self.save(data, filename, encrypt=True)
+        Storages sharing one key file: rotate all but the last with
+        keep_old_keys=True; later calls re-encrypt with the already
+        installed primary key instead of generating another one.
+
+        With ENCRYPTION_KEY the key cannot be changed here: set
+        ENCRYPTION_KEY=<new>,<old>, restart, run rotate_key, then drop <old>.
+
+        Args:
+            workers: Threads re-encrypting files
+            batch_size: Items per checkpoint
+            progress: Called with (processed, total) after each batch
+            keep_old_keys: Leave old keys in the key file for other storages
+
+        Returns:
+            Number of items re-encrypted
+        """
+        self._refresh_cipher()
+        checkpoint_path = self.data_dir / self.ROTATION_CHECKPOINT
+        checkpoint = json.loads(checkpoint_path.read_text()) if checkpoint_path.exists() else {}
+        backup_key_file = self.key_file.with_suffix('.key.backup')
+
+        if self.key_from_env:
+            if len(self._keys) < 2:
+                raise ValueError(
+                    "ENCRYPTION_KEY holds a single key. Set ENCRYPTION_KEY=<new>,<old> and restart before rotating."
+                )
+        elif not checkpoint and len(self._keys) < 2:
+            backup_key_file = self._install_new_key()
+            checkpoint = {'started_at': time.time(), 'processed': 0}
+            self._write_atomic(checkpoint_path, json.dumps(checkpoint).encode('utf-8'))
+        # Otherwise: resume (new primary key already installed)
+        checkpoint.setdefault('started_at', time.time())
+        checkpoint.setdefault('processed', 0)
+
+        last = checkpoint.get('last')
+        items = [item for item in self._rotation_items() if last is None or item > last]
+        total = checkpoint['processed'] + len(items)
+        logger.warning("key_rotation_started", total=total, resumed_from=last)
+
+        started = time.monotonic()
+        rotated = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="key-rotation") as pool:
+            for start in range(0, len(items), batch_size):
+                batch = items[start:start + batch_size]
+                rotated += self._rotate_batch(batch, pool)
+
+                checkpoint['processed'] += len(batch)
+                checkpoint['last'] = batch[-1]
+                self._write_atomic(checkpoint_path, json.dumps(checkpoint).encode('utf-8'))
+
+                elapsed = time.monotonic() - started
+                logger.info("key_rotation_progress",
+                           processed=checkpoint['processed'],
+                           total=total,
+                           items_per_sec=round((start + len(batch)) / elapsed, 1) if elapsed else None)
+                if progress:
+                    progress(checkpoint['processed'], total)
+
+            # Items written since rotation started by processes still on an old key
+            rotated += self._rotate_batch(self._rotation_items(modified_since=checkpoint['started_at']), pool)
+
+        if not self.key_from_env and not keep_old_keys:
+            self._keys = self._keys[:1]
+            self._write_key_file(self._keys)
+            self.cipher = MultiFernet([Fernet(self._keys[0])])
+        checkpoint_path.unlink(missing_ok=True)
 
         logger.info("key_rotation_completed",
-                   files_reencrypted=len(all_data),
-                   backup_key=str(backup_key_file))
+                   items_reencrypted=rotated,
+                   duration_sec=round(time.monotonic() - started, 1),
+                   backup_key=None if self.key_from_env else str(backup_key_file))
+        return rotated
+
+
+class EncryptedSQLiteStorage(EncryptedStorage):
+    """
+    Encrypted storage backed by a single SQLite database.
+
+    Drop-in replacement for EncryptedStorage (save/load/exists/delete work
+    on "files" stored as rows), plus record-level get/put/delete_record/scan
+    for data that should not be rewritten as a whole on every change.
+
+    Every row is a Fernet token (AES-CBC + HMAC) over its namespace, key and
+    value, so a token copied into another row fails to load. Each row may
+    carry a plaintext index value (e.g. a due date) for range queries;
+    never put sensitive data there. Key sources are the same as for
+    EncryptedStorage.
+
+    Thread-safe.
+    """
+
+    DB_FILENAME = "encrypted.db"
+    ROTATION_CHECKPOINT = ".key_rotation.sqlite.json"
+    FILES_NAMESPACE = "files"  # Rows behind the file-level save/load API
+
+    def __init__(
+        self,
+        data_dir: Optional[str] = None,
+        key_file: Optional[str] = None,
+        key_from_env: Optional[str] = None,
+        db_path: Optional[str] = None
+    ):
+        """
+        Initialize SQLite-backed encrypted storage.
+
+        Args:
+            data_dir: Directory of the database (and of per-file data to import)
+            key_file: Path to encryption key file (separate from data)
+            key_from_env: Base64-encoded encryption key from environment
+            db_path: Database path (default: data_dir/encrypted.db)
+        """
+        super().__init__(data_dir=data_dir, key_file=key_file, key_from_env=key_from_env)
+        self.db_path = Path(db_path) if db_path else self.data_dir / self.DB_FILENAME
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._init_db()
+        logger.info("encrypted_sqlite_storage_initialized", db_path=str(self.db_path))
+
+    def _init_db(self):
+        """Create records table and index."""
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS records (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    idx TEXT,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID
+            ''')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_records_ns_idx ON records(namespace, idx) WHERE idx IS NOT NULL'
+            )
+            self._conn.commit()
+
+    def _encrypt_row(self, namespace: str, key: str, value: Any) -> bytes:
+        payload = json.dumps({'ns': namespace, 'k': key, 'v': value}, ensure_ascii=False, separators=(',', ':'))
+        return self.cipher.encrypt(payload.encode('utf-8'))
+
+    def _decrypt_row(self, namespace: str, key: str, token: bytes) -> Any:
+        payload = json.loads(self._decrypt(token).decode('utf-8'))
+        if payload.get('ns') != namespace or payload.get('k') != key:
+            raise ValueError(f"Encrypted record does not belong to {namespace}/{key}")
+        return payload['v']
+
+    # Record-level API
+
+    def put(self, namespace: str, key: str, value: Any, index: Optional[str] = None) -> str:
+        """
+        Encrypt and store one record (insert or replace).
+
+        Args:
+            namespace: Record group (e.g. "todos")
+            key: Record key within namespace
+            value: JSON-serializable value
+            index: Optional plaintext value for scan() range queries
+
+        Returns:
+            The record's new updated_at
+        """
+        self._refresh_cipher()
+        token = self._encrypt_row(namespace, key, value)
+        updated_at = _utc_now_iso()
+        with self._lock, self._conn:
+            self._conn.execute(
+                '''INSERT INTO records (namespace, key, value, idx, updated_at) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(namespace, key) DO UPDATE SET
+                       value = excluded.value, idx = excluded.idx, updated_at = excluded.updated_at''',
+                (namespace, key, token, index, updated_at)
+            )
+        return updated_at
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """
+        Load and decrypt one record.
+
+        Returns:
+            Stored value, or default if missing or unreadable
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM records WHERE namespace = ? AND key = ?', (namespace, key)
+            ).fetchone()
+        if row is None:
+            return default
+        try:
+            return self._decrypt_row(namespace, key, row[0])
+        except Exception as e:
+            logger.error("record_decrypt_failed", namespace=namespace, key=key, error=str(e))
+            return default
+
+    def delete_record(self, namespace: str, key: str) -> bool:
+        """Delete one record. Returns False if it did not exist."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute('DELETE FROM records WHERE namespace = ? AND key = ?', (namespace, key))
+        return cursor.rowcount > 0
+
+    def _select_records(
+        self,
+        columns: str,
+        namespace: str,
+        key_prefix: Optional[str],
+        index_min: Optional[str],
+        index_max: Optional[str]
+    ) -> List[tuple]:
+        query = f'SELECT {columns} FROM records WHERE namespace = ?'
+        params: List[Any] = [namespace]
+        if key_prefix:
+            query += ' AND key >= ? AND key < ?'
+            params += [key_prefix, key_prefix + '\uffff']
+        if index_min is not None:
+            query += ' AND idx >= ?'
+            params.append(index_min)
+        if index_max is not None:
+            query += ' AND idx <= ?'
+            params.append(index_max)
+        if index_min is not None or index_max is not None:
+            query += ' ORDER BY idx'
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def scan(
+        self,
+        namespace: str,
+        key_prefix: Optional[str] = None,
+        index_min: Optional[str] = None,
+        index_max: Optional[str] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate decrypted (key, value) records of a namespace.
+
+        Filters use the primary key (key_prefix) and the plaintext index
+        (index_min/index_max, inclusive; records without index are skipped
+        when either bound is given), so only matching rows are decrypted.
+        Unreadable records are logged and skipped.
+        """
+        for key, token in self._select_records('key, value', namespace, key_prefix, index_min, index_max):
+            try:
+                yield key, self._decrypt_row(namespace, key, token)
+            except Exception as e:
+                logger.error("record_decrypt_failed", namespace=namespace, key=key, error=str(e))
+
+    def scan_keys(
+        self,
+        namespace: str,
+        key_prefix: Optional[str] = None,
+        index_min: Optional[str] = None,
+        index_max: Optional[str] = None
+    ) -> List[str]:
+        """Keys matching the same filters as scan(), without decrypting."""
+        return [row[0] for row in self._select_records('key', namespace, key_prefix, index_min, index_max)]
+
+    # File-level API (EncryptedStorage compatible)
+
+    def save(self, data: Dict[str, Any], filename: str, encrypt: bool = True, index: Optional[str] = None) -> str:
+        """
+        Save data as one record.
+
+        Records are always encrypted; encrypt is accepted for compatibility.
+
+        Args:
+            data: Data to save (must be JSON-serializable)
+            filename: Record name (same names as the per-file layout)
+            encrypt: Ignored
+            index: Optional plaintext value for scan() range queries
+
+        Returns:
+            version() of the written record
+        """
+        try:
+            updated_at = self.put(self.FILES_NAMESPACE, filename, data, index=index)
+            logger.debug("data_saved_encrypted_sqlite", filename=filename)
+            return updated_at
+        except Exception as e:
+            logger.error("save_failed", filename=filename, error=str(e), exc_info=True)
+            raise
+
+    def load(self, filename: str, default: Any = None) -> Dict[str, Any]:
+        """Load data saved under filename, or default ({} if None)."""
+        return self.get(self.FILES_NAMESPACE, filename, default if default is not None else {})
+
+    def exists(self, filename: str) -> bool:
+        """Check if data is saved under filename."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM records WHERE namespace = ? AND key = ?', (self.FILES_NAMESPACE, filename)
+            ).fetchone()
+        return row is not None
+
+    def version(self, filename: str) -> Optional[str]:
+        """Change marker of data saved under filename (its updated_at), or None if missing."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT updated_at FROM records WHERE namespace = ? AND key = ?', (self.FILES_NAMESPACE, filename)
+            ).fetchone()
+        return row[0] if row else None
+
+    def delete(self, filename: str):
+        """Delete data saved under filename."""
+        if self.delete_record(self.FILES_NAMESPACE, filename):
+            logger.info("data_deleted", filename=filename)
+        else:
+            logger.warning("data_delete_not_found", filename=filename)
+
+    def import_files(
+        self,
+        source_dir: Optional[str] = None,
+        remove: bool = False,
+        index: Optional[Callable[[str, Any], Optional[str]]] = None
+    ) -> int:
+        """
+        Bulk-import the per-file layout (*.enc and legacy plain files).
+
+        Files are decrypted with this storage's key and written in a single
+        transaction; existing records with the same name are replaced.
+
+        Args:
+            source_dir: Directory of EncryptedStorage files (default: data_dir)
+            remove: Delete imported files after a successful commit
+            index: (filename, data) -> plaintext index for scan() range
+                queries, as save(index=...) would set it (default: no index)
+
+        Returns:
+            Number of imported files
+        """
+        source = Path(source_dir) if source_dir else self.data_dir
+        files: Dict[str, Path] = {}
+        for path in sorted(source.iterdir()):
+            if not path.is_file() or path.name.startswith('.') or path == self.db_path:
+                continue
+            if path.name.startswith(self.db_path.name):  # -wal / -shm
+                continue
+            if path.suffix == '.enc':
+                files[path.name[:-len('.enc')]] = path
+            elif path.suffix == '.json':
+                files.setdefault(path.name, path)  # .enc wins over a stale plain copy
+
+        rows = []
+        for filename, path in files.items():
+            raw = path.read_bytes()
+            if path.suffix == '.enc':
+                raw = self._decrypt(raw)
+            data = json.loads(raw.decode('utf-8'))
+            rows.append((
+                self.FILES_NAMESPACE, filename, self._encrypt_row(self.FILES_NAMESPACE, filename, data),
+                index(filename, data) if index else None,
+            ))
+
+        now = _utc_now_iso()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                '''INSERT INTO records (namespace, key, value, idx, updated_at) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(namespace, key) DO UPDATE SET
+                       value = excluded.value, idx = excluded.idx, updated_at = excluded.updated_at''',
+                [row + (now,) for row in rows]
+            )
+
+        if remove:
+            for filename in files:
+                plain_path = source / filename
+                plain_path.with_suffix(plain_path.suffix + '.enc').unlink(missing_ok=True)
+                plain_path.unlink(missing_ok=True)
+
+        logger.info("encrypted_files_imported", count=len(rows), source_dir=str(source), removed=remove)
+        return len(rows)
+
+    def _rotation_items(self, modified_since: Optional[float] = None) -> List[Any]:
+        """Sorted [namespace, key] of records (optionally only updated since a timestamp)."""
+        query = 'SELECT namespace, key FROM records'
+        params: List[Any] = []
+        if modified_since is not None:
+            query += ' WHERE updated_at >= ?'
+            params.append(datetime.fromtimestamp(modified_since, timezone.utc).replace(tzinfo=None).isoformat())
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY namespace, key', params).fetchall()
+        return [[namespace, key] for namespace, key in rows]
+
+    def _rotate_batch(self, batch: List[Any], pool: ThreadPoolExecutor) -> int:
+        """Re-encrypt a batch of records in one transaction."""
+        with self._lock:
+            rows = [
+                (namespace, key, self._conn.execute(
+                    'SELECT value FROM records WHERE namespace = ? AND key = ?', (namespace, key)
+                ).fetchone())
+                for namespace, key in batch
+            ]
+
+        def rotate(item) -> Optional[tuple]:
+            namespace, key, row = item
+            if row is None:
+                return None
+            try:
+                rotated = self._rotate_token(row[0])
+            except InvalidToken:
+                logger.error("key_rotation_item_failed", item=f"{namespace}/{key}", error="invalid token")
+                return None
+            return None if rotated is None else (rotated, namespace, key, row[0])
+
+        # Decrypt/encrypt on the worker pool; the writes stay one transaction
+        updates = [update for update in pool.map(rotate, rows) if update is not None]
+
+        # Compare-and-set: a record rewritten meanwhile already has the primary key
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'UPDATE records SET value = ? WHERE namespace = ? AND key = ? AND value = ?', updates
+            )
+            return self._conn.total_changes - before
+
+    def close(self):
+        """Close database connection."""
+        with self._lock:
+            self._conn.close()
 
 
 # Global instance
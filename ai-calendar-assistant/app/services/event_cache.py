@@ -0,0 +1,217 @@
+"""In-process per-user cache of calendar event windows for RadicaleService."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import pytz
+import structlog
+
+from app.config import settings
+from app.schemas.events import CalendarEvent
+from app.utils.lru_dict import LRUDict
+from app.utils.recurrence import split_occurrence_id
+
+logger = structlog.get_logger()
+
+# Metrics (optional - graceful fallback if prometheus_client not available)
+try:
+    from app.services.metrics import EVENT_CACHE_REQUESTS, EVENT_CACHE_USERS
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
+
+@dataclass
+class _EventWindow:
+    """Events of one user fully covering [start, end), keyed by (uid, start) - occurrences share a UID."""
+    start: datetime
+    end: datetime
+    loaded_at: float
+    events: Dict[Tuple[str, datetime], CalendarEvent] = field(default_factory=dict)
+
+    def drop(self, event_uid: str):
+        """Remove event by id; a series UID removes all occurrences of the series."""
+        for key in [key for key in self.events
+                    if key[0] == event_uid or split_occurrence_id(key[0])[0] == event_uid]:
+            del self.events[key]
+
+    def covers(self, time_min: datetime, time_max: datetime) -> bool:
+        return self.start <= time_min and time_max <= self.end
+
+    def overlaps(self, time_min: datetime, time_max: datetime) -> bool:
+        return self.start <= time_max and time_min <= self.end
+
+
+class EventWindowCache:
+    """
+    Per-user cache of calendar events covering a time window.
+
+    Each user has at most one window. Any query inside that window is
+    served from memory; overlapping fetches are merged into a wider window.
+    Writes go through upsert()/remove() so the window stays correct after
+    create/update/delete without a refetch. Entries expire after
+    ttl_seconds (covers changes made by other CalDAV clients) and the
+    least recently used users are evicted beyond max_users.
+
+    Every write bumps the user's generation. list_events captures it before
+    fetching and passes it to put(), so a fetch that raced a write-through
+    cannot merge its stale snapshot over the window.
+
+    Thread-safe: RadicaleService calls it from asyncio.to_thread workers.
+    """
+
+    def __init__(self, max_users: int = 1000, ttl_seconds: float = 120):
+        """
+        Initialize event cache.
+
+        Args:
+            max_users: Maximum number of users with a cached window
+            ttl_seconds: Window lifetime since it was loaded from the server
+        """
+        self.ttl_seconds = ttl_seconds
+        self._windows: LRUDict = LRUDict(max_size=max_users)
+        self._lock = threading.Lock()
+        # Write sequence: user_id -> sequence number of their last write;
+        # _cleared_at is the sequence number of the last invalidate() of all users
+        self._write_seq = 0
+        self._generations: Dict[str, int] = {}
+        self._cleared_at = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _aware(value: datetime) -> datetime:
+        """Naive datetimes are in the default timezone (same rule as create_event)."""
+        if value.tzinfo is None:
+            return pytz.timezone(settings.default_timezone).localize(value)
+        return value
+
+    def _fresh_window(self, user_id: str) -> Optional[_EventWindow]:
+        """Return non-expired window for user (caller holds the lock)."""
+        window = self._windows.get(user_id)
+        if window is None:
+            return None
+        if time.monotonic() - window.loaded_at >= self.ttl_seconds:
+            self._windows.pop(user_id)
+            return None
+        return window
+
+    def _bump(self, user_id: str):
+        """Record a write for user (caller holds the lock)."""
+        self._write_seq += 1
+        self._generations[user_id] = self._write_seq
+
+    def generation(self, user_id: str) -> int:
+        """Current write generation of user; capture it before fetching and pass it to put()."""
+        with self._lock:
+            return max(self._generations.get(user_id, 0), self._cleared_at)
+
+    def _record(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if METRICS_ENABLED:
+            EVENT_CACHE_REQUESTS.labels(result="hit" if hit else "miss").inc()
+
+    def get(self, user_id: str, time_min: datetime, time_max: datetime) -> Optional[List[CalendarEvent]]:
+        """
+        Get events overlapping [time_min, time_max) if a cached window covers it.
+
+        Returns:
+            Events sorted by start time, or None on cache miss
+        """
+        time_min, time_max = self._aware(time_min), self._aware(time_max)
+        with self._lock:
+            window = self._fresh_window(user_id)
+            if window is None or not window.covers(time_min, time_max):
+                self._record(hit=False)
+                return None
+            events = [
+                event for event in window.events.values()
+                if event.start < time_max and event.end > time_min
+            ]
+            self._record(hit=True)
+        events.sort(key=lambda e: e.start)
+        return events
+
+    def put(
+        self,
+        user_id: str,
+        time_min: datetime,
+        time_max: datetime,
+        events: List[CalendarEvent],
+        generation: Optional[int] = None,
+    ) -> bool:
+        """
+        Store events fetched for [time_min, time_max), merging with an overlapping window.
+
+        Args:
+            generation: Value of generation() captured before the fetch started.
+                        If the user was written since, the snapshot may be stale
+                        and is discarded.
+
+        Returns:
+            True if stored, False if discarded as stale
+        """
+        time_min, time_max = self._aware(time_min), self._aware(time_max)
+        by_key = {(event.id, event.start): event for event in events}
+        with self._lock:
+            current = max(self._generations.get(user_id, 0), self._cleared_at)
+            if generation is not None and generation != current:
+                logger.debug("event_cache_stale_put_discarded", user_id=user_id)
+                return False
+            window = self._fresh_window(user_id)
+            if window is not None and window.overlaps(time_min, time_max):
+                # Both ranges are fully known and contiguous - keep the union.
+                # Drop events inside the new range that the server no longer returns.
+                window.events = {
+                    key: event for key, event in window.events.items()
+                    if not (event.start < time_max and event.end > time_min)
+                }
+                window.events.update(by_key)
+                window.start = min(window.start, time_min)
+                window.end = max(window.end, time_max)
+                window.loaded_at = min(window.loaded_at, time.monotonic())
+            else:
+                self._windows[user_id] = _EventWindow(
+                    start=time_min, end=time_max, loaded_at=time.monotonic(), events=by_key
+                )
+            if METRICS_ENABLED:
+                EVENT_CACHE_USERS.set(len(self._windows))
+        return True
+
+    def upsert(self, user_id: str, event: CalendarEvent):
+        """Write-through for created/updated event."""
+        with self._lock:
+            self._bump(user_id)
+            window = self._fresh_window(user_id)
+            if window is None:
+                return
+            # Drop the previous version (it may have moved in time)
+            window.drop(event.id)
+            if event.start < window.end and event.end > window.start:
+                window.events[(event.id, event.start)] = event
+
+    def remove(self, user_id: str, event_uid: str):
+        """Write-through for deleted event."""
+        with self._lock:
+            self._bump(user_id)
+            window = self._windows.get(user_id)
+            if window is not None:
+                window.drop(event_uid)
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop cached window for user or all users."""
+        with self._lock:
+            if user_id:
+                self._bump(user_id)
+                self._windows.pop(user_id, None)
+            else:
+                self._write_seq += 1
+                self._cleared_at = self._write_seq
+                self._generations.clear()
+                self._windows.clear()
+        logger.debug("event_cache_invalidated", user_id=user_id)
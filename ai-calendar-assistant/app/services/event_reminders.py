@@ -11,6 +11,7 @@ from telegram.error import TelegramError
 
 from app.services.calendar_radicale import calendar_service
 from app.services.user_preferences import user_preferences
+from app.services.active_users import active_users_registry
 from app.services.translations import get_translation, Language
 from app.utils.datetime_parser import format_datetime_human
 
@@ -23,43 +24,38 @@ class EventRemindersService:
     def __init__(self, bot: Bot, users_file: str = "/var/lib/calendar-bot/event_reminder_users.json"):
         """Initialize event reminders service."""
         self.bot = bot
-        self.users_file = Path(users_file)
-        self.active_users: Dict[str, int] = {}  # user_id -> chat_id mapping
+        self.users_file = Path(users_file)  # Legacy, kept for migration
         self.running = False
         self.sent_reminders: Set[str] = set()  # Track sent reminders (event_id + user_id)
         self.reminder_minutes = 30  # Remind 30 minutes before event
 
-        # Load active users from file
-        self._load_users()
+        # Recipients live in the shared registry (users table)
+        self._migrate_json_users()
 
-    def _load_users(self):
-        """Load active users from file."""
-        try:
-            if self.users_file.exists():
-                with open(self.users_file, 'r') as f:
-                    data = json.load(f)
-                    # Convert string keys back to proper types
-                    self.active_users = {str(k): int(v) for k, v in data.items()}
-                logger.info("event_reminder_users_loaded", count=len(self.active_users))
-            else:
-                logger.info("event_reminder_users_file_not_found", creating_new=True)
-        except Exception as e:
-            logger.error("event_reminder_users_load_error", error=str(e), exc_info=True)
+    @property
+    def active_users(self) -> Dict[str, int]:
+        """Snapshot of active users from the shared registry."""
+        return active_users_registry.snapshot()
 
-    def _save_users(self):
-        """Save active users to file."""
+    def _migrate_json_users(self):
+        """One-time import of the legacy JSON user file into the registry."""
+        if not self.users_file.exists():
+            return
         try:
-            self.users_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.users_file, 'w') as f:
-                json.dump(self.active_users, f)
+            with open(self.users_file, 'r') as f:
+                data = json.load(f)
+            for user_id, chat_id in data.items():
+                active_users_registry.register(str(user_id), int(chat_id))
+            backup_path = self.users_file.with_suffix('.json.migrated')
+            self.users_file.rename(backup_path)
+            logger.info("event_reminder_users_migrated", count=len(data), backup_path=str(backup_path))
         except Exception as e:
-            logger.error("event_reminder_users_save_error", error=str(e), exc_info=True)
+            logger.error("event_reminder_users_migration_error", error=str(e), exc_info=True)
 
     def register_user(self, user_id: str, chat_id: int):
-        """Register user for event reminders."""
-        self.active_users[user_id] = chat_id
-        self._save_users()
-        logger.info("user_registered_for_event_reminders", user_id=user_id)
+        """Register user for event reminders (no write if already registered)."""
+        if active_users_registry.register(str(user_id), int(chat_id)):
+            logger.info("user_registered_for_event_reminders", user_id=user_id)
 
     async def send_event_reminder(self, user_id: str, chat_id: int, event: dict):
         """Send reminder for upcoming event."""
@@ -99,9 +95,10 @@ class EventRemindersService:
         """Check for upcoming events and send reminders."""
         import pytz
 
-        logger.info("checking_upcoming_events", active_users=len(self.active_users))
+        active_users = self.active_users
+        logger.info("checking_upcoming_events", active_users=len(active_users))
 
-        for user_id, chat_id in list(self.active_users.items()):
+        for user_id, chat_id in active_users.items():
             try:
                 # Get user's timezone
                 user_tz = user_preferences.get_timezone(user_id)
@@ -1,17 +1,24 @@
 """Event reminders service with SQLite-based idempotency."""
 
 import asyncio
+import heapq
+import itertools
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Callable, Optional
+from typing import Dict, Callable, List, Optional, Tuple
 from pathlib import Path
 import structlog
 from telegram import Bot
 from telegram.error import TelegramError
 import pytz
 
+from app.schemas.events import CalendarEvent
 from app.services.calendar_radicale import calendar_service
 from app.services.user_preferences import user_preferences
+from app.services.active_users import active_users_registry
+from app.utils.recurrence import split_occurrence_id
 
 logger = structlog.get_logger()
 
@@ -24,9 +31,20 @@ class EventRemindersServiceIdempotent:
     - SQLite database for tracking sent reminders
     - Prevents duplicate reminders after restarts
     - Automatic cleanup of old reminder records
-    - 28-32 minute window for reliability
+    - Min-heap of due reminder times: the loop sleeps until the next
+      reminder is due instead of polling every user each minute
+    - Schedule kept current by calendar_service create/update/delete
+      notifications and a low-frequency reconcile sweep (changes made by the
+      web app or other CalDAV clients, restarts); due reminders are re-checked
+      against the calendar before sending
     """
 
+    # Low-frequency safety sweep; send-time correctness comes from _revalidate.
+    # Anything shorter than the event cache TTL turns into per-user polling of Radicale.
+    RECONCILE_INTERVAL_SECONDS = 900  # Full sweep of active users every 15 minutes
+    RECONCILE_HORIZON_MINUTES = 120  # Sweep schedules events starting within this horizon
+    RECONCILE_CONCURRENCY = 10  # Parallel list_events calls during a sweep
+
     def __init__(
         self,
         bot: Bot,
@@ -39,7 +57,7 @@ class EventRemindersServiceIdempotent:
         Args:
             bot: Telegram bot instance
             user_provider: Callable that returns {user_id: chat_id} mapping.
-                          If None, will try to import from daily_reminders (legacy).
+                          If None, uses the shared active_users_registry.
             db_path: Path to SQLite database for tracking sent reminders
         """
         self.bot = bot
@@ -47,12 +65,25 @@ class EventRemindersServiceIdempotent:
         self._user_provider = user_provider
         self.running = False
         self.reminder_minutes = 30  # Remind 30 minutes before event
-        self.reminder_window_min = 28  # Minimum minutes before
-        self.reminder_window_max = 32  # Maximum minutes before
+        self.reminder_window_min = 28  # Too late to remind when less than this is left
+
+        # Min-heap of (remind_at timestamp, seq, user_id, reminder key).
+        # Rescheduled/cancelled reminders leave stale heap entries that are skipped on pop.
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._seq = itertools.count()
+        # user_id -> {reminder key: (remind_at timestamp, event)}
+        self._scheduled: Dict[str, Dict[str, Tuple[float, CalendarEvent]]] = {}
+        self._lock = threading.Lock()  # calendar_service may notify from worker threads
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._last_cleanup_date = None
 
         # Initialize SQLite database
         self._init_database()
 
+        # Drop pending reminders of users who stop receiving messages
+        active_users_registry.add_listener(self._on_active_user_changed)
+
         logger.info("event_reminders_idempotent_initialized",
                    db_path=str(self.db_path),
                    reminder_minutes=self.reminder_minutes,
@@ -154,97 +185,202 @@ class EventRemindersServiceIdempotent:
             logger.info("old_reminders_cleaned", count=deleted_count, days=days)
 
     def _get_active_users(self) -> Dict[str, int]:
-        """Get active users from provider or legacy import."""
-        # Use injected provider if available
+        """Get active users from provider or the shared registry."""
         if self._user_provider is not None:
             return self._user_provider()
-
-        # Legacy fallback: import at runtime (for backward compatibility)
-        try:
-            from app.services.daily_reminders import daily_reminders_service
-            if hasattr(daily_reminders_service, 'active_users'):
-                return daily_reminders_service.active_users
-        except ImportError:
-            pass
-
-        return {}
-
-    async def check_and_send_reminders(self):
-        """Check for upcoming events and send reminders."""
-        try:
-            active_users = self._get_active_users()
-
-            if not active_users:
-                logger.debug("no_active_users_for_reminders")
+        return active_users_registry.snapshot()
+
+    def _on_active_user_changed(self, user_id: str, chat_id: Optional[int]) -> None:
+        """Registry listener: forget reminders of unregistered users."""
+        if chat_id is None:
+            with self._lock:
+                self._scheduled.pop(user_id, None)
+
+    @staticmethod
+    def _reminder_key(event: CalendarEvent) -> str:
+        """Idempotency key: event id (occurrences of a series carry their own occurrence id)."""
+        return event.id
+
+    def _remind_at(self, event: CalendarEvent, now: datetime) -> Optional[float]:
+        """Timestamp when the reminder is due, or None if it is too late to remind."""
+        event_start = event.start
+        if event_start.tzinfo is None:
+            event_start = pytz.UTC.localize(event_start)
+        if (event_start - now).total_seconds() < self.reminder_window_min * 60:
+            return None
+        return event_start.timestamp() - self.reminder_minutes * 60
+
+    def _push(self, user_id: str, event: CalendarEvent, remind_at: float) -> None:
+        """Add reminder to the schedule (caller holds the lock)."""
+        key = self._reminder_key(event)
+        self._scheduled.setdefault(user_id, {})[key] = (remind_at, event)
+        heapq.heappush(self._heap, (remind_at, next(self._seq), user_id, key))
+
+    def schedule_event(self, user_id: str, event: CalendarEvent) -> None:
+        """Schedule (or reschedule) reminder for event."""
+        remind_at = self._remind_at(event, datetime.now(pytz.UTC))
+        if remind_at is None:
+            return
+        with self._lock:
+            self._push(user_id, event, remind_at)
+            is_next = self._heap[0][0] == remind_at
+        if is_next:
+            self._wake()
+
+    def unschedule_event(self, user_id: str, event_uid: str) -> None:
+        """Cancel reminders of event (all occurrences for a series)."""
+        with self._lock:
+            user_reminders = self._scheduled.get(user_id)
+            if not user_reminders:
                 return
+            for key in [key for key, (_, event) in user_reminders.items()
+                        if event.id == event_uid or split_occurrence_id(event.id)[0] == event_uid]:
+                del user_reminders[key]
+
+    def _on_event_changed(self, user_id: str, event_uid: str, events: List[CalendarEvent]) -> None:
+        """calendar_service listener: event created/updated (events) or deleted (empty list)."""
+        self.unschedule_event(user_id, event_uid)
+        for event in events:
+            self.schedule_event(user_id, event)
 
-            for user_id, chat_id in active_users.items():
+    def _wake(self) -> None:
+        """Wake the loop to recompute its sleep (thread-safe)."""
+        if self._loop is not None and self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def _pop_due(self, now_ts: float) -> List[Tuple[str, CalendarEvent]]:
+        """Remove and return reminders due at now_ts."""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now_ts:
+                remind_at, _, user_id, key = heapq.heappop(self._heap)
+                user_reminders = self._scheduled.get(user_id, {})
+                entry = user_reminders.get(key)
+                if entry is None or entry[0] != remind_at:
+                    continue  # Stale: rescheduled or cancelled
+                del user_reminders[key]
+                if not user_reminders:
+                    self._scheduled.pop(user_id, None)
+                due.append((user_id, entry[1]))
+        return due
+
+    def _seconds_until_next(self, now_ts: float) -> Optional[float]:
+        """Seconds until the next live reminder, dropping stale heap heads."""
+        with self._lock:
+            while self._heap:
+                remind_at, _, user_id, key = self._heap[0]
+                entry = self._scheduled.get(user_id, {}).get(key)
+                if entry is not None and entry[0] == remind_at:
+                    return max(0.0, remind_at - now_ts)
+                heapq.heappop(self._heap)
+        return None
+
+    def scheduled_count(self) -> int:
+        """Number of pending reminders."""
+        with self._lock:
+            return sum(len(user_reminders) for user_reminders in self._scheduled.values())
+
+    async def reconcile(self):
+        """Rebuild schedule of active users from their events in the next RECONCILE_HORIZON_MINUTES."""
+        active_users = self._get_active_users()
+        now = datetime.now(pytz.UTC)
+        horizon = now + timedelta(minutes=self.RECONCILE_HORIZON_MINUTES)
+        semaphore = asyncio.Semaphore(self.RECONCILE_CONCURRENCY)
+
+        async def sweep_user(user_id: str):
+            async with semaphore:
                 try:
-                    await self._check_user_events(user_id, chat_id)
+                    events = await calendar_service.list_events(user_id, now, horizon)
                 except Exception as e:
-                    logger.error("check_user_events_error",
-                               user_id=user_id,
-                               error=str(e))
-
-        except Exception as e:
-            logger.error("check_reminders_error", error=str(e), exc_info=True)
-
-    async def _check_user_events(self, user_id: str, chat_id: int):
+                    logger.error("check_user_events_error", user_id=user_id, error=str(e))
+                    return
+            with self._lock:
+                # Keep reminders beyond the horizon (added by change notifications)
+                self._scheduled[user_id] = {
+                    key: entry for key, entry in self._scheduled.get(user_id, {}).items()
+                    if entry[1].start >= horizon
+                }
+                for event in events:
+                    remind_at = self._remind_at(event, now)
+                    if remind_at is not None:
+                        self._push(user_id, event, remind_at)
+
+        await asyncio.gather(*(sweep_user(user_id) for user_id in list(active_users)))
+
+        with self._lock:
+            for user_id in [user_id for user_id in self._scheduled if user_id not in active_users]:
+                del self._scheduled[user_id]
+        logger.info("reminders_reconciled", users=len(active_users), scheduled=self.scheduled_count())
+
+    async def _revalidate(self, due: List[Tuple[str, CalendarEvent]], now: datetime) -> List[Tuple[str, CalendarEvent]]:
         """
-        Check events for a specific user and send reminders.
+        Re-check due reminders against the calendar.
 
-        Args:
-            user_id: User ID
-            chat_id: Telegram chat ID
+        Events moved or deleted by another process (web app, other CalDAV
+        clients) since they were scheduled are dropped; moved ones are
+        rescheduled. If the calendar cannot be read, the cached events are kept.
         """
-        # Get user's timezone
-        user_tz_str = user_preferences.get_timezone(user_id)
-        user_tz = pytz.timezone(user_tz_str)
-        now = datetime.now(user_tz)
+        by_user: Dict[str, List[CalendarEvent]] = {}
+        for user_id, event in due:
+            by_user.setdefault(user_id, []).append(event)
 
-        # Get events in the next hour
-        time_min = now
-        time_max = now + timedelta(hours=1)
+        valid = []
+        for user_id, events in by_user.items():
+            time_max = max(event.start for event in events) + timedelta(minutes=1)
+            try:
+                current = await calendar_service.list_events(user_id, now, time_max)
+            except Exception as e:
+                logger.warning("reminder_revalidate_failed", user_id=user_id, error=str(e))
+                valid.extend((user_id, event) for event in events)
+                continue
+
+            current_by_key = {self._reminder_key(event): event for event in current}
+            for event in events:
+                fresh = current_by_key.get(self._reminder_key(event))
+                if fresh is None:
+                    logger.info("reminder_event_gone", user_id=user_id, event_id=event.id)
+                elif fresh.start != event.start:
+                    logger.info("reminder_event_moved", user_id=user_id, event_id=event.id)
+                    self.schedule_event(user_id, fresh)
+                else:
+                    valid.append((user_id, fresh))
+        return valid
+
+    async def send_due_reminders(self):
+        """Send reminders that are due now."""
+        now = datetime.now(pytz.UTC)
+        due = self._pop_due(now.timestamp())
+        if not due:
+            return
+
+        active_users = self._get_active_users()
+        due = await self._revalidate([(user_id, event) for user_id, event in due if user_id in active_users], now)
+        for user_id, event in due:
+            try:
+                chat_id = active_users.get(user_id)
+                if chat_id is None:
+                    continue
 
-        # Fetch events from calendar
-        events = await calendar_service.list_events(user_id, time_min, time_max)
+                if self._remind_at(event, now) is None:
+                    logger.debug("reminder_too_late", user_id=user_id, event_id=event.id)
+                    continue
+
+                key = self._reminder_key(event)
+                if self._is_reminder_sent(key, user_id):
+                    logger.debug("reminder_already_sent",
+                               user_id=user_id,
+                               event_id=event.id)
+                    continue
 
-        for event in events:
-            try:
                 # Convert event time to user timezone
-                event_start = event.start
-                if event_start.tzinfo is None:
-                    event_start = pytz.UTC.localize(event_start)
-                event_start_local = event_start.astimezone(user_tz)
-
-                # Calculate time until event
-                time_until_event = event_start_local - now
-                minutes_until = time_until_event.total_seconds() / 60
-
-                # Check if within reminder window (28-32 minutes)
-                if self.reminder_window_min <= minutes_until <= self.reminder_window_max:
-                    # Check if reminder already sent
-                    if self._is_reminder_sent(event.id, user_id):
-                        logger.debug("reminder_already_sent",
-                                   user_id=user_id,
-                                   event_id=event.id)
-                        continue
-
-                    # Send reminder
-                    await self._send_reminder(
-                        user_id,
-                        chat_id,
-                        event,
-                        event_start_local
-                    )
-
-                    # Record that reminder was sent
-                    self._record_sent_reminder(
-                        event.id,
-                        user_id,
-                        chat_id,
-                        event_start_local
-                    )
+                user_tz = pytz.timezone(user_preferences.get_timezone(user_id))
+                event_start_local = event.start.astimezone(user_tz)
+
+                await self._send_reminder(user_id, chat_id, event, event_start_local)
+                self._record_sent_reminder(key, user_id, chat_id, event_start_local)
 
             except Exception as e:
                 logger.error("process_event_reminder_error",
@@ -252,6 +388,14 @@ class EventRemindersServiceIdempotent:
                            event_id=getattr(event, 'id', 'unknown'),
                            error=str(e))
 
+    async def check_and_send_reminders(self):
+        """Reconcile schedule with calendars and send due reminders (one full pass)."""
+        try:
+            await self.reconcile()
+            await self.send_due_reminders()
+        except Exception as e:
+            logger.error("check_reminders_error", error=str(e), exc_info=True)
+
     async def _send_reminder(
         self,
         user_id: str,
@@ -293,11 +437,9 @@ class EventRemindersServiceIdempotent:
             # Unregister user if chat not found (user blocked bot or deleted account)
             if "chat not found" in error_msg or "bot was blocked" in error_msg:
                 logger.warning("chat_not_found_event_reminder", user_id=user_id, error=str(e))
-                # Unregister from daily_reminders (source of truth)
+                # Unregister from the shared registry (all schedulers are notified)
                 try:
-                    from app.services.daily_reminders import daily_reminders_service
-                    if daily_reminders_service:
-                        daily_reminders_service.unregister_user(user_id)
+                    active_users_registry.unregister(user_id)
                 except Exception as unreg_error:
                     logger.error("unregister_user_failed", user_id=user_id, error=str(unreg_error))
             else:
@@ -311,32 +453,51 @@ class EventRemindersServiceIdempotent:
                         exc_info=True)
 
     async def run_reminder_loop(self):
-        """Main loop for checking and sending reminders."""
+        """Main loop: sleep until the next due reminder or reconcile sweep."""
         self.running = True
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        calendar_service.add_event_listener(self._on_event_changed)
         logger.info("event_reminders_loop_started")
 
-        while self.running:
-            try:
-                # Check for reminders every minute
-                await self.check_and_send_reminders()
-
-                # Cleanup old reminders once per day (at 3 AM)
-                now = datetime.now()
-                if now.hour == 3 and now.minute == 0:
-                    self.cleanup_old_reminders(days=7)
-
-                # Wait 1 minute
-                await asyncio.sleep(60)
+        next_reconcile = 0.0
+        try:
+            while self.running:
+                try:
+                    if time.monotonic() >= next_reconcile:
+                        await self.reconcile()
+                        next_reconcile = time.monotonic() + self.RECONCILE_INTERVAL_SECONDS
+
+                        # Cleanup old reminders once per day (at 3 AM)
+                        now = datetime.now()
+                        if now.hour == 3 and self._last_cleanup_date != now.date():
+                            self.cleanup_old_reminders(days=7)
+                            self._last_cleanup_date = now.date()
+
+                    await self.send_due_reminders()
+
+                    self._wakeup.clear()
+                    timeout = next_reconcile - time.monotonic()
+                    next_due = self._seconds_until_next(time.time())
+                    if next_due is not None:
+                        timeout = min(timeout, next_due)
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0.0))
+                    except asyncio.TimeoutError:
+                        pass
 
-            except Exception as e:
-                logger.error("reminder_loop_error", error=str(e), exc_info=True)
-                await asyncio.sleep(60)
+                except Exception as e:
+                    logger.error("reminder_loop_error", error=str(e), exc_info=True)
+                    await asyncio.sleep(60)
+        finally:
+            calendar_service.remove_event_listener(self._on_event_changed)
 
         logger.info("event_reminders_loop_stopped")
 
     def stop(self):
         """Stop the reminder loop."""
         self.running = False
+        self._wake()
         logger.info("event_reminders_stop_requested")
 
 
@@ -0,0 +1,249 @@
+"""In-process cache of LLM intent results for repeated, context-free requests."""
+
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Optional, Tuple
+import pytz
+import structlog
+
+from app.schemas.events import EventDTO, IntentType
+from app.utils.lru_dict import LRUDict
+
+logger = structlog.get_logger()
+
+# Metrics (optional - graceful fallback if prometheus_client not available)
+try:
+    from app.services.metrics import INTENT_CACHE_REQUESTS, INTENT_CACHE_ENTRIES
+    METRICS_ENABLED = True
+except ImportError:
+    METRICS_ENABLED = False
+
+
+# Answers that do not reference existing events (update/delete carry event
+# IDs, clarify/batch depend on the conversation).
+CACHEABLE_INTENTS = frozenset({
+    IntentType.QUERY.value,
+    IntentType.FIND_FREE_SLOTS.value,
+    IntentType.TODO.value,
+    IntentType.CREATE.value,
+    IntentType.CREATE_RECURRING.value,
+})
+
+_CREATE_INTENTS = frozenset({IntentType.CREATE.value, IntentType.CREATE_RECURRING.value})
+
+# Answers the LLM derives from the user's own events ("когда у меня стоматолог"):
+# shared only between requests of the same user with the same events
+_EVENT_SCOPED_INTENTS = frozenset({IntentType.QUERY.value, IntentType.FIND_FREE_SLOTS.value})
+
+# Datetimes that depend on more than the weekday: "через час", "сейчас",
+# calendar dates ("15 марта", "15.03", "15 числа"), month/year arithmetic.
+_NOT_WEEKLY = re.compile(
+    r"через|сейчас|только что|\bin \d|\bnow\b|"
+    r"\d{1,2}[./]\d{1,2}|\d{4}|числ|"
+    r"январ|феврал|март|апрел|\bма[яйе]\b|июн|июл|август|сентябр|октябр|ноябр|декабр|"
+    r"january|february|march|april|\bmay\b|june|july|august|september|october|november|december|"
+    r"месяц|month|\bгод|\bлет\b|year",
+    re.IGNORECASE,
+)
+
+_DATETIME_FIELDS = ("start_time", "end_time", "query_date_start", "query_date_end")
+
+
+class _Template:
+    """EventDTO with datetimes stored as offsets from local midnight of the day it was parsed."""
+
+    __slots__ = ("fields", "offsets", "stored_at")
+
+    def __init__(self, fields: dict, offsets: Dict[str, Tuple[timedelta, bool]], stored_at: float):
+        self.fields = fields
+        self.offsets = offsets
+        self.stored_at = stored_at
+
+
+class IntentCache:
+    """
+    Cache of parsed LLM answers keyed on what the answer depends on.
+
+    Key: normalized text, timezone, language, weekday of the request, a
+    hash of the immediate context (last dialog exchange, recently touched
+    events) and a hash of the user's events in the prompt. The last part
+    only applies to query/find_free_slots answers, which can depend on
+    those events; other answers are shared between users. On a hit, the stored EventDTO is re-anchored: every datetime
+    keeps its offset from local midnight, applied to today's midnight.
+    "завтра в 15" asked on two Mondays therefore resolves to the right
+    Tuesday each time. Texts whose dates are not weekday-relative (calendar
+    dates, "через час", months) are never cached, and a cached create whose
+    start has already passed today is a miss. Answers carrying a
+    recurrence_end_date are not cached either: it is an absolute date
+    (often the end_of_year default), not an offset from today.
+
+    Entries expire after ttl_seconds; the least recently used are evicted
+    beyond max_entries. Not thread-safe: call from the event loop only.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = 14 * 86400):
+        """
+        Initialize intent cache.
+
+        Args:
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Answer lifetime (a weekday repeats every 7 days)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: LRUDict = LRUDict(max_size=max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, ё -> е, collapse whitespace, drop trailing punctuation."""
+        text = text.lower().replace('ё', 'е')
+        text = re.sub(r'\s+', ' ', text).strip()
+        return text.rstrip(' .!?…')
+
+    @staticmethod
+    def _context_hash(conversation_history: Optional[list], recent_context: Optional[list]) -> str:
+        """Hash of the context that can change the answer to a standalone request."""
+        last_exchange = [
+            (msg.get('role'), msg.get('text', msg.get('content', '')))
+            for msg in (conversation_history or [])[-2:]
+        ]
+        recent_ids = sorted(getattr(event, 'id', str(event)) for event in (recent_context or []))
+        if not last_exchange and not recent_ids:
+            return ""
+        payload = json.dumps([last_exchange, recent_ids], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _events_hash(user_id: Optional[str], existing_events: Optional[list]) -> str:
+        """Hash of the user and the events the LLM sees in the prompt."""
+        events = sorted(
+            (str(getattr(event, 'id', '')), str(getattr(event, 'start', '')), getattr(event, 'summary', '') or '')
+            for event in (existing_events or [])
+        )
+        payload = json.dumps([user_id, events], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def key(
+        self,
+        user_text: str,
+        timezone: str,
+        language: str,
+        now: datetime,
+        conversation_history: Optional[list] = None,
+        recent_context: Optional[list] = None,
+        user_id: Optional[str] = None,
+        existing_events: Optional[list] = None,
+    ) -> Optional[Hashable]:
+        """
+        Cache key for a request, or None if the request is not cacheable.
+
+        The last element scopes event-dependent answers to the user and
+        their events; get()/put() drop it for the other intents.
+
+        Args:
+            now: Current time in the user's timezone
+            user_id: Requesting user
+            existing_events: Events passed to the LLM in the prompt
+        """
+        text = self.normalize(user_text)
+        if not text or _NOT_WEEKLY.search(text):
+            return None
+        return (text, timezone, language, now.weekday(),
+                self._context_hash(conversation_history, recent_context),
+                self._events_hash(user_id, existing_events))
+
+    @staticmethod
+    def _midnight(now: datetime) -> datetime:
+        """Naive local midnight of now (now is in the key's timezone)."""
+        return now.replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+
+    def _record(self, result: str):
+        if result == "hit":
+            self.hits += 1
+        elif result == "miss":
+            self.misses += 1
+        if METRICS_ENABLED:
+            INTENT_CACHE_REQUESTS.labels(result=result).inc()
+
+    def get(self, key: Optional[Hashable], now: datetime, user_text: str) -> Optional[EventDTO]:
+        """
+        Cached answer re-anchored to now, or None.
+
+        Args:
+            key: Result of key() (None counts as an uncacheable request)
+            now: Current time in the user's timezone
+            user_text: Original text, set as raw_text of the answer
+        """
+        if key is None:
+            self._record("skip")
+            return None
+
+        # Shared answer first, then one scoped to this user's events
+        for entry_key in (key[:-1], key):
+            template = self._entries.get(entry_key)
+            if template is not None and time.monotonic() - template.stored_at >= self.ttl_seconds:
+                self._entries.pop(entry_key)
+                template = None
+            if template is not None:
+                break
+        if template is None:
+            self._record("miss")
+            return None
+
+        tz = pytz.timezone(key[1])
+        fields = dict(template.fields, raw_text=user_text)
+        midnight = self._midnight(now)
+        for name, (offset, aware) in template.offsets.items():
+            value = midnight + offset
+            fields[name] = tz.localize(value) if aware else value
+
+        # "встреча в 14:00" means tomorrow once 14:00 has passed - ask the LLM again
+        start_time = fields.get('start_time')
+        if start_time is not None and template.fields['intent'] in _CREATE_INTENTS:
+            if start_time < (now if start_time.tzinfo else now.replace(tzinfo=None)):
+                self._record("miss")
+                return None
+
+        self._record("hit")
+        logger.info("intent_cache_hit", intent=fields.get('intent'))
+        return EventDTO(**fields)
+
+    def put(self, key: Optional[Hashable], now: datetime, event_dto: EventDTO):
+        """Store answer for key if its intent is cacheable."""
+        if key is None or event_dto.intent not in CACHEABLE_INTENTS:
+            return
+        if event_dto.recurrence_end_date is not None:
+            # Series end is absolute - re-anchoring would move it
+            return
+
+        tz = pytz.timezone(key[1])
+        midnight = self._midnight(now)
+        offsets = {}
+        for name in _DATETIME_FIELDS:
+            value = getattr(event_dto, name)
+            if value is None:
+                continue
+            if value.tzinfo is not None:
+                offsets[name] = (value.astimezone(tz).replace(tzinfo=None) - midnight, True)
+            else:
+                offsets[name] = (value - midnight, False)
+
+        fields = event_dto.model_dump(exclude=set(_DATETIME_FIELDS) | {"raw_text"})
+        if event_dto.intent not in _EVENT_SCOPED_INTENTS:
+            key = key[:-1]
+        self._entries[key] = _Template(fields, offsets, time.monotonic())
+        if METRICS_ENABLED:
+            INTENT_CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        """Drop all cached answers."""
+        self._entries.clear()
+        if METRICS_ENABLED:
+            INTENT_CACHE_ENTRIES.set(0)
+
+
+intent_cache = IntentCache()
@@ -1,9 +1,11 @@
 """LLM Agent service using Yandex GPT (YandexGPT Foundation Models)."""
 
-from typing import Optional, List
+from typing import Awaitable, Callable, Dict, Optional, List, Tuple
 import asyncio
 import json
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import httpx
 import structlog
@@ -11,10 +13,27 @@ import structlog
 from app.config import settings
 from app.schemas.events import EventDTO, IntentType
 from app.utils.datetime_parser import parse_datetime_range
+from app.utils.json_stream import StreamingJSON
+from app.services.intent_cache import intent_cache
+from app.services.prompt_builder import PromptBuilder
 from app.services.translations import get_translation, Language
 
 logger = structlog.get_logger()
 
+# Called during a streamed completion with (intent, partial string fields)
+PartialCallback = Callable[[str, Dict[str, str]], Awaitable[None]]
+
+# Words dateparser/extract_duration can resolve; without any of them
+# parse_datetime_range finds nothing, so it is not run at all.
+_DATETIME_HINT = re.compile(
+    r"\d|сегодн|завтр|вчера|понедельн|вторник|сред|четверг|пятниц|суббот|воскрес|выходн|"
+    r"недел|месяц|год|час|минут|утр|вечер|ноч|днем|днём|полдень|полноч|через|назад|"
+    r"январ|феврал|март|апрел|ма[йя]|июн|июл|август|сентябр|октябр|ноябр|декабр|"
+    r"today|tomorrow|yesterday|mon|tue|wed|thu|fri|sat|sun|week|month|year|hour|min|"
+    r"noon|midnight|morning|evening|night|ago|next|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec",
+    re.IGNORECASE,
+)
+
 
 class CircuitOpenError(Exception):
     """Raised when circuit breaker is open."""
@@ -76,6 +95,10 @@ class LLMAgentYandex:
         # Async HTTP client (reusable with connection pooling)
         self._http_client: Optional[httpx.AsyncClient] = None
 
+        # dateparser fallback runs here, off the event loop and apart from
+        # the default executor used for CalDAV calls
+        self._parse_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-dateparse")
+
         # Circuit breaker state
         self._circuit_open = False
         self._circuit_open_until: float = 0
@@ -161,6 +184,9 @@ intent="create" когда:
 
 ВАЖНО: Ответ ТОЛЬКО в JSON формате. Никакого текста до/после JSON."""
 
+        # Assembles instructions + context within the prompt token budget
+        self._prompt_builder = PromptBuilder(self.base_system_prompt, settings.yandex_gpt_prompt_token_budget)
+
     def _is_llm_refusal(self, text: str) -> bool:
         """
         Detect if Yandex GPT refused to process request due to content moderation.
@@ -232,6 +258,22 @@ intent="create" когда:
             self._http_client = None
             logger.info("llm_agent_http_client_closed")
 
+    def _start_datetime_fallback(self, user_text: str) -> Optional[asyncio.Future]:
+        """
+        Start parse_datetime_range (dateparser, slow) in the parse pool.
+
+        It runs while the calendar context loads and the LLM answers; its
+        values only fill fields missing from the LLM answer. Not started
+        for text without date/time words.
+
+        Returns:
+            Future of (start_time, end_time, duration), or None if not needed
+        """
+        if not _DATETIME_HINT.search(user_text):
+            return None
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._parse_executor, parse_datetime_range, user_text)
+
     def _check_circuit(self) -> bool:
         """Check if circuit breaker allows requests. Returns True if allowed."""
         if not self._circuit_open:
@@ -331,74 +373,6 @@ intent="create" когда:
             'end_of_year_date': end_of_year_date
         }
 
-    def _prepare_events_context(
-        self,
-        existing_events: Optional[list],
-        recent_context: Optional[list],
-        conversation_history: Optional[list]
-    ) -> str:
-        """
-        Prepare events context string for LLM prompt.
-
-        Includes:
-            - Existing calendar events (for update/delete)
-            - Recent context (for follow-up commands)
-            - Dialog history
-        """
-        # Existing events prefix
-        events_prefix = ""
-        if existing_events and len(existing_events) > 0:
-            max_events_in_context = 10
-            limited_events = existing_events[:max_events_in_context]
-            events_prefix = "<existing_calendar_events>\n"
-            for event in limited_events:
-                event_time = event.start.strftime('%d.%m.%Y %H:%M') if hasattr(event, 'start') else 'Unknown'
-                event_title = event.summary if hasattr(event, 'summary') else 'No title'
-                event_id = event.id if hasattr(event, 'id') else 'unknown'
-                events_prefix += f"Event: {event_title}\nTime: {event_time}\nID: {event_id}\n\n"
-            events_prefix += """</existing_calendar_events>
-
-CRITICAL: For update/delete operations:
-- Find the event in the list above by matching title/description
-- COPY the exact ID value - NEVER use "unknown"
-- Example: "перенеси встречу с Леной" → find "Встреча с Леной" → copy its ID
-
-"""
-
-        # Recent context prefix
-        recent_context_prefix = ""
-        if recent_context and len(recent_context) > 0:
-            recent_context_prefix = "<recent_context>\n"
-            recent_context_prefix += "Пользователь ТОЛЬКО ЧТО создал/изменил следующие события:\n"
-            for event in recent_context:
-                event_time = event.start.strftime('%d.%m.%Y %H:%M') if hasattr(event, 'start') else 'Unknown'
-                event_title = event.summary if hasattr(event, 'summary') else 'No title'
-                event_id = event.id if hasattr(event, 'id') else 'unknown'
-                recent_context_prefix += f"- {event_title} ({event_time}) ID: {event_id}\n"
-            recent_context_prefix += """
-ВАЖНО: Если пользователь говорит "эти события", "их", "перепиши", "перенеси" БЕЗ указания конкретного названия — он имеет в виду события выше из recent_context.
-Используй их ID для update/delete операций.
-</recent_context>
-
-"""
-        events_prefix += recent_context_prefix + "User request:\n"
-
-        # Dialog history context
-        dialog_context = ""
-        if conversation_history and len(conversation_history) > 0:
-            dialog_context = "<dialog_history>\n"
-            for msg in conversation_history[-10:]:
-                role = msg.get('role', 'user')
-                text = msg.get('text', msg.get('content', ''))[:300]
-                if role == 'user':
-                    dialog_context += f"Пользователь: {text}\n"
-                else:
-                    dialog_context += f"Бот: {text}\n"
-            dialog_context += "</dialog_history>\n\n"
-            dialog_context += "ВАЖНО: Используй контекст диалога для понимания намерений пользователя.\n\n"
-
-        return events_prefix + dialog_context
-
     def _build_function_schema(self, existing_events: Optional[list]) -> dict:
         """
         Build function schema for LLM with dynamic event_id enum.
@@ -451,81 +425,26 @@ CRITICAL: For update/delete operations:
             }
         }, event_id_enum
 
-    def _build_full_prompt(self, dt_context: dict, events_context: str, user_text: str) -> str:
-        """
-        Build full prompt for LLM API call.
-        """
-        # Date context block
-        date_context = f"""ТЕКУЩАЯ ДАТА: {dt_context['current_datetime_str']} ({dt_context['timezone']}, UTC{dt_context['tz_offset_formatted']}), {dt_context['current_weekday_ru']}
-
-Относительные даты:
-- "завтра" = {(dt_context['now'] + timedelta(days=1)).strftime('%Y-%m-%d')}
-- "послезавтра" = {(dt_context['now'] + timedelta(days=2)).strftime('%Y-%m-%d')}
-- "через неделю" = {(dt_context['now'] + timedelta(days=7)).strftime('%Y-%m-%d')}
-
-Ближайшие дни недели:
-- понедельник = {dt_context['next_weekdays_ru']['понедельник'].strftime('%Y-%m-%d')}
-- вторник = {dt_context['next_weekdays_ru']['вторник'].strftime('%Y-%m-%d')}
-- среда = {dt_context['next_weekdays_ru']['среда'].strftime('%Y-%m-%d')}
-- четверг = {dt_context['next_weekdays_ru']['четверг'].strftime('%Y-%m-%d')}
-- пятница = {dt_context['next_weekdays_ru']['пятница'].strftime('%Y-%m-%d')}
-- суббота = {dt_context['next_weekdays_ru']['суббота'].strftime('%Y-%m-%d')}
-- воскресенье = {dt_context['next_weekdays_ru']['воскресенье'].strftime('%Y-%m-%d')}
-
-Используй ТОЧНО эти даты!"""
-
-        # Format base system prompt
-        formatted_base_prompt = self.base_system_prompt.format(
-            today_str=dt_context['current_date_str'],
-            days_until_eoy=dt_context['days_until_eoy'],
-            end_of_year_date=dt_context['end_of_year_date']
-        )
-
-        system_prompt = f"""{formatted_base_prompt}
-
-{date_context}
-"""
-
-        # JSON instruction
-        json_instruction = """ФОРМАТ ОТВЕТА: Верни ТОЛЬКО JSON объект с параметрами.
-
-Пример для одного события:
-{"intent": "create", "title": "Встреча", "start_time": "2025-01-15T15:00:00+03:00"}
-
-Пример для нескольких событий:
-{"intent": "batch_confirm", "batch_actions": [{"intent": "create", "title": "Дорога", "start_time": "2025-01-15T19:00:00+03:00"}, {"intent": "create", "title": "Ужин", "start_time": "2025-01-15T20:00:00+03:00"}]}
-
-Пример для задачи:
-{"intent": "todo", "title": "Позвонить маме"}
-
-Пример для уточнения:
-{"intent": "clarify", "clarify_question": "Уточните время события"}
-
-ВАЖНО: Возвращай ТОЛЬКО значения параметров, НЕ структуру схемы!
-JSON:"""
-
-        # Full user message
-        user_message_content = events_context + user_text
-
-        return f"""{system_prompt}
-
-{user_message_content}
-
-{json_instruction}"""
-
     async def _call_llm_api(
         self,
         full_prompt: str,
         user_id: Optional[str],
         user_text: str,
-        event_id_enum: list
+        event_id_enum: list,
+        on_partial: Optional[PartialCallback] = None
     ) -> tuple:
         """
         Call Yandex GPT API with circuit breaker and error handling.
 
+        With on_partial (and settings.yandex_gpt_streaming) the completion
+        is streamed: on_partial receives the intent and clarify_question
+        as they are generated, and reading stops as soon as the JSON answer
+        is closed (closing the stream cancels the rest of the generation).
+
         Returns:
             tuple: (response_data, result_text) or raises exception
         """
+        stream = on_partial is not None and settings.yandex_gpt_streaming
         # DEBUG log
         logger.debug("yandex_gpt_api_call",
                     event_id_enum=event_id_enum,
@@ -539,7 +458,7 @@ JSON:"""
         payload = {
             "modelUri": f"gpt://{self.folder_id}/{self.model}/latest",
             "completionOptions": {
-                "stream": False,
+                "stream": stream,
                 "temperature": 0.2,
                 "maxTokens": 2000
             },
@@ -567,6 +486,9 @@ JSON:"""
         try:
             _http_start = time.perf_counter()
             client = await self._get_http_client()
+            if stream:
+                return await self._stream_llm_api(client, headers, payload, on_partial, user_id, user_text, _http_start)
+
             response = await client.post(
                 self.api_url,
                 headers=headers,
@@ -596,24 +518,90 @@ JSON:"""
             raise
 
         if response.status_code != 200:
-            self._record_failure()
-            logger.error("yandex_gpt_api_error", status_code=response.status_code, response=response.text)
-            if ANALYTICS_ENABLED and analytics_service and user_id:
-                analytics_service.log_action(
-                    user_id=user_id,
-                    action_type=ActionType.LLM_ERROR,
-                    details=f"API error {response.status_code}: {user_text[:100]}",
-                    success=False,
-                    error_message=f"Status {response.status_code}: {response.text[:200]}"
-                )
-            raise Exception(f"Yandex GPT API error: {response.status_code} - {response.text}")
+            self._raise_api_error(response, user_id, user_text)
 
         response_data = response.json()
-        result_text = response_data.get("result", {}).get("alternatives", [{}])[0].get("message", {}).get("text", "")
+        result_text = self._result_text(response_data)
         logger.info("yandex_gpt_raw_response", result_text=result_text)
 
         return response_data, result_text
 
+    @staticmethod
+    def _result_text(response_data: dict) -> str:
+        return response_data.get("result", {}).get("alternatives", [{}])[0].get("message", {}).get("text", "")
+
+    def _raise_api_error(self, response: httpx.Response, user_id: Optional[str], user_text: str):
+        """Record and raise a non-200 API response."""
+        self._record_failure()
+        logger.error("yandex_gpt_api_error", status_code=response.status_code, response=response.text)
+        if ANALYTICS_ENABLED and analytics_service and user_id:
+            analytics_service.log_action(
+                user_id=user_id,
+                action_type=ActionType.LLM_ERROR,
+                details=f"API error {response.status_code}: {user_text[:100]}",
+                success=False,
+                error_message=f"Status {response.status_code}: {response.text[:200]}"
+            )
+        raise Exception(f"Yandex GPT API error: {response.status_code} - {response.text}")
+
+    async def _stream_llm_api(
+        self,
+        client: httpx.AsyncClient,
+        headers: dict,
+        payload: dict,
+        on_partial: PartialCallback,
+        user_id: Optional[str],
+        user_text: str,
+        http_start: float
+    ) -> tuple:
+        """
+        Read a streamed completion (one JSON result per line, cumulative text).
+
+        Returns:
+            tuple: (last response_data, result_text)
+        """
+        answer = StreamingJSON()
+        response_data: dict = {}
+        emitted: tuple = (None, None)
+        first_chunk_ms = None
+
+        async with client.stream("POST", self.api_url, headers=headers, json=payload) as response:
+            if response.status_code != 200:
+                await response.aread()
+                self._raise_api_error(response, user_id, user_text)
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                response_data = json.loads(line)
+                answer.feed(self._result_text(response_data))
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - http_start) * 1000
+
+                intent, intent_closed = answer.string_field("intent")
+                if intent_closed:
+                    question, _ = answer.string_field("clarify_question")
+                    if (intent, question) != emitted:
+                        emitted = (intent, question)
+                        fields = {"clarify_question": question} if question is not None else {}
+                        try:
+                            await on_partial(intent, fields)
+                        except Exception as e:
+                            logger.warning("llm_partial_callback_error", error=str(e))
+
+                if answer.complete:
+                    # Everything after the JSON is discarded anyway
+                    break
+
+        self._record_success()
+        logger.info("yandex_gpt_http_duration",
+                   duration_ms=round((time.perf_counter() - http_start) * 1000, 1),
+                   first_chunk_ms=round(first_chunk_ms, 1) if first_chunk_ms is not None else None,
+                   stopped_early=answer.complete,
+                   streamed=True)
+        logger.info("yandex_gpt_raw_response", result_text=answer.text)
+        return response_data, answer.text
+
     def _log_success_analytics(
         self,
         response_data: dict,
@@ -657,8 +645,10 @@ JSON:"""
         """
         Phase 4: Try local regex parser before calling LLM.
 
-        Handles ~60-70% of typical requests (query, todo, create, free_slots)
-        without an LLM call, saving cost and latency.
+        Handles ~60-70% of typical requests (query, todo, create,
+        create_recurring, free_slots, delete_by_criteria, delete_duplicates)
+        without an LLM call, saving cost and latency. Both delete intents
+        are confirmed by the user before anything is removed.
 
         Returns:
             EventDTO if locally parsed, None to fall through to LLM.
@@ -699,6 +689,29 @@ JSON:"""
                     confidence=confidence,
                     query_date_start=params.get("query_date_start"),
                 )
+            elif intent_str == "create_recurring":
+                dto = EventDTO(
+                    intent=IntentType.CREATE_RECURRING,
+                    confidence=confidence,
+                    title=params.get("title"),
+                    start_time=params.get("start_time"),
+                    duration_minutes=params.get("duration_minutes"),
+                    recurrence_type=params.get("recurrence_type"),
+                    recurrence_days=params.get("recurrence_days"),
+                    recurrence_end_date=params.get("recurrence_end_date"),
+                    event_type=params.get("event_type", "generic"),
+                )
+            elif intent_str == "delete_by_criteria":
+                dto = EventDTO(
+                    intent=IntentType.DELETE_BY_CRITERIA,
+                    confidence=confidence,
+                    delete_criteria_title_contains=params.get("delete_criteria_title_contains"),
+                )
+            elif intent_str == "delete_duplicates":
+                dto = EventDTO(
+                    intent=IntentType.DELETE_DUPLICATES,
+                    confidence=confidence,
+                )
             else:
                 return None
 
@@ -986,13 +999,19 @@ JSON:"""
         timezone: str = 'Europe/Moscow',
         existing_events: Optional[list] = None,
         language: str = 'ru',
-        recent_context: Optional[list] = None
+        recent_context: Optional[list] = None,
+        on_partial: Optional[PartialCallback] = None,
+        calendar_context: Optional[Awaitable[Tuple[list, list]]] = None
     ) -> EventDTO:
         """
         Extract structured event information from natural language text.
 
         ARCH-001: Refactored from ~500 lines to ~80 lines using helper methods.
 
+        Pipeline: local parsers first; for LLM-bound text the dateparser
+        fallback starts in the parse pool and runs concurrently with
+        calendar context loading and the LLM request.
+
         Args:
             user_text: User's natural language command
             user_id: User identifier for context
@@ -1001,6 +1020,11 @@ JSON:"""
             existing_events: List of existing calendar events from DB (for update/delete)
             language: User's preferred language (ru, en, es, ar)
             recent_context: Recently created/modified events for follow-up commands
+            on_partial: Streaming callback, see _call_llm_api (not called for
+                answers from local parsers)
+            calendar_context: Pending (existing_events, recent_context), e.g. a
+                task started by the caller; awaited only if the LLM is needed
+                and then used instead of existing_events/recent_context
 
         Returns:
             EventDTO with extracted information
@@ -1033,28 +1057,43 @@ JSON:"""
         if local_dto:
             return local_dto
 
+        # 2.6 dateparser fallback values, computed in the background
+        datetime_fallback = self._start_datetime_fallback(user_text)
+
         try:
-            # 3. Prepare datetime context using helper
+            # 3. Calendar context (loading since the handler started) and datetime context
+            if calendar_context is not None:
+                existing_events, recent_context = await calendar_context
             dt_context = self._prepare_datetime_context(timezone)
 
-            # 4. Prepare events context using helper
-            events_context = self._prepare_events_context(
-                existing_events, recent_context, conversation_history
-            )
+            # 3.5 Repeated context-free request: reuse the answer, re-anchored to today
+            cache_key = None
+            if settings.yandex_gpt_intent_cache:
+                cache_key = intent_cache.key(
+                    user_text, timezone, language, dt_context['now'],
+                    conversation_history, recent_context,
+                    user_id=user_id, existing_events=existing_events
+                )
+                cached_dto = intent_cache.get(cache_key, dt_context['now'], user_text)
+                if cached_dto:
+                    if datetime_fallback:
+                        datetime_fallback.cancel()
+                    return cached_dto
 
-            # 5. Build function schema (only need event_id_enum for logging)
+            # 4. Build function schema (only need event_id_enum for logging)
             _, event_id_enum = self._build_function_schema(existing_events)
 
-            # 6. Build full prompt using helper
-            full_prompt = self._build_full_prompt(dt_context, events_context, user_text)
-
-            # 7. Parse datetime from user text for fallback values
-            start_time, end_time, duration = parse_datetime_range(user_text)
+            # 5-6. Build full prompt: events and dialog history ranked to fit the token budget
+            full_prompt = self._prompt_builder.build(
+                dt_context, user_text, existing_events, recent_context, conversation_history
+            )
 
-            # 8. Call LLM API using helper
+            # 7-8. Call LLM API using helper (dateparser fallback still running)
             response_data, result_text = await self._call_llm_api(
-                full_prompt, user_id, user_text, event_id_enum
+                full_prompt, user_id, user_text, event_id_enum, on_partial
             )
+            usage = response_data.get("result", {}).get("usage", {})
+            self._prompt_builder.calibrate(len(full_prompt), int(usage.get("inputTextTokens", 0)))
 
             # 9. Check for content moderation refusal
             if self._is_llm_refusal(result_text):
@@ -1075,7 +1114,10 @@ JSON:"""
                 # Fallback: create TODO from user text
                 return self._create_todo_fallback(user_text, user_id)
 
-            # 10. Parse JSON from LLM response
+            # 10. Parse JSON from LLM response, with the dateparser fallback values
+            start_time, end_time, duration = (
+                await datetime_fallback if datetime_fallback else (None, None, None)
+            )
             event_dto = self._parse_yandex_response(
                 result_text,
                 user_text,
@@ -1087,6 +1129,8 @@ JSON:"""
                 user_id
             )
 
+            intent_cache.put(cache_key, dt_context['now'], event_dto)
+
             # 11. Log analytics using helper
             self._log_success_analytics(response_data, event_dto, user_id)
 
@@ -1,17 +1,23 @@
 """Local regex-based intent parser for common calendar queries.
 
 Handles 60-70% of typical requests without LLM call:
-- Queries: "что на сегодня", "какие планы на завтра", "мои дела"
+- Queries: "что на сегодня", "какие планы на завтра", "что у меня в пятницу"
 - Todos: "позвонить клиенту", "подготовить документы" (no time)
-- Creates: keywords + explicit time like "встреча в 15:00"
-- Free slots: "свободное время", "когда я свободен"
+- Creates: keywords + explicit time like "встреча в 15:00", "ужин в 7 вечера"
+- Recurring: "каждый понедельник в 10:00 планерка", "ежедневно в 9:00 зарядка"
+- Free slots: "свободное время", "когда я свободен в среду"
+- Deletes: "удали дубликаты", "удали все показы" (confirmed by the user)
+
+All patterns are compiled at import. One pass of _FAMILY_TRIGGERS over
+the text picks the pattern families that can match, so a message only
+runs the patterns of its candidate families.
 
 Fallback to LLM for complex/ambiguous requests.
 """
 
 import re
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Optional, Set, Tuple
 import structlog
 
 logger = structlog.get_logger()
@@ -19,6 +25,22 @@ logger = structlog.get_logger()
 # Confidence threshold — below this, fall through to LLM
 CONFIDENCE_THRESHOLD = 0.85
 
+# Keyword prefilter: zero-width match at every position, the named group
+# says which pattern family the keyword there belongs to. Todo is always a
+# candidate (its prefix pattern is anchored and cheap).
+_FAMILY_TRIGGERS = re.compile(
+    r"(?=(?P<delete>удал|убер|почист|очист)"
+    r"|(?P<recurring>кажд|ежедневн|еженедельн|ежемесячн|по\s+будн|по\s+(?:понедельн|вторн|сред|четверг|пятниц|суббот|воскресен)\w*ам\b)"
+    r"|(?P<query>что|чё|шо|как|план|дел|событи|расписани|покаж|запланир|сегодн|завтр|выходн)"
+    r"|(?P<free_slots>свобод|найд)"
+    r"|(?P<time>\d))"
+)
+
+
+def _candidate_families(text_lower: str) -> Set[str]:
+    """Pattern families whose keywords occur in text (one regex pass)."""
+    return {m.lastgroup for m in _FAMILY_TRIGGERS.finditer(text_lower)}
+
 
 def parse_intent(
     text: str,
@@ -33,7 +55,8 @@ def parse_intent(
 
     Returns:
         Tuple of (intent_type, params_dict, confidence) or None if can't parse.
-        intent_type: "query", "todo", "create", "find_free_slots"
+        intent_type: "query", "todo", "create", "create_recurring",
+            "find_free_slots", "delete_by_criteria", "delete_duplicates"
         params_dict: extracted parameters (dates, title, time, etc.)
         confidence: float 0.0-1.0
     """
@@ -43,77 +66,140 @@ def parse_intent(
     if len(text_lower) < 2 or len(text_lower) > 500:
         return None
 
-    # Try each parser in priority order
-    result = _try_query(text_lower, timezone)
+    families = _candidate_families(text_lower)
+
+    # Try each candidate parser in priority order
+    if "delete" in families:
+        result = _try_delete(text_lower)
+        if result:
+            return result
+
+    if "recurring" in families and "time" in families:
+        result = _try_recurring(text_lower, text.strip(), timezone)
+        if result:
+            return result
+
+    if "query" in families:
+        result = _try_query(text_lower, timezone)
+        if result:
+            return result
+
+    if "free_slots" in families:
+        result = _try_free_slots(text_lower, timezone)
+        if result:
+            return result
+
+    # A recurrence _try_recurring couldn't parse ("каждый месяц", "каждые
+    # две недели") must not become a single event
+    if "time" in families and "recurring" not in families:
+        result = _try_create_with_time(text_lower, text, timezone)
+        if result:
+            return result
+
+    result = _try_todo(text_lower, text, has_digits="time" in families)
     if result:
         return result
 
-    result = _try_free_slots(text_lower, timezone)
-    if result:
-        return result
+    return None
 
-    result = _try_create_with_time(text_lower, text, timezone)
-    if result:
-        return result
 
-    result = _try_todo(text_lower, text)
-    if result:
-        return result
+# ==================== Day references ====================
 
+_DAY_WORDS = r"сегодня|послезавтра|завтра|понедельник|вторник|сред[ау]|четверг|пятниц[ау]|суббот[ау]|воскресень[ею]"
+_WEEK_WORDS = r"(?:(?:эту|этой|следующую|следующей)\s+)?недел[юеи]|выходные"
+_DAY_REF = rf"({_WEEK_WORDS}|{_DAY_WORDS})"
+_DAY_PREP = r"(?:на|в|во)\s+"
+
+_DAY_MAP = {
+    "сегодня": 0,
+    "завтра": 1,
+    "послезавтра": 2,
+}
+
+_WEEKDAY_STEMS = (
+    ("понедельник", 0), ("вторник", 1), ("сред", 2), ("четверг", 3),
+    ("пятниц", 4), ("суббот", 5), ("воскресен", 6),
+)
+
+_WEEKDAY_CODES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+_DAY_WORD_RE = re.compile(rf"\b({_DAY_WORDS})\b")
+
+
+def _weekday_of(word: str) -> Optional[int]:
+    """Weekday number for any form of a weekday name."""
+    for stem, weekday in _WEEKDAY_STEMS:
+        if word.startswith(stem):
+            return weekday
     return None
 
 
+def _next_weekday(now: datetime, weekday: int) -> datetime:
+    """Next occurrence of weekday after today (same rule as the LLM prompt)."""
+    days_ahead = weekday - now.weekday()
+    if days_ahead <= 0:
+        days_ahead += 7
+    return now + timedelta(days=days_ahead)
+
+
+def _day_range(day_ref: str, now: datetime) -> Tuple[datetime, datetime]:
+    """Query range for a day/week reference."""
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if "недел" in day_ref:
+        if "следующ" in day_ref:
+            # Next week: Monday to Monday
+            start = today + timedelta(days=7 - today.weekday())
+        else:
+            # This week: from today to +7 days
+            start = today
+        return start, start + timedelta(days=7)
+
+    if day_ref == "выходные":
+        start = today if today.weekday() >= 5 else today + timedelta(days=5 - today.weekday())
+        end = (start + timedelta(days=6 - start.weekday())).replace(hour=23, minute=59, second=59)
+        return start, end
+
+    if day_ref in _DAY_MAP:
+        start = today + timedelta(days=_DAY_MAP[day_ref])
+    else:
+        weekday = _weekday_of(day_ref)
+        start = _next_weekday(today, weekday) if weekday is not None else today
+    return start, start.replace(hour=23, minute=59, second=59)
+
+
 # ==================== Query patterns ====================
 
-_QUERY_PATTERNS = [
-    # "что на сегодня/завтра/неделю"
-    (r"(?:что|чё|шо)\s+(?:у меня\s+)?на\s+(сегодня|завтра|послезавтра|(?:эту\s+)?недел[юе])", 0.95),
+_QUERY_PATTERNS = [(re.compile(pattern), confidence) for pattern, confidence in [
+    # "что на сегодня/завтра/неделю", "что у меня в пятницу"
+    (rf"(?:что|чё|шо)\s+(?:у меня\s+)?{_DAY_PREP}{_DAY_REF}", 0.95),
     # "какие планы на сегодня"
-    (r"как(?:ие|ой)\s+(?:план[ыа]?|дел[аов]?|событи[яей]?|встреч[иа]?)\s+(?:на\s+)?(сегодня|завтра|послезавтра|(?:эту\s+)?недел[юе])", 0.95),
+    (rf"как(?:ие|ой)\s+(?:план[ыа]?|дел[аов]?|событи[яей]?|встреч[иа]?)\s+(?:{_DAY_PREP})?{_DAY_REF}", 0.95),
     # "дела на сегодня"
-    (r"^(?:мои\s+)?(?:план[ыа]?|дел[аов]?|событи[яей]?|расписани[ее])\s+(?:на\s+)?(сегодня|завтра|послезавтра|(?:эту\s+)?недел[юе])", 0.93),
-    # "покажи расписание"
-    (r"покаж[иь]\s+(?:мо[иёе]\s+)?(?:расписани[ее]|план[ыа]?|дел[аов]?|событи[яей]?)", 0.90),
+    (rf"^(?:мои\s+)?(?:план[ыа]?|дел[аов]?|событи[яей]?|расписани[ее])\s+(?:{_DAY_PREP})?{_DAY_REF}", 0.93),
+    # "покажи расписание", "покажи расписание на завтра"
+    (rf"покаж[иь]\s+(?:мо[иёе]\s+)?(?:расписани[ее]|план[ыа]?|дел[аов]?|событи[яей]?)(?:\s+{_DAY_PREP}{_DAY_REF})?", 0.90),
     # "что запланировано"
-    (r"что\s+(?:у меня\s+)?запланирован[оа]", 0.90),
+    (rf"что\s+(?:у меня\s+)?запланирован[оа](?:\s+{_DAY_PREP}{_DAY_REF})?", 0.90),
     # Simple exact matches
     (r"^(?:мои\s+)?дела$", 0.90),
     (r"^(?:мои\s+)?планы$", 0.90),
     (r"^расписание$", 0.90),
     (r"^(?:что\s+)?на\s+сегодня\??$", 0.95),
     (r"^(?:что\s+)?на\s+завтра\??$", 0.95),
-]
-
-_DAY_MAP = {
-    "сегодня": 0,
-    "завтра": 1,
-    "послезавтра": 2,
-}
+]]
 
 
 def _try_query(text_lower: str, timezone: str) -> Optional[Tuple[str, dict, float]]:
     """Try to match query intent."""
     for pattern, confidence in _QUERY_PATTERNS:
-        m = re.search(pattern, text_lower)
+        m = pattern.search(text_lower)
         if m:
             # Extract day reference
-            day_ref = m.group(1) if m.lastindex and m.lastindex >= 1 else "сегодня"
-            day_ref = day_ref.strip().lower()
-
-            now = datetime.now()
-
-            if "недел" in day_ref:
-                # This week: from today to +7 days
-                start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                end = start + timedelta(days=7)
-            elif day_ref in _DAY_MAP:
-                offset = _DAY_MAP[day_ref]
-                start = (now + timedelta(days=offset)).replace(hour=0, minute=0, second=0, microsecond=0)
-                end = start.replace(hour=23, minute=59, second=59)
-            else:
-                start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                end = start.replace(hour=23, minute=59, second=59)
+            day_ref = m.group(1) if m.lastindex and m.group(1) else "сегодня"
+            day_ref = re.sub(r"\s+", " ", day_ref.strip())
 
+            start, end = _day_range(day_ref, datetime.now())
             return ("query", {
                 "query_date_start": start,
                 "query_date_end": end,
@@ -124,30 +210,25 @@ def _try_query(text_lower: str, timezone: str) -> Optional[Tuple[str, dict, floa
 
 # ==================== Free slots patterns ====================
 
-_FREE_SLOTS_PATTERNS = [
+_FREE_SLOTS_PATTERNS = [(re.compile(pattern), confidence) for pattern, confidence in [
     (r"свободн(?:ое|ые|ого)\s+(?:врем[яени]+|слот[ыа]?|окн[аоу])", 0.93),
     (r"когда\s+(?:я\s+)?свобод(?:ен|на|ны)", 0.93),
     (r"(?:есть|будет)\s+(?:ли\s+)?свободн(?:ое|ые)\s+(?:врем[яени]+|окн[аоу])", 0.90),
     (r"найд[иь]\s+(?:свободн(?:ое|ые)\s+)?(?:врем[яени]+|слот[ыа]?)", 0.90),
-]
+]]
 
 
 def _try_free_slots(text_lower: str, timezone: str) -> Optional[Tuple[str, dict, float]]:
     """Try to match free slots intent."""
     for pattern, confidence in _FREE_SLOTS_PATTERNS:
-        m = re.search(pattern, text_lower)
-        if m:
+        if pattern.search(text_lower):
             # Check for day reference in the rest of text
             now = datetime.now()
-            if "завтра" in text_lower:
-                date = now + timedelta(days=1)
-            elif "послезавтра" in text_lower:
-                date = now + timedelta(days=2)
-            else:
-                date = now
+            day = _DAY_WORD_RE.search(text_lower)
+            start, _ = _day_range(day.group(1) if day else "сегодня", now)
 
             return ("find_free_slots", {
-                "query_date_start": date.replace(hour=0, minute=0, second=0, microsecond=0),
+                "query_date_start": start,
             }, confidence)
 
     return None
@@ -155,19 +236,36 @@ def _try_free_slots(text_lower: str, timezone: str) -> Optional[Tuple[str, dict,
 
 # ==================== Create patterns (with explicit time) ====================
 
-_TIME_PATTERN = r'(?:в\s+)?(\d{1,2})[:.ч](\d{2})?'
+# "15:00", "в 14.30", "9ч" / "в 15 часов", "в 7 вечера", "в 12 часов ночи"
+_TIME_RE = re.compile(r'(?:в\s+)?(\d{1,2})[:.ч](\d{2})?')
+_TIME_WORDS_RE = re.compile(
+    r'(?:\bв\s+)?(\d{1,2})(?:\s*час(?:а|ов)?)?\s*(утра|дня|вечера|ночи)\b'
+    r'|\bв\s+(\d{1,2})\s*час(?:а|ов)?\b'
+)
+_TIME_STRIP_RE = re.compile(
+    r'(?:\bв\s+)?\d{1,2}(?:[:.ч]\d{0,2}|(?:\s*час(?:а|ов)?)?\s*(?:утра|дня|вечера|ночи)\b|\s*час(?:а|ов)?\b)',
+    re.IGNORECASE
+)
+# Relative times and durations ("через 2 часа", "на 2 часа", "2 часа подряд")
+# can't be kept in a local result — leave to LLM
+_RELATIVE_OR_DURATION_RE = re.compile(
+    r'\bчерез\b|\bна\s+\d+(?:[.,]\d+)?\s*(?:час|мин)|\bпол(?:часа|тора)\b'
+    r'|(?<!\bв )(?<![\d:.])\b\d+(?:[.,]\d+)?\s*(?:час(?:а|ов)?|мин\w*)\b(?!\s*(?:утра|дня|вечера|ночи)\b)'
+)
 
-_CREATE_KEYWORDS = [
+_CREATE_KEYWORDS = (
     "встреча", "показ", "просмотр", "совещание", "созвон",
     "звонок", "собрание", "презентация", "консультация",
     "обед", "ужин", "завтрак", "тренировка", "вебинар",
     "митинг", "конференция", "собеседование", "интервью",
-]
+    "планерка", "планёрка", "стрижка", "врач", "стоматолог",
+)
 
+# Longest first: "послезавтра" contains "завтра"
 _DAY_KEYWORDS = {
+    "послезавтра": 2,
     "сегодня": 0,
     "завтра": 1,
-    "послезавтра": 2,
     "понедельник": None,  # Will calculate from current weekday
     "вторник": None,
     "среда": None,
@@ -181,11 +279,7 @@ _DAY_KEYWORDS = {
     "воскресени": None,
 }
 
-_WEEKDAY_MAP = {
-    "понедельник": 0, "вторник": 1, "среда": 2, "среду": 2,
-    "четверг": 3, "пятница": 4, "пятницу": 4,
-    "суббота": 5, "субботу": 5, "воскресенье": 6, "воскресени": 6,
-}
+_DAY_KEYWORDS_RE = re.compile(r'\b(?:' + '|'.join(_DAY_KEYWORDS) + r')\b', re.IGNORECASE)
 
 # Event type detection keywords
 _EVENT_TYPE_KEYWORDS = {
@@ -215,59 +309,107 @@ def _get_now(timezone: str) -> datetime:
         return datetime.now()
 
 
-def _try_create_with_time(text_lower: str, text_orig: str, timezone: str) -> Optional[Tuple[str, dict, float]]:
-    """Try to match create intent — requires explicit time."""
-    # Must have explicit time to be confident
-    time_match = re.search(_TIME_PATTERN, text_lower)
-    if not time_match:
+# Edits of existing events ("перенеси показ на 16:00") go to the LLM
+_EDIT_VERBS_RE = re.compile(r'удал|убер|перенес|перенос|сдвин|измени|поменя|отмени|повтори')
+
+
+def _extract_time(text_lower: str) -> Optional[Tuple[int, int]]:
+    """Explicit (hour, minute) in text, or None (also if a relative time or duration is present)."""
+    if _RELATIVE_OR_DURATION_RE.search(text_lower):
         return None
 
-    hour = int(time_match.group(1))
-    minute = int(time_match.group(2)) if time_match.group(2) else 0
+    time_match = _TIME_RE.search(text_lower)
+    if time_match:
+        hour = int(time_match.group(1))
+        minute = int(time_match.group(2)) if time_match.group(2) else 0
+    else:
+        time_match = _TIME_WORDS_RE.search(text_lower)
+        if not time_match:
+            return None
+        hour, minute = int(time_match.group(1) or time_match.group(3)), 0
+        period = time_match.group(2)
+        if period in ("дня", "вечера") and hour < 12:
+            hour += 12
+        elif period == "ночи":
+            # "в 12 ночи" = 00:00, "в 11 ночи" = 23:00, "в 2 ночи" = 02:00
+            if hour == 12:
+                hour = 0
+            elif hour >= 9:
+                hour += 12
 
     # Validate time
     if hour > 23 or minute > 59:
         return None
+    return hour, minute
+
+
+def _clean_title(text_orig: str, extra: Optional[re.Pattern] = None) -> str:
+    """Text without time and day references and dangling prepositions."""
+    title = text_orig.strip()
+    if extra is not None:
+        title = extra.sub('', title)
+    # Remove time references
+    title = _TIME_STRIP_RE.sub('', title).strip()
+    # Remove day references
+    title = _DAY_KEYWORDS_RE.sub('', title).strip()
+    # Remove prepositions and separators left hanging
+    title = re.sub(r'(?:^|\s+)(?:на|в|во|и)\s*$', '', title).strip(' ,;')
+    title = re.sub(r'^\s*(?:на|в|во|и)(?:\s+|$)', '', title).strip(' ,;')
+    # Clean up extra spaces
+    return re.sub(r'\s+', ' ', title).strip()
+
+
+# Calendar dates ("23 октября", "23 числа", "23.10", "23.10.2026"); "в 10.10"
+# without a year is a time
+_CALENDAR_DATE_RE = re.compile(
+    r'\b\d{1,2}(?:-?го)?\s+(?:января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря|числа)\b'
+    r'|\b\d{1,2}[./]\d{1,2}[./]\d{2,4}\b'
+    r'|(?<!в )\b(?:0?[1-9]|[12]\d|3[01])[./](?:0?[1-9]|1[0-2])\b(?![.:]\d)'
+)
+
+
+def _try_create_with_time(text_lower: str, text_orig: str, timezone: str) -> Optional[Tuple[str, dict, float]]:
+    """Try to match create intent — requires explicit time."""
+    if _EDIT_VERBS_RE.search(text_lower):
+        return None
+
+    # Explicit calendar dates are resolved by the LLM
+    if _CALENDAR_DATE_RE.search(text_lower):
+        return None
+
+    # Several times mean several events (batch) — leave to LLM
+    if len(_TIME_RE.findall(text_lower)) > 1:
+        return None
+
+    # Must have explicit time to be confident
+    parsed_time = _extract_time(text_lower)
+    if parsed_time is None:
+        return None
+    hour, minute = parsed_time
 
     # Use timezone-aware "now" for correct past-time detection
     now = _get_now(timezone)
     target_date = now  # Default to today
 
-    for day_kw, offset in _DAY_KEYWORDS.items():
-        if day_kw in text_lower:
-            if offset is not None:
-                target_date = now + timedelta(days=offset)
-            else:
-                # Weekday — find next occurrence
-                weekday = _WEEKDAY_MAP.get(day_kw)
-                if weekday is not None:
-                    days_ahead = weekday - now.weekday()
-                    if days_ahead <= 0:
-                        days_ahead += 7
-                    target_date = now + timedelta(days=days_ahead)
-            break
+    # Whole words only: "завтрак" is not "завтра"
+    day_match = _DAY_KEYWORDS_RE.search(text_lower)
+    if day_match:
+        day_kw = day_match.group(0)
+        offset = _DAY_KEYWORDS[day_kw]
+        if offset is not None:
+            target_date = now + timedelta(days=offset)
+        else:
+            # Weekday — find next occurrence
+            target_date = _next_weekday(now, _weekday_of(day_kw))
 
     start_time = target_date.replace(hour=hour, minute=minute, second=0, microsecond=0)
 
     # If time already passed today and no day specified, assume tomorrow
-    if start_time < now and "сегодня" not in text_lower:
-        found_day = any(day_kw in text_lower for day_kw in _DAY_KEYWORDS)
-        if not found_day:
-            start_time += timedelta(days=1)
+    if start_time < now and not day_match:
+        start_time += timedelta(days=1)
 
     # Extract title: remove time pattern and day keywords, use the rest
-    title = text_orig.strip()
-    # Remove time references
-    title = re.sub(r'(?:в\s+)?\d{1,2}[:.ч]\d{0,2}', '', title).strip()
-    # Remove day references
-    for day_kw in _DAY_KEYWORDS:
-        title = re.sub(rf'\b{day_kw}\b', '', title, flags=re.IGNORECASE).strip()
-    # Remove prepositions left hanging
-    title = re.sub(r'\s+на\s*$', '', title).strip()
-    title = re.sub(r'\s+в\s*$', '', title).strip()
-    title = re.sub(r'^\s*на\s+', '', title).strip()
-    # Clean up extra spaces
-    title = re.sub(r'\s+', ' ', title).strip()
+    title = _clean_title(text_orig)
 
     if not title or len(title) < 2:
         return None  # Can't determine title — fall to LLM
@@ -293,6 +435,112 @@ def _try_create_with_time(text_lower: str, text_orig: str, timezone: str) -> Opt
     }, confidence)
 
 
+# ==================== Recurring patterns (with explicit time) ====================
+
+_DAILY_RE = re.compile(r'\b(?:каждый\s+день|ежедневно)\b')
+_WORKDAYS_RE = re.compile(r'\b(?:по\s+будням|каждый\s+будний\s+день)\b')
+_WEEKLY_RE = re.compile(
+    r'\b(?:кажд(?:ый|ую|ое)\s+(?:понедельник|вторник|среду|четверг|пятницу|субботу|воскресенье)'
+    r'|по\s+(?:понедельникам|вторникам|средам|четвергам|пятницам|субботам|воскресеньям))\b'
+)
+# Weekday forms used in recurrence phrases ("каждую среду", "по средам")
+_WEEKDAY_WORD_RE = re.compile(
+    r'\b(понедельник(?:ам)?|вторник(?:ам)?|среду|средам|четверг(?:ам)?'
+    r'|пятницу|пятницам|субботу|субботам|воскресенье|воскресеньям)\b'
+)
+# Qualifiers the local result can't express: exceptions, end dates,
+# periods, intervals ("кроме субботы", "до конца месяца", "раз в две недели")
+_RECURRING_QUALIFIER_RE = re.compile(r'кроме|\bдо\s|в\s+течение|\bчерез\b|\bпо\s+\d|\bраз\s+в\b')
+_RECURRING_STRIP_RE = re.compile(
+    '|'.join((_DAILY_RE.pattern, _WORKDAYS_RE.pattern, _WEEKLY_RE.pattern,
+              r'\b(?:по\s+)?(?:понедельникам|вторникам|средам|четвергам|пятницам|субботам|воскресеньям)\b')),
+    re.IGNORECASE
+)
+
+
+def _try_recurring(text_lower: str, text_orig: str, timezone: str) -> Optional[Tuple[str, dict, float]]:
+    """Try to match create_recurring intent — daily/weekly series with explicit time."""
+    if _EDIT_VERBS_RE.search(text_lower) or _RECURRING_QUALIFIER_RE.search(text_lower):
+        return None
+    if _CALENDAR_DATE_RE.search(text_lower):
+        return None
+
+    if _DAILY_RE.search(text_lower):
+        recurrence_type, weekdays = "daily", []
+    elif _WORKDAYS_RE.search(text_lower):
+        recurrence_type, weekdays = "weekly", [0, 1, 2, 3, 4]
+    elif _WEEKLY_RE.search(text_lower):
+        recurrence_type = "weekly"
+        weekdays = sorted({_weekday_of(word) for word in _WEEKDAY_WORD_RE.findall(text_lower)})
+    else:
+        return None
+
+    parsed_time = _extract_time(text_lower)
+    if parsed_time is None:
+        return None
+    hour, minute = parsed_time
+
+    # First occurrence: today if still ahead, otherwise the next matching day
+    now = _get_now(timezone)
+    start_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    while start_time <= now or (weekdays and start_time.weekday() not in weekdays):
+        start_time += timedelta(days=1)
+
+    title = _clean_title(text_orig, extra=_RECURRING_STRIP_RE)
+    if not title or len(title) < 2:
+        return None
+
+    params = {
+        "title": title,
+        "start_time": start_time,
+        "duration_minutes": 60,
+        "recurrence_type": recurrence_type,
+        # Same default as the LLM prompt: until the end of the year
+        "recurrence_end_date": start_time.replace(month=12, day=31, hour=23, minute=59),
+        "event_type": _detect_event_type(text_lower),
+    }
+    if weekdays:
+        params["recurrence_days"] = [_WEEKDAY_CODES[day] for day in weekdays]
+    return ("create_recurring", params, 0.90)
+
+
+# ==================== Delete patterns ====================
+
+_DELETE_DUPLICATES_RE = re.compile(
+    r'^(?:удали(?:ть)?|убери|почисти|очисти)\s+(?:все\s+)?(?:мои\s+)?(?:дубли(?:кат\w*)?|дублирующиеся\s+\w+)\??$'
+)
+# "удали все показы" - a single word naming the events
+_DELETE_ALL_RE = re.compile(r'^(?:удали(?:ть)?|убери)\s+все\s+([а-яёa-z-]{3,})$')
+# Event nouns a title criterion may name ("показы", "созвоны", "звонки").
+# Anything else ("завтрашние", "прошедшие", "повторяющиеся", "мои") is a
+# date or attribute criterion — LLM maps those to a date range.
+# Stems of _CREATE_KEYWORDS nouns, "встреча" excluded as too generic.
+_DELETE_TITLE_STEMS = frozenset((
+    "показ", "просмотр", "совещани", "созвон", "звонк", "собрани",
+    "презентаци", "консультаци", "обед", "ужин", "завтрак", "тренировк",
+    "вебинар", "митинг", "конференци", "собеседовани", "интервью",
+    "планерк", "планёрк", "стрижк", "врач", "стоматолог",
+))
+_PLURAL_ENDING_RE = re.compile(r'(?:ами|ями|ов|ев|ей|ы|и|а|я)$')
+
+
+def _try_delete(text_lower: str) -> Optional[Tuple[str, dict, float]]:
+    """Try to match delete_duplicates / delete_by_criteria (both confirmed by the user)."""
+    if _DELETE_DUPLICATES_RE.search(text_lower):
+        return ("delete_duplicates", {}, 0.95)
+
+    m = _DELETE_ALL_RE.search(text_lower.rstrip('.!'))
+    if m:
+        # "показы" -> "показ": match titles in any case form
+        stem = _PLURAL_ENDING_RE.sub('', m.group(1))
+        if stem in _DELETE_TITLE_STEMS:
+            return ("delete_by_criteria", {
+                "delete_criteria_title_contains": stem,
+            }, 0.90)
+
+    return None
+
+
 # ==================== Todo patterns (no time) ====================
 
 _TODO_KEYWORDS = [
@@ -300,10 +548,13 @@ _TODO_KEYWORDS = [
     r"согласова(?:ть)?", r"подготови(?:ть)?",
     r"куп(?:ить|и)", r"оплати(?:ть)?", r"отправ(?:ить|ь)",
     r"проверь", r"проверить", r"узна(?:ть|й)",
-    r"заказа(?:ть)?", r"забра(?:ть)?", r"забери",
+    r"заказа(?:ть)?", r"закажи", r"забра(?:ть)?", r"забери",
     r"сдела(?:ть|й)", r"зарегистрирова(?:ть)?",
     r"обнови(?:ть)?", r"найти", r"найди",
+    r"забронирова(?:ть)?", r"забронируй", r"распечата(?:ть)?", r"распечатай",
+    r"отвез(?:ти)?", r"отвези", r"привез(?:ти)?", r"привези",
     r"(?:нужно|надо|необходимо)\s+\w+",
+    r"не\s+забыть",
 ]
 
 _TODO_PREFIX_PATTERN = re.compile(
@@ -311,22 +562,25 @@ _TODO_PREFIX_PATTERN = re.compile(
     re.IGNORECASE
 )
 
+_HAS_CLOCK_TIME_RE = re.compile(r'\d{1,2}[:.]\d{2}')
+
 # Explicit todo markers
-_EXPLICIT_TODO_PATTERNS = [
-    (r"^(?:задач[аиу]|todo|напоминани[ее]|напомни)[\s:]+(.+)", 0.95),
+_EXPLICIT_TODO_PATTERNS = [(re.compile(pattern), confidence) for pattern, confidence in [
+    # "напомни за 30 минут до встречи" is a reminder for an event — LLM
+    (r"^(?:задач[аиу]|todo|напоминани[ее]|напомни(?!\s+за\s))[\s:]+(.+)", 0.95),
     (r"^(?:добав(?:ь|ить)\s+(?:в\s+)?(?:задач[иу]|todo))[\s:]+(.+)", 0.95),
-]
+]]
 
 
-def _try_todo(text_lower: str, text_orig: str) -> Optional[Tuple[str, dict, float]]:
+def _try_todo(text_lower: str, text_orig: str, has_digits: bool = True) -> Optional[Tuple[str, dict, float]]:
     """Try to match todo intent — task without specific time."""
     # If text contains explicit time, it's probably an event, not todo
-    if re.search(r'\d{1,2}[:.]\d{2}', text_lower):
+    if has_digits and _HAS_CLOCK_TIME_RE.search(text_lower):
         return None
 
     # Check explicit todo markers first
     for pattern, confidence in _EXPLICIT_TODO_PATTERNS:
-        m = re.search(pattern, text_lower)
+        m = pattern.search(text_lower)
         if m:
             title = m.group(1).strip() if m.lastindex >= 1 else text_orig.strip()
             if title and len(title) >= 2:
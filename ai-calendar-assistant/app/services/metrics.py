@@ -7,7 +7,8 @@ Metrics collected:
 - Telegram message processing
 - LLM API calls and token usage
 - Rate limiting events
-- Calendar operations
+- Calendar operations and event cache hit/miss
+- LLM intent cache hit/miss
 
 Usage:
     from app.services.metrics import (
@@ -104,6 +105,30 @@ CALENDAR_OPERATIONS = Counter(
     ["operation", "success"]  # operation: create, update, delete, query
 )
 
+# Calendar event-window cache metrics
+EVENT_CACHE_REQUESTS = Counter(
+    "calendar_event_cache_requests_total",
+    "Calendar event-window cache lookups",
+    ["result"]  # hit, miss
+)
+
+EVENT_CACHE_USERS = Gauge(
+    "calendar_event_cache_users",
+    "Number of users with a cached event window"
+)
+
+# LLM intent result cache metrics
+INTENT_CACHE_REQUESTS = Counter(
+    "llm_intent_cache_requests_total",
+    "LLM intent cache lookups",
+    ["result"]  # hit, miss, skip (request not cacheable)
+)
+
+INTENT_CACHE_ENTRIES = Gauge(
+    "llm_intent_cache_entries",
+    "Number of cached LLM intent results"
+)
+
 # Error metrics
 ERRORS = Counter(
     "errors_total",
@@ -0,0 +1,72 @@
+"""Progressive editing of a Telegram placeholder message."""
+
+import time
+from typing import Optional
+import structlog
+from telegram import Message
+from telegram.error import RetryAfter
+
+logger = structlog.get_logger()
+
+
+class ProgressiveReply:
+    """
+    Placeholder reply that is edited as a streamed answer arrives.
+
+    Edits are throttled to MIN_EDIT_INTERVAL (Telegram limits edits per
+    chat); update(..., final=True) always goes through. Failed edits are
+    logged and ignored - the caller can still fall back to a new reply.
+    """
+
+    MIN_EDIT_INTERVAL = 1.0  # seconds
+    CURSOR = " ▌"
+
+    def __init__(self, message: Message, placeholder: str):
+        """
+        Args:
+            message: Sent placeholder message (editable by the bot)
+            placeholder: Its current text
+        """
+        self.message = message
+        self.placeholder = placeholder
+        self.text = placeholder
+        self._last_edit = 0.0
+
+    @property
+    def changed(self) -> bool:
+        """True if the placeholder text was replaced."""
+        return self.text != self.placeholder
+
+    async def update(self, text: str, final: bool = False) -> bool:
+        """
+        Show text in the message (with a typing cursor unless final).
+
+        Returns:
+            True if the message now shows text
+        """
+        shown = text if final else text + self.CURSOR
+        if shown == self.text:
+            return True
+        now = time.monotonic()
+        if not final and now - self._last_edit < self.MIN_EDIT_INTERVAL:
+            return False
+
+        try:
+            await self.message.edit_text(shown)
+        except RetryAfter as e:
+            logger.debug("progressive_reply_throttled", retry_after=e.retry_after)
+            return False
+        except Exception as e:
+            # "Message is not modified", too long etc. - keep what is shown
+            logger.debug("progressive_reply_edit_failed", error=str(e))
+            return False
+
+        self.text = shown
+        self._last_edit = now
+        return True
+
+    async def restore(self) -> Optional[bool]:
+        """Put the placeholder back if a partial answer was shown."""
+        if not self.changed:
+            return None
+        return await self.update(self.placeholder, final=True)
@@ -0,0 +1,252 @@
+"""Token-budgeted assembly of the Yandex GPT prompt."""
+
+import math
+import re
+from datetime import timedelta
+from typing import List, Optional, Set, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+JSON_INSTRUCTION = """ФОРМАТ ОТВЕТА: Верни ТОЛЬКО JSON объект с параметрами.
+
+Пример для одного события:
+{"intent": "create", "title": "Встреча", "start_time": "2025-01-15T15:00:00+03:00"}
+
+Пример для нескольких событий:
+{"intent": "batch_confirm", "batch_actions": [{"intent": "create", "title": "Дорога", "start_time": "2025-01-15T19:00:00+03:00"}, {"intent": "create", "title": "Ужин", "start_time": "2025-01-15T20:00:00+03:00"}]}
+
+Пример для задачи:
+{"intent": "todo", "title": "Позвонить маме"}
+
+Пример для уточнения:
+{"intent": "clarify", "clarify_question": "Уточните время события"}
+
+ВАЖНО: Возвращай ТОЛЬКО значения параметров, НЕ структуру схемы!
+JSON:"""
+
+EVENTS_HEADER = "<existing_calendar_events>\n"
+EVENTS_FOOTER = """</existing_calendar_events>
+
+CRITICAL: For update/delete operations:
+- Find the event in the list above by matching title/description
+- COPY the exact ID value - NEVER use "unknown"
+- Example: "перенеси встречу с Леной" → find "Встреча с Леной" → copy its ID
+
+"""
+
+RECENT_HEADER = "<recent_context>\nПользователь ТОЛЬКО ЧТО создал/изменил следующие события:\n"
+RECENT_FOOTER = """
+ВАЖНО: Если пользователь говорит "эти события", "их", "перепиши", "перенеси" БЕЗ указания конкретного названия — он имеет в виду события выше из recent_context.
+Используй их ID для update/delete операций.
+</recent_context>
+
+"""
+
+HISTORY_HEADER = "<dialog_history>\n"
+HISTORY_FOOTER = "</dialog_history>\n\nВАЖНО: Используй контекст диалога для понимания намерений пользователя.\n\n"
+
+USER_REQUEST = "User request:\n"
+
+WEEKDAYS_RU = ('понедельник', 'вторник', 'среда', 'четверг', 'пятница', 'суббота', 'воскресенье')
+
+
+def _stems(text: str) -> Set[str]:
+    """Crude stems (first 5 letters of words of 3+ letters) for overlap scoring."""
+    return {word[:5] for word in re.findall(r'\w{3,}', text.lower().replace('ё', 'е'))}
+
+
+class PromptBuilder:
+    """
+    Assembles the completion prompt within a token budget.
+
+    Always included: static instructions, date context, user text and the
+    JSON format block. The rest is added in priority order while it fits
+    the budget:
+    1. recent_context events (targets of follow-up commands)
+    2. the last dialog exchange (answers to a clarify question)
+    3. existing events, most relevant to the user text first
+    4. earlier dialog turns, most relevant (then most recent) first
+    Selected items keep their original order in the prompt.
+
+    Tokens are estimated from characters; calibrate() adjusts the
+    chars-per-token ratio from the inputTextTokens reported by the API.
+    The static instructions are formatted once and reused until the end
+    of year date in them changes.
+    """
+
+    CHARS_PER_TOKEN = 3.5  # Starting estimate for mixed Russian/JSON text
+    MAX_EVENTS = 10
+    MAX_HISTORY_TURNS = 10
+    HISTORY_TURN_CHARS = 300
+
+    def __init__(self, system_prompt_template: str, token_budget: int):
+        """
+        Args:
+            system_prompt_template: Instructions with an {end_of_year_date} placeholder
+            token_budget: Target prompt size in (estimated) tokens
+        """
+        self.system_prompt_template = system_prompt_template
+        self.token_budget = token_budget
+        self.chars_per_token = self.CHARS_PER_TOKEN
+        self._static: Tuple[str, str] = ("", "")
+
+    def estimate_tokens(self, text: str) -> int:
+        """Estimated token count of text."""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def calibrate(self, prompt_chars: int, input_tokens: int):
+        """Move the chars-per-token estimate towards an observed prompt."""
+        if prompt_chars <= 0 or input_tokens <= 0:
+            return
+        observed = min(max(prompt_chars / input_tokens, 1.5), 6.0)
+        self.chars_per_token = 0.9 * self.chars_per_token + 0.1 * observed
+
+    def _static_prompt(self, end_of_year_date: str) -> str:
+        """Formatted instructions (reformatted only when the year changes)."""
+        if self._static[0] != end_of_year_date:
+            self._static = (end_of_year_date, self.system_prompt_template.format(end_of_year_date=end_of_year_date))
+        return self._static[1]
+
+    @staticmethod
+    def _date_context(dt_context: dict) -> str:
+        now = dt_context['now']
+        lines = [
+            f"ТЕКУЩАЯ ДАТА: {dt_context['current_datetime_str']} ({dt_context['timezone']}, "
+            f"UTC{dt_context['tz_offset_formatted']}), {dt_context['current_weekday_ru']}",
+            "",
+            "Относительные даты:",
+            f"- \"завтра\" = {(now + timedelta(days=1)).strftime('%Y-%m-%d')}",
+            f"- \"послезавтра\" = {(now + timedelta(days=2)).strftime('%Y-%m-%d')}",
+            f"- \"через неделю\" = {(now + timedelta(days=7)).strftime('%Y-%m-%d')}",
+            "",
+            "Ближайшие дни недели:",
+        ]
+        lines.extend(
+            f"- {day} = {dt_context['next_weekdays_ru'][day].strftime('%Y-%m-%d')}"
+            for day in WEEKDAYS_RU
+        )
+        lines.extend(["", "Используй ТОЧНО эти даты!"])
+        return "\n".join(lines)
+
+    @staticmethod
+    def _event_line(event) -> Tuple[str, str, str]:
+        event_time = event.start.strftime('%d.%m.%Y %H:%M') if hasattr(event, 'start') else 'Unknown'
+        event_title = event.summary if hasattr(event, 'summary') else 'No title'
+        event_id = event.id if hasattr(event, 'id') else 'unknown'
+        return event_time, event_title, event_id
+
+    @staticmethod
+    def _history_line(msg: dict) -> str:
+        text = msg.get('text', msg.get('content', ''))[:PromptBuilder.HISTORY_TURN_CHARS]
+        speaker = "Пользователь" if msg.get('role', 'user') == 'user' else "Бот"
+        return f"{speaker}: {text}\n"
+
+    def _fit(
+        self,
+        items: List[str],
+        order: List[int],
+        remaining: int,
+        overhead: int,
+        taken: Optional[List[int]] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[int], int]:
+        """
+        Greedily take items in priority order while they fit.
+
+        Args:
+            overhead: Section header/footer cost, paid with the first item
+            taken: Items of the section already taken (overhead paid)
+
+        Returns:
+            (all taken indexes, sorted; remaining budget)
+        """
+        taken = list(taken or [])
+        for index in order:
+            if limit is not None and len(taken) >= limit:
+                break
+            cost = self.estimate_tokens(items[index]) + (overhead if not taken else 0)
+            if cost <= remaining:
+                taken.append(index)
+                remaining -= cost
+        return sorted(taken), remaining
+
+    def build(
+        self,
+        dt_context: dict,
+        user_text: str,
+        existing_events: Optional[list] = None,
+        recent_context: Optional[list] = None,
+        conversation_history: Optional[list] = None,
+    ) -> str:
+        """Full prompt for a user request."""
+        system_prompt = self._static_prompt(dt_context['end_of_year_date'])
+        date_context = self._date_context(dt_context)
+        head = f"{system_prompt}\n\n{date_context}\n\n\n"
+        tail = f"{user_text}\n\n{JSON_INSTRUCTION}"
+        fixed_tokens = self.estimate_tokens(head) + self.estimate_tokens(USER_REQUEST) + self.estimate_tokens(tail)
+        remaining = self.token_budget - fixed_tokens
+
+        user_stems = _stems(user_text)
+
+        # 1. Recent context (newest last, so prefer the end of the list)
+        recent = [
+            "- {1} ({0}) ID: {2}\n".format(*self._event_line(event))
+            for event in (recent_context or [])
+        ]
+        recent_overhead = self.estimate_tokens(RECENT_HEADER + RECENT_FOOTER)
+        recent_taken, remaining = self._fit(
+            recent, list(reversed(range(len(recent)))), remaining, recent_overhead
+        )
+
+        # 2 + 4. Dialog history (last MAX_HISTORY_TURNS turns)
+        history_msgs = (conversation_history or [])[-self.MAX_HISTORY_TURNS:]
+        history = [self._history_line(msg) for msg in history_msgs]
+        history_overhead = self.estimate_tokens(HISTORY_HEADER + HISTORY_FOOTER)
+        last_exchange = list(reversed(range(max(len(history) - 2, 0), len(history))))
+        history_taken, remaining = self._fit(history, last_exchange, remaining, history_overhead)
+
+        # 3. Existing events ranked by overlap with the user text
+        events = [
+            "Event: {1}\nTime: {0}\nID: {2}\n\n".format(*self._event_line(event))
+            for event in (existing_events or [])
+        ]
+        scores = [len(user_stems & _stems(line.split("\n", 1)[0])) for line in events]
+        event_order = sorted(range(len(events)), key=lambda i: (-scores[i], i))
+        events_overhead = self.estimate_tokens(EVENTS_HEADER + EVENTS_FOOTER)
+        events_taken, remaining = self._fit(
+            events, event_order, remaining, events_overhead, limit=self.MAX_EVENTS
+        )
+
+        # 4. Earlier turns: relevant first, then most recent
+        earlier = [i for i in range(len(history)) if i not in last_exchange]
+        earlier.sort(key=lambda i: (-len(user_stems & _stems(history[i])), -i))
+        history_taken, remaining = self._fit(history, earlier, remaining, history_overhead, taken=history_taken)
+
+        parts = [head]
+        if events_taken:
+            parts.append(EVENTS_HEADER)
+            parts.extend(events[i] for i in events_taken)
+            parts.append(EVENTS_FOOTER)
+        if recent_taken:
+            parts.append(RECENT_HEADER)
+            parts.extend(recent[i] for i in recent_taken)
+            parts.append(RECENT_FOOTER)
+        parts.append(USER_REQUEST)
+        if history_taken:
+            parts.append(HISTORY_HEADER)
+            parts.extend(history[i] for i in history_taken)
+            parts.append(HISTORY_FOOTER)
+        parts.append(tail)
+        prompt = "".join(parts)
+
+        prompt_tokens = self.estimate_tokens(prompt)
+        log = logger.warning if prompt_tokens > self.token_budget else logger.info
+        log("llm_prompt_built",
+            prompt_tokens=prompt_tokens,
+            token_budget=self.token_budget,
+            events=f"{len(events_taken)}/{len(events)}",
+            recent_context=f"{len(recent_taken)}/{len(recent)}",
+            history_turns=f"{len(history_taken)}/{len(history)}")
+        return prompt
@@ -1,12 +1,61 @@
 """Rate limiting and spam detection service."""
 
-from datetime import datetime, timedelta
-from typing import Dict, List
+import time
+from array import array
+from typing import Callable, Dict, Optional
 import structlog
 
+from app.utils.lru_dict import LRUDict
+
 logger = structlog.get_logger()
 
 
+class _TimestampRing:
+    """
+    Last `capacity` event timestamps, newest at pos - 1.
+
+    "N events within window" holds exactly when the N-th newest timestamp
+    is inside the window, so every sliding-window check is one lookup.
+    """
+
+    __slots__ = ("times", "pos", "size")
+
+    def __init__(self, capacity: int):
+        self.times = array('d', bytes(8 * capacity))
+        self.pos = 0
+        self.size = 0
+
+    def append(self, ts: float):
+        self.times[self.pos] = ts
+        self.pos = (self.pos + 1) % len(self.times)
+        if self.size < len(self.times):
+            self.size += 1
+
+    def nth_newest(self, n: int) -> Optional[float]:
+        """Timestamp of the n-th newest event (1-based), None if fewer recorded."""
+        if n > self.size:
+            return None
+        return self.times[(self.pos - n) % len(self.times)]
+
+    def count_since(self, since: float) -> int:
+        """Events at or after since (at most capacity)."""
+        count = 0
+        while count < self.size and self.nth_newest(count + 1) >= since:
+            count += 1
+        return count
+
+
+class _UserState:
+    """Per-user limiter state."""
+
+    __slots__ = ("messages", "errors", "bursts")
+
+    def __init__(self, message_capacity: int, error_capacity: int):
+        self.messages = _TimestampRing(message_capacity)
+        self.errors = _TimestampRing(error_capacity)
+        self.bursts = 0
+
+
 class RateLimiter:
     """
     Rate limiting and spam detection for bot users.
@@ -17,21 +66,25 @@ class RateLimiter:
     3. Auto-block after 3 rapid bursts (5+ messages in 10 seconds)
     4. Temporary ban: 1 hour
     5. Error flood detection: 5+ errors in 1 minute = block
-    """
 
-    def __init__(self):
-        """Initialize rate limiter."""
-        # User message history: user_id -> list of timestamps
-        self._message_history: Dict[str, List[datetime]] = {}
+    Windows are exact sliding windows over ring buffers of the last
+    MAX_MESSAGES_PER_HOUR message and MAX_ERRORS_PER_MINUTE error
+    timestamps (monotonic seconds), so check_rate_limit, record_message
+    and record_error are O(1). State of at most MAX_TRACKED_USERS users is
+    kept; the least recently active are evicted. Blocks are tracked
+    separately and survive eviction.
+    """
 
-        # User error history: user_id -> list of error timestamps
-        self._error_history: Dict[str, List[datetime]] = {}
+    MAX_TRACKED_USERS = 10000
 
-        # Blocked users: user_id -> block_until timestamp
-        self._blocked_users: Dict[str, datetime] = {}
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize rate limiter.
 
-        # Burst detection: user_id -> burst_count
-        self._burst_count: Dict[str, int] = {}
+        Args:
+            clock: Time source in seconds (monotonic)
+        """
+        self._clock = clock
 
         # Rate limits
         self.MAX_MESSAGES_PER_MINUTE = 10
@@ -40,12 +93,25 @@ class RateLimiter:
         self.RAPID_BURST_THRESHOLD = 5  # messages
         self.RAPID_BURST_WINDOW = 10  # seconds
         self.MAX_BURSTS_BEFORE_BLOCK = 3
-        self.BLOCK_DURATION = timedelta(hours=1)
+        self.BLOCK_DURATION = 3600  # seconds
+
+        # User state (message/error rings, burst count): user_id -> _UserState
+        self._users: LRUDict = LRUDict(max_size=self.MAX_TRACKED_USERS)
+
+        # Blocked users: user_id -> block_until (clock seconds)
+        self._blocked_users: Dict[str, float] = {}
 
         logger.info("rate_limiter_initialized",
                    max_per_minute=self.MAX_MESSAGES_PER_MINUTE,
                    max_per_hour=self.MAX_MESSAGES_PER_HOUR)
 
+    def _state(self, user_id: str) -> _UserState:
+        state = self._users.get(user_id)
+        if state is None:
+            capacity = max(self.MAX_MESSAGES_PER_HOUR, self.MAX_MESSAGES_PER_MINUTE, self.RAPID_BURST_THRESHOLD)
+            state = self._users[user_id] = _UserState(capacity, self.MAX_ERRORS_PER_MINUTE)
+        return state
+
     def is_blocked(self, user_id: str) -> bool:
         """
         Check if user is currently blocked.
@@ -56,17 +122,16 @@ class RateLimiter:
         Returns:
             True if user is blocked, False otherwise
         """
-        if user_id not in self._blocked_users:
+        block_until = self._blocked_users.get(user_id)
+        if block_until is None:
             return False
 
-        block_until = self._blocked_users[user_id]
-        now = datetime.now()
-
-        if now >= block_until:
+        if self._clock() >= block_until:
             # Block expired, remove it
             del self._blocked_users[user_id]
-            if user_id in self._burst_count:
-                del self._burst_count[user_id]
+            state = self._users.get(user_id)
+            if state is not None:
+                state.bursts = 0
             logger.info("user_unblocked", user_id=user_id)
             return False
 
@@ -86,63 +151,41 @@ class RateLimiter:
         """
         # Check if user is blocked
         if self.is_blocked(user_id):
-            block_until = self._blocked_users[user_id]
-            minutes_left = int((block_until - datetime.now()).total_seconds() / 60)
+            minutes_left = int((self._blocked_users[user_id] - self._clock()) / 60)
             return False, f"blocked_until_{minutes_left}_min"
 
-        now = datetime.now()
-
-        # Initialize user history if not exists
-        if user_id not in self._message_history:
-            self._message_history[user_id] = []
-
-        # Clean old messages (older than 1 hour)
-        self._message_history[user_id] = [
-            ts for ts in self._message_history[user_id]
-            if now - ts < timedelta(hours=1)
-        ]
-
-        # Check rate limits
-        messages_last_minute = sum(
-            1 for ts in self._message_history[user_id]
-            if now - ts < timedelta(minutes=1)
-        )
-
-        messages_last_hour = len(self._message_history[user_id])
+        now = self._clock()
+        state = self._state(user_id)
+        messages = state.messages
 
         # Check per-minute limit
-        if messages_last_minute >= self.MAX_MESSAGES_PER_MINUTE:
+        ts = messages.nth_newest(self.MAX_MESSAGES_PER_MINUTE)
+        if ts is not None and now - ts < 60:
             logger.warning("rate_limit_exceeded_minute",
                           user_id=user_id,
-                          count=messages_last_minute)
+                          count=self.MAX_MESSAGES_PER_MINUTE)
             return False, "too_many_requests_per_minute"
 
         # Check per-hour limit
-        if messages_last_hour >= self.MAX_MESSAGES_PER_HOUR:
+        ts = messages.nth_newest(self.MAX_MESSAGES_PER_HOUR)
+        if ts is not None and now - ts < 3600:
             logger.warning("rate_limit_exceeded_hour",
                           user_id=user_id,
-                          count=messages_last_hour)
+                          count=self.MAX_MESSAGES_PER_HOUR)
             return False, "too_many_requests_per_hour"
 
         # Check for rapid bursts (spam detection)
-        messages_last_10sec = sum(
-            1 for ts in self._message_history[user_id]
-            if now - ts < timedelta(seconds=self.RAPID_BURST_WINDOW)
-        )
-
-        if messages_last_10sec >= self.RAPID_BURST_THRESHOLD:
+        ts = messages.nth_newest(self.RAPID_BURST_THRESHOLD)
+        if ts is not None and now - ts < self.RAPID_BURST_WINDOW:
             # Rapid burst detected
-            if user_id not in self._burst_count:
-                self._burst_count[user_id] = 0
-
-            self._burst_count[user_id] += 1
+            state.bursts += 1
 
             logger.warning("rapid_burst_detected",
                           user_id=user_id,
-                          burst_count=self._burst_count[user_id],
-                          messages_in_10sec=messages_last_10sec)
+                          burst_count=state.bursts,
+                          messages_in_10sec=self.RAPID_BURST_THRESHOLD)
 
-            if self._burst_count[user_id] >= self.MAX_BURSTS_BEFORE_BLOCK:
+            if state.bursts >= self.MAX_BURSTS_BEFORE_BLOCK:
                 # Block user for spamming
                 self._block_user(user_id, "repeated_rapid_bursts")
                 return False, "blocked_for_spamming"
@@ -159,12 +202,7 @@ class RateLimiter:
         Args:
             user_id: User ID
         """
-        now = datetime.now()
-
-        if user_id not in self._message_history:
-            self._message_history[user_id] = []
-
-        self._message_history[user_id].append(now)
+        self._state(user_id).messages.append(self._clock())
 
     def record_error(self, user_id: str):
         """
@@ -173,24 +211,16 @@ class RateLimiter:
         Args:
             user_id: User ID
         """
-        now = datetime.now()
-
-        if user_id not in self._error_history:
-            self._error_history[user_id] = []
-
-        # Clean old errors
-        self._error_history[user_id] = [
-            ts for ts in self._error_history[user_id]
-            if now - ts < timedelta(minutes=1)
-        ]
-
-        self._error_history[user_id].append(now)
+        now = self._clock()
+        errors = self._state(user_id).errors
+        errors.append(now)
 
         # Check for error flood
-        if len(self._error_history[user_id]) >= self.MAX_ERRORS_PER_MINUTE:
+        ts = errors.nth_newest(self.MAX_ERRORS_PER_MINUTE)
+        if ts is not None and now - ts < 60:
             logger.warning("error_flood_detected",
                           user_id=user_id,
-                          error_count=len(self._error_history[user_id]))
+                          error_count=self.MAX_ERRORS_PER_MINUTE)
             self._block_user(user_id, "error_flood")
 
     def _block_user(self, user_id: str, reason: str):
@@ -201,13 +231,12 @@ class RateLimiter:
             user_id: User ID to block
             reason: Reason for blocking
         """
-        block_until = datetime.now() + self.BLOCK_DURATION
-        self._blocked_users[user_id] = block_until
+        self._blocked_users[user_id] = self._clock() + self.BLOCK_DURATION
 
         logger.warning("user_blocked",
                       user_id=user_id,
                       reason=reason,
-                      block_duration_hours=self.BLOCK_DURATION.total_seconds() / 3600)
+                      block_duration_hours=self.BLOCK_DURATION / 3600)
 
     def get_stats(self, user_id: str) -> dict:
         """
@@ -219,63 +248,39 @@ class RateLimiter:
         Returns:
             Dict with user stats
         """
-        now = datetime.now()
-
-        if user_id not in self._message_history:
+        state = self._users.get(user_id)
+        if state is None:
             return {
                 "messages_last_minute": 0,
                 "messages_last_hour": 0,
-                "is_blocked": False,
+                "is_blocked": self.is_blocked(user_id),
                 "burst_count": 0
             }
 
-        messages_last_minute = sum(
-            1 for ts in self._message_history[user_id]
-            if now - ts < timedelta(minutes=1)
-        )
-
-        messages_last_hour = sum(
-            1 for ts in self._message_history[user_id]
-            if now - ts < timedelta(hours=1)
-        )
-
+        now = self._clock()
         return {
-            "messages_last_minute": messages_last_minute,
-            "messages_last_hour": messages_last_hour,
+            "messages_last_minute": state.messages.count_since(now - 60),
+            "messages_last_hour": state.messages.count_since(now - 3600),
             "is_blocked": self.is_blocked(user_id),
-            "burst_count": self._burst_count.get(user_id, 0)
+            "burst_count": state.bursts
         }
 
     def cleanup_old_data(self):
         """Clean up old tracking data (run periodically)."""
-        now = datetime.now()
-
-        # Clean message history
-        for user_id in list(self._message_history.keys()):
-            self._message_history[user_id] = [
-                ts for ts in self._message_history[user_id]
-                if now - ts < timedelta(hours=1)
-            ]
-
-            if not self._message_history[user_id]:
-                del self._message_history[user_id]
-
-        # Clean error history
-        for user_id in list(self._error_history.keys()):
-            self._error_history[user_id] = [
-                ts for ts in self._error_history[user_id]
-                if now - ts < timedelta(minutes=1)
-            ]
+        now = self._clock()
 
-            if not self._error_history[user_id]:
-                del self._error_history[user_id]
+        # Drop users idle for an hour (nothing left in any window)
+        for user_id, state in list(self._users.items()):
+            last_message = state.messages.nth_newest(1)
+            last_error = state.errors.nth_newest(1)
+            if (last_message is None or now - last_message >= 3600) and \
+               (last_error is None or now - last_error >= 60) and \
+               user_id not in self._blocked_users:
+                del self._users[user_id]
 
         # Clean expired blocks
         for user_id in list(self._blocked_users.keys()):
-            if now >= self._blocked_users[user_id]:
-                del self._blocked_users[user_id]
-                if user_id in self._burst_count:
-                    del self._burst_count[user_id]
+            self.is_blocked(user_id)
 
         logger.info("rate_limiter_cleanup_completed")
 
@@ -1,17 +1,166 @@
 """Redis-based distributed rate limiting and spam detection service."""
 
-from datetime import datetime, timedelta
+import time
 from typing import Optional, Tuple
 import structlog
 import redis
+import redis.asyncio as aioredis
 from redis.exceptions import RedisError
 
 from app.config import settings
+from app.utils.lru_dict import LRUDict
 
 logger = structlog.get_logger()
 
 
-class RedisRateLimiter:
+# Same algorithm as the in-memory RateLimiter: a capped list of the newest
+# message timestamps per user; "N messages within window" holds exactly
+# when the N-th newest is inside the window. One atomic round-trip.
+#
+# KEYS: messages list, blocked flag, burst counter
+# ARGV: now, per-minute limit, per-hour limit, burst threshold,
+#       burst window, max bursts, block seconds, list capacity
+# Returns {allowed (0/1), reason, detail}
+_CHECK_SCRIPT = """
+local blocked_ttl = redis.call('TTL', KEYS[2])
+if blocked_ttl > 0 then
+    return {0, 'blocked', blocked_ttl}
+end
+
+local now = tonumber(ARGV[1])
+local function nth_newest(n)
+    local ts = redis.call('LINDEX', KEYS[1], n - 1)
+    if ts then
+        return tonumber(ts)
+    end
+    return nil
+end
+
+local ts = nth_newest(tonumber(ARGV[2]))
+if ts and now - ts < 60 then
+    return {0, 'too_many_requests_per_minute', tonumber(ARGV[2])}
+end
+
+ts = nth_newest(tonumber(ARGV[3]))
+if ts and now - ts < 3600 then
+    return {0, 'too_many_requests_per_hour', tonumber(ARGV[3])}
+end
+
+ts = nth_newest(tonumber(ARGV[4]))
+if ts and now - ts < tonumber(ARGV[5]) then
+    local bursts = redis.call('INCR', KEYS[3])
+    redis.call('EXPIRE', KEYS[3], 3600)
+    if bursts >= tonumber(ARGV[6]) then
+        redis.call('SET', KEYS[2], 'repeated_rapid_bursts', 'EX', tonumber(ARGV[7]))
+        return {0, 'blocked_for_spamming', bursts}
+    end
+    return {0, 'slow_down_please', bursts}
+end
+
+redis.call('LPUSH', KEYS[1], ARGV[1])
+redis.call('LTRIM', KEYS[1], 0, tonumber(ARGV[8]) - 1)
+redis.call('EXPIRE', KEYS[1], 3600)
+return {1, '', 0}
+"""
+
+# KEYS: errors list, blocked flag
+# ARGV: now, max errors per minute, block seconds
+# Returns {blocked (0/1), errors kept}
+_RECORD_ERROR_SCRIPT = """
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+redis.call('LPUSH', KEYS[1], ARGV[1])
+redis.call('LTRIM', KEYS[1], 0, limit - 1)
+redis.call('EXPIRE', KEYS[1], 60)
+local ts = redis.call('LINDEX', KEYS[1], limit - 1)
+if ts and now - tonumber(ts) < 60 then
+    redis.call('SET', KEYS[2], 'error_flood', 'EX', tonumber(ARGV[3]))
+    return {1, limit}
+end
+return {0, redis.call('LLEN', KEYS[1])}
+"""
+
+
+def _redis_kwargs() -> dict:
+    """Connection kwargs - only include password if set."""
+    redis_kwargs = {
+        "decode_responses": True,
+        "socket_timeout": 5,
+        "socket_connect_timeout": 5
+    }
+    if settings.redis_password:
+        redis_kwargs["password"] = settings.redis_password
+    return redis_kwargs
+
+
+class _RedisLimiterBase:
+    """Limits, keys and script arguments/results shared by sync and async limiters."""
+
+    def __init__(self):
+        # Rate limits
+        self.MAX_MESSAGES_PER_MINUTE = 10
+        self.MAX_MESSAGES_PER_HOUR = 50
+        self.MAX_ERRORS_PER_MINUTE = 5
+        self.RAPID_BURST_THRESHOLD = 5  # messages
+        self.RAPID_BURST_WINDOW = 10  # seconds
+        self.MAX_BURSTS_BEFORE_BLOCK = 3
+        self.BLOCK_DURATION_SECONDS = 3600  # 1 hour
+
+    def _get_key(self, user_id: str, key_type: str) -> str:
+        """Generate Redis key for user data."""
+        return f"rate_limit:{user_id}:{key_type}"
+
+    def _check_call(self, user_id: str) -> Tuple[list, list]:
+        """Keys and args for _CHECK_SCRIPT."""
+        keys = [
+            self._get_key(user_id, "messages"),
+            self._get_key(user_id, "blocked"),
+            self._get_key(user_id, "burst_counter"),
+        ]
+        args = [
+            time.time(),
+            self.MAX_MESSAGES_PER_MINUTE,
+            self.MAX_MESSAGES_PER_HOUR,
+            self.RAPID_BURST_THRESHOLD,
+            self.RAPID_BURST_WINDOW,
+            self.MAX_BURSTS_BEFORE_BLOCK,
+            self.BLOCK_DURATION_SECONDS,
+            max(self.MAX_MESSAGES_PER_HOUR, self.MAX_MESSAGES_PER_MINUTE, self.RAPID_BURST_THRESHOLD),
+        ]
+        return keys, args
+
+    def _check_outcome(self, user_id: str, allowed: int, reason: str, detail: int) -> Tuple[bool, str]:
+        """Map _CHECK_SCRIPT result to (is_allowed, reason) and log."""
+        if allowed:
+            return True, ""
+
+        detail = int(detail)
+        if reason == "blocked":
+            return False, f"blocked_until_{max(1, detail // 60)}_min"
+        if reason == "too_many_requests_per_minute":
+            logger.warning("rate_limit_exceeded_minute", user_id=user_id, count=detail)
+        elif reason == "too_many_requests_per_hour":
+            logger.warning("rate_limit_exceeded_hour", user_id=user_id, count=detail)
+        else:
+            logger.warning("rapid_burst_detected", user_id=user_id, burst_count=detail)
+            if reason == "blocked_for_spamming":
+                logger.warning("user_blocked",
+                             user_id=user_id,
+                             reason="repeated_rapid_bursts",
+                             duration_hours=self.BLOCK_DURATION_SECONDS / 3600)
+        return False, reason
+
+    def _log_error_flood(self, user_id: str, error_count: int):
+        logger.warning("error_flood_detected",
+                     user_id=user_id,
+                     error_count=error_count)
+        logger.warning("user_blocked",
+                     user_id=user_id,
+                     reason="error_flood",
+                     duration_hours=self.BLOCK_DURATION_SECONDS / 3600)
+
+
+class RedisRateLimiter(_RedisLimiterBase):
     """
     Distributed rate limiting using Redis.
 
@@ -26,22 +175,18 @@ class RedisRateLimiter:
     - Works across multiple application instances
     - Persistent across restarts
     - TTL-based automatic cleanup
+
+    check_rate_limit and record_error are single atomic Lua scripts
+    (exact sliding windows, same algorithm as RateLimiter). Timestamps
+    are wall-clock seconds so that instances agree.
     """
 
     def __init__(self):
         """Initialize Redis rate limiter."""
+        super().__init__()
         # Connect to Redis
         try:
-            # Build connection kwargs - only include password if set
-            redis_kwargs = {
-                "decode_responses": True,
-                "socket_timeout": 5,
-                "socket_connect_timeout": 5
-            }
-            if settings.redis_password:
-                redis_kwargs["password"] = settings.redis_password
-
-            self.redis = redis.from_url(settings.redis_url, **redis_kwargs)
+            self.redis = redis.from_url(settings.redis_url, **_redis_kwargs())
             # Test connection
             self.redis.ping()
             logger.info("redis_rate_limiter_initialized", url=settings.redis_url)
@@ -49,18 +194,9 @@ class RedisRateLimiter:
             logger.error("redis_connection_failed", error=str(e))
             raise
 
-        # Rate limits
-        self.MAX_MESSAGES_PER_MINUTE = 10
-        self.MAX_MESSAGES_PER_HOUR = 50
-        self.MAX_ERRORS_PER_MINUTE = 5
-        self.RAPID_BURST_THRESHOLD = 5  # messages
-        self.RAPID_BURST_WINDOW = 10  # seconds
-        self.MAX_BURSTS_BEFORE_BLOCK = 3
-        self.BLOCK_DURATION_SECONDS = 3600  # 1 hour
-
-    def _get_key(self, user_id: str, key_type: str) -> str:
-        """Generate Redis key for user data."""
-        return f"rate_limit:{user_id}:{key_type}"
+        # Sent as EVALSHA, loaded on first use
+        self._check_script = self.redis.register_script(_CHECK_SCRIPT)
+        self._record_error_script = self.redis.register_script(_RECORD_ERROR_SCRIPT)
 
     def is_blocked(self, user_id: str) -> bool:
         """
@@ -91,65 +227,9 @@ class RedisRateLimiter:
             Tuple of (is_allowed, reason)
         """
         try:
-            # Check if blocked
-            if self.is_blocked(user_id):
-                block_key = self._get_key(user_id, "blocked")
-                ttl = self.redis.ttl(block_key)
-                minutes_left = max(1, ttl // 60)
-                return False, f"blocked_until_{minutes_left}_min"
-
-            now = int(datetime.now().timestamp())
-
-            # Per-minute rate limit (sliding window)
-            minute_key = self._get_key(user_id, f"minute:{now // 60}")
-            minute_count = self.redis.incr(minute_key)
-            if minute_count == 1:
-                self.redis.expire(minute_key, 60)  # TTL 60 seconds
-
-            if minute_count > self.MAX_MESSAGES_PER_MINUTE:
-                logger.warning("rate_limit_exceeded_minute",
-                             user_id=user_id,
-                             count=minute_count)
-                return False, "too_many_requests_per_minute"
-
-            # Per-hour rate limit (sliding window)
-            hour_key = self._get_key(user_id, f"hour:{now // 3600}")
-            hour_count = self.redis.incr(hour_key)
-            if hour_count == 1:
-                self.redis.expire(hour_key, 3600)  # TTL 1 hour
-
-            if hour_count > self.MAX_MESSAGES_PER_HOUR:
-                logger.warning("rate_limit_exceeded_hour",
-                             user_id=user_id,
-                             count=hour_count)
-                return False, "too_many_requests_per_hour"
-
-            # Rapid burst detection (10-second window)
-            burst_key = self._get_key(user_id, f"burst:{now // self.RAPID_BURST_WINDOW}")
-            burst_count = self.redis.incr(burst_key)
-            if burst_count == 1:
-                self.redis.expire(burst_key, self.RAPID_BURST_WINDOW)
-
-            if burst_count >= self.RAPID_BURST_THRESHOLD:
-                # Rapid burst detected - increment burst counter
-                burst_counter_key = self._get_key(user_id, "burst_counter")
-                total_bursts = self.redis.incr(burst_counter_key)
-                self.redis.expire(burst_counter_key, 3600)  # Reset after 1 hour
-
-                logger.warning("rapid_burst_detected",
-                             user_id=user_id,
-                             burst_count=total_bursts,
-                             messages_in_window=burst_count)
-
-                if total_bursts >= self.MAX_BURSTS_BEFORE_BLOCK:
-                    # Block user for spamming
-                    self._block_user(user_id, "repeated_rapid_bursts")
-                    return False, "blocked_for_spamming"
-
-                return False, "slow_down_please"
-
-            # All checks passed
-            return True, ""
+            keys, args = self._check_call(user_id)
+            allowed, reason, detail = self._check_script(keys=keys, args=args)
+            return self._check_outcome(user_id, allowed, reason, detail)
 
         except RedisError as e:
             logger.error("redis_check_rate_limit_error", user_id=user_id, error=str(e))
@@ -165,7 +245,7 @@ class RedisRateLimiter:
         """
         Record a message from user.
 
-        Note: Recording is done automatically in check_rate_limit via incr.
+        Note: Allowed messages are recorded by the check_rate_limit script.
         This method is kept for API compatibility.
         """
         pass  # Already recorded in check_rate_limit
@@ -180,18 +260,13 @@ class RedisRateLimiter:
             user_id: User ID
         """
         try:
-            now = int(datetime.now().timestamp())
-            error_key = self._get_key(user_id, f"errors:{now // 60}")
-
-            error_count = self.redis.incr(error_key)
-            if error_count == 1:
-                self.redis.expire(error_key, 60)
+            blocked, error_count = self._record_error_script(
+                keys=[self._get_key(user_id, "errors"), self._get_key(user_id, "blocked")],
+                args=[time.time(), self.MAX_ERRORS_PER_MINUTE, self.BLOCK_DURATION_SECONDS]
+            )
 
-            if error_count >= self.MAX_ERRORS_PER_MINUTE:
-                logger.warning("error_flood_detected",
-                             user_id=user_id,
-                             error_count=error_count)
-                self._block_user(user_id, "error_flood")
+            if blocked:
+                self._log_error_flood(user_id, error_count)
 
         except RedisError as e:
             logger.error("redis_record_error_failed", user_id=user_id, error=str(e))
@@ -251,16 +326,17 @@ class RedisRateLimiter:
             Dict with user stats
         """
         try:
-            now = int(datetime.now().timestamp())
+            now = time.time()
 
-            # Get current minute/hour counts
-            minute_key = self._get_key(user_id, f"minute:{now // 60}")
-            hour_key = self._get_key(user_id, f"hour:{now // 3600}")
-            burst_counter_key = self._get_key(user_id, "burst_counter")
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.lrange(self._get_key(user_id, "messages"), 0, -1)
+            pipe.get(self._get_key(user_id, "burst_counter"))
+            timestamps, burst_count = pipe.execute()
 
-            minute_count = int(self.redis.get(minute_key) or 0)
-            hour_count = int(self.redis.get(hour_key) or 0)
-            burst_count = int(self.redis.get(burst_counter_key) or 0)
+            timestamps = [float(ts) for ts in timestamps]
+            minute_count = sum(1 for ts in timestamps if now - ts < 60)
+            hour_count = sum(1 for ts in timestamps if now - ts < 3600)
+            burst_count = int(burst_count or 0)
 
             return {
                 "messages_last_minute": minute_count,
@@ -305,8 +381,169 @@ class RedisRateLimiter:
             return False
 
 
+class AsyncRedisRateLimiter(_RedisLimiterBase):
+    """
+    asyncio Redis rate limiter for the message path.
+
+    Each message costs one EVALSHA (block check, windows, burst detection
+    and recording in one atomic script) on a non-blocking connection.
+    Users seen blocked are cached locally until their block expires, so
+    their further messages cost no round-trip at all (a manual unblock in
+    another process takes effect here when the cached block ends).
+
+    On Redis errors a call falls back to the in-memory limiter; after
+    MAX_CONSECUTIVE_FAILURES the limiter reports itself unhealthy for
+    RETRY_AFTER_SECONDS so get_rate_limiter() skips it without probing.
+    """
+
+    MAX_CONSECUTIVE_FAILURES = 3
+    RETRY_AFTER_SECONDS = 30
+    BLOCK_CACHE_SIZE = 10000
+
+    def __init__(self, client: Optional[aioredis.Redis] = None):
+        """
+        Initialize async Redis rate limiter (connects lazily, see connect()).
+
+        Args:
+            client: Redis client (default: from settings.redis_url)
+        """
+        super().__init__()
+        self.redis = client or aioredis.from_url(settings.redis_url, **_redis_kwargs())
+        self._check_script = self.redis.register_script(_CHECK_SCRIPT)
+        self._record_error_script = self.redis.register_script(_RECORD_ERROR_SCRIPT)
+
+        # Local short-circuit: user_id -> block end (monotonic seconds)
+        self._blocked_until: LRUDict = LRUDict(max_size=self.BLOCK_CACHE_SIZE)
+
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+
+    async def connect(self):
+        """Verify the connection (raises RedisError)."""
+        await self.redis.ping()
+        logger.info("async_redis_rate_limiter_initialized", url=settings.redis_url)
+
+    @property
+    def healthy(self) -> bool:
+        """False while the circuit is open after repeated Redis failures."""
+        return self._consecutive_failures < self.MAX_CONSECUTIVE_FAILURES or time.monotonic() >= self._retry_at
+
+    def _on_success(self):
+        self._consecutive_failures = 0
+
+    def _on_failure(self, operation: str, user_id: str, error: Exception):
+        self._consecutive_failures += 1
+        logger.error(f"redis_{operation}_error", user_id=user_id, error=str(error),
+                     consecutive_failures=self._consecutive_failures)
+        if self._consecutive_failures >= self.MAX_CONSECUTIVE_FAILURES:
+            self._retry_at = time.monotonic() + self.RETRY_AFTER_SECONDS
+            logger.warning("redis_circuit_open",
+                         consecutive_failures=self._consecutive_failures,
+                         retry_after_sec=self.RETRY_AFTER_SECONDS)
+
+    def _cache_block(self, user_id: str, seconds: float):
+        self._blocked_until[user_id] = time.monotonic() + seconds
+
+    def _cached_block_left(self, user_id: str) -> float:
+        """Seconds left of a locally known block, 0 if none."""
+        block_until = self._blocked_until.get(user_id)
+        if block_until is None:
+            return 0
+        left = block_until - time.monotonic()
+        if left <= 0:
+            self._blocked_until.pop(user_id)
+            return 0
+        return left
+
+    async def check_rate_limit(self, user_id: str) -> Tuple[bool, str]:
+        """
+        Check limits and record the message if allowed.
+
+        Args:
+            user_id: User ID to check
+
+        Returns:
+            Tuple of (is_allowed, reason)
+        """
+        left = self._cached_block_left(user_id)
+        if left:
+            return False, f"blocked_until_{max(1, int(left) // 60)}_min"
+
+        try:
+            keys, args = self._check_call(user_id)
+            allowed, reason, detail = await self._check_script(keys=keys, args=args)
+        except RedisError as e:
+            self._on_failure("check_rate_limit", user_id, e)
+            # Fail CLOSED: delegate to in-memory rate limiter instead of allowing unlimited
+            from app.services.rate_limiter import rate_limiter as memory_limiter
+            is_allowed, reason = memory_limiter.check_rate_limit(user_id)
+            if is_allowed:
+                memory_limiter.record_message(user_id)
+            return is_allowed, reason
+
+        self._on_success()
+        if reason == "blocked":
+            self._cache_block(user_id, int(detail))
+        elif reason == "blocked_for_spamming":
+            self._cache_block(user_id, self.BLOCK_DURATION_SECONDS)
+        return self._check_outcome(user_id, allowed, reason, detail)
+
+    async def record_message(self, user_id: str):
+        """Kept for API compatibility: check_rate_limit records allowed messages."""
+
+    async def record_error(self, user_id: str):
+        """
+        Record an error from user request; blocks user on error flood.
+
+        Args:
+            user_id: User ID
+        """
+        try:
+            blocked, error_count = await self._record_error_script(
+                keys=[self._get_key(user_id, "errors"), self._get_key(user_id, "blocked")],
+                args=[time.time(), self.MAX_ERRORS_PER_MINUTE, self.BLOCK_DURATION_SECONDS]
+            )
+        except RedisError as e:
+            self._on_failure("record_error", user_id, e)
+            from app.services.rate_limiter import rate_limiter as memory_limiter
+            memory_limiter.record_error(user_id)
+            return
+
+        self._on_success()
+        if blocked:
+            self._cache_block(user_id, self.BLOCK_DURATION_SECONDS)
+            self._log_error_flood(user_id, error_count)
+
+    async def is_blocked(self, user_id: str) -> bool:
+        """Check if user is currently blocked (local cache first)."""
+        if self._cached_block_left(user_id):
+            return True
+        try:
+            ttl = await self.redis.ttl(self._get_key(user_id, "blocked"))
+        except RedisError as e:
+            self._on_failure("is_blocked", user_id, e)
+            return False
+        if ttl > 0:
+            self._cache_block(user_id, ttl)
+        return ttl > 0
+
+    async def unblock_user(self, user_id: str):
+        """Manually unblock a user."""
+        self._blocked_until.pop(user_id)
+        try:
+            await self.redis.delete(self._get_key(user_id, "blocked"), self._get_key(user_id, "burst_counter"))
+            logger.info("user_unblocked", user_id=user_id)
+        except RedisError as e:
+            logger.error("redis_unblock_user_failed", user_id=user_id, error=str(e))
+
+    async def close(self):
+        """Close connection pool."""
+        await self.redis.aclose()
+
+
 # Global instance - will be initialized by application
 rate_limiter_redis: Optional[RedisRateLimiter] = None
+rate_limiter_redis_async: Optional[AsyncRedisRateLimiter] = None
 
 
 def init_redis_rate_limiter():
@@ -320,6 +557,20 @@ def init_redis_rate_limiter():
         rate_limiter_redis = None
 
 
+async def init_async_redis_rate_limiter():
+    """Initialize global async Redis rate limiter (call from the running event loop)."""
+    global rate_limiter_redis_async
+    limiter = AsyncRedisRateLimiter()
+    try:
+        await limiter.connect()
+        rate_limiter_redis_async = limiter
+        logger.info("async_redis_rate_limiter_global_initialized")
+    except Exception as e:
+        logger.error("async_redis_rate_limiter_init_failed", error=str(e))
+        await limiter.close()
+        rate_limiter_redis_async = None
+
+
 _redis_consecutive_failures: int = 0
 _MAX_REDIS_FAILURES: int = 3
 
@@ -329,16 +580,21 @@ def get_rate_limiter():
     Get the best available rate limiter.
 
     Priority:
-    1. Redis rate limiter (if healthy)
-    2. In-memory rate limiter (fallback)
+    1. Async Redis rate limiter (unless its circuit is open; no probe)
+    2. Redis rate limiter (if healthy)
+    3. In-memory rate limiter (fallback)
 
     Auto-switches to in-memory after consecutive Redis failures.
+    The async limiter's methods are coroutines.
 
     Returns:
-        Rate limiter instance (Redis or in-memory)
+        Rate limiter instance (async Redis, Redis or in-memory)
     """
     global _redis_consecutive_failures
 
+    if rate_limiter_redis_async is not None and rate_limiter_redis_async.healthy:
+        return rate_limiter_redis_async
+
     if rate_limiter_redis is not None:
         if _redis_consecutive_failures < _MAX_REDIS_FAILURES:
             # Try Redis, track failures
@@ -378,3 +634,16 @@ def is_redis_available() -> bool:
     if rate_limiter_redis is None:
         return False
     return rate_limiter_redis.get_connection_status()
+
+
+async def is_redis_available_async() -> bool:
+    """Check the Redis limiter serving traffic: ping the async one, else the sync one."""
+    if rate_limiter_redis_async is None:
+        return is_redis_available()
+    if not rate_limiter_redis_async.healthy:
+        return False
+    try:
+        return bool(await rate_limiter_redis_async.redis.ping())
+    except Exception as e:
+        logger.warning("redis_health_ping_failed", error=str(e))
+        return False
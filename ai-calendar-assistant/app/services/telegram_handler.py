@@ -1,5 +1,7 @@
 """Telegram bot message handler."""
 
+import asyncio
+import re
 import time
 from datetime import datetime, timedelta
 from typing import Optional
@@ -40,9 +42,11 @@ except ImportError:
 from app.schemas.events import IntentType
 from app.utils.datetime_parser import format_datetime_human
 from app.utils.lru_dict import LRUDict
+from app.utils.recurrence import split_occurrence_id
 
 # Rate limiter - Redis primary with in-memory fallback
-from app.services.rate_limiter_redis import get_rate_limiter
+from app.services.rate_limiter_redis import AsyncRedisRateLimiter, get_rate_limiter
+from app.services.progressive_reply import ProgressiveReply
 
 # Forum activity logger (optional)
 try:
@@ -65,6 +69,10 @@ MAX_CONTEXT_MESSAGES = 5      # Context expires after N messages without referen
 # Stores last N message pairs (user + bot response) for context
 MAX_DIALOG_HISTORY = 5        # Maximum message pairs to keep per user
 
+# Update/delete of one occurrence of a recurring event touches the whole series
+# only when the user says so ("всю серию", "все повторы", "навсегда", "каждый ...")
+_WHOLE_SERIES_RE = re.compile(r'\bсери[юяи]\b|\bвсе\s+повтор\w*|\bнавсегда\b|\bкажд\w+', re.IGNORECASE)
+
 logger = structlog.get_logger()
 
 
@@ -133,7 +141,11 @@ class TelegramHandler:
         # Rate limiting check - Redis primary with in-memory fallback
         try:
             limiter = get_rate_limiter()
-            is_allowed, reason = limiter.check_rate_limit(user_id)
+            if isinstance(limiter, AsyncRedisRateLimiter):
+                # One script call: block check, windows, bursts and recording
+                is_allowed, reason = await limiter.check_rate_limit(user_id)
+            else:
+                is_allowed, reason = limiter.check_rate_limit(user_id)
 
             if not is_allowed:
                 logger.warning("rate_limit_blocked", user_id=user_id, reason=reason)
@@ -148,8 +160,9 @@ class TelegramHandler:
                     self._log_bot_response(user_id, rate_msg)
                 return
 
-            # Record message for rate limiting
-            limiter.record_message(user_id)
+            # Record message for rate limiting (async limiter already did)
+            if not isinstance(limiter, AsyncRedisRateLimiter):
+                limiter.record_message(user_id)
         except Exception as e:
             # Fail open - allow request if rate limiter fails
             logger.warning("rate_limit_check_error", user_id=user_id, error=str(e))
@@ -1216,6 +1229,8 @@ Housler.ru сделал подборку сервисов, которые пом
                 await query.edit_message_text("Неверная команда.")
                 return True
 
+            # Several ids may name the same series (deleting it twice would miscount)
+            event_ids = list(dict.fromkeys(event_ids))
             await query.edit_message_text(f"⏳ Удаляю {len(event_ids)} {action_name}...")
 
             deleted_count = 0
@@ -2170,6 +2185,7 @@ Housler.ru сделал подборку сервисов, которые пом
                 event_ids = last_msg.get("duplicates", [])
             else:  # pending_delete_by_criteria
                 event_ids = last_msg.get("events", [])
+            event_ids = list(dict.fromkeys(event_ids))
 
             # Delete events
             deleted_count = 0
@@ -2297,8 +2313,15 @@ Housler.ru сделал подборку сервисов, которые пом
                 if handled:
                     return
 
-        # Process with LLM
-        await update.message.reply_text("⏳ Секунду...")
+        # Process with LLM (placeholder is edited while the answer streams in)
+        placeholder_text = "⏳ Секунду..."
+        placeholder = ProgressiveReply(await update.message.reply_text(placeholder_text), placeholder_text)
+
+        async def show_partial(intent: str, fields: dict):
+            if intent == "clarify" and fields.get("clarify_question"):
+                await placeholder.update(fields["clarify_question"])
+            elif intent == "query":
+                await placeholder.update("🔍 Смотрю календарь...", final=True)
 
         # Get or create conversation history for this user
         if user_id not in self.conversation_history:
@@ -2307,30 +2330,38 @@ Housler.ru сделал подборку сервисов, которые пом
         # Get user timezone
         user_tz = self._get_user_timezone(update)
 
-        # ALWAYS load events from calendar before processing request
-        # This allows Claude to see what exists and make informed decisions
+        # ALWAYS load events from calendar as LLM context
+        # Loaded in the background: local parsers answer without it, the LLM
+        # path awaits it in extract_event
         from datetime import datetime, timedelta
         now = datetime.now()
         start = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=7)
         end = now + timedelta(days=60)
-        calendar_had_error = False
-        try:
-            existing_events = await calendar_service.list_events(user_id, start, end)
-        except CalendarServiceError:
-            existing_events = []
-            calendar_had_error = True
-            logger.warning("calendar_unavailable_for_context", user_id=user_id)
-        _events_duration_ms = (time.perf_counter() - _handle_start) * 1000
+        context_event_ids = self._get_event_context(user_id)
+        _events_duration_ms = 0.0
+
+        async def load_calendar_context():
+            nonlocal _events_duration_ms
+            calendar_had_error = False
+            try:
+                existing_events = await calendar_service.list_events(user_id, start, end)
+            except CalendarServiceError:
+                existing_events = []
+                calendar_had_error = True
+                logger.warning("calendar_unavailable_for_context", user_id=user_id)
+            _events_duration_ms = (time.perf_counter() - _handle_start) * 1000
 
-        logger.info("events_loaded_for_context", user_id=user_id, count=len(existing_events), duration_ms=round(_events_duration_ms, 1), calendar_error=calendar_had_error)
+            logger.info("events_loaded_for_context", user_id=user_id, count=len(existing_events), duration_ms=round(_events_duration_ms, 1), calendar_error=calendar_had_error)
 
-        # Get recent context events (for follow-up commands like "перепиши эти события")
-        context_event_ids = self._get_event_context(user_id)
-        recent_context_events = []
-        if context_event_ids and existing_events:
-            context_ids_set = set(context_event_ids)
-            recent_context_events = [e for e in existing_events if e.id in context_ids_set]
-            logger.debug("recent_context_loaded", user_id=user_id, count=len(recent_context_events))
+            # Get recent context events (for follow-up commands like "перепиши эти события")
+            recent_context_events = []
+            if context_event_ids and existing_events:
+                context_ids_set = set(context_event_ids)
+                recent_context_events = [e for e in existing_events if e.id in context_ids_set]
+                logger.debug("recent_context_loaded", user_id=user_id, count=len(recent_context_events))
+            return existing_events, recent_context_events
+
+        calendar_context = asyncio.create_task(load_calendar_context())
 
         # Get dialog history for better LLM context understanding
         # This helps LLM understand what user wants based on previous messages
@@ -2353,16 +2384,26 @@ Housler.ru сделал подборку сервисов, которые пом
         # Example: "12:00" after "Уточните время" → "Брокер тур в 12:00"
         enriched_text = self._enrich_short_response(text, user_id)
 
-        event_dto = await llm_agent.extract_event(
-            enriched_text,
-            user_id,
-            conversation_history=combined_history,
-            timezone=user_tz,
-            existing_events=existing_events,
-            recent_context=recent_context_events
-        )
+        # Timed on its own: calendar loading overlaps it, so total - events is not the LLM time
+        _llm_start = time.perf_counter()
+        try:
+            event_dto = await llm_agent.extract_event(
+                enriched_text,
+                user_id,
+                conversation_history=combined_history,
+                timezone=user_tz,
+                on_partial=show_partial,
+                calendar_context=calendar_context
+            )
+        finally:
+            if not calendar_context.done():
+                # Answered without the LLM (or failed) - calendar context not needed
+                calendar_context.cancel()
+        _llm_duration_ms = (time.perf_counter() - _llm_start) * 1000
+        if event_dto.intent not in (IntentType.CLARIFY, IntentType.QUERY):
+            # Partial clarify text was shown but the final answer differs
+            await placeholder.restore()
         _total_duration_ms = (time.perf_counter() - _handle_start) * 1000
-        _llm_duration_ms = _total_duration_ms - _events_duration_ms
         # Get intent as string (may be enum or already string)
         _intent_str = event_dto.intent.value if hasattr(event_dto.intent, 'value') else str(event_dto.intent) if event_dto.intent else "unknown"
         logger.info("handle_text_llm_done",
@@ -2405,7 +2446,8 @@ Housler.ru сделал подборку сервисов, которые пом
                 except Exception as analytics_err:
                     logger.warning("analytics_log_failed", error=str(analytics_err))
             clarify_msg = event_dto.clarify_question or "Уточните, пожалуйста."
-            await update.message.reply_text(clarify_msg)
+            if not (placeholder.changed and await placeholder.update(clarify_msg, final=True)):
+                await update.message.reply_text(clarify_msg)
             self._log_bot_response(user_id, clarify_msg, text)  # Save to dialog history
             return
 
@@ -2422,7 +2464,7 @@ Housler.ru сделал подборку сервисов, которые пом
             return
 
         if event_dto.intent == IntentType.QUERY:
-            await self._handle_query(update, user_id, event_dto, text)
+            await self._handle_query(update, user_id, event_dto, text, progress=placeholder)
             return
 
         if event_dto.intent == IntentType.FIND_FREE_SLOTS:
@@ -2567,7 +2609,8 @@ Housler.ru сделал подборку сервисов, которые пом
         original_events = await calendar_service.list_events(user_id, now - timedelta(days=30), now + timedelta(days=90))
         original_event = next((e for e in original_events if e.id == event_dto.event_id), None)
 
-        success = await calendar_service.update_event(user_id, event_dto.event_id, event_dto)
+        target_id = self._target_event_id(event_dto.event_id, user_text)
+        success = await calendar_service.update_event(user_id, target_id, event_dto)
 
         if success:
             # Log event update to analytics
@@ -2628,7 +2671,8 @@ Housler.ru сделал подборку сервисов, которые пом
         events = await calendar_service.list_events(user_id, now - timedelta(days=30), now + timedelta(days=90))
         event_to_delete = next((e for e in events if e.id == event_dto.event_id), None)
 
-        success = await calendar_service.delete_event(user_id, event_dto.event_id)
+        target_id = self._target_event_id(event_dto.event_id, user_text)
+        success = await calendar_service.delete_event(user_id, target_id)
 
         if success:
             # Remove from context (no longer exists)
@@ -2658,6 +2702,8 @@ Housler.ru сделал подборку сервисов, которые пом
 📅 {event_to_delete.summary}
 🕐 {time_str}
 {f"📍 {event_to_delete.location}" if event_to_delete.location else ""}"""
+                if target_id != event_dto.event_id:
+                    del_msg += "\n🔁 Удалена вся серия"
                 await update.message.reply_text(del_msg)
                 self._log_bot_response(user_id, del_msg, user_text)
             else:
@@ -2669,8 +2715,11 @@ Housler.ru сделал подборку сервисов, которые пом
             await update.message.reply_text(fail_del_msg)
             self._log_bot_response(user_id, fail_del_msg, user_text)
 
-    async def _handle_query(self, update: Update, user_id: str, event_dto, user_text: str = None) -> None:
-        """Handle events query."""
+    async def _handle_query(
+        self, update: Update, user_id: str, event_dto, user_text: str = None,
+        progress: Optional[ProgressiveReply] = None
+    ) -> None:
+        """Handle events query (the events list replaces a streamed progress message)."""
         from datetime import datetime, timedelta
 
         # Log query to analytics
@@ -2778,7 +2827,8 @@ Housler.ru сделал подборку сервисов, которые пом
             if event.location:
                 message += f"  📍 {event.location}\n"
 
-        await update.message.reply_text(message)
+        if not (progress and progress.changed and await progress.update(message, final=True)):
+            await update.message.reply_text(message)
         self._log_bot_response(user_id, message, user_text)
 
     async def _handle_free_slots(self, update: Update, user_id: str, event_dto, user_text: str = None) -> None:
@@ -2836,6 +2886,7 @@ Housler.ru сделал подборку сервисов, которые пом
         created_todos = []
         created_uids = []  # Track UUIDs for context
         failed_count = 0
+        pending_events = []  # EventDTOs created in one bulk call below
 
         for action in event_dto.batch_actions:
             try:
@@ -2879,20 +2930,29 @@ Housler.ru сделал подборку сервисов, которые пом
                     description=action.get("description")
                 )
 
-                event_uid = await calendar_service.create_event(user_id, single_event)
+                pending_events.append(single_event)
+            except Exception as e:
+                logger.error("batch_creation_error", error=str(e), user_id=user_id,
+                            title=action.get("title"))
+                failed_count += 1
+
+        # One conflict scan and concurrent writes for all events of the batch
+        if pending_events:
+            try:
+                event_uids = await calendar_service.create_events_bulk(user_id, pending_events)
+            except Exception as e:
+                logger.error("batch_creation_error", error=str(e), user_id=user_id, count=len(pending_events))
+                event_uids = [None] * len(pending_events)
+            for single_event, event_uid in zip(pending_events, event_uids):
                 if event_uid:
                     created_events.append({
-                        'title': title,
-                        'start': start_time,  # Now datetime, not string
-                        'end': end_time
+                        'title': single_event.title,
+                        'start': single_event.start_time,  # Now datetime, not string
+                        'end': single_event.end_time
                     })
                     created_uids.append(event_uid)
                 else:
                     failed_count += 1
-            except Exception as e:
-                logger.error("batch_creation_error", error=str(e), user_id=user_id,
-                            title=action.get("title"))
-                failed_count += 1
 
         # Save to context for follow-up commands ("перепиши эти события")
         if created_uids:
@@ -2939,7 +2999,7 @@ Housler.ru сделал подборку сервисов, которые пом
             self._log_bot_response(user_id, no_data_msg, user_text)
             return
 
-        if not event_dto.recurrence_type:
+        if event_dto.recurrence_type not in ("daily", "weekly", "monthly"):
             no_recur_msg = "Не указан тип повторения (ежедневно, еженедельно, ежемесячно)."
             await update.message.reply_text(no_recur_msg)
             self._log_bot_response(user_id, no_recur_msg, user_text)
@@ -2952,51 +3012,27 @@ Housler.ru сделал подборку сервисов, которые пом
             self._log_bot_response(user_id, msg, user_text)
             return
 
-        # Default: create recurring events for 30 days
+        # Default: recurring events for 30 days
         recurrence_end = event_dto.recurrence_end_date or (event_dto.start_time + timedelta(days=30))
 
-        created_count = 0
-        failed_count = 0
-        current_date = event_dto.start_time
-
-        # Create individual events based on recurrence type
-        while current_date <= recurrence_end:
-            # Create a copy of event_dto for this occurrence
-            from app.schemas.events import EventDTO, IntentType
-            occurrence = EventDTO(
-                intent=IntentType.CREATE,
-                title=event_dto.title,
-                start_time=current_date,
-                end_time=current_date + timedelta(minutes=event_dto.duration_minutes or 60) if event_dto.duration_minutes else None,
-                location=event_dto.location,
-                description=event_dto.description
-            )
-
-            # Create the event
-            event_uid = await calendar_service.create_event(user_id, occurrence)
-            if event_uid:
-                created_count += 1
-            else:
-                failed_count += 1
-
-            # Move to next occurrence
-            if event_dto.recurrence_type == "daily":
-                current_date += timedelta(days=1)
-            elif event_dto.recurrence_type == "weekly":
-                current_date += timedelta(weeks=1)
-            elif event_dto.recurrence_type == "monthly":
-                # Add one month (approximate - use 30 days for simplicity)
-                current_date += timedelta(days=30)
-            else:
-                # Unknown recurrence type
-                break
-
-            # Safety limit: don't create more than 100 events
-            if created_count >= 100:
-                break
+        # One master VEVENT with RRULE - occurrences are expanded on read
+        from app.schemas.events import EventDTO, IntentType
+        series = EventDTO(
+            intent=IntentType.CREATE,
+            title=event_dto.title,
+            start_time=event_dto.start_time,
+            end_time=event_dto.start_time + timedelta(minutes=event_dto.duration_minutes) if event_dto.duration_minutes else None,
+            location=event_dto.location,
+            description=event_dto.description,
+            recurrence_type=event_dto.recurrence_type,
+            recurrence_end_date=recurrence_end,
+            recurrence_days=event_dto.recurrence_days,
+        )
+        event_uid = await calendar_service.create_event(user_id, series)
 
         # Send confirmation
-        if created_count > 0:
+        if event_uid:
+            self._add_to_event_context(user_id, [event_uid])
             recurrence_name = {
                 "daily": "ежедневное",
                 "weekly": "еженедельное",
@@ -3004,9 +3040,10 @@ Housler.ru сделал подборку сервисов, которые пом
             }.get(event_dto.recurrence_type, "повторяющееся")
 
             time_str = format_datetime_human(event_dto.start_time, self._get_user_timezone(update))
-            message = f"✅ Создано {recurrence_name} событие\n{time_str} • {event_dto.title}\n\nСоздано повторений: {created_count}"
-            if failed_count > 0:
-                message += f"\nНе создано: {failed_count}"
+            message = (
+                f"✅ Создано {recurrence_name} событие\n{time_str} • {event_dto.title}\n\n"
+                f"Повторяется до {recurrence_end.strftime('%d.%m.%Y')}"
+            )
             await update.message.reply_text(message)
             self._log_bot_response(user_id, message, user_text)
         else:
@@ -3014,6 +3051,27 @@ Housler.ru сделал подборку сервисов, которые пом
             await update.message.reply_text(fail_recur_msg)
             self._log_bot_response(user_id, fail_recur_msg, user_text)
 
+    @staticmethod
+    def _target_event_id(event_id: str, user_text: Optional[str]) -> str:
+        """Id to update/delete: the occurrence itself, its series only when the user asked for it."""
+        if user_text and _WHOLE_SERIES_RE.search(user_text):
+            return split_occurrence_id(event_id)[0]
+        return event_id
+
+    @staticmethod
+    def _deletion_targets(events: list, whole_series: bool) -> list:
+        """
+        (id to delete, event to show) pairs, one per id.
+
+        With whole_series occurrences of a recurring series collapse into one
+        entry for the series UID (shown with its first listed occurrence).
+        """
+        targets = {}
+        for event in events:
+            target_id = split_occurrence_id(event.id)[0] if whole_series and event.recurring else event.id
+            targets.setdefault(target_id, event)
+        return list(targets.items())
+
     async def _handle_delete_by_criteria(self, update: Update, user_id: str, event_dto, user_text: str = None) -> None:
         """Handle mass deletion by criteria (title contains, date range, etc)."""
         from datetime import datetime, timedelta
@@ -3066,17 +3124,23 @@ Housler.ru сделал подборку сервисов, которые пом
             self._log_bot_response(user_id, not_found_msg, user_text)
             return
 
+        # Without a date range the user asked for "all X": delete recurring series whole,
+        # otherwise only the occurrences inside the range
+        whole_series = not (event_dto.query_date_start or event_dto.query_date_end)
+        targets = self._deletion_targets(events_to_delete, whole_series)
+
         # Show list of events and ask for confirmation
-        message = f"Найдено: {len(events_to_delete)}\n\n"
+        message = f"Найдено: {len(targets)}\n\n"
         message += "Удалить:\n"
 
         user_tz = self._get_user_timezone(update)
-        for i, event in enumerate(events_to_delete[:10]):  # Show first 10
+        for target_id, event in targets[:10]:  # Show first 10
             time_str = format_datetime_human(event.start, user_tz)
-            message += f"• {event.summary} ({time_str})\n"
+            series_note = ", вся серия" if target_id != event.id else ""
+            message += f"• {event.summary} ({time_str}{series_note})\n"
 
-        if len(events_to_delete) > 10:
-            message += f"\n...ещё {len(events_to_delete) - 10}\n"
+        if len(targets) > 10:
+            message += f"\n...ещё {len(targets) - 10}\n"
 
         message += "\nПодтвердите:"
 
@@ -3087,7 +3151,7 @@ Housler.ru сделал подборку сервисов, которые пом
         self.conversation_history[user_id] = [{
             "role": "assistant",
             "content": "pending_delete_by_criteria",
-            "events": [e.id for e in events_to_delete],
+            "events": [target_id for target_id, _ in targets],
             "message": message
         }]
 
@@ -1,14 +1,16 @@
 """Service for managing todos with encrypted storage."""
 
+import asyncio
 import uuid
 import os
-from datetime import datetime
-from typing import List, Optional, Dict
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional, Dict
 import structlog
 from threading import Lock
 
 from app.schemas.todos import Todo, TodoDTO, TodoPriority
-from app.services.encrypted_storage import EncryptedStorage
+from app.services.encrypted_storage import EncryptedSQLiteStorage, EncryptedStorage
+from app.utils.lru_dict import LRUDict
 
 logger = structlog.get_logger()
 
@@ -22,47 +24,108 @@ except ImportError:
     ANALYTICS_ENABLED = False
 
 
-class TodosService:
-    """Service for storing and managing user todos with encrypted storage."""
+# load() default marking "no stored todos" (a read error returns it too)
+_MISSING = object()
+
+
+class TodosReadError(Exception):
+    """Stored todos exist but could not be read or decrypted."""
+
 
-    def __init__(self, data_dir: Optional[str] = None):
+class TodosService:
+    """
+    Service for storing and managing user todos with encrypted storage.
+
+    Each user's todos are one encrypted file, or one row of an encrypted
+    SQLite database with TODOS_STORAGE=sqlite (the row is indexed by its
+    earliest open due date, see get_due_todos). Decrypted todo sets are kept
+    in an LRU cache, so reads skip decrypt/parse and writes only encrypt.
+    The bot and the web app write the same storage from separate processes,
+    so a cached set is used only while the storage version (file stat or
+    row updated_at) still matches the one it was read or written at.
+    Storage I/O runs in worker threads under a (striped) per-user lock; a cached set is
+    replaced only after it was written (atomically, by the storage backend).
+    """
+
+    CACHE_MAX_USERS = 1000  # Decrypted todo sets kept in memory
+    LOCK_STRIPES = 64
+
+    def __init__(self, data_dir: Optional[str] = None, backend: Optional[str] = None):
         """
         Initialize todos service with encrypted storage.
 
         Args:
             data_dir: Directory path for storing encrypted todo files
+            backend: "files" (one encrypted file per user) or "sqlite"
+                (default: TODOS_STORAGE env var, else "files")
         """
         if data_dir is None:
             data_dir = os.getenv("TODOS_DATA_DIR", "/var/lib/calendar-bot/todos")
-            
-        # Development fallback if we can't write to the target directory
-        try:
-            # We don't create it here, EncryptedStorage does, but we can check parent
-            pass
-        except Exception:
-            pass
-            
-        # If we are local and the path is /var/lib, we might want to fallback automatically
-        # but explicit env var is better.
-            
-        self.storage = EncryptedStorage(data_dir=data_dir)
-        self._lock = Lock()
-        logger.info("todos_service_initialized_encrypted", data_dir=data_dir)
+        if backend is None:
+            backend = os.getenv("TODOS_STORAGE", "files")
+
+        if backend == "sqlite":
+            self.storage: EncryptedStorage = EncryptedSQLiteStorage(data_dir=data_dir)
+        else:
+            self.storage = EncryptedStorage(data_dir=data_dir)
+        self._cache: LRUDict = LRUDict(max_size=self.CACHE_MAX_USERS)  # user_id -> (version, {todo_id: todo})
+        self._cache_lock = Lock()  # Guards _cache
+        # Lock striping: serialize per user without a lock per user
+        self._user_locks = [Lock() for _ in range(self.LOCK_STRIPES)]
+        logger.info("todos_service_initialized_encrypted", data_dir=data_dir, backend=backend)
 
     def _get_user_filename(self, user_id: str) -> str:
         """Get filename for user's todos."""
         return f"user_{user_id}.json"
 
-    def _load_todos(self, user_id: str) -> Dict[str, dict]:
+    @staticmethod
+    def _due_index(due_date: datetime) -> str:
+        """Sortable storage index for a due date (aware dates in UTC)."""
+        if due_date.tzinfo is not None:
+            due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+        return due_date.isoformat(timespec='seconds')
+
+    @classmethod
+    def storage_index(cls, todos: Dict[str, Any]) -> Optional[str]:
         """
-        Load todos for a user from encrypted storage.
+        SQLite row index of a user's todos: their earliest open due date.
+
+        Due dates may be datetimes or ISO strings (as stored in files), so
+        the migration can index imported rows (see import_files).
+        """
+        open_due = []
+        for todo_data in todos.values():
+            if not isinstance(todo_data, dict) or todo_data.get('completed') or not todo_data.get('due_date'):
+                continue
+            due_date = todo_data['due_date']
+            open_due.append(cls._due_index(
+                datetime.fromisoformat(due_date) if isinstance(due_date, str) else due_date
+            ))
+        return min(open_due) if open_due else None
+
+    def _user_lock(self, user_id: str) -> Lock:
+        """Lock serializing load/save of one user's file."""
+        return self._user_locks[hash(user_id) % self.LOCK_STRIPES]
+
+    def _read_todos(self, user_id: str) -> Dict[str, dict]:
+        """
+        Read and decrypt todos for a user from encrypted storage.
 
         Returns:
-            Dictionary mapping todo_id to todo data
+            Dictionary mapping todo_id to todo data ({} if nothing is stored)
+
+        Raises:
+            TodosReadError: Stored todos could not be read, so callers must
+                not cache them or save over them
         """
+        filename = self._get_user_filename(user_id)
         try:
-            filename = self._get_user_filename(user_id)
-            data = self.storage.load(filename, default={})
+            data = self.storage.load(filename, default=_MISSING)
+            if data is _MISSING:
+                # Backends return the default on read/decrypt errors too
+                if self.storage.exists(filename):
+                    raise TodosReadError(f"unreadable {filename}")
+                return {}
 
             # Convert datetime strings back to datetime objects
             for todo_id, todo_data in data.items():
@@ -75,9 +138,32 @@ class TodosService:
             return data
         except Exception as e:
             logger.error("load_todos_error", user_id=user_id, error=str(e))
-            return {}
+            if isinstance(e, TodosReadError):
+                raise
+            raise TodosReadError(str(e)) from e
+
+    def _load_todos(self, user_id: str) -> Dict[str, dict]:
+        """
+        Cached todos for a user (caller holds the user lock).
 
-    def _save_todos(self, user_id: str, todos: Dict[str, dict]) -> bool:
+        The cached set is re-read when the storage version changed, e.g.
+        after a write by the other process. The returned dict is shared
+        with the cache and must not be mutated; _modify_todos replaces it
+        instead. Read errors propagate and are not cached, so a failed read
+        never turns into an empty todo list.
+        """
+        version = self.storage.version(self._get_user_filename(user_id))
+        with self._cache_lock:
+            entry = self._cache.get(user_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        # Version taken before the read: a write in between only causes another re-read
+        todos = self._read_todos(user_id)
+        with self._cache_lock:
+            self._cache[user_id] = (version, todos)
+        return todos
+
+    def _save_todos(self, user_id: str, todos: Dict[str, dict]) -> Any:
         """
         Save todos for a user to encrypted storage.
 
@@ -86,28 +172,54 @@ class TodosService:
             todos: Dictionary mapping todo_id to todo data
 
         Returns:
-            True if successful
+            Storage version of the written todos, None if the save failed
         """
         try:
-            with self._lock:
-                # Convert datetime objects to strings for JSON serialization
-                serializable_todos = {}
-                for todo_id, todo_data in todos.items():
-                    todo_copy = todo_data.copy()
-                    if todo_copy.get('due_date'):
-                        todo_copy['due_date'] = todo_copy['due_date'].isoformat()
-                    if todo_copy.get('created_at'):
-                        todo_copy['created_at'] = todo_copy['created_at'].isoformat()
-                    if todo_copy.get('updated_at'):
-                        todo_copy['updated_at'] = todo_copy['updated_at'].isoformat()
-                    serializable_todos[todo_id] = todo_copy
-
-                filename = self._get_user_filename(user_id)
-                self.storage.save(serializable_todos, filename, encrypt=True)
-            return True
+            # Convert datetime objects to strings for JSON serialization
+            serializable_todos = {}
+            for todo_id, todo_data in todos.items():
+                todo_copy = todo_data.copy()
+                if todo_copy.get('due_date'):
+                    todo_copy['due_date'] = todo_copy['due_date'].isoformat()
+                if todo_copy.get('created_at'):
+                    todo_copy['created_at'] = todo_copy['created_at'].isoformat()
+                if todo_copy.get('updated_at'):
+                    todo_copy['updated_at'] = todo_copy['updated_at'].isoformat()
+                serializable_todos[todo_id] = todo_copy
+
+            filename = self._get_user_filename(user_id)
+            if isinstance(self.storage, EncryptedSQLiteStorage):
+                return self.storage.save(serializable_todos, filename, encrypt=True, index=self.storage_index(todos))
+            return self.storage.save(serializable_todos, filename, encrypt=True)
         except Exception as e:
             logger.error("save_todos_error", user_id=user_id, error=str(e))
-            return False
+            return None
+
+    def _get_todos_sync(self, user_id: str) -> Dict[str, dict]:
+        with self._user_lock(user_id):
+            return self._load_todos(user_id)
+
+    def _modify_todos(self, user_id: str, change: Callable[[Dict[str, dict]], Any]) -> Any:
+        """
+        Apply change to a copy of user's todos, save it and update the cache.
+
+        change mutates the copy (replacing, not editing, existing todo dicts)
+        and returns a result, or None to abort without saving.
+        Returns the result, or None if aborted or the save failed.
+        Raises TodosReadError (nothing is written) if stored todos can't be read.
+        """
+        with self._user_lock(user_id):
+            # Validated against the storage version, so another process's writes are not lost
+            todos = dict(self._load_todos(user_id))
+            result = change(todos)
+            if result is None:
+                return None
+            version = self._save_todos(user_id, todos)
+            if version is None:
+                return None
+            with self._cache_lock:
+                self._cache[user_id] = (version, todos)
+            return result
 
     async def create_todo(self, user_id: str, todo_dto: TodoDTO) -> Optional[str]:
         """
@@ -135,10 +247,11 @@ class TodosService:
                 'updated_at': now
             }
 
-            todos = self._load_todos(user_id)
-            todos[todo_id] = todo_data
+            def add(todos: Dict[str, dict]) -> bool:
+                todos[todo_id] = todo_data
+                return True
 
-            if self._save_todos(user_id, todos):
+            if await asyncio.to_thread(self._modify_todos, user_id, add):
                 logger.info("todo_created", user_id=user_id, todo_id=todo_id, title=todo_dto.title)
                 # Log to analytics
                 if ANALYTICS_ENABLED and analytics_service:
@@ -178,7 +291,7 @@ class TodosService:
             List of todos
         """
         try:
-            todos = self._load_todos(user_id)
+            todos = await asyncio.to_thread(self._get_todos_sync, user_id)
             result = []
 
             for todo_data in todos.values():
@@ -218,29 +331,30 @@ class TodosService:
             True if successful
         """
         try:
-            todos = self._load_todos(user_id)
-
-            if todo_id not in todos:
-                logger.warning("todo_not_found", user_id=user_id, todo_id=todo_id)
-                return False
-
-            todo_data = todos[todo_id]
-
-            # Update fields if provided
-            if todo_dto.title is not None:
-                todo_data['title'] = todo_dto.title
-            if todo_dto.completed is not None:
-                todo_data['completed'] = todo_dto.completed
-            if todo_dto.priority is not None:
-                todo_data['priority'] = todo_dto.priority
-            if todo_dto.due_date is not None:
-                todo_data['due_date'] = todo_dto.due_date
-            if todo_dto.notes is not None:
-                todo_data['notes'] = todo_dto.notes
-
-            todo_data['updated_at'] = datetime.now()
-
-            if self._save_todos(user_id, todos):
+            def update(todos: Dict[str, dict]) -> Optional[dict]:
+                if todo_id not in todos:
+                    logger.warning("todo_not_found", user_id=user_id, todo_id=todo_id)
+                    return None
+                todo_data = dict(todos[todo_id])
+
+                # Update fields if provided
+                if todo_dto.title is not None:
+                    todo_data['title'] = todo_dto.title
+                if todo_dto.completed is not None:
+                    todo_data['completed'] = todo_dto.completed
+                if todo_dto.priority is not None:
+                    todo_data['priority'] = todo_dto.priority
+                if todo_dto.due_date is not None:
+                    todo_data['due_date'] = todo_dto.due_date
+                if todo_dto.notes is not None:
+                    todo_data['notes'] = todo_dto.notes
+
+                todo_data['updated_at'] = datetime.now()
+                todos[todo_id] = todo_data
+                return todo_data
+
+            todo_data = await asyncio.to_thread(self._modify_todos, user_id, update)
+            if todo_data is not None:
                 logger.info("todo_updated", user_id=user_id, todo_id=todo_id)
                 # Log to analytics
                 if ANALYTICS_ENABLED and analytics_service:
@@ -274,21 +388,24 @@ class TodosService:
             True if successful
         """
         try:
-            todos = self._load_todos(user_id)
-
-            if todo_id not in todos:
-                logger.warning("todo_not_found", user_id=user_id, todo_id=todo_id)
-                return False
-
-            todos[todo_id]['completed'] = not todos[todo_id]['completed']
-            todos[todo_id]['updated_at'] = datetime.now()
-
-            if self._save_todos(user_id, todos):
+            def toggle(todos: Dict[str, dict]) -> Optional[dict]:
+                if todo_id not in todos:
+                    logger.warning("todo_not_found", user_id=user_id, todo_id=todo_id)
+                    return None
+                todos[todo_id] = {
+                    **todos[todo_id],
+                    'completed': not todos[todo_id]['completed'],
+                    'updated_at': datetime.now()
+                }
+                return todos[todo_id]
+
+            todo_data = await asyncio.to_thread(self._modify_todos, user_id, toggle)
+            if todo_data is not None:
                 logger.info(
                     "todo_toggled",
                     user_id=user_id,
                     todo_id=todo_id,
-                    completed=todos[todo_id]['completed']
+                    completed=todo_data['completed']
                 )
                 # Log to analytics
                 if ANALYTICS_ENABLED and analytics_service:
@@ -296,7 +413,7 @@ class TodosService:
                         analytics_service.log_action(
                             user_id=user_id,
                             action_type=ActionType.TODO_COMPLETE,
-                            details=f"Todo {'completed' if todos[todo_id]['completed'] else 'uncompleted'}: {todos[todo_id].get('title', '')[:100]}",
+                            details=f"Todo {'completed' if todo_data['completed'] else 'uncompleted'}: {todo_data.get('title', '')[:100]}",
                             event_id=todo_id,
                             success=True
                         )
@@ -322,17 +439,16 @@ class TodosService:
             True if successful
         """
         try:
-            todos = self._load_todos(user_id)
-
-            if todo_id not in todos:
-                logger.warning("todo_not_found", user_id=user_id, todo_id=todo_id)
-                return False
-
-            # Get title before deletion for analytics
-            todo_title = todos[todo_id].get('title', '')
-            del todos[todo_id]
-
-            if self._save_todos(user_id, todos):
+            def delete(todos: Dict[str, dict]) -> Optional[dict]:
+                if todo_id not in todos:
+                    logger.warning("todo_not_found", user_id=user_id, todo_id=todo_id)
+                    return None
+                return todos.pop(todo_id)
+
+            deleted = await asyncio.to_thread(self._modify_todos, user_id, delete)
+            if deleted is not None:
+                # Title for analytics
+                todo_title = deleted.get('title', '')
                 logger.info("todo_deleted", user_id=user_id, todo_id=todo_id)
                 # Log to analytics
                 if ANALYTICS_ENABLED and analytics_service:
@@ -366,7 +482,7 @@ class TodosService:
             Todo if found, None otherwise
         """
         try:
-            todos = self._load_todos(user_id)
+            todos = await asyncio.to_thread(self._get_todos_sync, user_id)
 
             if todo_id not in todos:
                 return None
@@ -377,6 +493,51 @@ class TodosService:
             logger.error("get_todo_error", user_id=user_id, todo_id=todo_id, error=str(e), exc_info=True)
             return None
 
+    def _get_due_todos_sync(self, until: datetime) -> Dict[str, List[Todo]]:
+        if isinstance(self.storage, EncryptedSQLiteStorage):
+            # Only users whose earliest open due date is <= until
+            filenames = self.storage.scan_keys(
+                EncryptedSQLiteStorage.FILES_NAMESPACE, key_prefix="user_", index_max=self._due_index(until)
+            )
+        else:
+            filenames = [path.name[:-len(".enc")] for path in self.storage.data_dir.glob("user_*.json.enc")]
+
+        limit = self._due_index(until)
+        result = {}
+        for filename in filenames:
+            user_id = filename[len("user_"):-len(".json")]
+            try:
+                todos = self._get_todos_sync(user_id)
+            except TodosReadError:
+                continue  # Logged by _read_todos; other users still get reminders
+            due = [
+                Todo(**todo_data) for todo_data in todos.values()
+                if todo_data.get('due_date') and not todo_data['completed']
+                and self._due_index(todo_data['due_date']) <= limit
+            ]
+            if due:
+                result[user_id] = sorted(due, key=lambda t: self._due_index(t.due_date))
+        return result
+
+    async def get_due_todos(self, until: datetime) -> Dict[str, List[Todo]]:
+        """
+        Open todos due at or before until, for all users.
+
+        With the SQLite backend only users with something due are read
+        (indexed by earliest open due date); the file backend reads all.
+
+        Args:
+            until: Upper bound, e.g. end of today
+
+        Returns:
+            Dictionary mapping user_id to todos sorted by due date
+        """
+        try:
+            return await asyncio.to_thread(self._get_due_todos_sync, until)
+        except Exception as e:
+            logger.error("get_due_todos_error", error=str(e), exc_info=True)
+            return {}
+
 
 # Global instance
 todos_service = TodosService()
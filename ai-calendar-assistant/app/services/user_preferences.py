@@ -1,8 +1,10 @@
 """User preferences service for storing language and other settings."""
 
 import json
+import sqlite3
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 import structlog
 
 from app.services.translations import Language
@@ -12,64 +14,131 @@ logger = structlog.get_logger()
 
 
 class UserPreferencesService:
-    """Service for managing user preferences."""
-
-    # Flush to disk every N changes or on explicit flush()
-    FLUSH_THRESHOLD = 10
-
-    def __init__(self, data_file: str = "/var/lib/calendar-bot/user_preferences.json"):
+    """
+    Service for managing user preferences.
+
+    Stored in SQLite as one row per (user_id, key) with a JSON value, so a
+    setter writes only the keys it changes and is durable immediately.
+    Users are loaded on first access into an in-memory cache; getters are
+    dict lookups after that. The legacy JSON file is imported once.
+    """
+
+    def __init__(
+        self,
+        data_file: str = "/var/lib/calendar-bot/user_preferences.json",
+        db_path: Optional[str] = None
+    ):
         """
         Initialize preferences service.
 
         Args:
-            data_file: Path to JSON file for storing preferences
+            data_file: Legacy JSON file (imported once, then renamed to .migrated)
+            db_path: SQLite file (default: data_file with .db suffix)
         """
         self.data_file = data_file
-        self.preferences: Dict[str, dict] = {}
-        self._dirty = False
-        self._changes_since_flush = 0
-        self._load_data()
-
-    def _load_data(self):
-        """Load preferences from file."""
+        self.db_path = Path(db_path) if db_path else Path(data_file).with_suffix(".db")
+        self.preferences: Dict[str, dict] = {}  # Read-through cache: user_id -> settings
+        self._lock = threading.Lock()
+        # Called with user_id when schedule-related settings change (timezone, digest times, quiet hours)
+        self._schedule_listeners: List[Callable[[str], None]] = []
+        self._conn = self._connect()
+        self._migrate_json()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open persistent connection and create the table."""
         try:
-            if Path(self.data_file).exists():
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.preferences = json.load(f)
-                logger.info("user_preferences_loaded", count=len(self.preferences))
-            else:
-                logger.info("user_preferences_file_not_found", creating_new=True)
-                self.preferences = {}
-        except Exception as e:
-            logger.error("failed_to_load_preferences", error=str(e))
-            self.preferences = {}
-
-    def _save_data(self):
-        """Save preferences to file (internal, immediate write)."""
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        except PermissionError:
+            # Local development without access to system paths
+            logger.warning("preferences_db_permission_error", path=str(self.db_path), fallback="using local ./data directory")
+            self.db_path = Path("./data/user_preferences.db")
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_preferences (
+                user_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (user_id, key)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        return conn
+
+    def _migrate_json(self):
+        """One-time import of the legacy whole-file JSON store."""
+        json_path = Path(self.data_file)
+        if not json_path.exists():
+            return
         try:
-            # Ensure directory exists
-            Path(self.data_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.preferences, f, ensure_ascii=False, indent=2)
-            self._dirty = False
-            self._changes_since_flush = 0
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rows = [
+                (str(user_id), key, json.dumps(value, ensure_ascii=False))
+                for user_id, prefs in data.items()
+                for key, value in prefs.items()
+            ]
+            with self._lock, self._conn:
+                # Keys already in SQLite are newer than the file
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO user_preferences (user_id, key, value) VALUES (?, ?, ?)', rows
+                )
+            backup_path = json_path.with_suffix('.json.migrated')
+            json_path.rename(backup_path)
+            logger.info("user_preferences_migrated", users=len(data), backup_path=str(backup_path))
         except Exception as e:
-            logger.error("failed_to_save_preferences", error=str(e))
-
-    def _mark_dirty(self):
-        """Mark data as changed and flush if threshold reached."""
-        self._dirty = True
-        self._changes_since_flush += 1
-
-        if self._changes_since_flush >= self.FLUSH_THRESHOLD:
-            self._save_data()
-            logger.debug("preferences_auto_flushed", changes=self._changes_since_flush)
+            logger.error("failed_to_migrate_preferences", error=str(e))
+
+    def _get_prefs(self, user_id: str) -> dict:
+        """User settings from cache, loaded from SQLite on first access."""
+        prefs = self.preferences.get(user_id)
+        if prefs is not None:
+            return prefs
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    'SELECT key, value FROM user_preferences WHERE user_id = ?', (user_id,)
+                ).fetchall()
+            except Exception as e:
+                logger.error("failed_to_load_preferences", user_id=user_id, error=str(e))
+                return {}  # Not cached: retry on next access
+            prefs = {key: json.loads(value) for key, value in rows}
+            return self.preferences.setdefault(user_id, prefs)
+
+    def _set(self, user_id: str, **values: Any):
+        """Update cache and persist only the given keys (one transaction)."""
+        self._get_prefs(user_id)
+        with self._lock:
+            self.preferences.setdefault(user_id, {}).update(values)
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO user_preferences (user_id, key, value) VALUES (?, ?, ?)',
+                        [(user_id, key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()]
+                    )
+            except Exception as e:
+                logger.error("failed_to_save_preferences", user_id=user_id, error=str(e))
+
+    def add_schedule_listener(self, listener: Callable[[str], None]):
+        """Subscribe to changes of timezone, morning/evening digest settings and quiet hours."""
+        self._schedule_listeners.append(listener)
+
+    def _notify_schedule_changed(self, user_id: str):
+        for listener in list(self._schedule_listeners):
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.error("schedule_listener_error", user_id=user_id, error=str(e))
 
     def flush(self):
-        """Force save to disk. Call on shutdown."""
-        if self._dirty:
-            self._save_data()
-            logger.info("preferences_flushed")
+        """Writes are durable when made; kept for shutdown hooks. Checkpoints the WAL."""
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            except Exception as e:
+                logger.error("failed_to_flush_preferences", error=str(e))
 
     def get_language(self, user_id: str) -> Language:
         """
@@ -81,7 +150,7 @@ class UserPreferencesService:
         Returns:
             User's language or Russian as default
         """
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         lang_code = prefs.get("language", Language.RUSSIAN)
         try:
             return Language(lang_code)
@@ -96,11 +165,7 @@ class UserPreferencesService:
             user_id: Telegram user ID
             language: Language to set
         """
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-
-        self.preferences[user_id]["language"] = language.value
-        self._mark_dirty()
+        self._set(user_id, language=language.value)
 
         logger.info("user_language_set", user_id=user_id, language=language)
 
@@ -114,7 +179,7 @@ class UserPreferencesService:
         Returns:
             True if user has selected language, False otherwise
         """
-        return user_id in self.preferences and "language" in self.preferences[user_id]
+        return "language" in self._get_prefs(user_id)
 
     def get_timezone(self, user_id: str) -> str:
         """
@@ -126,7 +191,7 @@ class UserPreferencesService:
         Returns:
             Timezone string or default timezone from settings
         """
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("timezone", settings.default_timezone)
 
     def set_timezone(self, user_id: str, timezone: str):
@@ -137,13 +202,10 @@ class UserPreferencesService:
             user_id: Telegram user ID
             timezone: Timezone string
         """
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-
-        self.preferences[user_id]["timezone"] = timezone
-        self._mark_dirty()
+        self._set(user_id, timezone=timezone)
 
         logger.info("user_timezone_set", user_id=user_id, timezone=timezone)
+        self._notify_schedule_changed(user_id)
 
     def get_motivation_index(self, user_id: str) -> int:
         """
@@ -155,7 +217,7 @@ class UserPreferencesService:
         Returns:
             Current message index (1-60)
         """
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("motivation_index", 1)
 
     def increment_motivation_index(self, user_id: str) -> int:
@@ -169,14 +231,10 @@ class UserPreferencesService:
         Returns:
             New message index (1-60)
         """
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-
         current_index = self.get_motivation_index(user_id)
         new_index = (current_index % 60) + 1  # Cycle: 1->2->...->60->1
 
-        self.preferences[user_id]["motivation_index"] = new_index
-        self._mark_dirty()
+        self._set(user_id, motivation_index=new_index)
 
         logger.info("motivation_index_incremented", user_id=user_id, new_index=new_index)
 
@@ -184,75 +242,64 @@ class UserPreferencesService:
 
     def get_morning_summary_enabled(self, user_id: str) -> bool:
         """Get whether morning summary is enabled."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("morning_summary_enabled", True)  # Default: enabled
 
     def set_morning_summary_enabled(self, user_id: str, enabled: bool):
         """Set morning summary enabled/disabled."""
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-        self.preferences[user_id]["morning_summary_enabled"] = enabled
-        self._mark_dirty()
+        self._set(user_id, morning_summary_enabled=enabled)
         logger.info("morning_summary_toggled", user_id=user_id, enabled=enabled)
+        self._notify_schedule_changed(user_id)
 
     def get_morning_summary_time(self, user_id: str) -> str:
         """Get morning summary time (HH:MM format)."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("morning_summary_time", "07:30")
 
     def set_morning_summary_time(self, user_id: str, time: str):
         """Set morning summary time."""
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-        self.preferences[user_id]["morning_summary_time"] = time
-        self._mark_dirty()
+        self._set(user_id, morning_summary_time=time)
         logger.info("morning_summary_time_set", user_id=user_id, time=time)
+        self._notify_schedule_changed(user_id)
 
     def get_evening_digest_enabled(self, user_id: str) -> bool:
         """Get whether evening digest is enabled."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("evening_digest_enabled", True)  # Default: enabled
 
     def set_evening_digest_enabled(self, user_id: str, enabled: bool):
         """Set evening digest enabled/disabled."""
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-        self.preferences[user_id]["evening_digest_enabled"] = enabled
-        self._mark_dirty()
+        self._set(user_id, evening_digest_enabled=enabled)
         logger.info("evening_digest_toggled", user_id=user_id, enabled=enabled)
+        self._notify_schedule_changed(user_id)
 
     def get_evening_digest_time(self, user_id: str) -> str:
         """Get evening digest time (HH:MM format)."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("evening_digest_time", "20:00")
 
     def set_evening_digest_time(self, user_id: str, time: str):
         """Set evening digest time."""
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-        self.preferences[user_id]["evening_digest_time"] = time
-        self._mark_dirty()
+        self._set(user_id, evening_digest_time=time)
         logger.info("evening_digest_time_set", user_id=user_id, time=time)
+        self._notify_schedule_changed(user_id)
 
     def get_quiet_hours(self, user_id: str) -> tuple:
         """Get quiet hours as tuple (start, end) in HH:MM format."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         start = prefs.get("quiet_hours_start", "22:00")
         end = prefs.get("quiet_hours_end", "08:00")
         return (start, end)
 
     def set_quiet_hours(self, user_id: str, start: str, end: str):
         """Set quiet hours."""
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-        self.preferences[user_id]["quiet_hours_start"] = start
-        self.preferences[user_id]["quiet_hours_end"] = end
-        self._mark_dirty()
+        self._set(user_id, quiet_hours_start=start, quiet_hours_end=end)
         logger.info("quiet_hours_set", user_id=user_id, start=start, end=end)
+        self._notify_schedule_changed(user_id)
 
     def get_all_settings(self, user_id: str) -> dict:
         """Get all settings for a user."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         quiet_start, quiet_end = self.get_quiet_hours(user_id)
 
         return {
@@ -268,28 +315,22 @@ class UserPreferencesService:
 
     def get_advertising_consent(self, user_id: str) -> bool:
         """Get whether user gave advertising consent."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("advertising_consent", False)
 
     def set_advertising_consent(self, user_id: str, consent: bool):
         """Set advertising consent."""
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-        self.preferences[user_id]["advertising_consent"] = consent
-        self._mark_dirty()
+        self._set(user_id, advertising_consent=consent)
         logger.info("advertising_consent_set", user_id=user_id, consent=consent)
 
     def get_privacy_consent(self, user_id: str) -> bool:
         """Get whether user gave privacy consent."""
-        prefs = self.preferences.get(user_id, {})
+        prefs = self._get_prefs(user_id)
         return prefs.get("privacy_consent", False)
 
     def set_privacy_consent(self, user_id: str, consent: bool):
         """Set privacy consent."""
-        if user_id not in self.preferences:
-            self.preferences[user_id] = {}
-        self.preferences[user_id]["privacy_consent"] = consent
-        self._mark_dirty()
+        self._set(user_id, privacy_consent=consent)
         logger.info("privacy_consent_set", user_id=user_id, consent=consent)
 
 
@@ -0,0 +1,116 @@
+"""Incremental scanning of a JSON answer in a streamed LLM completion."""
+
+import json
+import re
+from typing import Optional, Tuple
+
+
+class StreamingJSON:
+    """
+    Tracks the first top-level JSON object/array in growing completion text.
+
+    feed() accepts the cumulative text (or a continuation) and scans only
+    the new characters, so the caller learns when the JSON value closed
+    (and can stop generation) and can read string fields while they are
+    still being written.
+
+    Examples:
+        >>> s = StreamingJSON()
+        >>> s.feed('{"intent": "clarify", "clarify_question": "Во ск')
+        >>> s.string_field("clarify_question")
+        ('Во ск', False)
+        >>> s.feed('{"intent": "clarify", "clarify_question": "Во сколько?"}')
+        >>> s.complete, s.json_text
+        (True, '{"intent": "clarify", "clarify_question": "Во сколько?"}')
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._scanned = 0
+        self._start = -1
+        self._end = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str):
+        """Update with cumulative completion text."""
+        if not text.startswith(self.text):
+            # Not a continuation: rescan from scratch
+            self.__init__()
+        self.text = text
+        self._scan()
+
+    def _scan(self):
+        text = self.text
+        i = self._scanned
+        while i < len(text) and self._end == -1:
+            ch = text[i]
+            if self._start == -1:
+                if ch in '{[':
+                    self._start = i
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = i + 1
+            i += 1
+        self._scanned = i
+
+    @property
+    def complete(self) -> bool:
+        """True once the first JSON object/array is closed."""
+        return self._end != -1
+
+    @property
+    def json_text(self) -> Optional[str]:
+        """The closed JSON value, or None while incomplete."""
+        return self.text[self._start:self._end] if self.complete else None
+
+    def string_field(self, key: str) -> Tuple[Optional[str], bool]:
+        """
+        Value of the first string field `key`, possibly still being written.
+
+        Returns:
+            (value, closed): value None if the field has not started yet
+        """
+        if self._start == -1:
+            return None, False
+        match = re.search(r'"%s"\s*:\s*"' % re.escape(key), self.text[self._start:])
+        if not match:
+            return None, False
+
+        begin = self._start + match.end()
+        raw = []
+        escape = False
+        for ch in self.text[begin:]:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                return self._decode(''.join(raw)), True
+            raw.append(ch)
+
+        value = ''.join(raw)
+        # Drop an escape sequence cut off at the end
+        value = re.sub(r'\\(u[0-9a-fA-F]{0,3})?$', '', value)
+        return self._decode(value), False
+
+    @staticmethod
+    def _decode(raw: str) -> str:
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            return raw
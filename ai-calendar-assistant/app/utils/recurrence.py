@@ -0,0 +1,185 @@
+"""RRULE helpers: build recurrence rules and expand recurring VEVENTs into a time window."""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+import pytz
+from dateutil.rrule import rruleset, rrulestr
+
+# Hard cap on occurrences expanded for a single series per query
+MAX_OCCURRENCES = 1000
+
+# Occurrence ids: "<series UID>::<RECURRENCE-ID in UTC>"
+OCCURRENCE_SEPARATOR = "::"
+_RECURRENCE_ID_FORMAT = "%Y%m%dT%H%M%SZ"
+
+RECURRENCE_FREQUENCIES = {
+    "daily": "DAILY",
+    "weekly": "WEEKLY",
+    "monthly": "MONTHLY",
+}
+
+WEEKDAYS = {
+    "mon": "MO", "tue": "TU", "wed": "WE", "thu": "TH", "fri": "FR", "sat": "SA", "sun": "SU",
+}
+
+
+def build_rrule(
+    recurrence_type: str,
+    until: Optional[datetime] = None,
+    days: Optional[List[str]] = None
+) -> Optional[dict]:
+    """
+    Build RRULE value for icalendar from EventDTO recurrence fields.
+
+    Args:
+        recurrence_type: daily, weekly or monthly
+        until: Last possible occurrence start (aware datetime)
+        days: Days of week for weekly recurrence (e.g. ['mon', 'wed'])
+
+    Returns:
+        Dict accepted by icalendar vRecur, or None for unknown type
+    """
+    freq = RECURRENCE_FREQUENCIES.get((recurrence_type or "").lower())
+    if freq is None:
+        return None
+    rule = {"FREQ": freq}
+    if until is not None:
+        rule["UNTIL"] = until.astimezone(pytz.UTC)
+    byday = [WEEKDAYS[d[:3].lower()] for d in days or [] if d and d[:3].lower() in WEEKDAYS]
+    if freq == "WEEKLY" and byday:
+        rule["BYDAY"] = byday
+    return rule
+
+
+def series_timezone(value):
+    """Timezone a series is expanded in: DTSTART's zone, UTC for UTC, floating and all-day starts."""
+    tzinfo = getattr(value, 'tzinfo', None)
+    if tzinfo is None:
+        return pytz.UTC
+    zone = getattr(tzinfo, 'zone', None)
+    # pytz attaches a fixed-offset instance; its zone gives DST transitions back
+    return pytz.timezone(zone) if zone else tzinfo
+
+
+def _to_local(value: datetime, tz) -> datetime:
+    """Aware datetime -> naive wall time in tz."""
+    return value.astimezone(tz).replace(tzinfo=None)
+
+
+def _localize(value: datetime, tz) -> datetime:
+    """Naive wall time in tz -> aware datetime (offset chosen for that date)."""
+    return tz.localize(value) if hasattr(tz, 'localize') else value.replace(tzinfo=tz)
+
+
+def is_recurring(component) -> bool:
+    """True for a VEVENT master with RRULE or RDATE."""
+    return 'rrule' in component or 'rdate' in component
+
+
+def to_utc(value) -> datetime:
+    """date/naive/aware value -> aware UTC datetime (naive and all-day values are taken as UTC)."""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if value.tzinfo is None:
+        return pytz.UTC.localize(value)
+    return value.astimezone(pytz.UTC)
+
+
+def occurrence_id(uid: str, recurrence_id) -> str:
+    """Event id of one occurrence: series UID plus its RECURRENCE-ID (original start) in UTC."""
+    return f"{uid}{OCCURRENCE_SEPARATOR}{to_utc(recurrence_id).strftime(_RECURRENCE_ID_FORMAT)}"
+
+
+def split_occurrence_id(event_id: str) -> Tuple[str, Optional[datetime]]:
+    """(series UID, RECURRENCE-ID in UTC) of an occurrence id; (event_id, None) for any other id."""
+    uid, separator, stamp = event_id.rpartition(OCCURRENCE_SEPARATOR)
+    if separator and uid:
+        try:
+            return uid, pytz.UTC.localize(datetime.strptime(stamp, _RECURRENCE_ID_FORMAT))
+        except ValueError:
+            pass
+    return event_id, None
+
+
+def _property_dates(component, name: str) -> List[datetime]:
+    """Values of a (possibly repeated) EXDATE/RDATE property as UTC datetimes."""
+    prop = component.get(name)
+    if prop is None:
+        return []
+    dates = []
+    for item in prop if isinstance(prop, list) else [prop]:
+        dates.extend(to_utc(value.dt) for value in item.dts)
+    return dates
+
+
+def occurrence_starts(
+    component,
+    time_min: datetime,
+    time_max: datetime,
+    exclude: Iterable[datetime] = (),
+    max_count: int = MAX_OCCURRENCES
+) -> List[datetime]:
+    """
+    Start times (UTC) of occurrences overlapping [time_min, time_max).
+
+    RRULE/RDATE are expanded from DTSTART in DTSTART's timezone, so BYDAY
+    and the wall-clock time hold across DST changes; each occurrence is then
+    converted to UTC. EXDATE and the given exclude starts (overridden
+    instances) are skipped.
+    """
+    raw_start = component.decoded('dtstart')
+    tz = series_timezone(raw_start)
+    dtstart = to_utc(raw_start)
+    duration = _duration(component, dtstart)
+    local_dtstart = _to_local(dtstart, tz)
+    rules = rruleset()
+    rrules = component.get('rrule')
+    for rrule in rrules if isinstance(rrules, list) else [rrules] if rrules is not None else []:
+        rules.rrule(rrulestr(_rrule_line(rrule, tz), dtstart=local_dtstart))
+    for value in _property_dates(component, 'rdate'):
+        rules.rdate(_to_local(value, tz))
+    rules.rdate(local_dtstart)
+    excluded: Set[datetime] = set(_property_dates(component, 'exdate'))
+    excluded.update(to_utc(value) for value in exclude)
+
+    starts = []
+    window_start, window_end = to_utc(time_min) - duration, to_utc(time_max)
+    # One day of slack covers any UTC offset change inside the window
+    for local_start in rules.xafter(_to_local(window_start, tz) - timedelta(days=1), inc=True):
+        start = _localize(local_start, tz).astimezone(pytz.UTC)
+        if start >= window_end or len(starts) >= max_count:
+            break
+        if start < window_start or (duration and start == window_start):
+            continue
+        if start not in excluded:
+            starts.append(start)
+    return starts
+
+
+def _duration(component, dtstart: datetime) -> timedelta:
+    """Occurrence length from DTEND or DURATION (RFC 5545 defaults otherwise)."""
+    if 'dtend' in component:
+        return to_utc(component.decoded('dtend')) - dtstart
+    if 'duration' in component:
+        return component.decoded('duration')
+    return timedelta(0) if isinstance(component.decoded('dtstart'), datetime) else timedelta(days=1)
+
+
+def _rrule_line(rrule, tz=pytz.UTC) -> str:
+    """
+    vRecur -> RRULE string for expansion in naive wall time of tz.
+
+    UNTIL is UTC in the file (RFC 5545) and is converted to tz; a date-only
+    UNTIL is widened to the end of that day in UTC.
+    """
+    line = rrule.to_ical().decode()
+    parts = []
+    for part in line.split(";"):
+        key, _, value = part.partition("=")
+        if key == "UNTIL":
+            if "T" not in value:
+                value = f"{value}T235959"
+            until = pytz.UTC.localize(datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S"))
+            value = _to_local(until, tz).strftime("%Y%m%dT%H%M%S")
+        parts.append(f"{key}={value}")
+    return ";".join(parts)
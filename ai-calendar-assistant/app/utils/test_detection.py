@@ -139,6 +139,9 @@ def mark_test_data_in_db():
 
         conn.commit()
 
+        # Re-flagged actions must drop out of the dashboard rollups
+        analytics_service.rebuild_rollups()
+
         total_marked = marked_by_id + marked_by_username
         return {
             'marked_by_id': marked_by_id,
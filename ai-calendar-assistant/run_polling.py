@@ -9,6 +9,7 @@ from telegram import Update, BotCommand
 from telegram.ext import Application, MessageHandler, CommandHandler, CallbackQueryHandler, filters
 
 from app.config import settings
+from app.services.analytics_service import analytics_service
 from app.services.telegram_handler import TelegramHandler
 from app.services.daily_reminders import DailyRemindersService
 from app.services.event_reminders_idempotent import EventRemindersServiceIdempotent
@@ -85,11 +86,8 @@ async def main():
 
     # Initialize event reminders service (30 minutes before events)
     # Uses SQLite for idempotency - survives restarts without duplicate reminders
-    # Uses dependency injection for user list (no circular imports)
-    event_reminders = EventRemindersServiceIdempotent(
-        bot=app.bot,
-        user_provider=lambda: reminders.active_users
-    )
+    # Recipients come from the shared active_users_registry
+    event_reminders = EventRemindersServiceIdempotent(bot=app.bot)
 
     # Set global reference for legacy compatibility
     import app.services.daily_reminders as dr_module
@@ -107,13 +105,9 @@ async def main():
     # Create wrapper for handle_update that accepts context
     async def handle_with_context(update: Update, context):
         # Register user for daily reminders on ANY message (idempotent - won't duplicate)
-        # Event reminders use daily_reminders.active_users as source of truth
+        # Registry lookup is in-memory; only new or changed chats are written
         if update.effective_user and update.effective_chat:
-            user_id = str(update.effective_user.id)
-            chat_id = update.effective_chat.id
-            # Only register if not already in active_users (avoid unnecessary file writes)
-            if user_id not in reminders.active_users:
-                reminders.register_user(user_id, chat_id)
+            reminders.register_user(str(update.effective_user.id), update.effective_chat.id)
 
         await handler.handle_update(update)
 
@@ -194,6 +188,7 @@ async def main():
     admin_report_task.cancel()
     followup_task.cancel()
     forum_logger.stop()
+    analytics_service.flush()
     await app.updater.stop()
     await app.stop()
     await app.shutdown()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Rebuild admin dashboard rollups from the analytics actions table.
+
+Rollups are maintained incrementally by AnalyticsService and backfilled once
+on first start. Run this after editing actions directly in SQL
+(imports, manual is_test fixes) to bring the dashboards back in sync.
+
+Usage:
+    python scripts/backfill_analytics_rollups.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.analytics_service import analytics_service
+
+
+def main():
+    """Rebuild rollups and print resulting row counts."""
+    print("🔄 Rebuilding analytics rollups...")
+    started = time.monotonic()
+    analytics_service.rebuild_rollups()
+    elapsed = time.monotonic() - started
+
+    conn = analytics_service._get_connection()
+    try:
+        for table in ('rollup_daily_user', 'rollup_daily_type', 'rollup_hourly', 'user_first_seen'):
+            count = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            print(f"  {table}: {count:,} rows")
+    finally:
+        conn.close()
+
+    print(f"\n✅ Done in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
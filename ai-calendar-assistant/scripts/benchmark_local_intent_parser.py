@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local intent parser against LLM-labelled messages.
+
+Replays a JSONL corpus (one {"text": ..., "intent": ...} object per line,
+"intent" being what the LLM returned for the message) through
+parse_intent and reports:
+- per-intent hit rate: share of messages with that LLM label answered locally
+- per-intent precision: share of local answers that agree with the LLM label
+- overall coverage and parse time in microseconds per message
+
+Messages the LLM would not send to the calendar (chit-chat, complex
+edits) should be in the corpus too — local answers to them count
+against precision.
+
+Usage:
+    python scripts/benchmark_local_intent_parser.py
+    python scripts/benchmark_local_intent_parser.py --corpus export.jsonl --repeat 20
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.local_intent_parser import parse_intent
+
+DEFAULT_CORPUS = Path(__file__).parent / "local_intent_corpus.jsonl"
+
+
+def load_corpus(path: Path) -> list:
+    """Read {"text", "intent"} records, skipping blank lines."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def run_benchmark(corpus: list, timezone: str = "Europe/Moscow", repeat: int = 5) -> dict:
+    """
+    Replay corpus through the local parser.
+
+    Args:
+        corpus: Records with "text" and the LLM "intent" label
+        timezone: User timezone passed to the parser
+        repeat: Timing passes per message (the fastest one is kept)
+
+    Returns:
+        Dict with per-intent stats, coverage, precision, timings and mismatches
+    """
+    labelled = Counter()
+    hits = Counter()
+    answered = Counter()
+    correct = Counter()
+    timings_us = []
+    mismatches = []
+
+    for record in corpus:
+        text, label = record["text"], record["intent"]
+        labelled[label] += 1
+
+        best = None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = parse_intent(text, timezone)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        timings_us.append(best * 1e6)
+
+        if result is None:
+            continue
+        intent = result[0]
+        answered[intent] += 1
+        if intent == label:
+            hits[label] += 1
+            correct[intent] += 1
+        else:
+            mismatches.append({"text": text, "label": label, "local": intent})
+
+    per_intent = {}
+    for intent in sorted(set(labelled) | set(answered)):
+        per_intent[intent] = {
+            "messages": labelled[intent],
+            "hit_rate": hits[intent] / labelled[intent] if labelled[intent] else None,
+            "answered": answered[intent],
+            "precision": correct[intent] / answered[intent] if answered[intent] else None,
+        }
+
+    total_answered = sum(answered.values())
+    timings_us.sort()
+    return {
+        "messages": len(corpus),
+        "per_intent": per_intent,
+        "coverage": total_answered / len(corpus) if corpus else 0.0,
+        "precision": sum(correct.values()) / total_answered if total_answered else None,
+        "us_per_message_mean": statistics.fmean(timings_us) if timings_us else 0.0,
+        "us_per_message_p95": timings_us[int(0.95 * (len(timings_us) - 1))] if timings_us else 0.0,
+        "mismatches": mismatches,
+    }
+
+
+def _pct(value) -> str:
+    return "     -" if value is None else f"{value * 100:5.1f}%"
+
+
+def main():
+    """Run the benchmark and print a per-intent table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="JSONL file with text/intent records")
+    parser.add_argument("--timezone", default="Europe/Moscow")
+    parser.add_argument("--repeat", type=int, default=5, help="timing passes per message")
+    args = parser.parse_args()
+
+    report = run_benchmark(load_corpus(args.corpus), args.timezone, args.repeat)
+
+    print(f"📊 Local intent parser on {report['messages']} messages ({args.corpus.name})\n")
+    print(f"  {'intent':<20} {'msgs':>5} {'hit rate':>9} {'local':>6} {'precision':>10}")
+    for intent, stats in report["per_intent"].items():
+        print(f"  {intent:<20} {stats['messages']:>5} {_pct(stats['hit_rate']):>9} "
+              f"{stats['answered']:>6} {_pct(stats['precision']):>10}")
+
+    print(f"\n  coverage:  {_pct(report['coverage'])}")
+    print(f"  precision: {_pct(report['precision'])}")
+    print(f"  parse time: {report['us_per_message_mean']:.1f} µs/message mean, "
+          f"{report['us_per_message_p95']:.1f} µs p95")
+
+    if report["mismatches"]:
+        print("\n⚠️  Local answers disagreeing with the LLM label:")
+        for item in report["mismatches"]:
+            print(f"  {item['local']:<18} (LLM: {item['label']}) {item['text']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Migrate per-file encrypted storage (*.json.enc) into one encrypted SQLite database.
+
+Files are decrypted with the configured key (ENCRYPTION_KEY or key file)
+and imported in a single transaction as rows of <data_dir>/encrypted.db,
+re-encrypted per row. Re-running is safe: existing rows are replaced.
+Todo files (user_*.json) are indexed by their earliest open due date,
+as TodosService writes them, so get_due_todos finds migrated users.
+
+After migrating todos, set TODOS_STORAGE=sqlite.
+
+Usage:
+    python scripts/migrate_encrypted_storage_to_sqlite.py DATA_DIR [--remove] [--dry-run]
+
+Options:
+    --remove     Delete migrated files after a successful import
+    --dry-run    Show what would be migrated without making changes
+"""
+
+import sys
+import argparse
+from typing import Optional
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.encrypted_storage import EncryptedSQLiteStorage
+from app.services.todos_service import TodosService
+
+
+def todos_index(filename: str, data) -> Optional[str]:
+    """Due-date index for todo files, none for anything else."""
+    if filename.startswith("user_") and isinstance(data, dict):
+        return TodosService.storage_index(data)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate encrypted files to encrypted SQLite storage")
+    parser.add_argument("data_dir", help="Directory with *.json.enc files (e.g. /var/lib/calendar-bot/todos)")
+    parser.add_argument("--remove", action="store_true", help="Delete files after import")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be migrated")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    if not data_dir.is_dir():
+        print(f"❌ Not a directory: {data_dir}")
+        sys.exit(1)
+
+    files = sorted(p.name for p in data_dir.glob("*.enc")) + sorted(p.name for p in data_dir.glob("*.json"))
+    print(f"📁 {data_dir}: {len(files)} files to migrate")
+
+    if args.dry_run:
+        for name in files[:20]:
+            print(f"  {name}")
+        if len(files) > 20:
+            print(f"  ... and {len(files) - 20} more")
+        print("\n🔍 Dry run - no changes made")
+        return
+
+    storage = EncryptedSQLiteStorage(data_dir=str(data_dir))
+    try:
+        count = storage.import_files(remove=args.remove, index=todos_index)
+    finally:
+        storage.close()
+
+    print(f"\n✅ Imported {count} files into {storage.db_path}")
+    if args.remove:
+        print("🗑️  Source files removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,11 @@ These tests validate that common queries are handled locally
 without needing an LLM call.
 """
 
+import sys
+from pathlib import Path
+
 import pytest
+import pytz
 from datetime import datetime, timedelta
 
 from app.services.local_intent_parser import parse_intent
@@ -68,6 +72,25 @@ class TestQueryIntent:
         assert params["query_date_start"].date() == today
         assert params["query_date_end"].date() == today + timedelta(days=7)
 
+    def test_query_weekday(self):
+        _, params, _ = parse_intent("что у меня в пятницу")
+        today = datetime.now().date()
+        start = params["query_date_start"].date()
+        assert start.weekday() == 4
+        assert 0 < (start - today).days <= 7
+        assert params["query_date_end"].date() == start
+
+    def test_query_next_week(self):
+        _, params, _ = parse_intent("какие планы на следующую неделю")
+        start = params["query_date_start"].date()
+        assert start.weekday() == 0
+        assert start > datetime.now().date()
+        assert params["query_date_end"].date() == start + timedelta(days=7)
+
+    def test_show_schedule_with_day(self):
+        _, params, _ = parse_intent("покажи расписание на завтра")
+        assert params["query_date_start"].date() == (datetime.now() + timedelta(days=1)).date()
+
 
 class TestTodoIntent:
     """Test todo (task without time) intent detection."""
@@ -163,6 +186,157 @@ class TestCreateIntent:
         assert "завтра" not in params["title"].lower()
         assert "клиент" in params["title"].lower()
 
+    @pytest.mark.parametrize("text,hour", [
+        ("Ужин в 7 вечера", 19),
+        ("Созвон в 3 дня", 15),
+        ("Тренировка в 8 утра", 8),
+        ("Совещание в 15 часов", 15),
+    ])
+    def test_create_time_words(self, text, hour):
+        intent, params, _ = parse_intent(text)
+        assert intent == "create"
+        assert params["start_time"].hour == hour
+        assert params["title"] == text.split()[0]
+
+    @pytest.mark.parametrize("text,hour", [
+        ("Встреча в 12 часов ночи", 0),
+        ("Встреча в 11 ночи", 23),
+        ("Встреча в 2 ночи", 2),
+    ])
+    def test_create_night_hours(self, text, hour):
+        _, params, _ = parse_intent(text)
+        assert params["start_time"].hour == hour
+        assert params["title"] == "Встреча"
+
+    @pytest.mark.parametrize("text", [
+        "встреча через 2 часа",
+        "созвон через 1 час",
+        "обед через 2 часа",
+        "встреча на 2 часа завтра в 10:00",
+        "встреча завтра в 10:00 на 30 минут",
+        "совещание 2 часа в 10:00",
+    ])
+    def test_relative_times_and_durations_fall_through(self, text):
+        assert parse_intent(text) is None
+
+    def test_create_day_after_tomorrow(self):
+        _, params, _ = parse_intent("Встреча послезавтра в 12:00")
+        assert params["title"] == "Встреча"
+        moscow_today = datetime.now(pytz.timezone("Europe/Moscow")).date()
+        assert params["start_time"].date() == moscow_today + timedelta(days=2)
+
+    @pytest.mark.parametrize("text", [
+        "встреча в 10:00 23 октября",
+        "встреча 23.10 в 15:00",
+        "встреча 23.10.2026 в 15:00",
+        "встреча 23 числа в 10:00",
+        "каждый понедельник с 23 октября в 10:00",
+    ])
+    def test_calendar_dates_fall_through(self, text):
+        assert parse_intent(text) is None
+
+    def test_day_keyword_needs_whole_word(self):
+        # "завтрак" is a title, not "завтра": the date follows the past-time rule only
+        _, params, _ = parse_intent("Завтрак в 9:00")
+        assert params["title"] == "Завтрак"
+        now = datetime.now(pytz.timezone("Europe/Moscow"))
+        expected = now.date() if now.hour < 9 else now.date() + timedelta(days=1)
+        assert params["start_time"].date() == expected
+
+    @pytest.mark.parametrize("text", [
+        "Перенеси показ на 16:00",
+        "Завтра в 10:00 встреча, в 12:00 показ",
+    ])
+    def test_edits_and_batches_not_create(self, text):
+        assert parse_intent(text) is None
+
+
+class TestRecurringIntent:
+    """Test create_recurring intent detection."""
+
+    def test_weekly(self):
+        intent, params, confidence = parse_intent("Каждый понедельник в 10:00 планерка")
+        assert intent == "create_recurring"
+        assert confidence >= 0.85
+        assert params["title"] == "планерка"
+        assert params["recurrence_type"] == "weekly"
+        assert params["recurrence_days"] == ["mon"]
+        assert params["start_time"].weekday() == 0
+        assert (params["start_time"].hour, params["start_time"].minute) == (10, 0)
+        assert params["recurrence_end_date"].date() == params["start_time"].date().replace(month=12, day=31)
+
+    def test_several_weekdays(self):
+        _, params, _ = parse_intent("по средам и пятницам в 19:00 тренировка")
+        assert params["recurrence_days"] == ["wed", "fri"]
+        assert params["title"] == "тренировка"
+
+    def test_daily(self):
+        _, params, _ = parse_intent("ежедневно в 9 утра зарядка")
+        assert params["recurrence_type"] == "daily"
+        assert "recurrence_days" not in params
+        assert params["start_time"].hour == 9
+
+    @pytest.mark.parametrize("text", [
+        "Повтори это событие каждую неделю",
+        "Йога по вторникам",
+        "Удали каждый понедельник в 10:00 планерку",
+    ])
+    def test_not_recurring(self, text):
+        result = parse_intent(text)
+        assert result is None or result[0] != "create_recurring"
+
+    @pytest.mark.parametrize("text", [
+        "каждый день кроме субботы в 9:00 зарядка",
+        "каждый день в 9:00 зарядка до конца месяца",
+        "каждый день в 10:00 встреча в течение недели",
+        "каждый день в 9:00 зарядка раз в два дня",
+    ])
+    def test_unsupported_qualifiers_fall_through(self, text):
+        assert parse_intent(text) is None
+
+    @pytest.mark.parametrize("text", [
+        "каждый месяц в 10:00 встреча",
+        "каждые две недели в 10:00 встреча",
+        "созвон в 10:00 каждую неделю",
+        "ежемесячно в 10:00 встреча",
+    ])
+    def test_unparsed_recurrence_is_not_single_event(self, text):
+        assert parse_intent(text) is None
+
+
+class TestDeleteIntent:
+    """Test delete_duplicates / delete_by_criteria detection."""
+
+    @pytest.mark.parametrize("text", ["Удали дубликаты", "удали все дубли", "почисти дубликаты"])
+    def test_delete_duplicates(self, text):
+        assert parse_intent(text) == ("delete_duplicates", {}, 0.95)
+
+    def test_delete_by_title(self):
+        intent, params, _ = parse_intent("Удали все показы")
+        assert intent == "delete_by_criteria"
+        assert params["delete_criteria_title_contains"] == "показ"
+
+    @pytest.mark.parametrize("text,stem", [
+        ("убери все созвоны", "созвон"),
+        ("удали все звонки", "звонк"),
+        ("удали все тренировки", "тренировк"),
+    ])
+    def test_delete_by_event_noun(self, text, stem):
+        assert parse_intent(text) == ("delete_by_criteria", {"delete_criteria_title_contains": stem}, 0.90)
+
+    @pytest.mark.parametrize("text", [
+        "Удали все события на понедельник",
+        "удали все встречи",
+        "удали все завтра",
+        "удали все завтрашние",
+        "удали все сегодняшние",
+        "удали все прошедшие",
+        "удали все повторяющиеся",
+        "удали все мои",
+    ])
+    def test_generic_delete_falls_through(self, text):
+        assert parse_intent(text) is None
+
 
 class TestFreeSlotsIntent:
     """Test free slots intent detection."""
@@ -175,6 +349,7 @@ class TestFreeSlotsIntent:
         "Есть ли свободное время",
         "Найди свободное время",
         "свободные окна",
+        "Когда я свободен в среду?",
     ])
     def test_free_slots_detected(self, text):
         result = parse_intent(text)
@@ -183,6 +358,10 @@ class TestFreeSlotsIntent:
         assert intent == "find_free_slots", f"Expected 'find_free_slots', got '{intent}' for: '{text}'"
         assert confidence >= 0.85
 
+    def test_free_slots_day_after_tomorrow(self):
+        _, params, _ = parse_intent("свободное время послезавтра")
+        assert params["query_date_start"].date() == (datetime.now() + timedelta(days=2)).date()
+
 
 class TestFallbackToLLM:
     """Test that ambiguous/complex queries fall through to LLM."""
@@ -240,3 +419,20 @@ class TestEdgeCases:
         # Should still detect query
         if result:
             assert result[0] == "query"
+
+
+class TestBenchmarkCorpus:
+    """The seed corpus replays without disagreeing with the LLM labels."""
+
+    def test_precision_on_seed_corpus(self):
+        scripts = Path(__file__).parent.parent / "scripts"
+        sys.path.insert(0, str(scripts))
+        try:
+            from benchmark_local_intent_parser import DEFAULT_CORPUS, load_corpus, run_benchmark
+        finally:
+            sys.path.remove(str(scripts))
+
+        report = run_benchmark(load_corpus(DEFAULT_CORPUS), repeat=1)
+        assert report["mismatches"] == []
+        assert report["precision"] == 1.0
+        assert report["per_intent"]["query"]["hit_rate"] == 1.0
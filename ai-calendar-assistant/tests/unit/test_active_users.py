@@ -0,0 +1,76 @@
+"""
+Unit tests for the shared ActiveUsersRegistry.
+"""
+
+import sqlite3
+import pytest
+from unittest.mock import patch
+
+from app.services.active_users import ActiveUsersRegistry
+from app.services.analytics_service import AnalyticsService
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    """Analytics service on a temp database used by the registry."""
+    service = AnalyticsService(db_path=str(tmp_path / "analytics.db"), buffered=False)
+    with patch("app.services.active_users.analytics_service", service):
+        yield service
+
+
+@pytest.fixture
+def registry(analytics):
+    """Registry with a change recorder."""
+    registry = ActiveUsersRegistry()
+    registry.changes = []
+    registry.add_listener(lambda user_id, chat_id: registry.changes.append((user_id, chat_id)))
+    return registry
+
+
+class TestActiveUsersRegistry:
+    """Test register/unregister, notifications and reload."""
+
+    def test_register_writes_once(self, registry, analytics):
+        """Test repeated registration with the same chat is an in-memory no-op."""
+        with patch.object(analytics, "ensure_user", wraps=analytics.ensure_user) as ensure_user:
+            assert registry.register("1", 100)
+            assert not registry.register("1", 100)
+            assert registry.register("1", 101)  # Chat changed
+
+        assert ensure_user.call_count == 2
+        assert registry.changes == [("1", 100), ("1", 101)]
+        assert analytics.get_active_users() == {"1": 101}
+
+    def test_unregister_notifies_and_deactivates(self, registry, analytics):
+        """Test removal is persisted and reported with chat_id None."""
+        registry.register("1", 100)
+        assert registry.unregister("1")
+        assert not registry.unregister("1")
+
+        assert "1" not in registry and len(registry) == 0
+        assert registry.changes[-1] == ("1", None)
+        assert analytics.get_active_users() == {}
+
+    def test_reload_notifies_only_differences(self, registry, analytics):
+        """Test users changed by another process are picked up on reload."""
+        registry.register("1", 100)
+        registry.register("2", 200)
+        registry.changes.clear()
+
+        analytics.deactivate_user("1")
+        analytics.ensure_user("3", 300)
+        registry.reload()
+
+        assert sorted(registry.changes, key=str) == [("1", None), ("3", 300)]
+        assert registry.snapshot() == {"2": 200, "3": 300}
+
+    def test_active_users_query_uses_index(self, analytics):
+        """Test the active-users scan is served by the partial index."""
+        conn = sqlite3.connect(str(analytics.db_path))
+        plan = " ".join(
+            row[-1] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT user_id, chat_id FROM users WHERE is_active = 1"
+            )
+        )
+        conn.close()
+        assert "idx_users_active" in plan
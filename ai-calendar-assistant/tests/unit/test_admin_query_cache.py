@@ -0,0 +1,91 @@
+"""
+Unit tests for AdminQueryCache (executor offload, TTL cache, coalescing).
+"""
+
+import asyncio
+import threading
+import pytest
+
+from app.services.admin_query_cache import AdminQueryCache
+
+
+class SlowQuery:
+    """Counts calls and blocks until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, days):
+        self.calls += 1
+        self.release.wait(timeout=5)
+        return {"days": days, "thread": threading.current_thread().name}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_query():
+    """Test concurrent callers for the same key coalesce and run off the loop."""
+    cache = AdminQueryCache()
+    query = SlowQuery()
+
+    tasks = [asyncio.create_task(cache.run(query, 30)) for _ in range(3)]
+    await asyncio.sleep(0.05)  # Loop stays responsive while the query blocks
+    query.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert query.calls == 1
+    assert results[0] is results[1] is results[2]
+    assert results[0]["thread"].startswith("admin-query")
+
+
+@pytest.mark.asyncio
+async def test_results_cached_per_arguments_until_ttl():
+    """Test cache hits within TTL, separate keys per arguments, refresh after TTL."""
+    cache = AdminQueryCache(ttl_seconds=60)
+    query = SlowQuery()
+    query.release.set()
+
+    await cache.run(query, 30)
+    await cache.run(query, 30)
+    assert query.calls == 1
+
+    await cache.run(query, 7)
+    assert query.calls == 2
+
+    cache.ttl_seconds = 0
+    await cache.run(query, 30)
+    assert query.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached():
+    """Test a failing query is retried on the next request."""
+    cache = AdminQueryCache()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await cache.run(flaky)
+    assert await cache.run(flaky) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_clear_drops_results_and_in_flight_queries():
+    """Test a query started before clear() is neither cached nor joined afterwards."""
+    cache = AdminQueryCache(ttl_seconds=60)
+    query = SlowQuery()
+
+    before = asyncio.create_task(cache.run(query, 30))
+    await asyncio.sleep(0.05)
+    cache.clear()  # e.g. after toggling a user's hidden flag
+    query.release.set()
+    await before
+
+    after = await cache.run(query, 30)
+    assert query.calls == 2
+    assert await cache.run(query, 30) is after
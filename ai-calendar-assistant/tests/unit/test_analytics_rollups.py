@@ -0,0 +1,115 @@
+"""
+Unit tests for AnalyticsService dashboard rollups.
+"""
+
+import sqlite3
+import pytest
+from datetime import datetime, timedelta
+
+from app.models.analytics import ActionType
+from app.services.analytics_service import AnalyticsService
+
+ROLLUP_TABLES = ('rollup_daily_user', 'rollup_daily_type', 'rollup_hourly', 'user_first_seen')
+
+
+def _dump_rollups(service):
+    conn = sqlite3.connect(str(service.db_path))
+    try:
+        return {
+            table: sorted(conn.execute(f'SELECT * FROM {table}').fetchall())
+            for table in ROLLUP_TABLES
+        }
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    """Analytics service with live-logged actions."""
+    service = AnalyticsService(db_path=str(tmp_path / "analytics.db"))
+    service.ensure_user("1", 100, username="alice")
+    service.ensure_user("2", 200)
+
+    service.log_action("1", ActionType.USER_LOGIN, is_test=False)
+    service.log_action("1", ActionType.TEXT_MESSAGE, is_test=False)
+    service.log_action("1", ActionType.EVENT_CREATE, is_test=False)
+    service.log_action("1", ActionType.LLM_REQUEST, total_tokens=100, cost_rub=0.5,
+                       llm_model="yandexgpt", is_test=False)
+    service.log_action("2", ActionType.VOICE_MESSAGE, success=False, is_test=False)
+    service.log_action("2", ActionType.LLM_REQUEST, total_tokens=50, cost_rub=0.25, is_test=False)
+    service.log_action("3", ActionType.TEXT_MESSAGE, is_test=True)
+    service.flush()
+    return service
+
+
+class TestRollupMaintenance:
+    """Test incremental rollups stay equal to a full rebuild."""
+
+    def test_incremental_matches_rebuild(self, analytics):
+        """Test rollups written with each batch equal those recomputed from actions."""
+        incremental = _dump_rollups(analytics)
+        analytics.rebuild_rollups()
+
+        assert incremental == _dump_rollups(analytics)
+        assert len(incremental['user_first_seen']) == 2  # Test user excluded
+
+    def test_backfill_on_first_start(self, tmp_path):
+        """Test a database from before rollups is backfilled on init."""
+        db_path = tmp_path / "analytics.db"
+        AnalyticsService(db_path=str(db_path))
+        conn = sqlite3.connect(str(db_path))
+        old_day = (datetime.now() - timedelta(days=3)).isoformat()
+        conn.execute(
+            "INSERT INTO actions (user_id, action_type, timestamp, is_test) VALUES ('7', 'text_message', ?, 0)",
+            (old_day,)
+        )
+        conn.execute('PRAGMA user_version = 0')
+        conn.commit()
+        conn.close()
+
+        service = AnalyticsService(db_path=str(db_path))
+
+        assert _dump_rollups(service)['user_first_seen'] == [('7', old_day[:10])]
+
+
+class TestDashboardsFromRollups:
+    """Test dashboard readers over rollup tables."""
+
+    def test_dashboard_and_admin_stats(self, analytics):
+        """Test totals exclude test data."""
+        stats = analytics.get_dashboard_stats()
+        assert (stats.total_users, stats.active_users_today) == (2, 2)
+        assert (stats.total_events, stats.events_today, stats.events_week) == (1, 1, 1)
+        assert (stats.total_messages, stats.messages_today) == (2, 2)
+        assert (stats.total_errors, stats.errors_today) == (1, 1)
+
+        admin = analytics.get_admin_stats()
+        assert (admin.total_logins, admin.total_actions, admin.total_users) == (1, 6, 2)
+        assert (admin.total_events_created, admin.total_messages) == (1, 2)
+
+    def test_daily_timeline_and_llm_costs(self, analytics):
+        """Test per-day timeline and LLM breakdown by model and user."""
+        today = datetime.now().strftime('%Y-%m-%d')
+        timeline = {d['date']: d for d in analytics.get_daily_timeline(7)}
+        assert timeline[today] == {
+            'date': today, 'actions': 6, 'users': 2, 'events': 1, 'messages': 2, 'errors': 1
+        }
+
+        costs = analytics.get_llm_cost_breakdown(7)
+        assert set(costs['by_model']) == {'yandexgpt', 'unknown'}
+        assert costs['totals']['requests'] == 2 and costs['totals']['tokens'] == 150
+        assert [u['user_id'] for u in costs['by_user']] == ['1', '2']
+        assert costs['by_user'][0]['username'] == 'alice'
+
+    def test_engagement_metrics(self, analytics):
+        """Test DAU, segments and cohort counts."""
+        metrics = analytics.get_user_engagement_metrics(30)
+        assert metrics['dau'][-1]['count'] == 2
+        assert (metrics['wau'], metrics['mau']) == (2, 2)
+        assert metrics['segments']['casual_users'] == 2
+        assert metrics['segments']['dormant_users'] == 0
+        assert metrics['new_users'] == {'today': 2, 'this_week': 2, 'this_month': 2}
+
+    def test_activity_timeline(self, analytics):
+        """Test hourly rollup feeds the activity timeline."""
+        assert sum(point.value for point in analytics.get_activity_timeline(24)) == 6
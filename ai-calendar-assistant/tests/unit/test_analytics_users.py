@@ -0,0 +1,96 @@
+"""
+Unit tests for AnalyticsService write-behind logging and get_all_users_details.
+"""
+
+import queue
+import sqlite3
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from app.models.analytics import ActionType
+from app.services.analytics_service import AnalyticsService
+
+
+@pytest.fixture
+def analytics(tmp_path):
+    """Analytics service with a few users and actions."""
+    service = AnalyticsService(db_path=str(tmp_path / "analytics.db"))
+    service.ensure_user("1", 100, username="alice")
+    service.ensure_user("2", 200)
+    service.ensure_user("3", 300)  # Never acted
+
+    for _ in range(3):
+        service.log_action("1", ActionType.TEXT_MESSAGE, is_test=False)
+    service.log_action("1", ActionType.USER_LOGIN, is_test=False)
+    service.log_action("2", ActionType.TEXT_MESSAGE, is_test=False)
+    service.log_action("2", ActionType.TEXT_MESSAGE, is_test=True)
+    service.log_action("4", ActionType.TEXT_MESSAGE, is_test=False)  # Not in users table
+    service.flush()
+
+    # Older activity on another day for active_days counting
+    conn = sqlite3.connect(str(service.db_path))
+    conn.execute(
+        "INSERT INTO actions (user_id, action_type, timestamp, is_test) VALUES (?, ?, ?, 0)",
+        ("1", "text_message", (datetime.now() - timedelta(days=2)).isoformat())
+    )
+    conn.commit()
+    conn.close()
+    return service
+
+
+class TestBufferedWrites:
+    """Test queued log_action writes."""
+
+    def test_flush_writes_batch_and_coalesces_last_seen(self, tmp_path):
+        """Test queued actions land in one batch with latest user fields."""
+        service = AnalyticsService(db_path=str(tmp_path / "analytics.db"))
+        service.ensure_user("1", 100)
+        service.log_action("1", ActionType.TEXT_MESSAGE, username="old", is_test=False)
+        service.log_action("1", ActionType.TEXT_MESSAGE, first_name="Alice", is_test=False)
+        service.flush()
+
+        assert service.get_user_action_count("1") == 2
+        user = service.get_all_users_details()[0]
+        assert (user.username, user.first_name) == ("old", "Alice")
+
+    def test_full_queue_writes_inline(self, tmp_path):
+        """Test log_action still stores the action when the queue is full."""
+        service = AnalyticsService(db_path=str(tmp_path / "analytics.db"))
+        service._writer_thread = Mock(is_alive=Mock(return_value=True))  # Stalled writer
+        service._write_queue = queue.Queue(maxsize=1)
+        service._write_queue.put_nowait(None)
+        service.log_action("1", ActionType.TEXT_MESSAGE, is_test=False)
+
+        assert service.get_user_action_count("1") == 1
+
+
+class TestGetAllUsersDetails:
+    """Test set-based aggregation, sorting and pagination."""
+
+    def test_aggregates_per_user(self, analytics):
+        """Test metrics match per-user counts and test actions are excluded."""
+        users = {u.user_id: u for u in analytics.get_all_users_details()}
+
+        assert set(users) == {"1", "2", "3", "4"}
+        alice = users["1"]
+        assert alice.username == "alice" and alice.telegram_link == "https://t.me/alice"
+        assert (alice.total_actions, alice.total_logins, alice.actions_today) == (5, 1, 4)
+        assert alice.active_days_week == 2
+        assert users["2"].total_actions == 1
+        assert users["3"].total_actions == 0 and not users["3"].is_active_today
+        assert users["4"].username is None
+
+    def test_sorted_and_paginated_in_sql(self, analytics):
+        """Test default order is most active first and limit/offset page through it."""
+        ordered = [u.user_id for u in analytics.get_all_users_details()]
+        assert ordered[0] == "1"
+        assert ordered[-1] == "3"
+
+        page = analytics.get_all_users_details(limit=2, offset=1)
+        assert [u.user_id for u in page] == ordered[1:3]
+
+    def test_unknown_sort_rejected(self, analytics):
+        """Test sort key is whitelisted."""
+        with pytest.raises(ValueError):
+            analytics.get_all_users_details(sort_by="user_id; DROP TABLE users")
@@ -0,0 +1,176 @@
+"""
+Unit tests for AsyncCalDAVClient and the async CalDAV path of RadicaleService.
+"""
+
+import httpx
+import pytest
+from datetime import datetime, timedelta
+import pytz
+
+from app.schemas.events import EventDTO
+from app.services.caldav_async import AsyncCalDAVClient, CalDAVUnavailableError
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_radicale import CalendarServiceError, RadicaleService
+from app.utils.recurrence import occurrence_id
+
+BASE_URL = "http://radicale:5232"
+CAL_URL = f"{BASE_URL}/bot/telegram_1/"
+MSK = pytz.timezone("Europe/Moscow")
+
+
+def _client(handler) -> AsyncCalDAVClient:
+    """AsyncCalDAVClient answering through an in-process transport."""
+    client = AsyncCalDAVClient(BASE_URL, "bot", "secret")
+    client.RETRY_DELAY_SECONDS = 0
+    client._http_client = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestAsyncCalDAVClient:
+    """Test transport, retries and pool configuration."""
+
+    async def test_pool_and_timeouts_configured(self):
+        """Test lazily created client has bounded pool and connect timeout."""
+        client = AsyncCalDAVClient(BASE_URL, "bot", "secret")
+        http_client = await client._get_http_client()
+        try:
+            assert http_client.timeout.connect == AsyncCalDAVClient.CONNECT_TIMEOUT_SECONDS
+            assert http_client.timeout.read == AsyncCalDAVClient.REQUEST_TIMEOUT_SECONDS
+            assert await client._get_http_client() is http_client
+        finally:
+            await client.close()
+        assert client._http_client is None
+
+    async def test_retries_on_503(self):
+        """Test idempotent request is retried on 503."""
+        statuses = [503, 207]
+
+        def handler(request):
+            assert request.headers["Depth"] == "0"
+            return httpx.Response(statuses.pop(0), content=b"<multistatus/>")
+
+        client = _client(handler)
+        response = await client.request("PROPFIND", CAL_URL, "<propfind/>", depth="0")
+
+        assert response.status_code == 207
+        assert statuses == []
+
+    async def test_raises_after_transport_errors(self):
+        """Test CalDAVUnavailableError after all retries fail."""
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            raise httpx.ConnectError("refused")
+
+        client = _client(handler)
+        with pytest.raises(CalDAVUnavailableError):
+            await client.request("GET", f"{CAL_URL}a.ics")
+
+        assert len(calls) == AsyncCalDAVClient.MAX_RETRIES + 1
+
+    async def test_non_idempotent_not_retried(self):
+        """Test MKCALENDAR is sent once."""
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503)
+
+        client = _client(handler)
+        with pytest.raises(CalDAVUnavailableError):
+            await client.request("MKCALENDAR", CAL_URL)
+
+        assert calls == ["MKCALENDAR"]
+
+
+class TestRadicaleAsyncPath:
+    """Test RadicaleService create/delete over AsyncCalDAVClient."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        index = CalendarIndex(str(tmp_path / "calendar_index.json"))
+        index.set("1", CAL_URL)
+        return RadicaleService(calendar_index=index)
+
+    async def test_create_is_single_put(self, service):
+        """Test create PUTs a new object into the indexed calendar."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(201)
+
+        service._async_client = _client(handler)
+        service._sync_engine = None
+        service._list_events_sync = lambda *args: []
+
+        now = datetime.now(MSK)
+        uid = await service.create_event("1", EventDTO(title="Call", start_time=now + timedelta(days=1)))
+
+        assert [r.method for r in requests] == ["PUT"]
+        assert str(requests[0].url) == f"{CAL_URL}{uid}.ics"
+        assert requests[0].headers["If-None-Match"] == "*"
+        assert service._get_event_href("1", uid) == f"{CAL_URL}{uid}.ics"
+
+    async def test_delete_known_href_is_single_delete(self, service):
+        """Test delete of a known object sends one DELETE."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(204)
+
+        service._async_client = _client(handler)
+        service._remember_event_href("1", "abc", f"{CAL_URL}abc.ics")
+
+        assert await service.delete_event("1", "abc") is True
+        assert [(r.method, str(r.url)) for r in requests] == [("DELETE", f"{CAL_URL}abc.ics")]
+        assert service._get_event_href("1", "abc") is None
+
+    async def test_delete_occurrence_adds_exdate(self, service):
+        """Test deleting one occurrence rewrites the series with EXDATE instead of deleting it."""
+        requests = []
+        series = (
+            "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nBEGIN:VEVENT\r\nUID:s\r\nSUMMARY:Gym\r\n"
+            "DTSTART:20260105T070000Z\r\nDTEND:20260105T080000Z\r\nRRULE:FREQ=DAILY;COUNT=5\r\n"
+            "END:VEVENT\r\nEND:VCALENDAR\r\n"
+        )
+
+        def handler(request):
+            requests.append(request)
+            if request.method == "GET":
+                return httpx.Response(200, content=series.encode(), headers={"ETag": '"v1"'})
+            return httpx.Response(204)
+
+        service._async_client = _client(handler)
+        service._remember_event_href("1", "s", f"{CAL_URL}s.ics")
+
+        event_id = occurrence_id("s", datetime(2026, 1, 6, 7, 0, tzinfo=pytz.UTC))
+        assert await service.delete_event("1", event_id) is True
+        assert [r.method for r in requests] == ["GET", "PUT"]
+        assert requests[1].headers["If-Match"] == '"v1"'
+        assert b"EXDATE:20260106T070000Z" in requests[1].content
+        assert b"RRULE:FREQ=DAILY;COUNT=5" in requests[1].content
+
+        # Not an occurrence of the series: nothing is written
+        requests.clear()
+        missing = occurrence_id("s", datetime(2026, 1, 6, 9, 0, tzinfo=pytz.UTC))
+        assert await service.delete_event("1", missing) is False
+        assert [r.method for r in requests] == ["GET"]
+
+    async def test_failure_keeps_other_users_cached(self, service):
+        """Test a failing request does not evict other users' calendars or events."""
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        service._async_client = _client(handler)
+        service._calendar_cache["2"] = (object(), 0)
+        now = datetime.now(MSK)
+        service._event_cache.put("2", now, now + timedelta(days=1), [])
+
+        with pytest.raises(CalendarServiceError):
+            await service.delete_event("1", "abc")
+
+        assert "2" in service._calendar_cache
+        assert service._event_cache.get("2", now, now + timedelta(hours=1)) == []
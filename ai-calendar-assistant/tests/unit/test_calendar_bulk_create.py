@@ -0,0 +1,73 @@
+"""
+Unit tests for RadicaleService.create_events_bulk.
+"""
+
+import httpx
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+import pytz
+
+from app.schemas.events import EventDTO
+from app.services.caldav_async import AsyncCalDAVClient
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_radicale import RadicaleService
+
+BASE_URL = "http://radicale:5232"
+CAL_URL = f"{BASE_URL}/bot/telegram_1/"
+MSK = pytz.timezone("Europe/Moscow")
+
+
+class TestCreateEventsBulk:
+    """Test bulk creation over the async client."""
+
+    @pytest.fixture
+    def puts(self):
+        return []
+
+    @pytest.fixture
+    def service(self, tmp_path, puts):
+        index = CalendarIndex(str(tmp_path / "calendar_index.json"))
+        index.set("1", CAL_URL)
+        service = RadicaleService(calendar_index=index)
+
+        def handler(request):
+            puts.append(request)
+            # Fail the object whose body mentions "Broken"
+            return httpx.Response(500 if b"Broken" in request.content else 201)
+
+        client = AsyncCalDAVClient(BASE_URL)
+        client.RETRY_DELAY_SECONDS = 0
+        client._http_client = httpx.AsyncClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+        service._async_client = client
+        return service
+
+    async def test_results_in_input_order_with_partial_failure(self, service, puts):
+        """Test per-item results keep input order and report failures as None."""
+        start = datetime.now(MSK) + timedelta(days=1)
+        events = [
+            EventDTO(title="Standup", start_time=start),
+            EventDTO(title="Broken", start_time=start + timedelta(days=1)),
+            EventDTO(title="No time"),
+            EventDTO(title="Review", start_time=start + timedelta(days=2)),
+        ]
+        with patch.object(service, '_find_conflicts_async', new=AsyncMock(return_value=[])):
+            uids = await service.create_events_bulk("1", events)
+
+        assert uids[0] and uids[3]
+        assert uids[1] is None and uids[2] is None
+        assert {str(r.url) for r in puts if r.method == "PUT"} >= {f"{CAL_URL}{uids[0]}.ics", f"{CAL_URL}{uids[3]}.ics"}
+
+    async def test_single_conflict_scan_over_union_window(self, service):
+        """Test conflicts are looked up once for the whole batch."""
+        start = datetime.now(MSK) + timedelta(days=1)
+        events = [EventDTO(title=f"Lesson {i}", start_time=start + timedelta(weeks=i)) for i in range(30)]
+        scan = AsyncMock(return_value=[])
+        with patch.object(service, '_find_conflicts_async', new=scan):
+            uids = await service.create_events_bulk("1", events)
+
+        assert all(uids)
+        scan.assert_awaited_once()
+        _, window_start, window_end = scan.await_args.args
+        assert window_start == start.astimezone(pytz.UTC)
+        assert window_end == (start + timedelta(weeks=29, hours=1)).astimezone(pytz.UTC)
@@ -0,0 +1,142 @@
+"""
+Unit tests for calendar URL index and direct calendar resolution in RadicaleService.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from caldav.lib.error import NotFoundError
+
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_radicale import RadicaleService
+
+
+class TestCalendarIndex:
+    """Test CalendarIndex persistence."""
+
+    def test_set_and_reload(self, tmp_path):
+        """Test URLs survive reload from disk."""
+        index_file = tmp_path / "calendar_index.json"
+        index = CalendarIndex(str(index_file))
+        index.set("123", "http://radicale/bot/telegram_123/")
+
+        reloaded = CalendarIndex(str(index_file))
+        assert reloaded.get("123") == "http://radicale/bot/telegram_123/"
+        assert reloaded.migrated is False
+
+    def test_import_legacy_keeps_existing_entries(self, tmp_path):
+        """Test legacy import does not override fresher entries and marks migration done."""
+        index = CalendarIndex(str(tmp_path / "calendar_index.json"))
+        index.set("1", "http://radicale/bot/telegram_1/")
+
+        index.import_legacy({"1": "http://radicale/bot/old-uuid/", "2": "http://radicale/bot/other-uuid/"})
+
+        reloaded = CalendarIndex(str(tmp_path / "calendar_index.json"))
+        assert reloaded.migrated is True
+        assert reloaded.get("1") == "http://radicale/bot/telegram_1/"
+        assert reloaded.get("2") == "http://radicale/bot/other-uuid/"
+
+    def test_remove(self, tmp_path):
+        """Test removing entry."""
+        index = CalendarIndex(str(tmp_path / "calendar_index.json"))
+        index.set("1", "http://radicale/bot/telegram_1/")
+        index.remove("1")
+        assert index.get("1") is None
+
+
+class TestDirectCalendarResolution:
+    """Test RadicaleService._get_user_calendar with the index."""
+
+    @pytest.fixture
+    def client(self):
+        """Mock CalDAV client returning calendars addressed by URL."""
+        client = Mock()
+        client.calendar.side_effect = lambda url: Mock(url=url)
+        principal = Mock(url="http://radicale/bot/")
+        client.principal.return_value = principal
+        return client
+
+    @pytest.fixture
+    def service(self, tmp_path, client):
+        """RadicaleService with temp index and mocked client."""
+        service = RadicaleService(calendar_index=CalendarIndex(str(tmp_path / "calendar_index.json")))
+        with patch.object(service, '_get_shared_client', return_value=client):
+            yield service
+
+    def test_index_hit_makes_no_requests(self, service, client):
+        """Test indexed calendar is addressed directly by URL."""
+        service._calendar_index.import_legacy({"42": "http://radicale/bot/telegram_42/"})
+
+        calendar = service._get_user_calendar("42")
+
+        assert calendar.url == "http://radicale/bot/telegram_42/"
+        client.principal.assert_not_called()
+
+    def test_legacy_calendars_migrated_once(self, service, client):
+        """Test display-name calendars are imported into the index on first miss."""
+        legacy = Mock(url="http://radicale/bot/5f1c-uuid/")
+        legacy.name = "telegram_7"
+        client.principal.return_value.calendars.return_value = [legacy]
+
+        calendar = service._get_user_calendar("7")
+
+        assert calendar.url == "http://radicale/bot/5f1c-uuid/"
+        assert service._calendar_index.migrated is True
+        legacy.get_properties.assert_not_called()
+
+    def test_miss_uses_deterministic_url(self, service, client):
+        """Test unknown user resolves to telegram_<id> under the calendar home."""
+        service._calendar_index.import_legacy({})
+
+        calendar = service._get_user_calendar("99")
+
+        assert calendar.url == "http://radicale/bot/telegram_99/"
+        calendar.get_properties.assert_called_once()
+        assert service._calendar_index.get("99") == "http://radicale/bot/telegram_99/"
+
+    def test_miss_creates_calendar_when_absent(self, service, client):
+        """Test calendar is created with deterministic id when PROPFIND returns 404."""
+        service._calendar_index.import_legacy({})
+        missing = Mock(url="http://radicale/bot/telegram_5/")
+        missing.get_properties.side_effect = NotFoundError("404")
+        client.calendar.side_effect = None
+        client.calendar.return_value = missing
+        created = Mock(url="http://radicale/bot/telegram_5/")
+        client.principal.return_value.make_calendar.return_value = created
+
+        calendar = service._get_user_calendar("5")
+
+        assert calendar is created
+        client.principal.return_value.make_calendar.assert_called_once_with(
+            name="telegram_5", cal_id="telegram_5", supported_calendar_component_set=['VEVENT']
+        )
+
+
+class TestNotFoundHandling:
+    """Test which 404s drop the indexed calendar."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        """RadicaleService with one indexed calendar and no retry delay."""
+        service = RadicaleService(calendar_index=CalendarIndex(str(tmp_path / "calendar_index.json")))
+        service._calendar_index.set("42", "http://radicale/bot/telegram_42/")
+        service.RETRY_DELAY_SECONDS = 0
+        with patch.object(service, '_reset_connection'):
+            yield service
+
+    def test_event_404_keeps_calendar(self, service):
+        """Test a stale event href does not force calendar rediscovery."""
+        operation = Mock(side_effect=NotFoundError(url="http://radicale/bot/telegram_42/stale.ics"))
+
+        with pytest.raises(Exception):
+            service._retry_caldav_operation("delete_event", "42", operation)
+
+        assert service._calendar_index.get("42") == "http://radicale/bot/telegram_42/"
+
+    def test_calendar_404_forgets_calendar(self, service):
+        """Test a 404 on the collection URL drops the index entry."""
+        operation = Mock(side_effect=NotFoundError(url="http://radicale/bot/telegram_42"))
+
+        with pytest.raises(Exception):
+            service._retry_caldav_operation("list_events", "42", operation)
+
+        assert service._calendar_index.get("42") is None
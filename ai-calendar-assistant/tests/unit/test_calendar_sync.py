@@ -0,0 +1,141 @@
+"""
+Unit tests for the incremental CalDAV sync engine (RFC 6578 sync-collection).
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from xml.sax.saxutils import escape
+import pytz
+
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_radicale import RadicaleService
+from app.services.calendar_sync import CalendarSyncEngine
+
+CAL_URL = "http://radicale:5232/bot/telegram_1/"
+
+
+def _ical(uid: str, summary: str, start: datetime) -> str:
+    end = start + timedelta(hours=1)
+    return (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nBEGIN:VEVENT\r\n"
+        f"UID:{uid}\r\nSUMMARY:{summary}\r\n"
+        f"DTSTART:{start.strftime('%Y%m%dT%H%M%SZ')}\r\nDTEND:{end.strftime('%Y%m%dT%H%M%SZ')}\r\n"
+        "END:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+
+
+class FakeRadicale:
+    """Minimal in-memory CalDAV collection answering sync-collection/multiget."""
+
+    def __init__(self):
+        self.objects = {}  # href -> (etag, data)
+        self.deleted = {}  # href -> token when deleted
+        self.changed_at = {}  # href -> token when last changed
+        self.token = 0
+        self.requests = []
+
+    def put(self, uid, summary, start):
+        self.token += 1
+        href = f"/bot/telegram_1/{uid}.ics"
+        self.objects[href] = (f'"{self.token}"', _ical(uid, summary, start))
+        self.changed_at[href] = self.token
+        self.deleted.pop(href, None)
+
+    def delete(self, uid):
+        self.token += 1
+        href = f"/bot/telegram_1/{uid}.ics"
+        self.objects.pop(href)
+        self.deleted[href] = self.token
+
+    def request(self, url, method, body, headers):
+        self.requests.append(method)
+        if "sync-collection" in body:
+            since = body.split("<D:sync-token>")[1].split("</D:sync-token>")[0]
+            since = int(since[4:]) if since else 0
+            parts = []
+            for href, (etag, _) in self.objects.items():
+                if self.changed_at[href] > since:
+                    parts.append(f'<D:response><D:href>{href}</D:href><D:propstat><D:prop>'
+                                 f'<D:getetag>{etag}</D:getetag></D:prop>'
+                                 f'<D:status>HTTP/1.1 200 OK</D:status></D:propstat></D:response>')
+            for href, token in self.deleted.items():
+                if since and token > since:
+                    parts.append(f'<D:response><D:href>{href}</D:href>'
+                                 f'<D:status>HTTP/1.1 404 Not Found</D:status></D:response>')
+            xml = f'<D:multistatus xmlns:D="DAV:">{"".join(parts)}<D:sync-token>tok-{self.token}</D:sync-token></D:multistatus>'
+        else:  # calendar-multiget
+            hrefs = [h.split("</D:href>")[0] for h in body.split("<D:href>")[1:]]
+            parts = [
+                f'<D:response><D:href>{h}</D:href><D:propstat><D:prop><D:getetag>{self.objects[h][0]}</D:getetag>'
+                f'<C:calendar-data>{escape(self.objects[h][1])}</C:calendar-data></D:prop></D:propstat></D:response>'
+                for h in hrefs if h in self.objects
+            ]
+            xml = f'<D:multistatus xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">{"".join(parts)}</D:multistatus>'
+        return Mock(raw=xml, status=207)
+
+
+class TestCalendarSyncEngine:
+    """Test incremental sync against a fake server."""
+
+    @pytest.fixture
+    def server(self):
+        return FakeRadicale()
+
+    @pytest.fixture
+    def engine(self, tmp_path, server):
+        service = RadicaleService(calendar_index=CalendarIndex(str(tmp_path / "calendar_index.json")))
+        calendar = Mock(url=CAL_URL)
+        calendar.client.request.side_effect = server.request
+        with patch.object(service, '_get_user_calendar_with_retry', return_value=calendar):
+            yield CalendarSyncEngine(service)
+
+    @pytest.fixture
+    def start(self):
+        return datetime(2026, 3, 10, 9, 0, tzinfo=pytz.UTC)
+
+    def test_initial_sync_loads_all(self, engine, server, start):
+        """Test first sync fetches every object once."""
+        server.put("a", "Standup", start)
+        server.put("b", "Review", start + timedelta(days=1))
+
+        result = engine.sync("1")
+
+        assert result.full is True
+        assert result.changed == 2
+        events = engine.list_events("1", start - timedelta(days=1), start + timedelta(days=2))
+        assert [e.summary for e in events] == ["Standup", "Review"]
+
+    def test_incremental_sync_fetches_only_changes(self, engine, server, start):
+        """Test second sync fetches only modified objects and applies deletions."""
+        server.put("a", "Standup", start)
+        server.put("b", "Review", start + timedelta(days=1))
+        engine.sync("1")
+
+        server.put("a", "Standup moved", start + timedelta(hours=2))
+        server.delete("b")
+        server.requests.clear()
+        result = engine.sync("1")
+
+        assert result.full is False
+        assert (result.changed, result.deleted) == (1, 1)
+        events = engine.list_events("1", start - timedelta(days=1), start + timedelta(days=2))
+        assert [e.summary for e in events] == ["Standup moved"]
+
+    def test_unchanged_sync_is_single_request(self, engine, server, start):
+        """Test no-op sync costs one sync-collection REPORT."""
+        server.put("a", "Standup", start)
+        engine.sync("1")
+        server.requests.clear()
+
+        result = engine.sync("1")
+
+        assert result.unchanged is True
+        assert server.requests == ["REPORT"]
+
+    def test_sync_remembers_event_hrefs(self, engine, server, start):
+        """Test synced objects feed the UID -> href map used by update/delete."""
+        server.put("a", "Standup", start)
+        engine.sync("1")
+
+        assert engine.service._get_event_href("1", "a") == "http://radicale:5232/bot/telegram_1/a.ics"
@@ -0,0 +1,104 @@
+"""
+Unit tests for UID-addressed update/delete in RadicaleService.
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+from caldav.lib.error import NotFoundError
+import pytz
+
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_radicale import RadicaleService
+from app.schemas.events import EventDTO
+
+
+def _make_caldav_event(uid: str, href: str) -> Mock:
+    """Create mock CalDAV object with iCal payload."""
+    event = Mock()
+    event.url = href
+    event.data = f"""BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:{uid}
+SUMMARY:Original
+DTSTART:20260115T100000Z
+DTEND:20260115T110000Z
+END:VEVENT
+END:VCALENDAR"""
+    return event
+
+
+class TestUidAddressing:
+    """Update/delete must not download the whole calendar."""
+
+    @pytest.fixture
+    def calendar(self):
+        """Mock calendar that fails if fully listed."""
+        calendar = Mock()
+        calendar.events.side_effect = AssertionError("full calendar download")
+        return calendar
+
+    @pytest.fixture
+    def service(self, tmp_path, calendar):
+        """RadicaleService with mocked calendar lookup."""
+        service = RadicaleService(calendar_index=CalendarIndex(str(tmp_path / "calendar_index.json")))
+        with patch.object(service, '_get_user_calendar', return_value=calendar), \
+             patch.object(service, '_find_conflicts', return_value=[]):
+            yield service
+
+    def test_create_remembers_href(self, service, calendar):
+        """Test href returned by PUT is kept for later addressing."""
+        calendar.save_event.return_value = Mock(url="http://radicale/bot/telegram_1/abc.ics")
+
+        uid = service._create_event_sync("1", EventDTO(title="Call", start_time=datetime(2026, 1, 15, 10, tzinfo=pytz.UTC)))
+
+        assert service._get_event_href("1", uid) == "http://radicale/bot/telegram_1/abc.ics"
+
+    def test_delete_with_known_href_is_single_request(self, service, calendar):
+        """Test known href is deleted directly without fetching."""
+        service._remember_event_href("1", "uid-1", "http://radicale/bot/telegram_1/uid-1.ics")
+
+        assert service._delete_event_sync("1", "uid-1") is True
+
+        calendar.event_by_url.assert_called_once_with("http://radicale/bot/telegram_1/uid-1.ics")
+        calendar.event_by_url.return_value.delete.assert_called_once()
+        calendar.event_by_uid.assert_not_called()
+        assert service._get_event_href("1", "uid-1") is None
+
+    def test_delete_falls_back_to_uid_query(self, service, calendar):
+        """Test stale href falls back to calendar-query by UID."""
+        service._remember_event_href("1", "uid-1", "http://radicale/bot/telegram_1/gone.ics")
+        calendar.event_by_url.return_value.delete.side_effect = NotFoundError("404")
+        found = _make_caldav_event("uid-1", "http://radicale/bot/telegram_1/real.ics")
+        calendar.event_by_uid.return_value = found
+
+        assert service._delete_event_sync("1", "uid-1") is True
+        found.delete.assert_called_once()
+
+    def test_delete_not_found(self, service, calendar):
+        """Test missing UID returns False."""
+        calendar.event_by_uid.side_effect = NotFoundError("404")
+
+        assert service._delete_event_sync("1", "missing") is False
+
+    def test_update_uses_href(self, service, calendar):
+        """Test update fetches a single object by href and saves it."""
+        service._remember_event_href("1", "uid-1", "http://radicale/bot/telegram_1/uid-1.ics")
+        stored = _make_caldav_event("uid-1", "http://radicale/bot/telegram_1/uid-1.ics")
+        calendar.event_by_url.return_value = stored
+
+        assert service._update_event_sync("1", "uid-1", EventDTO(title="Renamed")) is True
+
+        stored.load.assert_called_once()
+        stored.save.assert_called_once()
+        assert b"Renamed" in stored.data
+        calendar.event_by_uid.assert_not_called()
+
+    def test_href_map_is_per_user(self, service, calendar):
+        """Test another user's href is never used for a UID."""
+        service._remember_event_href("1", "uid-1", "http://radicale/bot/telegram_1/uid-1.ics")
+        calendar.event_by_uid.side_effect = NotFoundError("404")
+
+        assert service._delete_event_sync("2", "uid-1") is False
+        calendar.event_by_url.assert_not_called()
@@ -317,7 +317,7 @@ END:VCALENDAR"""
             mock_event.data = ical_data
             mock_event.save = Mock()
 
-            mock_calendar.events.return_value = [mock_event]
+            mock_calendar.event_by_uid.return_value = mock_event
             mock_get_cal.return_value = mock_calendar
 
             # Mock conflict found
@@ -0,0 +1,131 @@
+"""
+Unit tests for the timezone-bucketed daily digest schedule and its dispatcher.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+import pytz
+
+from app.services.daily_reminders import DailyRemindersService, DigestScheduleIndex, DigestSlot
+from app.services.user_preferences import UserPreferencesService
+
+MSK = pytz.timezone("Europe/Moscow")
+
+
+@pytest.fixture
+def preferences(tmp_path):
+    """Fresh preferences used by the schedule index."""
+    prefs = UserPreferencesService(data_file=str(tmp_path / "user_preferences.json"))
+    with patch("app.services.daily_reminders.user_preferences", prefs):
+        yield prefs
+
+
+def _due(index: DigestScheduleIndex, utc_now: datetime):
+    return sorted((slot.user_id, slot.reminder_type) for slot, _ in index.due(utc_now))
+
+
+class TestDigestScheduleIndex:
+    """Test slot bucketing by timezone and local minute."""
+
+    def test_slots_due_at_local_time_only(self, preferences):
+        """Test users in different timezones are due at their own local times."""
+        preferences.set_timezone("1", "Europe/Moscow")
+        preferences.set_timezone("2", "Asia/Vladivostok")
+        index = DigestScheduleIndex()
+        index.rebuild(["1", "2"])
+
+        # 08:30 MSK morning time for user 1 is 05:30 UTC
+        preferences.set_morning_summary_time("1", "08:30")
+        index.update_user("1")
+        assert _due(index, datetime(2026, 3, 2, 5, 30, tzinfo=pytz.UTC)) == [("1", "morning")]
+        # 20:00 Vladivostok (UTC+10) is 10:00 UTC
+        assert _due(index, datetime(2026, 3, 2, 10, 0, tzinfo=pytz.UTC)) == [("2", "evening")]
+        assert _due(index, datetime(2026, 3, 2, 5, 31, tzinfo=pytz.UTC)) == []
+
+    def test_quiet_hours_and_disabled_not_indexed(self, preferences):
+        """Test slots inside quiet hours or disabled messages are never due."""
+        preferences.set_timezone("1", "UTC")
+        preferences.set_evening_digest_enabled("1", False)
+        index = DigestScheduleIndex()
+        index.update_user("1")
+
+        # Default morning time 07:30 falls into default quiet hours 22:00-08:00
+        assert _due(index, datetime(2026, 3, 2, 7, 30, tzinfo=pytz.UTC)) == []
+        assert _due(index, datetime(2026, 3, 2, 20, 0, tzinfo=pytz.UTC)) == []
+        assert _due(index, datetime(2026, 3, 2, 10, 0, tzinfo=pytz.UTC)) == [("1", "motivation")]
+
+    def test_weekly_digest_only_on_sunday(self, preferences):
+        """Test weekly digest slot is filtered by local weekday."""
+        preferences.set_timezone("1", "UTC")
+        index = DigestScheduleIndex()
+        index.update_user("1")
+
+        assert _due(index, datetime(2026, 3, 1, 18, 0, tzinfo=pytz.UTC)) == [("1", "weekly_digest")]
+        assert _due(index, datetime(2026, 3, 2, 18, 0, tzinfo=pytz.UTC)) == []
+
+    def test_preference_change_reindexes(self, preferences):
+        """Test setter notifies listener and the user moves to the new bucket."""
+        preferences.set_timezone("1", "UTC")
+        index = DigestScheduleIndex()
+        preferences.add_schedule_listener(index.update_user)
+        index.update_user("1")
+
+        preferences.set_evening_digest_time("1", "21:15")
+
+        assert _due(index, datetime(2026, 3, 2, 20, 0, tzinfo=pytz.UTC)) == []
+        assert _due(index, datetime(2026, 3, 2, 21, 15, tzinfo=pytz.UTC)) == [("1", "evening")]
+
+        index.remove_user("1")
+        assert len(index) == 0
+        assert index._slots == {}
+
+
+class TestDigestDispatch:
+    """Test queued sending of due slots."""
+
+    @pytest.fixture
+    def service(self, tmp_path, preferences):
+        with patch("app.services.daily_reminders.active_users_registry"):
+            service = DailyRemindersService(
+                bot=Mock(),
+                users_file=str(tmp_path / "users.json"),
+                db_path=str(tmp_path / "reminders.db"),
+            )
+        service.send_evening_reminder = AsyncMock(return_value="digest")
+        return service
+
+    async def test_only_due_users_sent_once(self, service, preferences):
+        """Test worker sends due slots, records them and skips repeats."""
+        for user_id, chat_id in (("1", 100), ("2", 200)):
+            preferences.set_timezone(user_id, "Europe/Moscow")
+            service._chat_ids[user_id] = chat_id
+        preferences.set_evening_digest_time("2", "21:00")
+        service._schedule.rebuild(["1", "2"])
+
+        service._queue = asyncio.Queue()
+        worker = asyncio.create_task(service._send_worker())
+        utc_now = MSK.localize(datetime(2026, 3, 2, 20, 0)).astimezone(pytz.UTC)
+        try:
+            assert service.enqueue_due(utc_now) == 1
+            await service._queue.join()
+            service.enqueue_due(utc_now)
+            await service._queue.join()
+        finally:
+            worker.cancel()
+
+        service.send_evening_reminder.assert_awaited_once_with("1", 100)
+        assert service._is_daily_reminder_sent("1", "2026-03-02", "evening")
+
+    async def test_retry_after_waits_and_resends(self, service):
+        """Test flood control error is retried once after the requested delay."""
+        from telegram.error import RetryAfter
+
+        service.bot.send_message = AsyncMock(side_effect=[RetryAfter(0), "ok"])
+        assert await service._send_message(chat_id=1, text="hi") == "ok"
+        assert service.bot.send_message.await_count == 2
+
+    def test_slot_is_hashable(self):
+        """Test identical slots collapse in a bucket."""
+        assert len({DigestSlot("1", "morning"), DigestSlot("1", "morning")}) == 1
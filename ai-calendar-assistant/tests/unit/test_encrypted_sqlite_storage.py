@@ -0,0 +1,200 @@
+"""
+Unit tests for EncryptedSQLiteStorage and the SQLite todos backend.
+"""
+
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from unittest.mock import patch
+from cryptography.fernet import Fernet
+
+from app.config import settings
+from app.schemas.todos import TodoDTO
+from app.services.encrypted_storage import EncryptedSQLiteStorage, EncryptedStorage
+from app.services.todos_service import TodosService
+
+
+@pytest.fixture
+def key():
+    return Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def storage(tmp_path, key):
+    """SQLite storage on a temp directory."""
+    storage = EncryptedSQLiteStorage(data_dir=str(tmp_path), key_from_env=key)
+    yield storage
+    storage.close()
+
+
+class TestRecords:
+    """Test record-level API."""
+
+    def test_put_get_delete(self, storage):
+        """Test round trip and deletion of one record."""
+        storage.put("notes", "a", {"text": "секрет"})
+
+        assert storage.get("notes", "a") == {"text": "секрет"}
+        assert storage.get("notes", "b", default=1) == 1
+        assert storage.delete_record("notes", "a")
+        assert not storage.delete_record("notes", "a")
+        assert storage.get("notes", "a") is None
+
+    def test_values_encrypted_at_rest(self, storage):
+        """Test plaintext never reaches the database file."""
+        storage.put("notes", "a", {"text": "top secret"})
+
+        raw = sqlite3.connect(storage.db_path).execute("SELECT value FROM records").fetchone()[0]
+        assert b"top secret" not in raw
+
+    def test_row_swap_detected(self, storage):
+        """Test a token copied into another row is rejected."""
+        storage.put("notes", "a", {"owner": "a"})
+        storage.put("notes", "b", {"owner": "b"})
+        with storage._lock, storage._conn:
+            storage._conn.execute(
+                "UPDATE records SET value = (SELECT value FROM records WHERE key = 'a') WHERE key = 'b'"
+            )
+
+        assert storage.get("notes", "b") is None
+        assert list(storage.scan("notes")) == [("a", {"owner": "a"})]
+
+    def test_scan_filters(self, storage):
+        """Test prefix and index range filters."""
+        storage.put("todos", "user_1", [1], index="2026-01-01")
+        storage.put("todos", "user_2", [2], index="2026-01-05")
+        storage.put("todos", "user_3", [3])
+        storage.put("todos", "other", [4], index="2026-01-01")
+
+        assert [k for k, _ in storage.scan("todos", key_prefix="user_")] == ["user_1", "user_2", "user_3"]
+        assert list(storage.scan("todos", key_prefix="user_", index_max="2026-01-03")) == [("user_1", [1])]
+        assert storage.scan_keys("todos", index_min="2026-01-02") == ["user_2"]
+
+
+class TestFileApi:
+    """Test EncryptedStorage-compatible API and migration."""
+
+    @pytest.fixture(autouse=True)
+    def no_env_key(self, monkeypatch):
+        """Key-file tests must not pick up an ENCRYPTION_KEY exported in the shell."""
+        monkeypatch.delenv("ENCRYPTION_KEY", raising=False)
+        monkeypatch.setattr(settings, "encryption_key", None)
+        monkeypatch.setattr(settings, "app_env", "development")
+
+    def test_save_load_exists_delete(self, storage):
+        """Test file-level methods map to records."""
+        assert storage.load("user_1.json") == {}
+        storage.save({"x": 1}, "user_1.json")
+
+        assert storage.exists("user_1.json")
+        assert storage.load("user_1.json") == {"x": 1}
+        storage.delete("user_1.json")
+        assert not storage.exists("user_1.json")
+
+    def test_import_files(self, tmp_path, key):
+        """Test bulk import of encrypted and legacy plain files."""
+        files = EncryptedStorage(data_dir=str(tmp_path), key_from_env=key)
+        files.save({"a": 1}, "user_1.json")
+        files.save({"b": 2}, "user_2.json", encrypt=False)
+
+        storage = EncryptedSQLiteStorage(data_dir=str(tmp_path), key_from_env=key)
+        try:
+            assert storage.import_files(remove=True) == 2
+            assert storage.load("user_1.json") == {"a": 1}
+            assert storage.load("user_2.json") == {"b": 2}
+        finally:
+            storage.close()
+
+        assert not list(tmp_path.glob("user_*"))
+
+    def test_rotate_key(self, tmp_path):
+        """Test records stay readable after rotation and the old key no longer works."""
+        key_file = tmp_path / "keys" / "storage.key"
+        storage = EncryptedSQLiteStorage(data_dir=str(tmp_path / "data"), key_file=str(key_file))
+        old_key = key_file.read_bytes()
+        storage.save({"x": 1}, "user_1.json")
+        storage.put("notes", "a", "text")
+
+        storage.rotate_key()
+
+        assert key_file.read_bytes() != old_key
+        assert key_file.with_suffix(".key.backup").read_bytes() == old_key
+        assert storage.load("user_1.json") == {"x": 1}
+        assert storage.get("notes", "a") == "text"
+        storage.close()
+
+    def test_rotate_key_uses_worker_pool(self, tmp_path):
+        """Test records are re-encrypted on the worker threads, not the caller."""
+        storage = EncryptedSQLiteStorage(data_dir=str(tmp_path / "data"), key_file=str(tmp_path / "keys" / "storage.key"))
+        for i in range(6):
+            storage.put("notes", str(i), i)
+        threads = set()
+        rotate_token = storage._rotate_token
+
+        def recording_rotate(token):
+            threads.add(threading.current_thread())
+            return rotate_token(token)
+
+        with patch.object(storage, "_rotate_token", side_effect=recording_rotate):
+            assert storage.rotate_key(workers=3) == 6
+
+        assert threading.current_thread() not in threads
+        assert [storage.get("notes", str(i)) for i in range(6)] == list(range(6))
+        storage.close()
+
+
+class TestTodosSQLiteBackend:
+    """Test TodosService on the SQLite backend."""
+
+    @pytest.fixture
+    def service(self, tmp_path, key):
+        with patch.object(settings, "encryption_key", key), \
+             patch("app.services.todos_service.ANALYTICS_ENABLED", False):
+            service = TodosService(data_dir=str(tmp_path), backend="sqlite")
+            yield service
+            service.storage.close()
+
+    async def test_get_due_todos(self, service):
+        """Test only open todos due by the bound are returned, using the index."""
+        now = datetime(2026, 3, 10, 12, 0)
+        await service.create_todo("1", TodoDTO(title="today", due_date=now))
+        done_id = await service.create_todo("1", TodoDTO(title="done", due_date=now - timedelta(days=1)))
+        await service.toggle_todo("1", done_id)
+        await service.create_todo("2", TodoDTO(title="next week", due_date=now + timedelta(days=7)))
+        await service.create_todo("3", TodoDTO(title="no date"))
+
+        assert service.storage.scan_keys(
+            EncryptedSQLiteStorage.FILES_NAMESPACE, index_max=service._due_index(now)
+        ) == ["user_1.json"]
+
+        due = await service.get_due_todos(now.replace(hour=23, minute=59))
+        assert {user_id: [t.title for t in todos] for user_id, todos in due.items()} == {"1": ["today"]}
+
+    async def test_migrated_todos_are_due(self, tmp_path, key):
+        """Test the migration script indexes imported todo rows for get_due_todos."""
+        now = datetime(2026, 3, 10, 12, 0)
+        with patch.object(settings, "encryption_key", key), \
+             patch("app.services.todos_service.ANALYTICS_ENABLED", False):
+            files = TodosService(data_dir=str(tmp_path), backend="files")
+            await files.create_todo("1", TodoDTO(title="due now", due_date=now))
+            await files.create_todo("2", TodoDTO(title="later", due_date=now + timedelta(days=7)))
+
+            scripts = str(Path(__file__).parent.parent.parent / "scripts")
+            sys.path.insert(0, scripts)
+            try:
+                import migrate_encrypted_storage_to_sqlite as migration
+            finally:
+                sys.path.remove(scripts)
+            with patch.object(sys, "argv", ["migrate", str(tmp_path)]):
+                migration.main()
+
+            service = TodosService(data_dir=str(tmp_path), backend="sqlite")
+            try:
+                due = await service.get_due_todos(now)
+                assert {user_id: [t.title for t in todos] for user_id, todos in due.items()} == {"1": ["due now"]}
+            finally:
+                service.storage.close()
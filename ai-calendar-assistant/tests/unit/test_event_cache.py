@@ -0,0 +1,166 @@
+"""
+Unit tests for the per-user event-window cache used by RadicaleService.list_events.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytz
+
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_radicale import RadicaleService
+from app.services.event_cache import EventWindowCache
+from app.schemas.events import CalendarEvent, EventDTO
+
+MSK = pytz.timezone("Europe/Moscow")
+
+
+def _event(uid: str, start: datetime, hours: int = 1) -> CalendarEvent:
+    return CalendarEvent(id=uid, summary=uid, start=start, end=start + timedelta(hours=hours), html_link="")
+
+
+class TestEventWindowCache:
+    """Test EventWindowCache semantics."""
+
+    @pytest.fixture
+    def base(self):
+        return MSK.localize(datetime(2026, 3, 10, 0, 0))
+
+    def test_sub_range_served_from_covering_window(self, base):
+        """Test a narrower query is answered from a wider cached window."""
+        cache = EventWindowCache()
+        cache.put("1", base, base + timedelta(days=30), [
+            _event("a", base + timedelta(days=1, hours=10)),
+            _event("b", base + timedelta(days=5, hours=10)),
+        ])
+
+        events = cache.get("1", base + timedelta(days=1), base + timedelta(days=2))
+
+        assert [e.id for e in events] == ["a"]
+        assert cache.hits == 1
+
+    def test_range_outside_window_is_miss(self, base):
+        """Test query extending past the window misses."""
+        cache = EventWindowCache()
+        cache.put("1", base, base + timedelta(days=1), [])
+
+        assert cache.get("1", base, base + timedelta(days=2)) is None
+        assert cache.misses == 1
+
+    def test_overlapping_puts_are_merged(self, base):
+        """Test overlapping windows are merged into their union."""
+        cache = EventWindowCache()
+        cache.put("1", base, base + timedelta(days=2), [_event("a", base + timedelta(hours=10))])
+        cache.put("1", base + timedelta(days=1), base + timedelta(days=4), [_event("b", base + timedelta(days=3))])
+
+        events = cache.get("1", base, base + timedelta(days=4))
+
+        assert [e.id for e in events] == ["a", "b"]
+
+    def test_ttl_expiry(self, base):
+        """Test expired window is not served."""
+        cache = EventWindowCache(ttl_seconds=0)
+        cache.put("1", base, base + timedelta(days=1), [])
+
+        assert cache.get("1", base, base + timedelta(days=1)) is None
+
+    def test_lru_eviction(self, base):
+        """Test least recently used user is evicted beyond max_users."""
+        cache = EventWindowCache(max_users=1)
+        cache.put("1", base, base + timedelta(days=1), [])
+        cache.put("2", base, base + timedelta(days=1), [])
+
+        assert cache.get("1", base, base + timedelta(days=1)) is None
+        assert cache.get("2", base, base + timedelta(days=1)) == []
+
+    def test_naive_datetimes_use_default_timezone(self, base):
+        """Test naive query bounds are treated as default timezone."""
+        cache = EventWindowCache()
+        cache.put("1", base, base + timedelta(days=1), [_event("a", base + timedelta(hours=10))])
+
+        events = cache.get("1", datetime(2026, 3, 10, 9, 0), datetime(2026, 3, 10, 12, 0))
+
+        assert [e.id for e in events] == ["a"]
+
+    def test_upsert_and_remove(self, base):
+        """Test write-through keeps window current."""
+        cache = EventWindowCache()
+        cache.put("1", base, base + timedelta(days=7), [_event("a", base + timedelta(hours=10))])
+
+        cache.upsert("1", _event("b", base + timedelta(days=2)))
+        cache.upsert("1", _event("a", base + timedelta(days=30)))  # moved out of window
+        cache.remove("1", "b")
+
+        assert cache.get("1", base, base + timedelta(days=7)) == []
+
+    def test_put_after_racing_write_is_discarded(self, base):
+        """Test a fetch that started before a write-through does not overwrite it."""
+        cache = EventWindowCache()
+        cache.put("1", base, base + timedelta(days=7), [_event("a", base + timedelta(hours=10))])
+
+        generation = cache.generation("1")  # list_events starts fetching
+        cache.upsert("1", _event("b", base + timedelta(days=1)))  # create lands meanwhile
+        cache.remove("1", "a")  # delete lands meanwhile
+        stored = cache.put("1", base, base + timedelta(days=7),
+                           [_event("a", base + timedelta(hours=10))], generation=generation)
+
+        assert stored is False
+        assert [e.id for e in cache.get("1", base, base + timedelta(days=7))] == ["b"]
+
+    def test_put_after_invalidate_all_is_discarded(self, base):
+        """Test invalidating all users makes in-flight fetches stale."""
+        cache = EventWindowCache()
+        generation = cache.generation("1")
+        cache.invalidate()
+
+        assert cache.put("1", base, base + timedelta(days=7), [], generation=generation) is False
+        assert cache.put("1", base, base + timedelta(days=7), [], generation=cache.generation("1")) is True
+
+
+class TestListEventsCaching:
+    """Test RadicaleService.list_events uses the cache."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        service = RadicaleService(calendar_index=CalendarIndex(str(tmp_path / "calendar_index.json")))
+        service._async_client = None  # thread pool path
+        return service
+
+    async def test_second_call_hits_cache(self, service):
+        """Test overlapping query does not reach Radicale."""
+        now = datetime.now(MSK)
+        stored = [_event("a", now + timedelta(hours=2))]
+        with patch.object(service, '_list_events_sync', return_value=stored) as mock_sync:
+            await service.list_events("1", now - timedelta(days=7), now + timedelta(days=60))
+            events = await service.list_events("1", now, now + timedelta(hours=3))
+
+        assert [e.id for e in events] == ["a"]
+        mock_sync.assert_called_once()
+
+    async def test_fetch_racing_delete_is_not_cached(self, service):
+        """Test a list_events fetch overlapping a delete does not bring the event back."""
+        now = datetime.now(MSK)
+        stored = [_event("a", now + timedelta(hours=2))]
+
+        def fetch_while_deleted(*args):
+            service._cache_remove("1", "a")  # delete write-through lands mid-fetch
+            return stored
+
+        with patch.object(service, '_list_events_sync', side_effect=fetch_while_deleted):
+            await service.list_events("1", now, now + timedelta(days=1))
+
+        assert service._event_cache.get("1", now, now + timedelta(days=1)) is None
+
+    async def test_create_updates_cached_window(self, service):
+        """Test created event appears in cached window without a refetch."""
+        now = datetime.now(MSK)
+        with patch.object(service, '_list_events_sync', return_value=[]) as mock_sync, \
+             patch.object(service, '_get_user_calendar_with_retry') as mock_cal, \
+             patch.object(service, '_find_conflicts', return_value=[]):
+            await service.list_events("1", now - timedelta(days=7), now + timedelta(days=60))
+            uid = await service.create_event("1", EventDTO(title="Call", start_time=now + timedelta(days=1)))
+            events = await service.list_events("1", now, now + timedelta(days=2))
+
+        assert [e.id for e in events] == [uid]
+        assert mock_cal.return_value.save_event.called
+        mock_sync.assert_called_once()
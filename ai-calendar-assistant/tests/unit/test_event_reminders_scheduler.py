@@ -0,0 +1,121 @@
+"""
+Unit tests for the heap-based reminder schedule in EventRemindersServiceIdempotent.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+import pytz
+
+from app.schemas.events import CalendarEvent
+from app.services.event_reminders_idempotent import EventRemindersServiceIdempotent
+from app.utils.recurrence import occurrence_id
+
+
+def _event(uid: str, start: datetime, recurring: bool = False) -> CalendarEvent:
+    return CalendarEvent(
+        id=uid, summary=f"Event {uid}", start=start, end=start + timedelta(hours=1),
+        html_link="", recurring=recurring,
+    )
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Reminder service with temp database and one active user."""
+    bot = Mock()
+    bot.send_message = AsyncMock()
+    return EventRemindersServiceIdempotent(
+        bot=bot,
+        user_provider=lambda: {"1": 100},
+        db_path=str(tmp_path / "reminders.db"),
+    )
+
+
+class TestReminderSchedule:
+    """Test schedule/unschedule and due selection."""
+
+    def test_due_only_at_reminder_time(self, service):
+        """Test reminder pops 30 minutes before start, not earlier."""
+        start = datetime.now(pytz.UTC) + timedelta(hours=2)
+        service.schedule_event("1", _event("a", start))
+        remind_at = (start - timedelta(minutes=30)).timestamp()
+
+        assert service._pop_due(remind_at - 1) == []
+        assert [event.id for _, event in service._pop_due(remind_at)] == ["a"]
+        assert service.scheduled_count() == 0
+
+    def test_reschedule_and_cancel(self, service):
+        """Test updated event replaces its reminder and delete cancels it."""
+        start = datetime.now(pytz.UTC) + timedelta(hours=2)
+        service._on_event_changed("1", "a", [_event("a", start)])
+        service._on_event_changed("1", "a", [_event("a", start + timedelta(hours=1))])
+
+        assert service._seconds_until_next(0) == pytest.approx((start + timedelta(minutes=30)).timestamp())
+
+        service._on_event_changed("1", "a", [])
+        assert service._seconds_until_next(0) is None
+
+    def test_too_late_not_scheduled(self, service):
+        """Test event starting in less than the reminder window is skipped."""
+        service.schedule_event("1", _event("a", datetime.now(pytz.UTC) + timedelta(minutes=10)))
+        assert service.scheduled_count() == 0
+
+    def test_series_occurrences_have_own_keys(self, service):
+        """Test occurrences of a series are reminded separately."""
+        start = datetime.now(pytz.UTC) + timedelta(hours=2)
+        second = start + timedelta(days=1)
+        service._on_event_changed("1", "s", [
+            _event(occurrence_id("s", start), start, recurring=True),
+            _event(occurrence_id("s", second), second, recurring=True),
+        ])
+        assert service.scheduled_count() == 2
+
+        service.unschedule_event("1", "s")
+        assert service.scheduled_count() == 0
+
+
+class TestReminderDelivery:
+    """Test sending and reconcile sweep."""
+
+    async def test_due_reminder_sent_once(self, service):
+        """Test due reminder is sent and recorded for idempotency."""
+        start = datetime.now(pytz.UTC) + timedelta(minutes=30, seconds=-5)
+        event = _event("a", start)
+        service._push("1", event, start.timestamp() - 1800)
+
+        with patch("app.services.event_reminders_idempotent.calendar_service") as calendar:
+            calendar.list_events = AsyncMock(return_value=[event])
+            await service.send_due_reminders()
+            service._push("1", event, start.timestamp() - 1800)
+            await service.send_due_reminders()
+
+        service.bot.send_message.assert_awaited_once()
+        assert service._is_reminder_sent("a", "1")
+
+    async def test_moved_or_deleted_elsewhere_not_sent(self, service):
+        """Test due reminders are re-checked against the calendar before sending."""
+        start = datetime.now(pytz.UTC) + timedelta(minutes=30, seconds=-5)
+        service._push("1", _event("moved", start), start.timestamp() - 1800)
+        service._push("1", _event("deleted", start), start.timestamp() - 1800)
+        later = start + timedelta(hours=2)
+
+        with patch("app.services.event_reminders_idempotent.calendar_service") as calendar:
+            calendar.list_events = AsyncMock(return_value=[_event("moved", later)])
+            await service.send_due_reminders()
+
+        service.bot.send_message.assert_not_awaited()
+        assert [event.start for _, event in service._scheduled["1"].values()] == [later]
+
+    async def test_reconcile_schedules_active_users_only(self, service):
+        """Test sweep schedules upcoming events and drops inactive users."""
+        start = datetime.now(pytz.UTC) + timedelta(hours=1)
+        service.schedule_event("2", _event("gone", start))
+        list_events = AsyncMock(return_value=[_event("a", start)])
+
+        with patch("app.services.event_reminders_idempotent.calendar_service") as calendar:
+            calendar.list_events = list_events
+            await service.reconcile()
+
+        list_events.assert_awaited_once()
+        assert service.scheduled_count() == 1
+        assert "2" not in service._scheduled
@@ -0,0 +1,82 @@
+"""
+Unit tests for the concurrent pre-LLM pipeline in extract_event.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.schemas.events import EventDTO, IntentType
+from app.services.llm_agent_yandex import LLMAgentYandex
+
+
+@pytest.fixture
+def agent():
+    with patch("app.services.llm_agent_yandex.settings") as mock_settings:
+        mock_settings.yandex_gpt_api_key = "test-key"
+        mock_settings.yandex_gpt_folder_id = "test-folder"
+        mock_settings.default_timezone = "Europe/Moscow"
+        mock_settings.yandex_gpt_intent_cache = False
+        mock_settings.yandex_gpt_prompt_token_budget = 100000
+        yield LLMAgentYandex()
+
+
+class TestExtractEventPipeline:
+    """Calendar context, dateparser fallback and LLM request overlap."""
+
+    @pytest.mark.asyncio
+    async def test_local_answer_does_not_wait_for_calendar(self, agent):
+        agent._try_local_parser = lambda *args, **kwargs: EventDTO(intent=IntentType.QUERY)
+        never_loaded = asyncio.get_running_loop().create_future()
+
+        with patch("app.services.llm_agent_yandex.parse_datetime_range") as parse:
+            dto = await asyncio.wait_for(
+                agent.extract_event("что у меня завтра", calendar_context=never_loaded), timeout=1
+            )
+
+        assert dto.intent == "query"
+        parse.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_dateparser_runs_during_llm_request(self, agent):
+        agent._try_local_parser = lambda *args, **kwargs: None
+        parsed = threading.Event()
+        threads = []
+        start = datetime(2026, 10, 17, 15, 0)
+
+        def slow_parse(text):
+            threads.append(threading.current_thread().name)
+            parsed.set()
+            return start, None, None
+
+        async def call_llm(full_prompt, *args):
+            # The fallback is computed while the request is in flight
+            assert await asyncio.to_thread(parsed.wait, 1)
+            assert "ID: ev1" in full_prompt
+            return {}, '{"intent": "create", "title": "Встреча"}'
+
+        async def load_context():
+            await asyncio.sleep(0)
+            return [SimpleNamespace(id="ev1", summary="Обед", start=start)], []
+
+        agent._call_llm_api = call_llm
+        with patch("app.services.llm_agent_yandex.parse_datetime_range", slow_parse):
+            dto = await agent.extract_event("встреча завтра в 15", calendar_context=load_context())
+
+        assert dto.start_time == start
+        assert threads[0].startswith("llm-dateparse")
+
+    @pytest.mark.asyncio
+    async def test_no_dateparser_without_datetime_words(self, agent):
+        agent._try_local_parser = lambda *args, **kwargs: None
+        agent._call_llm_api = AsyncMock(return_value=({}, '{"intent": "todo", "title": "Позвонить маме"}'))
+
+        with patch("app.services.llm_agent_yandex.parse_datetime_range") as parse:
+            dto = await agent.extract_event("позвонить маме")
+
+        assert dto.intent == "todo"
+        parse.assert_not_called()
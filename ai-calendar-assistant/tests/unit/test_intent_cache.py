@@ -0,0 +1,147 @@
+"""
+Unit tests for the LLM intent result cache.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.schemas.events import EventDTO, IntentType
+from app.services.intent_cache import IntentCache, intent_cache
+from app.services.llm_agent_yandex import LLMAgentYandex
+
+TZ = pytz.timezone("Europe/Moscow")
+
+
+def at(year, month, day, hour=10, minute=0):
+    return TZ.localize(datetime(year, month, day, hour, minute))
+
+
+class TestIntentCache:
+    """Keys, re-anchoring and eviction."""
+
+    @pytest.fixture
+    def cache(self):
+        return IntentCache(max_entries=2)
+
+    def test_reanchors_relative_dates(self, cache):
+        monday = at(2026, 10, 12)
+        key = cache.key("Что у меня завтра?", "Europe/Moscow", "ru", monday)
+        cache.put(key, monday, EventDTO(
+            intent=IntentType.QUERY, confidence=0.9,
+            query_date_start=at(2026, 10, 13, 0), query_date_end=at(2026, 10, 13, 23, 59),
+        ))
+
+        next_monday = monday + timedelta(days=7, hours=5)
+        key2 = cache.key("что у меня  завтра", "Europe/Moscow", "ru", next_monday)
+        assert key2 == key
+        dto = cache.get(key2, next_monday, "что у меня  завтра")
+        assert dto.intent == "query"
+        assert dto.query_date_start == at(2026, 10, 20, 0)
+        assert dto.query_date_end == at(2026, 10, 20, 23, 59)
+        assert dto.raw_text == "что у меня  завтра"
+        assert cache.hits == 1
+
+    def test_key_depends_on_weekday_and_context(self, cache):
+        monday = at(2026, 10, 12)
+        base = cache.key("покажи расписание", "Europe/Moscow", "ru", monday)
+        assert cache.key("покажи расписание", "Europe/Moscow", "ru", monday + timedelta(days=1)) != base
+        assert cache.key("покажи расписание", "Asia/Dubai", "ru", monday) != base
+        history = [{"role": "assistant", "text": "На какое время?"}]
+        assert cache.key("покажи расписание", "Europe/Moscow", "ru", monday, history) != base
+
+    def test_event_dependent_answers_scoped_to_user_events(self, cache):
+        now = at(2026, 10, 12)
+        dentist = [Mock(id="e1", start=at(2026, 10, 14, 9), summary="Стоматолог")]
+        key = cache.key("когда у меня стоматолог", "Europe/Moscow", "ru", now,
+                        user_id="1", existing_events=dentist)
+        cache.put(key, now, EventDTO(
+            intent=IntentType.QUERY, query_date_start=at(2026, 10, 14, 0), query_date_end=at(2026, 10, 14, 23, 59),
+        ))
+
+        assert cache.get(key, now, "").query_date_start == at(2026, 10, 14, 0)
+        other_user = cache.key("когда у меня стоматолог", "Europe/Moscow", "ru", now, user_id="2")
+        assert cache.get(other_user, now, "") is None
+        moved = [Mock(id="e1", start=at(2026, 10, 15, 9), summary="Стоматолог")]
+        assert cache.get(cache.key("когда у меня стоматолог", "Europe/Moscow", "ru", now,
+                                   user_id="1", existing_events=moved), now, "") is None
+
+    @pytest.mark.parametrize("text", [
+        "встреча 15 марта в 10", "что у меня 15.03", "напомни через час", "планы на следующий месяц",
+    ])
+    def test_absolute_and_now_relative_texts_not_cached(self, cache, text):
+        assert cache.key(text, "Europe/Moscow", "ru", at(2026, 10, 12)) is None
+        assert cache.get(None, at(2026, 10, 12), text) is None
+
+    def test_create_in_the_past_is_a_miss(self, cache):
+        morning = at(2026, 10, 12, 9)
+        key = cache.key("встреча в 14:00", "Europe/Moscow", "ru", morning)
+        cache.put(key, morning, EventDTO(
+            intent=IntentType.CREATE, title="Встреча",
+            start_time=at(2026, 10, 12, 14), end_time=at(2026, 10, 12, 15),
+        ))
+
+        assert cache.get(key, morning + timedelta(days=7, hours=1), "").start_time == at(2026, 10, 19, 14)
+        assert cache.get(key, morning + timedelta(days=7, hours=6), "") is None
+
+    def test_only_context_free_intents_stored(self, cache):
+        now = at(2026, 10, 12)
+        key = cache.key("удали встречу", "Europe/Moscow", "ru", now)
+        cache.put(key, now, EventDTO(intent=IntentType.DELETE, event_id="abc"))
+        assert cache.get(key, now, "удали встречу") is None
+
+    def test_recurrence_end_date_not_cached(self, cache):
+        now = at(2026, 12, 28)
+        key = cache.key("йога каждый вторник в 9", "Europe/Moscow", "ru", now)
+        cache.put(key, now, EventDTO(
+            intent=IntentType.CREATE_RECURRING, title="Йога",
+            start_time=at(2026, 12, 29, 9), recurrence_end_date=at(2026, 12, 31),
+        ))
+        assert cache.get(key, now + timedelta(days=7), "йога каждый вторник в 9") is None
+
+    def test_ttl_and_lru(self, cache):
+        now = at(2026, 10, 12)
+        keys = [cache.key(f"купить хлеб {i}", "Europe/Moscow", "ru", now) for i in range(3)]
+        for key in keys:
+            cache.put(key, now, EventDTO(intent=IntentType.TODO, title="Купить хлеб"))
+        assert cache.get(keys[0], now, "") is None
+        assert cache.get(keys[2], now, "").title == "Купить хлеб"
+
+        cache.ttl_seconds = 0
+        assert cache.get(keys[2], now, "") is None
+
+
+class TestExtractEventCache:
+    """extract_event serves repeated requests without calling the LLM."""
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        intent_cache.clear()
+        yield
+        intent_cache.clear()
+
+    @pytest.fixture
+    def agent(self):
+        with patch("app.services.llm_agent_yandex.settings") as mock_settings:
+            mock_settings.yandex_gpt_api_key = "test-key"
+            mock_settings.yandex_gpt_folder_id = "test-folder"
+            mock_settings.default_timezone = "Europe/Moscow"
+            mock_settings.yandex_gpt_intent_cache = True
+            mock_settings.yandex_gpt_prompt_token_budget = 2000
+            yield LLMAgentYandex()
+
+    @pytest.mark.asyncio
+    async def test_second_request_served_from_cache(self, agent):
+        answer = '{"intent": "todo", "title": "Позвонить маме"}'
+        agent._try_local_parser = lambda *args, **kwargs: None
+        agent._call_llm_api = AsyncMock(return_value=({}, answer))
+
+        first = await agent.extract_event("Надо позвонить маме", user_id="1")
+        second = await agent.extract_event("надо позвонить маме!", user_id="2")
+
+        assert agent._call_llm_api.await_count == 1
+        assert first.intent == second.intent == "todo"
+        assert second.title == "Позвонить маме"
+        assert second.raw_text == "надо позвонить маме!"
@@ -0,0 +1,124 @@
+"""
+Unit tests for streaming, resumable EncryptedStorage key rotation.
+"""
+
+import json
+
+import pytest
+from unittest.mock import patch
+from cryptography.fernet import Fernet, InvalidToken
+
+from app.config import settings
+from app.services.encrypted_storage import EncryptedStorage
+
+
+@pytest.fixture(autouse=True)
+def no_env_key(monkeypatch):
+    """Keys come from the test's key file, not an ENCRYPTION_KEY exported in the shell."""
+    monkeypatch.delenv("ENCRYPTION_KEY", raising=False)
+    monkeypatch.setattr(settings, "encryption_key", None)
+    monkeypatch.setattr(settings, "app_env", "development")
+
+
+@pytest.fixture
+def key_file(tmp_path):
+    return tmp_path / "keys" / "storage.key"
+
+
+@pytest.fixture
+def storage(tmp_path, key_file):
+    """File storage with 25 records and its own key file."""
+    storage = EncryptedStorage(data_dir=str(tmp_path / "data"), key_file=str(key_file))
+    for i in range(25):
+        storage.save({"n": i}, f"user_{i:02d}.json")
+    return storage
+
+
+def encrypted_with(storage, key: bytes) -> int:
+    """Number of files decryptable with key alone."""
+    count = 0
+    for path in storage.data_dir.glob("*.enc"):
+        try:
+            Fernet(key).decrypt(path.read_bytes())
+            count += 1
+        except InvalidToken:
+            pass
+    return count
+
+
+class TestRotation:
+    """Test rotate_key re-encrypts everything with a new key."""
+
+    def test_rotate_with_progress(self, storage, key_file):
+        """Test all files move to the new key, old key is retired and backed up."""
+        old_key = key_file.read_bytes().strip()
+        reports = []
+
+        assert storage.rotate_key(workers=3, batch_size=10, progress=lambda done, total: reports.append((done, total))) == 25
+
+        new_key = key_file.read_bytes().strip()
+        assert new_key != old_key and b"\n" not in new_key
+        assert key_file.with_suffix(".key.backup").read_bytes().strip() == old_key
+        assert encrypted_with(storage, new_key) == 25
+        assert reports == [(10, 25), (20, 25), (25, 25)]
+        assert not (storage.data_dir / EncryptedStorage.ROTATION_CHECKPOINT).exists()
+        assert storage.load("user_07.json") == {"n": 7}
+
+    def test_resume_after_crash(self, storage, key_file):
+        """Test a crashed rotation resumes from its checkpoint with the same new key."""
+        calls = []
+        original = storage._rotate_file
+
+        def crash_in_second_batch(name):
+            calls.append(name)
+            if len(calls) == 15:
+                raise OSError("disk gone")
+            return original(name)
+
+        with patch.object(storage, "_rotate_file", side_effect=crash_in_second_batch):
+            with pytest.raises(OSError):
+                storage.rotate_key(workers=1, batch_size=10)
+
+        keys = key_file.read_bytes().split()
+        assert len(keys) == 2  # New primary + old, both readable meanwhile
+        checkpoint = json.loads((storage.data_dir / EncryptedStorage.ROTATION_CHECKPOINT).read_text())
+        assert checkpoint["processed"] == 10 and checkpoint["last"] == "user_09.json.enc"
+
+        resumed = EncryptedStorage(data_dir=str(storage.data_dir), key_file=str(key_file))
+        assert resumed.load("user_20.json") == {"n": 20}
+        with patch.object(resumed, "_rotate_file", wraps=resumed._rotate_file) as rotate_file:
+            resumed.rotate_key(workers=1, batch_size=10)
+
+        # Only the remaining 15 in the main pass, then the sweep of files touched since start
+        assert [c.args[0] for c in rotate_file.call_args_list[:15]] == [f"user_{i:02d}.json.enc" for i in range(10, 25)]
+        assert key_file.read_bytes().split() == keys[:1]
+        assert encrypted_with(resumed, keys[0]) == 25
+
+
+class TestDualKeyReads:
+    """Test service stays online while another process rotates."""
+
+    def test_other_instance_follows_key_file(self, storage, key_file):
+        """Test a second instance reads new-key files and writes with the new key."""
+        other = EncryptedStorage(data_dir=str(storage.data_dir), key_file=str(key_file))
+
+        storage.rotate_key(keep_old_keys=True)
+        new_key = key_file.read_bytes().split()[0]
+
+        assert other.load("user_03.json") == {"n": 3}
+        other.save({"n": 100}, "user_99.json")
+        Fernet(new_key).decrypt((storage.data_dir / "user_99.json.enc").read_bytes())
+
+    def test_env_key_requires_new_key(self, tmp_path):
+        """Test env-configured storage rotates only when a new key was prepended."""
+        old_key = Fernet.generate_key().decode()
+        storage = EncryptedStorage(data_dir=str(tmp_path), key_from_env=old_key)
+        storage.save({"x": 1}, "a.json")
+
+        with pytest.raises(ValueError):
+            storage.rotate_key()
+
+        new_key = Fernet.generate_key().decode()
+        rotated = EncryptedStorage(data_dir=str(tmp_path), key_from_env=f"{new_key},{old_key}")
+        assert rotated.rotate_key() == 1
+        assert EncryptedStorage(data_dir=str(tmp_path), key_from_env=new_key).load("a.json") == {"x": 1}
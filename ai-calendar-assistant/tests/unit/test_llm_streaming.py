@@ -0,0 +1,137 @@
+"""
+Unit tests for streamed Yandex GPT completions and progressive replies.
+"""
+
+import json
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.llm_agent_yandex import LLMAgentYandex
+from app.services.progressive_reply import ProgressiveReply
+from app.utils.json_stream import StreamingJSON
+
+
+def chunk(text: str, status: str = "ALTERNATIVE_STATUS_PARTIAL") -> bytes:
+    """One line of a streamed completion (text is cumulative)."""
+    return (json.dumps({"result": {
+        "alternatives": [{"message": {"role": "assistant", "text": text}, "status": status}],
+        "usage": {"inputTextTokens": "100", "completionTokens": "10", "totalTokens": "110"},
+    }}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class TestStreamingJSON:
+    """Test incremental JSON scanning."""
+
+    def test_partial_field_and_completion(self):
+        """Test string field is readable while written and completion is detected."""
+        answer = StreamingJSON()
+        answer.feed('```json\n{"intent": "clarify", "clarify_question": "Во ск')
+        assert answer.string_field("intent") == ("clarify", True)
+        assert answer.string_field("clarify_question") == ("Во ск", False)
+        assert not answer.complete
+
+        answer.feed('```json\n{"intent": "clarify", "clarify_question": "Во сколько? {\\"}"}\n```')
+        assert answer.complete
+        assert json.loads(answer.json_text)["clarify_question"] == 'Во сколько? {"}'
+
+    def test_non_continuation_rescans(self):
+        """Test feeding text that does not extend the previous text starts over."""
+        answer = StreamingJSON()
+        answer.feed('{"a": [1, 2')
+        answer.feed('[3]')
+        assert answer.complete and answer.json_text == "[3]"
+
+
+class TestStreamedCompletion:
+    """Test LLMAgentYandex streaming mode."""
+
+    @pytest.fixture
+    def agent(self):
+        return LLMAgentYandex()
+
+    def mock_stream(self, agent, chunks):
+        """Serve chunks as a streamed response; returns list of chunks actually produced."""
+        produced = []
+
+        async def body():
+            for c in chunks:
+                produced.append(c)
+                yield c
+
+        def handler(request):
+            assert json.loads(request.content)["completionOptions"]["stream"] is True
+            return httpx.Response(200, content=body())
+
+        agent._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return produced
+
+    async def test_partials_and_early_stop(self, agent):
+        """Test callback gets growing clarify text and reading stops at the closing brace."""
+        chunks = [
+            chunk('{"intent": "clar'),
+            chunk('{"intent": "clarify", "clarify_question": "Во'),
+            chunk('{"intent": "clarify", "clarify_question": "Во сколько?"}'),
+            chunk('{"intent": "clarify", "clarify_question": "Во сколько?"}\nГотово.'),
+            chunk('{"intent": "clarify", "clarify_question": "Во сколько?"}\nГотово.', "ALTERNATIVE_STATUS_FINAL"),
+        ]
+        produced = self.mock_stream(agent, chunks)
+        on_partial = AsyncMock()
+
+        response_data, text = await agent._call_llm_api("prompt", None, "встреча", [], on_partial)
+
+        assert text == '{"intent": "clarify", "clarify_question": "Во сколько?"}'
+        assert [c.args for c in on_partial.await_args_list] == [
+            ("clarify", {"clarify_question": "Во"}),
+            ("clarify", {"clarify_question": "Во сколько?"}),
+        ]
+        assert len(produced) < len(chunks)
+        assert response_data["result"]["usage"]["totalTokens"] == "110"
+
+    async def test_streaming_disabled(self, agent):
+        """Test settings switch keeps the single-response call."""
+        def handler(request):
+            assert json.loads(request.content)["completionOptions"]["stream"] is False
+            return httpx.Response(200, json={"result": {"alternatives": [{"message": {"text": '{"intent": "todo"}'}}]}})
+
+        agent._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("app.services.llm_agent_yandex.settings.yandex_gpt_streaming", False):
+            _, text = await agent._call_llm_api("prompt", None, "x", [], AsyncMock())
+        assert text == '{"intent": "todo"}'
+
+    async def test_stream_http_error(self, agent):
+        """Test non-200 streamed response raises and counts as failure."""
+        agent._http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(500, text="boom"))
+        )
+        with pytest.raises(Exception, match="500"):
+            await agent._call_llm_api("prompt", None, "x", [], AsyncMock())
+        assert agent._failure_count == 1
+
+
+class TestProgressiveReply:
+    """Test throttled placeholder edits."""
+
+    async def test_throttle_and_final(self):
+        """Test intermediate edits are throttled, final edits always go through."""
+        message = MagicMock()
+        message.edit_text = AsyncMock()
+        reply = ProgressiveReply(message, "⏳")
+
+        assert await reply.update("Во")
+        assert not await reply.update("Во сколько")  # Within MIN_EDIT_INTERVAL
+        assert await reply.update("Во сколько?", final=True)
+        assert [c.args[0] for c in message.edit_text.await_args_list] == ["Во ▌", "Во сколько?"]
+
+        assert await reply.restore()
+        assert not reply.changed
+
+    async def test_failed_edit(self):
+        """Test edit errors are swallowed and reported."""
+        message = MagicMock()
+        message.edit_text = AsyncMock(side_effect=Exception("Message is too long"))
+        reply = ProgressiveReply(message, "⏳")
+
+        assert not await reply.update("x" * 5000, final=True)
+        assert not reply.changed
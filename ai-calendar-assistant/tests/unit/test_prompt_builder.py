@@ -0,0 +1,75 @@
+"""
+Unit tests for the token-budgeted prompt builder.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_agent_yandex import LLMAgentYandex
+from app.services.prompt_builder import EVENTS_FOOTER, EVENTS_HEADER, PromptBuilder
+
+
+def event(i, title):
+    return SimpleNamespace(id=f"ev{i}", summary=title, start=datetime(2026, 10, 20, 9 + i))
+
+
+@pytest.fixture
+def dt_context():
+    return LLMAgentYandex()._prepare_datetime_context("Europe/Moscow")
+
+
+@pytest.fixture
+def builder():
+    return PromptBuilder("Инструкции до {end_of_year_date}.", token_budget=100000)
+
+
+class TestPromptBuilder:
+    """Budget enforcement and relevance ranking."""
+
+    def test_unbounded_prompt_contains_all_sections(self, builder, dt_context):
+        events = [event(i, f"Встреча {i}") for i in range(3)]
+        history = [{"role": "user", "text": "привет"}, {"role": "assistant", "text": "Здравствуйте"}]
+        prompt = builder.build(dt_context, "что у меня завтра", events, events[:1], history)
+
+        assert prompt.startswith(f"Инструкции до {dt_context['end_of_year_date']}.\n\nТЕКУЩАЯ ДАТА:")
+        assert prompt.count("Event: ") == 3
+        assert "<recent_context>" in prompt and "Бот: Здравствуйте" in prompt
+        assert prompt.index("User request:") < prompt.index("<dialog_history>") < prompt.index("что у меня завтра")
+        assert prompt.endswith("JSON:")
+
+    def test_events_ranked_by_relevance_within_budget(self, builder, dt_context):
+        events = [event(i, title) for i, title in enumerate(
+            ["Обед", "Созвон с Петром", "Показ квартиры", "Стоматолог", "Встреча с Леной"]
+        )]
+        bare = builder.build(dt_context, "перенеси встречу с Леной")
+        one_event = builder.estimate_tokens("Event: Встреча с Леной\nTime: 20.10.2026 13:00\nID: ev4\n\n")
+        overhead = builder.estimate_tokens(EVENTS_HEADER + EVENTS_FOOTER)
+        builder.token_budget = builder.estimate_tokens(bare) + overhead + one_event + 3
+
+        prompt = builder.build(dt_context, "перенеси встречу с Леной", events)
+        assert builder.estimate_tokens(prompt) <= builder.token_budget
+        assert "ID: ev4" in prompt
+        assert "Обед" not in prompt
+
+    def test_last_exchange_kept_before_older_turns(self, builder, dt_context):
+        history = [{"role": "user", "text": f"старое сообщение {i} " * 20} for i in range(8)]
+        history += [{"role": "user", "text": "встреча завтра"}, {"role": "assistant", "text": "Во сколько?"}]
+        bare = builder.build(dt_context, "в 15")
+        builder.token_budget = builder.estimate_tokens(bare) + 60
+
+        prompt = builder.build(dt_context, "в 15", conversation_history=history)
+        assert "Пользователь: встреча завтра\nБот: Во сколько?\n" in prompt
+        assert "старое сообщение" not in prompt
+
+    def test_static_prompt_formatted_once(self, builder, dt_context):
+        builder.build(dt_context, "a")
+        builder.system_prompt_template = "changed {end_of_year_date}"
+        assert builder.build(dt_context, "b").startswith("Инструкции")
+
+    def test_calibrate_moves_towards_observed_ratio(self, builder):
+        builder.calibrate(3000, 1000)
+        assert 3.0 < builder.chars_per_token < PromptBuilder.CHARS_PER_TOKEN
+        builder.calibrate(0, 0)
+        assert builder.chars_per_token < PromptBuilder.CHARS_PER_TOKEN
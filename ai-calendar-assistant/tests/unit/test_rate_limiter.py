@@ -0,0 +1,228 @@
+"""
+Unit tests for ring-buffer rate limiting (in-memory, Redis and async Redis script wiring).
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return RateLimiter(clock=clock)
+
+
+def send(limiter, user_id="1"):
+    allowed, reason = limiter.check_rate_limit(user_id)
+    if allowed:
+        limiter.record_message(user_id)
+    return allowed, reason
+
+
+class TestSlidingWindows:
+    """Test exact sliding-window limits."""
+
+    def test_per_minute_limit(self, limiter, clock):
+        """Test 11th message within a minute is rejected until the oldest leaves the window."""
+        for _ in range(10):
+            assert send(limiter) == (True, "")
+            clock.now += 3  # 3s apart: no burst
+
+        assert send(limiter) == (False, "too_many_requests_per_minute")
+        clock.now = 1000.0 + 60  # First message now outside the window
+        assert send(limiter) == (True, "")
+
+    def test_per_hour_limit(self, limiter, clock):
+        """Test 51st message within an hour is rejected."""
+        for _ in range(50):
+            assert send(limiter)[0]
+            clock.now += 65
+
+        clock.now = 1000.0 + 3599
+        assert send(limiter) == (False, "too_many_requests_per_hour")
+        clock.now = 1000.0 + 3600
+        assert send(limiter)[0]
+
+    def test_bursts_block_user(self, limiter, clock):
+        """Test repeated rapid bursts lead to a block that expires."""
+        for _ in range(5):
+            assert send(limiter)[0]
+
+        assert send(limiter) == (False, "slow_down_please")
+        assert send(limiter) == (False, "slow_down_please")
+        assert send(limiter) == (False, "blocked_for_spamming")
+        assert send(limiter)[1].startswith("blocked_until_")
+
+        clock.now += 3600
+        assert send(limiter) == (True, "")
+        assert limiter.get_stats("1")["burst_count"] == 0
+
+    def test_error_flood(self, limiter, clock):
+        """Test 5 errors within a minute block, spread out they do not."""
+        for _ in range(5):
+            limiter.record_error("1")
+            clock.now += 16
+        assert not limiter.is_blocked("1")
+
+        for _ in range(5):
+            limiter.record_error("2")
+        assert limiter.is_blocked("2")
+
+    def test_stats(self, limiter, clock):
+        """Test stats count messages per window."""
+        for _ in range(3):
+            send(limiter)
+            clock.now += 40
+
+        stats = limiter.get_stats("1")
+        assert stats["messages_last_minute"] == 1
+        assert stats["messages_last_hour"] == 3
+        assert not stats["is_blocked"]
+
+
+class TestMemoryBound:
+    """Test per-user state is bounded."""
+
+    def test_idle_users_evicted_blocks_kept(self, clock):
+        """Test LRU eviction keeps blocks and cleanup drops idle users."""
+        limiter = RateLimiter(clock=clock)
+        limiter._users.max_size = 3
+        for _ in range(5):
+            limiter.record_error("spammer")
+        for user_id in ("a", "b", "c"):
+            send(limiter, user_id)
+
+        assert len(limiter._users) == 3
+        assert "spammer" not in limiter._users
+        assert limiter.is_blocked("spammer")
+
+        clock.now += 3600
+        limiter.cleanup_old_data()
+        assert len(limiter._users) == 0
+        assert not limiter._blocked_users
+
+
+class TestRedisScripts:
+    """Test RedisRateLimiter uses one script call per operation."""
+
+    @pytest.fixture
+    def redis_limiter(self):
+        from app.services.rate_limiter_redis import RedisRateLimiter
+
+        client = MagicMock()
+        scripts = {}
+        client.register_script.side_effect = lambda source: scripts.setdefault(len(scripts), MagicMock())
+        with patch("app.services.rate_limiter_redis.redis.from_url", return_value=client):
+            limiter = RedisRateLimiter()
+        return limiter, client, scripts[0], scripts[1]
+
+    def test_check_single_round_trip(self, redis_limiter):
+        """Test allowed and limited results map to (allowed, reason)."""
+        limiter, client, check, _ = redis_limiter
+
+        check.return_value = [1, "", 0]
+        assert limiter.check_rate_limit("7") == (True, "")
+        assert check.call_count == 1
+        assert check.call_args.kwargs["keys"] == [
+            "rate_limit:7:messages", "rate_limit:7:blocked", "rate_limit:7:burst_counter"
+        ]
+        client.incr.assert_not_called()
+
+        check.return_value = [0, "blocked", 1800]
+        assert limiter.check_rate_limit("7") == (False, "blocked_until_30_min")
+
+        check.return_value = [0, "slow_down_please", 1]
+        assert limiter.check_rate_limit("7") == (False, "slow_down_please")
+
+    def test_record_error(self, redis_limiter):
+        """Test error recording is one script call."""
+        limiter, _, _, record_error = redis_limiter
+        record_error.return_value = [1, 5]
+
+        limiter.record_error("7")
+
+        assert record_error.call_count == 1
+        assert record_error.call_args.kwargs["args"][1:] == [5, 3600]
+
+
+class TestAsyncRedisLimiter:
+    """Test asyncio limiter: one script call per message, local block cache, fallback."""
+
+    @pytest.fixture
+    def async_limiter(self):
+        from app.services.rate_limiter_redis import AsyncRedisRateLimiter
+
+        client = MagicMock()
+        scripts = []
+        client.register_script.side_effect = lambda source: scripts.append(AsyncMock()) or scripts[-1]
+        limiter = AsyncRedisRateLimiter(client=client)
+        return limiter, scripts[0], scripts[1]
+
+    async def test_blocked_user_short_circuits(self, async_limiter):
+        """Test a blocked result is cached and later checks skip Redis."""
+        limiter, check, _ = async_limiter
+
+        check.return_value = [1, "", 0]
+        assert await limiter.check_rate_limit("7") == (True, "")
+
+        check.return_value = [0, "blocked_for_spamming", 3]
+        assert await limiter.check_rate_limit("7") == (False, "blocked_for_spamming")
+        assert (await limiter.check_rate_limit("7"))[1].startswith("blocked_until_")
+        assert await limiter.is_blocked("7")
+        assert check.await_count == 2
+
+    async def test_error_flood_cached(self, async_limiter):
+        """Test error flood block is cached locally."""
+        limiter, check, record_error = async_limiter
+        record_error.return_value = [1, 5]
+
+        await limiter.record_error("7")
+
+        assert not (await limiter.check_rate_limit("7"))[0]
+        check.assert_not_awaited()
+
+    async def test_redis_failure_falls_back_and_opens_circuit(self, async_limiter):
+        """Test Redis errors use the in-memory limiter and open the circuit."""
+        limiter, check, _ = async_limiter
+        check.side_effect = RedisConnectionError("down")
+        memory = MagicMock()
+        memory.check_rate_limit.return_value = (True, "")
+
+        with patch("app.services.rate_limiter.rate_limiter", memory):
+            for _ in range(limiter.MAX_CONSECUTIVE_FAILURES):
+                assert await limiter.check_rate_limit("7") == (True, "")
+
+        assert memory.record_message.call_count == limiter.MAX_CONSECUTIVE_FAILURES
+        assert not limiter.healthy
+
+        limiter._retry_at = 0  # Retry window elapsed: half-open
+        assert limiter.healthy
+
+    async def test_health_uses_async_limiter(self, async_limiter):
+        """Test /health sees the async limiter even when the sync one is not initialized."""
+        from app.services import rate_limiter_redis
+
+        limiter, _, _ = async_limiter
+        limiter.redis.ping = AsyncMock(return_value=True)
+
+        with patch.object(rate_limiter_redis, "rate_limiter_redis", None), \
+                patch.object(rate_limiter_redis, "rate_limiter_redis_async", limiter):
+            assert await rate_limiter_redis.is_redis_available_async()
+
+            limiter.redis.ping.side_effect = RedisConnectionError("down")
+            assert not await rate_limiter_redis.is_redis_available_async()
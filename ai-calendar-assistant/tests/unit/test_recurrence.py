@@ -0,0 +1,210 @@
+"""
+Unit tests for RRULE recurring events: rule building, expansion and caching.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from icalendar import Calendar
+import pytz
+
+from app.schemas.events import EventDTO
+from app.services.calendar_index import CalendarIndex
+from app.services.calendar_radicale import RadicaleService
+from app.services.event_cache import EventWindowCache
+from app.utils.recurrence import build_rrule, occurrence_id, occurrence_starts, split_occurrence_id
+
+MSK = pytz.timezone("Europe/Moscow")
+START = datetime(2026, 1, 5, 7, 0, tzinfo=pytz.UTC)  # Monday 10:00 MSK
+
+
+def _series(extra: str = "") -> Calendar:
+    return Calendar.from_ical(f"""BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:series-1
+SUMMARY:Standup
+DTSTART:20260105T070000Z
+DTEND:20260105T073000Z
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;UNTIL=20261231T235959Z
+EXDATE:20260107T070000Z
+END:VEVENT
+{extra}END:VCALENDAR""")
+
+
+class TestRecurrenceRules:
+    """Test build_rrule and occurrence_starts."""
+
+    def test_build_weekly_rule_with_days(self):
+        """Test weekly recurrence keeps weekdays and UNTIL in UTC."""
+        rule = build_rrule("weekly", MSK.localize(datetime(2026, 12, 31, 23, 0)), ["mon", "Wednesday"])
+        assert rule["FREQ"] == "WEEKLY"
+        assert rule["BYDAY"] == ["MO", "WE"]
+        assert rule["UNTIL"].tzinfo == pytz.UTC
+
+    def test_unknown_type_has_no_rule(self):
+        """Test unknown recurrence type is not encoded."""
+        assert build_rrule("yearly") is None
+
+    def test_expansion_limited_to_window_and_exdate(self):
+        """Test only occurrences inside the window are produced and EXDATE is skipped."""
+        component = _series().walk('VEVENT')[0]
+        starts = occurrence_starts(component, START, START + timedelta(days=7))
+        assert starts == [START, START + timedelta(days=4)]
+
+    def test_occurrence_overlapping_window_start_included(self):
+        """Test occurrence in progress at window start is returned."""
+        component = _series().walk('VEVENT')[0]
+        starts = occurrence_starts(component, START + timedelta(minutes=15), START + timedelta(hours=1))
+        assert starts == [START]
+
+    def test_local_start_keeps_weekday_and_time_across_dst(self):
+        """Test a TZID series expands in its zone: BYDAY and wall time survive the DST change."""
+        component = Calendar.from_ical("""BEGIN:VCALENDAR
+VERSION:2.0
+BEGIN:VEVENT
+UID:series-ny
+DTSTART;TZID=America/New_York:20260302T090000
+DTEND;TZID=America/New_York:20260302T093000
+RRULE:FREQ=WEEKLY;BYDAY=MO;UNTIL=20260316T235959Z
+END:VEVENT
+END:VCALENDAR""").walk('VEVENT')[0]
+        ny = pytz.timezone("America/New_York")
+        starts = occurrence_starts(component, datetime(2026, 3, 1, tzinfo=pytz.UTC), datetime(2026, 4, 1, tzinfo=pytz.UTC))
+        assert [s.astimezone(ny).strftime("%a %d %H:%M") for s in starts] == [
+            "Mon 02 09:00", "Mon 09 09:00", "Mon 16 09:00",
+        ]
+        assert starts[1] - starts[0] == timedelta(days=7, hours=-1)
+
+
+class TestServiceExpansion:
+    """Test RadicaleService stores and expands one master VEVENT."""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        return RadicaleService(calendar_index=CalendarIndex(str(tmp_path / "calendar_index.json")))
+
+    def test_recurring_dto_builds_single_master(self, service):
+        """Test recurrence becomes an RRULE on one VEVENT."""
+        event = EventDTO(
+            title="Gym", start_time=START, recurrence_type="daily",
+            recurrence_end_date=START + timedelta(days=365)
+        )
+        _, cal, _ = service._build_ical_event(event, START, START + timedelta(hours=1))
+        components = cal.walk('VEVENT')
+        assert len(components) == 1
+        assert components[0].get('rrule').to_ical().startswith(b"FREQ=DAILY;UNTIL=")
+
+    def test_early_morning_local_start_stays_on_monday(self, service):
+        """Test a 01:30 MSK Monday series (Sunday in UTC) is stored with TZID and expands to Mondays."""
+        start = MSK.localize(datetime(2026, 1, 5, 1, 30))
+        event = EventDTO(
+            title="Night shift", start_time=start, recurrence_type="weekly", recurrence_days=["mon"],
+            recurrence_end_date=MSK.localize(datetime(2026, 12, 31, 23, 59))
+        )
+        _, cal, _ = service._build_ical_event(event, start.astimezone(pytz.UTC), start.astimezone(pytz.UTC) + timedelta(hours=1))
+        ical = cal.to_ical()
+        assert b"DTSTART;TZID=Europe/Moscow:20260105T013000" in ical
+
+        events = service._expand_vevents("1", list(Calendar.from_ical(ical).walk('VEVENT')), start, start + timedelta(days=21))
+        assert [e.start.strftime("%a %Y-%m-%d %H:%M") for e in sorted(events, key=lambda e: e.start)] == [
+            "Mon 2026-01-05 01:30", "Mon 2026-01-12 01:30", "Mon 2026-01-19 01:30",
+        ]
+
+    def test_override_replaces_occurrence(self, service):
+        """Test RECURRENCE-ID instance replaces the generated occurrence."""
+        ical = _series("""BEGIN:VEVENT
+UID:series-1
+RECURRENCE-ID:20260109T070000Z
+SUMMARY:Standup moved
+DTSTART:20260109T090000Z
+DTEND:20260109T093000Z
+END:VEVENT
+""")
+        events = service._expand_vevents("1", list(ical.walk('VEVENT')), START, START + timedelta(days=7))
+
+        assert [(e.summary, e.start.astimezone(pytz.UTC)) for e in sorted(events, key=lambda e: e.start)] == [
+            ("Standup", START),
+            ("Standup moved", START + timedelta(days=4, hours=2)),
+        ]
+        assert sorted(e.id for e in events) == [
+            "series-1::20260105T070000Z", "series-1::20260109T070000Z",
+        ]
+        assert all(e.recurring for e in events)
+
+    def test_occurrence_id_round_trip(self):
+        """Test occurrence id carries the series UID and the original start in UTC."""
+        start = MSK.localize(datetime(2026, 1, 9, 10, 0))
+        assert split_occurrence_id(occurrence_id("series-1", start)) == ("series-1", START + timedelta(days=4))
+        assert split_occurrence_id("series-1") == ("series-1", None)
+        assert split_occurrence_id("odd::id") == ("odd::id", None)
+
+    def test_exclude_occurrence_deletes_only_it(self, service):
+        """Test single-occurrence delete adds EXDATE and keeps the rest of the series."""
+        ical = _series()
+        assert service._exclude_occurrence(ical, "series-1", START + timedelta(days=4))
+
+        events = service._expand_vevents("1", list(ical.walk('VEVENT')), START, START + timedelta(days=14))
+        assert sorted(e.start.astimezone(pytz.UTC) for e in events) == [
+            START, START + timedelta(days=7), START + timedelta(days=9), START + timedelta(days=11),
+        ]
+        # Already excluded occurrences are not found again
+        assert not service._exclude_occurrence(ical, "series-1", START + timedelta(days=4))
+        assert not service._exclude_occurrence(ical, "series-1", START + timedelta(days=2))
+
+    def test_exclude_occurrence_drops_its_override(self, service):
+        """Test deleting a moved occurrence removes its RECURRENCE-ID instance too."""
+        ical = _series("""BEGIN:VEVENT
+UID:series-1
+RECURRENCE-ID:20260109T070000Z
+SUMMARY:Standup moved
+DTSTART:20260109T090000Z
+DTEND:20260109T093000Z
+END:VEVENT
+""")
+        assert service._exclude_occurrence(ical, "series-1", START + timedelta(days=4))
+
+        events = service._expand_vevents("1", list(ical.walk('VEVENT')), START, START + timedelta(days=7))
+        assert [e.summary for e in events] == ["Standup"]
+
+    def test_occurrence_update_writes_override(self, service):
+        """Test single-occurrence edit moves only that occurrence."""
+        ical = _series()
+        event_id = occurrence_id("series-1", START + timedelta(days=4))
+        component = service._target_component(ical, event_id)
+        service._apply_event_update(component, EventDTO(
+            title="Standup moved", start_time=START + timedelta(days=4, hours=2),
+            end_time=START + timedelta(days=4, hours=2, minutes=30),
+        ))
+
+        events = service._expand_vevents(
+            "1", service._series_components(ical, "series-1"), START, START + timedelta(days=14)
+        )
+        assert sorted((e.id, e.summary, e.start.astimezone(pytz.UTC)) for e in events) == [
+            (occurrence_id("series-1", START), "Standup", START),
+            (event_id, "Standup moved", START + timedelta(days=4, hours=2)),
+            (occurrence_id("series-1", START + timedelta(days=7)), "Standup", START + timedelta(days=7)),
+            (occurrence_id("series-1", START + timedelta(days=9)), "Standup", START + timedelta(days=9)),
+            (occurrence_id("series-1", START + timedelta(days=11)), "Standup", START + timedelta(days=11)),
+        ]
+        # Same occurrence again reuses the override; unknown occurrence gives None
+        assert service._target_component(ical, event_id) is component
+        assert service._target_component(ical, occurrence_id("series-1", START + timedelta(days=2))) is None
+
+
+class TestOccurrenceCaching:
+    """Test event cache keeps occurrences sharing a UID."""
+
+    def test_occurrences_cached_and_removed_together(self, tmp_path):
+        """Test each occurrence is cached and delete of the series drops all of them."""
+        service = RadicaleService(calendar_index=CalendarIndex(str(tmp_path / "calendar_index.json")))
+        events = service._expand_vevents("1", list(_series().walk('VEVENT')), START, START + timedelta(days=14))
+        cache = EventWindowCache()
+        cache.put("1", START, START + timedelta(days=14), events)
+
+        assert len(cache.get("1", START, START + timedelta(days=14))) == 5
+
+        cache.remove("1", occurrence_id("series-1", START))
+        assert len(cache.get("1", START, START + timedelta(days=14))) == 4
+
+        cache.remove("1", "series-1")
+        assert cache.get("1", START, START + timedelta(days=14)) == []
@@ -249,3 +249,30 @@ class TestUserTimezones:
 
         # Should be limited to max_size
         assert len(handler.user_timezones) <= 1000
+
+
+class TestRecurringTargets:
+    """Test which id an update/delete of a recurring occurrence addresses."""
+
+    def test_occurrence_kept_unless_series_requested(self):
+        """Test the series UID is used only when the user asks for the whole series."""
+        from app.services.telegram_handler import TelegramHandler
+
+        event_id = "s::20260106T070000Z"
+        assert TelegramHandler._target_event_id(event_id, "удали тренировку завтра") == event_id
+        assert TelegramHandler._target_event_id(event_id, "удали всю серию тренировок") == "s"
+        assert TelegramHandler._target_event_id("plain", "удали навсегда") == "plain"
+
+    def test_deletion_targets_dedupe_series(self):
+        """Test bulk delete lists each series once and keeps count and ids in step."""
+        from app.schemas.events import CalendarEvent
+        from app.services.telegram_handler import TelegramHandler
+
+        start = datetime(2026, 1, 6, 10, 0)
+        events = [
+            CalendarEvent(id=f"s::2026010{day}T070000Z", summary="Gym", start=start, end=start, html_link="", recurring=True)
+            for day in (6, 7, 8)
+        ] + [CalendarEvent(id="one", summary="Gym", start=start, end=start, html_link="")]
+
+        assert [target for target, _ in TelegramHandler._deletion_targets(events, whole_series=True)] == ["s", "one"]
+        assert len(TelegramHandler._deletion_targets(events, whole_series=False)) == 4
@@ -0,0 +1,114 @@
+"""
+Unit tests for TodosService caching, per-user writes and atomic storage.
+"""
+
+import pytest
+from unittest.mock import patch
+from cryptography.fernet import Fernet
+
+from app.config import settings
+from app.schemas.todos import TodoDTO
+from app.services.encrypted_storage import EncryptedStorage
+from app.services.todos_service import TodosService
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Todos service on a temp directory with its own key."""
+    with patch("app.services.todos_service.EncryptedStorage",
+               lambda data_dir: EncryptedStorage(data_dir=data_dir, key_from_env=Fernet.generate_key().decode())), \
+         patch("app.services.todos_service.ANALYTICS_ENABLED", False):
+        yield TodosService(data_dir=str(tmp_path))
+
+
+class TestTodosCache:
+    """Test decrypted todo sets are cached and replaced only after saving."""
+
+    async def test_reads_decrypt_once(self, service):
+        """Test list/get/toggle after the first load never read the file."""
+        todo_id = await service.create_todo("1", TodoDTO(title="Buy milk"))
+
+        with patch.object(service.storage, "load", wraps=service.storage.load) as load:
+            await service.list_todos("1")
+            assert await service.toggle_todo("1", todo_id)
+            todo = await service.get_todo("1", todo_id)
+
+        assert load.call_count == 0
+        assert todo.completed
+
+        # Persisted: after dropping the cache the file has the same state
+        service._cache.clear()
+        assert (await service.get_todo("1", todo_id)).completed
+
+    async def test_failed_save_keeps_cache(self, service):
+        """Test cache is unchanged when the write fails."""
+        todo_id = await service.create_todo("1", TodoDTO(title="Buy milk"))
+
+        with patch.object(service.storage, "save", side_effect=OSError("disk full")):
+            assert not await service.toggle_todo("1", todo_id)
+            assert not await service.delete_todo("1", todo_id)
+
+        assert not (await service.get_todo("1", todo_id)).completed
+
+    async def test_unreadable_todos_not_cached_or_overwritten(self, service, tmp_path):
+        """Test a failed read aborts writes and is retried instead of caching an empty set."""
+        todo_id = await service.create_todo("1", TodoDTO(title="Buy milk"))
+        path = tmp_path / "user_1.json.enc"
+        stored = path.read_bytes()
+        service._cache.clear()
+        path.write_bytes(b"not a fernet token")
+
+        assert await service.create_todo("1", TodoDTO(title="New")) is None
+        assert await service.list_todos("1") == []
+        assert "1" not in service._cache
+
+        path.write_bytes(stored)
+        assert [t.id for t in await service.list_todos("1")] == [todo_id]
+
+    @pytest.mark.parametrize("backend", ["files", "sqlite"])
+    async def test_writes_from_another_process_not_lost(self, tmp_path, backend):
+        """Test a cached set is re-read after another process (bot vs web app) wrote."""
+        with patch.object(settings, "encryption_key", Fernet.generate_key().decode()), \
+             patch("app.services.todos_service.ANALYTICS_ENABLED", False):
+            bot = TodosService(data_dir=str(tmp_path), backend=backend)
+            web = TodosService(data_dir=str(tmp_path), backend=backend)
+            try:
+                first = await bot.create_todo("1", TodoDTO(title="From bot"))
+                assert [t.id for t in await web.list_todos("1")] == [first]
+
+                second = await web.create_todo("1", TodoDTO(title="From web"))
+                assert {t.id for t in await bot.list_todos("1")} == {first, second}
+
+                assert await bot.toggle_todo("1", second)
+                todos = {t.id: t.completed for t in await web.list_todos("1")}
+                assert todos == {first: False, second: True}
+            finally:
+                for service in (bot, web):
+                    if backend == "sqlite":
+                        service.storage.close()
+
+    def test_user_locks_bounded(self, service):
+        """Test locks are striped, not one per user ever seen."""
+        locks = {id(service._user_lock(str(user_id))) for user_id in range(1000)}
+        assert len(locks) <= service.LOCK_STRIPES
+        assert service._user_lock("42") is service._user_lock("42")
+
+    async def test_missing_todo(self, service):
+        """Test update/toggle/delete of unknown todo return False."""
+        assert not await service.toggle_todo("1", "missing")
+        assert not await service.update_todo("1", "missing", TodoDTO(title="x"))
+        assert not await service.delete_todo("1", "missing")
+
+
+class TestAtomicWrites:
+    """Test EncryptedStorage writes."""
+
+    def test_atomic_compact_write(self, tmp_path):
+        """Test no temp files remain and the encrypted payload is compact JSON."""
+        storage = EncryptedStorage(data_dir=str(tmp_path), key_from_env=Fernet.generate_key().decode())
+        storage.save({"a": {"b": 1}}, "user_1.json")
+        storage.save({"a": {"b": 2}}, "user_1.json")
+
+        assert [p.name for p in tmp_path.iterdir()] == ["user_1.json.enc"]
+        raw = storage.cipher.decrypt((tmp_path / "user_1.json.enc").read_bytes())
+        assert raw == b'{"a":{"b":2}}'
@@ -0,0 +1,56 @@
+"""
+Unit tests for SQLite-backed UserPreferencesService.
+"""
+
+import json
+import sqlite3
+import pytest
+
+from app.services.translations import Language
+from app.services.user_preferences import UserPreferencesService
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    return str(tmp_path / "user_preferences.json")
+
+
+class TestUserPreferencesStorage:
+    """Test per-key durable writes and the read-through cache."""
+
+    def test_writes_durable_without_flush(self, data_file):
+        """Test a new instance sees settings written by another one (no flush)."""
+        prefs = UserPreferencesService(data_file=data_file)
+        prefs.set_timezone("1", "Asia/Tokyo")
+        prefs.set_quiet_hours("1", "23:00", "07:00")
+        prefs.set_language("2", Language.ENGLISH)
+
+        reopened = UserPreferencesService(data_file=data_file)
+        assert reopened.get_timezone("1") == "Asia/Tokyo"
+        assert reopened.get_quiet_hours("1") == ("23:00", "07:00")
+        assert reopened.has_selected_language("2") and not reopened.has_selected_language("1")
+        assert reopened.get_morning_summary_time("3") == "07:30"  # Default for unknown user
+
+    def test_setter_writes_only_its_keys(self, data_file):
+        """Test one row per key; updating a key replaces just that row."""
+        prefs = UserPreferencesService(data_file=data_file)
+        prefs.set_timezone("1", "UTC")
+        prefs.set_evening_digest_enabled("1", False)
+        prefs.set_timezone("1", "Europe/Moscow")
+
+        conn = sqlite3.connect(str(prefs.db_path))
+        rows = dict(conn.execute("SELECT key, value FROM user_preferences WHERE user_id = '1'").fetchall())
+        conn.close()
+        assert rows == {"timezone": '"Europe/Moscow"', "evening_digest_enabled": "false"}
+
+    def test_legacy_json_imported_once(self, tmp_path, data_file):
+        """Test JSON file is imported into SQLite and renamed."""
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump({"1": {"timezone": "Asia/Vladivostok", "motivation_index": 5}}, f)
+
+        prefs = UserPreferencesService(data_file=data_file)
+
+        assert prefs.get_timezone("1") == "Asia/Vladivostok"
+        assert prefs.increment_motivation_index("1") == 6
+        assert not (tmp_path / "user_preferences.json").exists()
+        assert (tmp_path / "user_preferences.json.migrated").exists()